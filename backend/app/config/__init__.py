@@ -3,11 +3,14 @@ Configuration package for the Stima Sacco Debt Management System.
 """
 
 from .settings import app_config
-from .database import get_database, close_database_connection
+from .database import get_database, close_database_connection, reset_database_connection
+from .indexes import ensure_indexes
 
 __all__ = [
     "app_config",
     "get_database", 
     "close_database_connection",
+    "reset_database_connection",
+    "ensure_indexes",
 ]
 
@@ -7,6 +7,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from pathlib import Path
 from dotenv import load_dotenv
 
+from ..utils.query_profiler import query_profiler
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent.parent.parent
 load_dotenv(ROOT_DIR / '.env')
@@ -25,7 +27,7 @@ class DatabaseConfig:
     def client(self) -> AsyncIOMotorClient:
         """Get MongoDB client instance."""
         if self._client is None:
-            self._client = AsyncIOMotorClient(self.mongo_url)
+            self._client = AsyncIOMotorClient(self.mongo_url, event_listeners=[query_profiler])
         return self._client
 
     @property
@@ -40,6 +42,16 @@ class DatabaseConfig:
         if self._client:
             self._client.close()
 
+    def reset(self):
+        """
+        Forget the client so the next use creates a new one.
+        
+        Called in each server worker after fork: a client must not be shared
+        across processes, and the parent still owns the inherited one.
+        """
+        self._client = None
+        self._database = None
+
 
 # Global database instance
 db_config = DatabaseConfig()
@@ -54,3 +66,8 @@ async def close_database_connection():
     """Close database connection."""
     await db_config.close_connection()
 
+
+def reset_database_connection():
+    """Drop this process's inherited client (after fork)."""
+    db_config.reset()
+
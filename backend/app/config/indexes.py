@@ -0,0 +1,258 @@
+"""
+MongoDB index definitions and creation.
+
+Every collection is looked up by its application ``id``, so each gets a
+unique index on it; hot query paths get their own compound indexes.
+``create_indexes`` is idempotent, so this runs on every startup.
+
+Branch-scoped queries (see ``utils.branch_scope``) are served by indexes led
+by ``branch_code``; in a sharded deployment the same field leads the shard
+keys (``SHARD_KEYS``).
+"""
+
+import logging
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from .database import get_database
+from .settings import app_config
+
+logger = logging.getLogger(__name__)
+
+# MongoDB duplicate key error
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], unique=True, name="id_unique")
+
+
+def _branch_id_index() -> IndexModel:
+    # Shard key index of the branch-partitioned collections (see SHARD_KEYS)
+    return IndexModel([("branch_code", ASCENDING), ("id", ASCENDING)], unique=True, name="branch_id_unique")
+
+
+COLLECTION_INDEXES = {
+    "members": [
+        _id_index(),
+        IndexModel([("member_number", ASCENDING)], unique=True, name="member_number_unique"),
+        IndexModel([("id_number", ASCENDING)], unique=True, name="id_number_unique"),
+        # Members may share a phone (family lines), so it is looked up but not unique
+        IndexModel([("phone_number", ASCENDING)], name="phone_number"),
+        # Blocking keys for duplicate detection (see services.dedup_service)
+        IndexModel([("dedup_keys", ASCENDING)], name="dedup_keys"),
+        _branch_id_index(),
+    ],
+    "loan_accounts": [
+        _id_index(),
+        IndexModel([("status", ASCENDING)], name="status"),
+        IndexModel([("member_id", ASCENDING)], name="member_id"),
+        _branch_id_index(),
+        # Branch NPL lists, counts and summaries
+        IndexModel([("branch_code", ASCENDING), ("status", ASCENDING)], name="branch_status"),
+        IndexModel([("branch_code", ASCENDING), ("member_id", ASCENDING)], name="branch_member_id"),
+    ],
+    "call_logs": [
+        _id_index(),
+        IndexModel([("loan_id", ASCENDING), ("call_start_time", DESCENDING)], name="loan_id_call_start_time"),
+        IndexModel([("call_start_time", DESCENDING)], name="call_start_time"),
+        _branch_id_index(),
+        IndexModel([("branch_code", ASCENDING), ("call_start_time", DESCENDING)], name="branch_call_start_time"),
+    ],
+    "promises_to_pay": [
+        _id_index(),
+        IndexModel([("status", ASCENDING), ("promised_date", ASCENDING)], name="status_promised_date"),
+        IndexModel([("loan_id", ASCENDING), ("status", ASCENDING)], name="loan_id_status"),
+        _branch_id_index(),
+        # Promises due today (equality on status) and the 30-day collection report (range only)
+        IndexModel(
+            [("branch_code", ASCENDING), ("status", ASCENDING), ("promised_date", ASCENDING)],
+            name="branch_status_promised_date",
+        ),
+        IndexModel([("branch_code", ASCENDING), ("promised_date", ASCENDING)], name="branch_promised_date"),
+    ],
+    "external_partners": [
+        _id_index(),
+    ],
+    "partner_assignments": [
+        _id_index(),
+        IndexModel([("status", ASCENDING)], name="status"),
+        IndexModel([("assigned_date", DESCENDING)], name="assigned_date"),
+        IndexModel([("loan_id", ASCENDING), ("status", ASCENDING)], name="loan_id_status"),
+        IndexModel([("partner_id", ASCENDING), ("status", ASCENDING)], name="partner_id_status"),
+        _branch_id_index(),
+        IndexModel([("branch_code", ASCENDING), ("status", ASCENDING)], name="branch_status"),
+    ],
+    "loan_schedules": [
+        IndexModel([("loan_id", ASCENDING), ("method", ASCENDING)], name="loan_id_method", unique=True),
+    ],
+    "status_transitions": [
+        _id_index(),
+        IndexModel(
+            [("entity", ASCENDING), ("entity_id", ASCENDING), ("occurred_at", DESCENDING)],
+            name="entity_history",
+        ),
+        IndexModel([("batch_id", ASCENDING)], name="batch_id"),
+    ],
+    "partner_ledger": [
+        _id_index(),
+        IndexModel(
+            [("partner_id", ASCENDING), ("period", ASCENDING), ("occurred_at", ASCENDING)],
+            name="partner_period",
+        ),
+        IndexModel(
+            [("recorded_at", ASCENDING)],
+            name="unapplied",
+            partialFilterExpression={"applied": False},
+        ),
+    ],
+    "partner_ledger_buckets": [
+        IndexModel([("period", ASCENDING), ("partner_id", ASCENDING)], name="period_partner"),
+    ],
+    "agents": [
+        IndexModel([("agent_id", ASCENDING)], unique=True, name="agent_id_unique"),
+        IndexModel([("branch_code", ASCENDING)], name="branch_code"),
+    ],
+    "worklist_items": [
+        IndexModel([("loan_id", ASCENDING)], unique=True, name="loan_id_unique"),
+        # Agent "next" pops: equality on the queue owner, sorted by priority, ranged on ready_at
+        IndexModel(
+            [("agent_id", ASCENDING), ("priority", DESCENDING), ("ready_at", ASCENDING)],
+            name="agent_queue",
+        ),
+        IndexModel(
+            [("branch_code", ASCENDING), ("agent_id", ASCENDING), ("priority", DESCENDING), ("ready_at", ASCENDING)],
+            name="branch_queue",
+        ),
+        IndexModel([("generation", ASCENDING)], name="generation"),
+    ],
+    "follow_ups": [
+        _id_index(),
+        # Due-timer loading and missed-timer recovery are range scans on this index
+        IndexModel([("status", ASCENDING), ("due_at", ASCENDING)], name="status_due_at"),
+        IndexModel([("agent_id", ASCENDING), ("status", ASCENDING), ("due_at", ASCENDING)], name="agent_status_due_at"),
+        IndexModel([("loan_id", ASCENDING), ("status", ASCENDING)], name="loan_id_status"),
+    ],
+    "note_index": [
+        _id_index(),
+        IndexModel([("notes", TEXT)], name="notes_text", default_language="english"),
+        # Prefix queries are anchored regexes over each note's distinct terms
+        IndexModel([("terms", ASCENDING), ("noted_at", DESCENDING)], name="terms_noted_at"),
+        IndexModel([("agent_id", ASCENDING), ("noted_at", DESCENDING)], name="agent_noted_at"),
+        IndexModel([("loan_id", ASCENDING), ("noted_at", DESCENDING)], name="loan_noted_at"),
+    ],
+    "idempotency_keys": [
+        _id_index(),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+    "users": [
+        IndexModel([("user_id", ASCENDING)], unique=True, name="user_id_unique"),
+        IndexModel([("username", ASCENDING)], unique=True, name="username_unique"),
+    ],
+    "revoked_tokens": [
+        # Looked up by token id on a verified-token cache miss; gone once the token has expired
+        IndexModel([("jti", ASCENDING)], unique=True, name="jti_unique"),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+    "domain_events": [
+        _id_index(),
+        # Consumers read forward from their offset on this index
+        IndexModel([("seq", ASCENDING)], unique=True, name="seq_unique"),
+        IndexModel(
+            [("recorded_at", ASCENDING)],
+            expireAfterSeconds=app_config.EVENT_RETENTION_DAYS * 86400,
+            name="recorded_at_ttl",
+        ),
+    ],
+    "event_consumers": [
+        _id_index(),
+    ],
+    "event_counters": [
+        _id_index(),
+    ],
+    "batch_runs": [
+        IndexModel([("job", ASCENDING), ("business_date", ASCENDING), ("started_at", DESCENDING)], name="job_date"),
+    ],
+    "notifications": [
+        _id_index(),
+        IndexModel([("sent_at", DESCENDING)], name="sent_at"),
+    ],
+    "balance_snapshots": [
+        _id_index(),
+        IndexModel(
+            [("branch_code", ASCENDING), ("chunk", ASCENDING), ("business_date", DESCENDING)],
+            name="branch_chunk_date",
+        ),
+        IndexModel([("branch_code", ASCENDING), ("business_date", ASCENDING)], name="branch_date"),
+        IndexModel([("business_date", DESCENDING)], name="business_date"),
+    ],
+    "balance_snapshot_loans": [
+        IndexModel([("branch_code", ASCENDING), ("chunk", ASCENDING)], unique=True, name="branch_chunk_unique"),
+    ],
+}
+
+
+# Shard keys of the branch-partitioned collections, applied when MONGO_SHARDED is set
+# (``shard_collections``). Ranges of branch_code keep a branch's records on few shards, so
+# a branch-scoped query is routed to those shards only, and zones can pin branches to
+# shards near them; id splits a branch into chunks and, being random, spreads its inserts.
+# Queries without a branch (admins, lookups by id alone) are broadcast to every shard.
+# Members stay unsharded: member numbers and national IDs are unique across branches, and
+# a sharded collection can only enforce unique indexes that start with its shard key.
+SHARD_KEYS = {
+    "loan_accounts": {"branch_code": 1, "id": 1},
+    "call_logs": {"branch_code": 1, "id": 1},
+    "promises_to_pay": {"branch_code": 1, "id": 1},
+    "partner_assignments": {"branch_code": 1, "id": 1},
+}
+
+
+def shard_compatible(collection: str, index: IndexModel) -> bool:
+    """Whether an index can exist on the collection once it is sharded on ``SHARD_KEYS``."""
+    shard_key = SHARD_KEYS.get(collection)
+    if shard_key is None or not index.document.get("unique"):
+        return True
+    return list(index.document["key"])[:len(shard_key)] == list(shard_key)
+
+
+# Indexes replaced by a differently named definition, dropped before creating the new ones
+SUPERSEDED_INDEXES = {
+    "members": ["member_number"],
+}
+
+
+async def ensure_indexes(db=None) -> None:
+    """
+    Create all application indexes (no-op for indexes that already exist).
+
+    A unique index cannot be built over data that already violates it; such
+    an index is skipped with an error logged and the rest are still created.
+    With ``MONGO_SHARDED`` set, unique indexes a sharded collection cannot
+    have (``id_unique``) are not created; ``branch_id_unique`` takes their place.
+    """
+    db = db if db is not None else get_database()
+    for collection, names in SUPERSEDED_INDEXES.items():
+        existing = await db[collection].index_information()
+        for name in names:
+            if name in existing:
+                await db[collection].drop_index(name)
+    for collection, indexes in COLLECTION_INDEXES.items():
+        if app_config.MONGO_SHARDED:
+            indexes = [index for index in indexes if shard_compatible(collection, index)]
+        try:
+            await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            if e.code != DUPLICATE_KEY_ERROR:
+                raise
+            for index in indexes:
+                try:
+                    await db[collection].create_indexes([index])
+                except OperationFailure as index_error:
+                    if index_error.code != DUPLICATE_KEY_ERROR:
+                        raise
+                    logger.error(
+                        f"Index {index.document['name']} on {collection} not created: existing documents "
+                        f"are duplicates ({index_error.details.get('errmsg') if index_error.details else index_error}). "
+                        "Resolve them (see the dedupe_members job) and restart."
+                    )
@@ -10,6 +10,12 @@ from dotenv import load_dotenv
 ROOT_DIR = Path(__file__).parent.parent.parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Signing key used when SECRET_KEY is not set (development only)
+DEFAULT_SECRET_KEY = 'your-secret-key-here'
+
+# Published signing keys (the default and the .env.example placeholder); anyone could forge tokens with them
+INSECURE_SECRET_KEYS = frozenset({DEFAULT_SECRET_KEY, 'your-secret-key-change-in-production'})
+
 
 class AppConfig:
     """Application configuration class."""
@@ -22,10 +28,16 @@ class AppConfig:
     # Database Configuration
     MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
     DATABASE_NAME = os.environ.get('DB_NAME', 'stima_sacco')
+    MONGO_SHARDED = os.environ.get('MONGO_SHARDED', 'false').lower() == 'true'  # connected through mongos
     
     # Security Configuration
-    SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-here')
+    SECRET_KEY = os.environ.get('SECRET_KEY', DEFAULT_SECRET_KEY)
+    # Development only: run with a published SECRET_KEY instead of refusing to start
+    ALLOW_INSECURE_SECRET_KEY = os.environ.get('ALLOW_INSECURE_SECRET_KEY', 'false').lower() == 'true'
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES', '30'))
+    AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', '10000'))
+    AUTH_TOKEN_CACHE_TTL_SECONDS = float(os.environ.get('AUTH_TOKEN_CACHE_TTL_SECONDS', '60'))
+    BRANCH_SCOPING_ENABLED = os.environ.get('BRANCH_SCOPING_ENABLED', 'true').lower() == 'true'
     
     # CORS Configuration
     ALLOWED_ORIGINS = [
@@ -36,10 +48,101 @@ class AppConfig:
     
     # Logging Configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+    LOG_FILE = os.environ.get('LOG_FILE') or None
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    LOG_INFO_SAMPLE_RATE = float(os.environ.get('LOG_INFO_SAMPLE_RATE', '1.0'))
+    
+    # Dummy Data Seeding Configuration
+    SEED_DUMMY_DATA = os.environ.get('SEED_DUMMY_DATA', 'true').lower() == 'true'
+    # The demo accounts have published passwords; only for demos and development
+    SEED_DEMO_USERS = os.environ.get('SEED_DEMO_USERS', 'false').lower() == 'true'
+    SEED_REQUIRED_FOR_READINESS = os.environ.get('SEED_REQUIRED_FOR_READINESS', 'false').lower() == 'true'
+    SEED_MEMBER_COUNT = int(os.environ.get('SEED_MEMBER_COUNT', '1000'))
+    SEED_RANDOM_SEED = int(os.environ.get('SEED_RANDOM_SEED', '42'))
+    SEED_BATCH_SIZE = int(os.environ.get('SEED_BATCH_SIZE', '5000'))
+    SEED_CONCURRENCY = int(os.environ.get('SEED_CONCURRENCY', '4'))
+    SEED_ROWS_PER_SECOND = float(os.environ.get('SEED_ROWS_PER_SECOND', '0'))
+    
+    # Arrears Batch Configuration
+    ARREARS_NPL_DAYS = int(os.environ.get('ARREARS_NPL_DAYS', '90'))
+    ARREARS_DEFAULT_DAYS = int(os.environ.get('ARREARS_DEFAULT_DAYS', '360'))
+    ARREARS_BATCH_CHUNK_SIZE = int(os.environ.get('ARREARS_BATCH_CHUNK_SIZE', '5000'))
+    ARREARS_BATCH_WINDOW_SECONDS = float(os.environ.get('ARREARS_BATCH_WINDOW_SECONDS', '1800'))
+    
+    # Escalation Configuration
+    ESCALATION_HEAD_OFFICE_DAYS = int(os.environ.get('ESCALATION_HEAD_OFFICE_DAYS', '90'))
+    ESCALATION_HEAD_OFFICE_BROKEN_PROMISES = int(os.environ.get('ESCALATION_HEAD_OFFICE_BROKEN_PROMISES', '1'))
+    ESCALATION_HEAD_OFFICE_FAILED_CALLS = int(os.environ.get('ESCALATION_HEAD_OFFICE_FAILED_CALLS', '3'))
+    ESCALATION_EXTERNAL_DAYS = int(os.environ.get('ESCALATION_EXTERNAL_DAYS', '180'))
+    ESCALATION_EXTERNAL_BROKEN_PROMISES = int(os.environ.get('ESCALATION_EXTERNAL_BROKEN_PROMISES', '2'))
+    ESCALATION_EXTERNAL_FAILED_CALLS = int(os.environ.get('ESCALATION_EXTERNAL_FAILED_CALLS', '5'))
+    ESCALATION_BATCH_CHUNK_SIZE = int(os.environ.get('ESCALATION_BATCH_CHUNK_SIZE', '5000'))
+    
+    # Agent Worklist Configuration
+    WORKLIST_AGENT_CAPACITY = int(os.environ.get('WORKLIST_AGENT_CAPACITY', '200'))
+    WORKLIST_LEASE_MINUTES = int(os.environ.get('WORKLIST_LEASE_MINUTES', '15'))
+    WORKLIST_RETRY_HOURS = float(os.environ.get('WORKLIST_RETRY_HOURS', '2'))
+    
+    # Follow-up Reminder Configuration
+    FOLLOW_UP_SCHEDULER_ENABLED = os.environ.get('FOLLOW_UP_SCHEDULER_ENABLED', 'true').lower() == 'true'
+    FOLLOW_UP_TICK_SECONDS = float(os.environ.get('FOLLOW_UP_TICK_SECONDS', '1'))
+    FOLLOW_UP_WINDOW_MINUTES = int(os.environ.get('FOLLOW_UP_WINDOW_MINUTES', '60'))
+    FOLLOW_UP_MAX_TIMERS = int(os.environ.get('FOLLOW_UP_MAX_TIMERS', '100000'))
+    
+    # Member Deduplication Configuration
+    DEDUP_NAME_SIMILARITY = float(os.environ.get('DEDUP_NAME_SIMILARITY', '0.85'))
+    DEDUP_MAX_BLOCK_SIZE = int(os.environ.get('DEDUP_MAX_BLOCK_SIZE', '200'))
+    
+    # Idempotency Key Configuration
+    IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+    IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '30'))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', '5'))
+    
+    # Domain Event Stream Configuration
+    EVENT_SOURCE = os.environ.get('EVENT_SOURCE', 'auto')  # auto, change_stream or outbox
+    EVENT_BATCH_SIZE = int(os.environ.get('EVENT_BATCH_SIZE', '500'))
+    EVENT_POLL_SECONDS = float(os.environ.get('EVENT_POLL_SECONDS', '1'))
+    EVENT_GAP_GRACE_SECONDS = int(os.environ.get('EVENT_GAP_GRACE_SECONDS', '30'))
+    EVENT_RETENTION_DAYS = int(os.environ.get('EVENT_RETENTION_DAYS', '7'))
+    
+    # Request Coalescing Configuration
+    SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+    SINGLE_FLIGHT_SCOPE = os.environ.get('SINGLE_FLIGHT_SCOPE', 'global')  # global, branch, role or branch_role
+    
+    # Admission Control Configuration (per worker process)
+    ADMISSION_CONTROL_ENABLED = os.environ.get('ADMISSION_CONTROL_ENABLED', 'true').lower() == 'true'
+    ADMISSION_CRITICAL_CONCURRENCY = int(os.environ.get('ADMISSION_CRITICAL_CONCURRENCY', '64'))
+    ADMISSION_CRITICAL_QUEUE_MS = int(os.environ.get('ADMISSION_CRITICAL_QUEUE_MS', '2000'))
+    ADMISSION_INTERACTIVE_CONCURRENCY = int(os.environ.get('ADMISSION_INTERACTIVE_CONCURRENCY', '32'))
+    ADMISSION_INTERACTIVE_QUEUE_MS = int(os.environ.get('ADMISSION_INTERACTIVE_QUEUE_MS', '500'))
+    ADMISSION_REPORTS_CONCURRENCY = int(os.environ.get('ADMISSION_REPORTS_CONCURRENCY', '4'))
+    ADMISSION_REPORTS_QUEUE_MS = int(os.environ.get('ADMISSION_REPORTS_QUEUE_MS', '250'))
+    RATE_LIMIT_PER_SECOND = float(os.environ.get('RATE_LIMIT_PER_SECOND', '10'))
+    RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', '60'))
+    RATE_LIMIT_REPORT_COST = float(os.environ.get('RATE_LIMIT_REPORT_COST', '5'))
+    
+    # Amortization Configuration
+    SCHEDULE_CACHE_SIZE = int(os.environ.get('SCHEDULE_CACHE_SIZE', '10000'))
+    
+    # Balance Snapshot Configuration
+    SNAPSHOT_CHUNK_SIZE = int(os.environ.get('SNAPSHOT_CHUNK_SIZE', '10000'))  # loan positions per document; fixed once snapshots exist
+    SNAPSHOT_KEYFRAME_DAYS = int(os.environ.get('SNAPSHOT_KEYFRAME_DAYS', '7'))  # full values at least this often
+    
+    # Query Profiling Configuration
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100'))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+    QUERY_TRACE_HEADER_ENABLED = os.environ.get('QUERY_TRACE_HEADER_ENABLED', 'false').lower() == 'true'
     
     # External Integrations
     PROFIX_API_URL = os.environ.get('PROFIX_API_URL', '')
     PROFIX_API_KEY = os.environ.get('PROFIX_API_KEY', '')
+    PROFIX_TIMEOUT_SECONDS = float(os.environ.get('PROFIX_TIMEOUT_SECONDS', '5'))
+    PROFIX_MAX_CONCURRENCY = int(os.environ.get('PROFIX_MAX_CONCURRENCY', '10'))
+    PROFIX_MAX_WAIT_SECONDS = float(os.environ.get('PROFIX_MAX_WAIT_SECONDS', '0.5'))
+    PROFIX_RETRY_ATTEMPTS = int(os.environ.get('PROFIX_RETRY_ATTEMPTS', '3'))
+    PROFIX_BREAKER_FAILURES = int(os.environ.get('PROFIX_BREAKER_FAILURES', '5'))
+    PROFIX_BREAKER_RESET_SECONDS = float(os.environ.get('PROFIX_BREAKER_RESET_SECONDS', '30'))
 
 
 # Global configuration instance
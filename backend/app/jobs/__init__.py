@@ -0,0 +1,6 @@
+"""
+Batch job entry points for the Stima Sacco Debt Management System.
+
+Each job module is runnable with ``python -m app.jobs.<job>`` from the
+backend directory, for scheduling from cron or a container job runner.
+"""
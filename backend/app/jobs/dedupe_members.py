@@ -0,0 +1,45 @@
+"""
+Member duplicate scan job.
+
+Usage:
+    python -m app.jobs.dedupe_members [--max-block-size N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from ..config import app_config, close_database_connection
+from ..services import MemberDedupService
+from ..utils import setup_logging, shutdown_logging
+
+
+async def run(args: argparse.Namespace) -> int:
+    dedup_service = MemberDedupService()
+    try:
+        report = await dedup_service.scan(max_block_size=args.max_block_size)
+    finally:
+        await close_database_connection()
+    summary = report.dict(exclude={"pairs"})
+    summary["top_pairs"] = [pair.dict() for pair in report.pairs[:args.show]]
+    print(json.dumps(summary, default=str))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Scan members for probable duplicates and store a report")
+    parser.add_argument("--max-block-size", type=int, default=None,
+                        help="Skip blocking keys shared by more members (default DEDUP_MAX_BLOCK_SIZE)")
+    parser.add_argument("--show", type=int, default=20, help="Duplicate pairs to print")
+    args = parser.parse_args()
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Rule-driven loan escalation and partner assignment job.
+
+Usage:
+    python -m app.jobs.escalate_loans [--chunk-size N] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from ..config import app_config, close_database_connection
+from ..services import EscalationService
+from ..utils import setup_logging, shutdown_logging
+
+
+async def run(args: argparse.Namespace) -> int:
+    escalation_service = EscalationService()
+    try:
+        summary = await escalation_service.run_escalations(chunk_size=args.chunk_size, dry_run=args.dry_run)
+    finally:
+        await close_database_connection()
+    print(json.dumps(summary))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Escalate non-performing loans and assign external partners")
+    parser.add_argument("--chunk-size", type=int, help="Loans evaluated per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Evaluate without writing")
+    args = parser.parse_args()
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
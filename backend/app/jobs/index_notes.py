@@ -0,0 +1,41 @@
+"""
+Note search index rebuild job.
+
+Usage:
+    python -m app.jobs.index_notes [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from ..config import app_config, close_database_connection
+from ..services import NoteSearchService
+from ..utils import setup_logging, shutdown_logging
+
+
+async def run(args: argparse.Namespace) -> int:
+    note_search_service = NoteSearchService()
+    try:
+        counts = await note_search_service.reindex(batch_size=args.batch_size)
+    finally:
+        await close_database_connection()
+    print(json.dumps(counts))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the call and promise note search index")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Notes written per bulk_write")
+    args = parser.parse_args()
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
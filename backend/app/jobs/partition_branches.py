@@ -0,0 +1,49 @@
+"""
+Branch partitioning job: backfill branch codes, optionally shard.
+
+Usage:
+    python -m app.jobs.partition_branches [--batch-size N]
+    MONGO_SHARDED=true python -m app.jobs.partition_branches --shard
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from ..config import app_config, close_database_connection, ensure_indexes
+from ..services import BranchPartitionService
+from ..utils import setup_logging, shutdown_logging
+
+
+async def run(args: argparse.Namespace) -> int:
+    partition_service = BranchPartitionService()
+    try:
+        result = {"backfilled": await partition_service.backfill_branch_codes(batch_size=args.batch_size)}
+        if args.shard:
+            await ensure_indexes()
+            result["sharded"] = await partition_service.shard_collections()
+    finally:
+        await close_database_connection()
+    print(json.dumps(result))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backfill branch codes on loan activity and shard by branch")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Records updated per bulk_write")
+    parser.add_argument("--shard", action="store_true",
+                        help="Shard the branch-partitioned collections (through mongos, with MONGO_SHARDED=true)")
+    args = parser.parse_args()
+    if args.shard and not app_config.MONGO_SHARDED:
+        parser.error("--shard needs MONGO_SHARDED=true, so id_unique indexes are not recreated on startup")
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Agent worklist rebuild job.
+
+Usage:
+    python -m app.jobs.rebuild_worklists [--branch CODE] [--chunk-size N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from ..config import app_config, close_database_connection
+from ..services import WorklistService
+from ..utils import setup_logging, shutdown_logging
+
+
+async def run(args: argparse.Namespace) -> int:
+    worklist_service = WorklistService()
+    try:
+        summary = await worklist_service.rebuild_worklists(branch_code=args.branch, chunk_size=args.chunk_size)
+    finally:
+        await close_database_connection()
+    print(json.dumps(summary))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild per-agent call worklists")
+    parser.add_argument("--branch", help="Only rebuild this branch's worklists")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Loans scored per batch")
+    args = parser.parse_args()
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+End-of-day arrears recomputation job.
+
+Usage:
+    python -m app.jobs.recompute_arrears [--as-of YYYY-MM-DD] [--chunk-size N] [--window-seconds S]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+from ..config import app_config, close_database_connection
+from ..services import ArrearsService
+from ..utils import setup_logging, shutdown_logging
+
+
+async def run(args: argparse.Namespace) -> int:
+    arrears_service = ArrearsService()
+    try:
+        summary = await arrears_service.recompute_arrears(
+            as_of=datetime.strptime(args.as_of, "%Y-%m-%d") if args.as_of else None,
+            chunk_size=args.chunk_size,
+            window_seconds=args.window_seconds,
+            resume=not args.no_resume,
+        )
+    finally:
+        await close_database_connection()
+    print(json.dumps(summary))
+    return 0 if summary["completed"] else 2
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute loan arrears and reclassify loan status")
+    parser.add_argument("--as-of", help="Business date (YYYY-MM-DD); defaults to now")
+    parser.add_argument("--chunk-size", type=int, help="Loans per cursor batch and bulk write")
+    parser.add_argument("--window-seconds", type=float, help="Stop resumably after this many seconds")
+    parser.add_argument("--no-resume", action="store_true", help="Start over instead of resuming")
+    args = parser.parse_args()
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
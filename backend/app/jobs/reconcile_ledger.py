@@ -0,0 +1,48 @@
+"""
+Partner ledger reconciliation job.
+
+Applies recoveries and settlements whose totals an interrupted write did not
+apply, and removes settlements that were overtaken.
+
+Usage:
+    python -m app.jobs.reconcile_ledger [--grace-seconds N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from ..config import app_config, close_database_connection
+from ..services import SettlementService
+from ..services.settlement_service import RECONCILE_GRACE_SECONDS
+from ..utils import setup_logging, shutdown_logging
+
+
+async def run(args: argparse.Namespace) -> int:
+    settlement_service = SettlementService()
+    try:
+        counts = await settlement_service.reconcile(grace_seconds=args.grace_seconds)
+    finally:
+        await close_database_connection()
+    print(json.dumps(counts))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply partner ledger entries left unapplied by an interrupted write")
+    parser.add_argument(
+        "--grace-seconds", type=float, default=RECONCILE_GRACE_SECONDS,
+        help="Leave entries recorded more recently than this to the writes still applying them",
+    )
+    args = parser.parse_args()
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Change stream relay into the domain event stream.
+
+Runs until stopped; run one relay per deployment. Needs a replica set
+(``EVENT_SOURCE`` auto or change_stream).
+
+Usage:
+    python -m app.jobs.relay_events [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from ..config import app_config, close_database_connection
+from ..services import EventStreamService
+from ..services.event_stream_service import resolve_event_source
+from ..utils import get_logger, setup_logging, shutdown_logging
+
+logger = get_logger(__name__)
+
+
+async def run(args: argparse.Namespace) -> int:
+    event_stream_service = EventStreamService()
+    try:
+        if await resolve_event_source() != "change_stream":
+            logger.error("Change streams are unavailable (standalone server or EVENT_SOURCE=outbox); "
+                         "write paths publish to the outbox instead")
+            return 1
+        await event_stream_service.relay_changes(batch_size=args.batch_size)
+    finally:
+        await close_database_connection()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Relay MongoDB change streams into domain_events")
+    parser.add_argument("--batch-size", type=int, default=None, help="Changes appended per batch (default EVENT_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Daily balance snapshot job: record every loan's balances and status.
+
+Run after ``recompute_arrears`` for the same business date.
+
+Usage:
+    python -m app.jobs.snapshot_balances [--as-of YYYY-MM-DD] [--branch CODE]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+from ..config import app_config, close_database_connection
+from ..services import BalanceSnapshotService
+from ..utils import setup_logging, shutdown_logging
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        result = await BalanceSnapshotService(branch_code=args.branch).take_snapshot(args.as_of)
+    finally:
+        await close_database_connection()
+    print(json.dumps(result))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Take the daily loan balance snapshot")
+    parser.add_argument("--as-of", help="Business date (YYYY-MM-DD); defaults to today")
+    parser.add_argument("--branch", help="Snapshot one branch only (default all)")
+    args = parser.parse_args()
+    if args.as_of:
+        try:
+            datetime.strptime(args.as_of, "%Y-%m-%d")
+        except ValueError:
+            parser.error("--as-of must be YYYY-MM-DD")
+
+    setup_logging(app_config.LOG_LEVEL, log_format=app_config.LOG_FORMAT)
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
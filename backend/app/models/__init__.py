@@ -10,7 +10,39 @@ from .external_partner import ExternalPartner, ExternalPartnerCreate
 from .partner_assignment import PartnerAssignment, PartnerAssignmentCreate
 from .notification import Notification
 from .dashboard_stats import DashboardStats
-from .enums import LoanStatus, CallStatus, CallType, PromiseStatus, PartnerType, EscalationLevel
+from .amortization_schedule import AmortizationSchedule
+from .status_transition import StatusTransition, StatusTransitionRequest, TransitionResult
+from .escalation_rule import EscalationRule
+from .partner_ledger import PartnerLedgerEntry, RecoveryCreate, PartnerStatement
+from .agent import Agent
+from .worklist_item import WorklistItem
+from .follow_up import FollowUp
+from .note_search import NoteSearchResult
+from .member_dedup import DuplicateCandidate, DedupReport
+from .domain_event import DomainEvent, EventBatch
+from .user import User, UserProfile, LoginRequest, AccessToken
+from .balance_snapshot import (
+    PortfolioPosition,
+    BranchPortfolioSnapshot,
+    PortfolioSnapshot,
+    StatusMigration,
+    PortfolioComparison,
+    SnapshotStorage,
+)
+from .enums import (
+    LoanStatus,
+    CallStatus,
+    CallType,
+    PromiseStatus,
+    PartnerType,
+    EscalationLevel,
+    AmortizationMethod,
+    TransitionOutcome,
+    LedgerEntryType,
+    FollowUpStatus,
+    NoteSource,
+    UserRole,
+)
 
 __all__ = [
     "Member",
@@ -27,11 +59,43 @@ __all__ = [
     "PartnerAssignmentCreate",
     "Notification",
     "DashboardStats",
+    "AmortizationSchedule",
+    "StatusTransition",
+    "StatusTransitionRequest",
+    "TransitionResult",
+    "EscalationRule",
+    "PartnerLedgerEntry",
+    "RecoveryCreate",
+    "PartnerStatement",
+    "Agent",
+    "WorklistItem",
+    "FollowUp",
+    "NoteSearchResult",
+    "DuplicateCandidate",
+    "DedupReport",
+    "DomainEvent",
+    "EventBatch",
+    "User",
+    "UserProfile",
+    "LoginRequest",
+    "AccessToken",
+    "PortfolioPosition",
+    "BranchPortfolioSnapshot",
+    "PortfolioSnapshot",
+    "StatusMigration",
+    "PortfolioComparison",
+    "SnapshotStorage",
     "LoanStatus",
     "CallStatus",
     "CallType",
     "PromiseStatus",
     "PartnerType",
     "EscalationLevel",
+    "AmortizationMethod",
+    "TransitionOutcome",
+    "LedgerEntryType",
+    "FollowUpStatus",
+    "NoteSource",
+    "UserRole",
 ]
 
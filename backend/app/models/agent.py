@@ -0,0 +1,17 @@
+"""
+Collection agent model for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class Agent(BaseModel):
+    """Collection agent working a branch's non-performing loans."""
+    
+    agent_id: str
+    name: str
+    branch_code: str
+    capacity: int = 200  # maximum loans queued for the agent
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
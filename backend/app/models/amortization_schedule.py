@@ -0,0 +1,38 @@
+"""
+Amortization schedule model for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List
+
+from .enums import AmortizationMethod
+
+
+class AmortizationSchedule(BaseModel):
+    """
+    Instalment schedule for a loan, stored in columnar form.
+
+    Each list holds one value per instalment, in due-date order.
+    """
+    
+    loan_id: str
+    method: AmortizationMethod
+    fingerprint: str  # loan terms the schedule was generated from
+    monthly_payment: float
+    due_dates: List[datetime]
+    principal: List[float]
+    interest: List[float]
+    balance: List[float]  # outstanding principal after each instalment
+    cumulative_due: List[float]
+    generated_at: datetime
+
+    @property
+    def total_interest(self) -> float:
+        """Total interest payable over the life of the loan."""
+        return round(sum(self.interest), 2)
+
+    @property
+    def maturity_date(self) -> datetime:
+        """Due date of the final instalment."""
+        return self.due_dates[-1]
@@ -0,0 +1,71 @@
+"""
+Historical balance snapshot models for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class PortfolioPosition(BaseModel):
+    """Loan count and balances of a set of loans at one snapshot."""
+
+    loans: int = 0
+    outstanding: float = 0.0
+    arrears: float = 0.0
+
+
+class BranchPortfolioSnapshot(BaseModel):
+    """A branch's portfolio as recorded by one daily snapshot."""
+
+    branch_code: str
+    business_date: str  # YYYY-MM-DD; the latest snapshot on or before the requested date
+    total: PortfolioPosition
+    by_status: Dict[str, PortfolioPosition] = Field(default_factory=dict)
+
+
+class PortfolioSnapshot(BaseModel):
+    """Portfolio position as of a date, per branch and overall."""
+
+    as_of: str  # YYYY-MM-DD
+    branches: List[BranchPortfolioSnapshot] = Field(default_factory=list)
+    total: PortfolioPosition = Field(default_factory=PortfolioPosition)
+    by_status: Dict[str, PortfolioPosition] = Field(default_factory=dict)
+
+    @property
+    def npl(self) -> PortfolioPosition:
+        """The non-performing book."""
+        return self.by_status.get("non_performing", PortfolioPosition())
+
+
+class StatusMigration(BaseModel):
+    """Loans that moved from one status to another between two snapshots."""
+
+    from_status: Optional[str] = None  # None: the loan was not in the earlier snapshot
+    to_status: Optional[str] = None  # None: the loan is not in the later snapshot
+    loans: int = 0
+    outstanding_from: float = 0.0
+    outstanding_to: float = 0.0
+
+
+class PortfolioComparison(BaseModel):
+    """Period-over-period change of the portfolio between two snapshots."""
+
+    from_snapshot: PortfolioSnapshot
+    to_snapshot: PortfolioSnapshot
+    change: PortfolioPosition  # to minus from, all loans
+    npl_change: PortfolioPosition  # to minus from, non-performing loans
+    migrations: List[StatusMigration] = Field(default_factory=list)
+
+
+class SnapshotStorage(BaseModel):
+    """Storage used by one business date's snapshot."""
+
+    business_date: str
+    branches: int = 0
+    chunks: int = 0
+    loans: int = 0  # loan positions recorded
+    keyframe: bool = False  # at least one branch stored full values rather than day-over-day changes
+    raw_bytes: int = 0  # the columns uncompressed
+    stored_bytes: int = 0  # the snapshot documents as BSON
+    bytes_per_loan: float = 0.0
+    compression_ratio: float = 0.0
@@ -28,6 +28,7 @@ class CallLog(BaseModel):
     recording_url: Optional[str] = None
     follow_up_required: bool = False
     follow_up_date: Optional[datetime] = None
+    branch_code: Optional[str] = None  # the loan's branch, copied for branch-scoped reports
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     @property
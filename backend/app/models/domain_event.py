@@ -0,0 +1,30 @@
+"""
+Domain event models for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, List
+import uuid
+
+
+class DomainEvent(BaseModel):
+    """A change to a loan, call, promise or partner assignment, in stream order."""
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    seq: int  # position in the stream; consumer offsets refer to it
+    event_type: str  # "<entity>.<created|updated|deleted>", e.g. call_log.created
+    entity: str
+    entity_id: str
+    occurred_at: datetime
+    recorded_at: datetime = Field(default_factory=datetime.utcnow)
+    payload: Dict[str, Any] = {}
+
+
+class EventBatch(BaseModel):
+    """Events after a consumer's committed offset."""
+    
+    consumer: str
+    offset: int  # committed offset the batch was read from
+    next_offset: int  # commit this once the batch is processed
+    events: List[DomainEvent]
@@ -48,3 +48,43 @@ class EscalationLevel(str, Enum):
     HEAD_OFFICE = "head_office"
     EXTERNAL_PARTNER = "external_partner"
 
+
+class AmortizationMethod(str, Enum):
+    """Loan amortization method enumeration."""
+    REDUCING_BALANCE = "reducing_balance"
+    FLAT_RATE = "flat_rate"
+
+
+class TransitionOutcome(str, Enum):
+    """Per-record outcome of a bulk status transition."""
+    APPLIED = "applied"
+    UNCHANGED = "unchanged"  # already in the target status
+    REJECTED = "rejected"  # not allowed from the current status
+    NOT_FOUND = "not_found"
+    CONFLICT = "conflict"  # status changed concurrently
+
+
+class LedgerEntryType(str, Enum):
+    """Partner ledger entry type enumeration."""
+    RECOVERY = "recovery"
+    SETTLEMENT = "settlement"
+
+
+class FollowUpStatus(str, Enum):
+    """Follow-up reminder status enumeration."""
+    PENDING = "pending"
+    FIRED = "fired"
+    CANCELLED = "cancelled"  # superseded by a later follow-up on the loan
+
+
+class NoteSource(str, Enum):
+    """Record type a searchable note was written on."""
+    CALL = "call"
+    PROMISE = "promise"
+
+
+class UserRole(str, Enum):
+    """User role enumeration (admins pass every role check)."""
+    AGENT = "agent"
+    MANAGER = "manager"
+    ADMIN = "admin"
@@ -0,0 +1,22 @@
+"""
+Escalation rule model for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel
+
+from .enums import EscalationLevel
+
+
+class EscalationRule(BaseModel):
+    """
+    Threshold rule that escalates a non-performing loan to a level.
+    
+    A loan matches when it is at least ``min_days_in_arrears`` overdue and
+    has either ``min_broken_promises`` broken promises or
+    ``min_failed_calls`` unsuccessful collection calls.
+    """
+    
+    level: EscalationLevel
+    min_days_in_arrears: int
+    min_broken_promises: int
+    min_failed_calls: int
@@ -19,6 +19,7 @@ class ExternalPartner(BaseModel):
     email: str
     phone_number: str
     commission_rate: float
+    max_active_assignments: int = 5000  # capacity used by the escalation engine
     is_active: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -37,4 +38,5 @@ class ExternalPartnerCreate(BaseModel):
     email: str
     phone_number: str
     commission_rate: float
+    max_active_assignments: int = 5000
 
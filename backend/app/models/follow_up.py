@@ -0,0 +1,27 @@
+"""
+Follow-up reminder model for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from .enums import FollowUpStatus
+
+
+class FollowUp(BaseModel):
+    """Callback reminder scheduled from a call log's follow-up date."""
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    call_id: str
+    loan_id: str
+    member_id: str
+    agent_id: str
+    agent_name: Optional[str] = None
+    due_at: datetime
+    status: FollowUpStatus = FollowUpStatus.PENDING
+    notes: str = ""
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    fired_at: Optional[datetime] = None
+    notification_id: Optional[str] = None
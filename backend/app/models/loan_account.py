@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import Optional
 import uuid
 
-from .enums import LoanStatus
+from .enums import LoanStatus, AmortizationMethod, EscalationLevel
 
 
 class LoanAccount(BaseModel):
@@ -23,12 +23,15 @@ class LoanAccount(BaseModel):
     monthly_payment: float
     interest_rate: float
     loan_term_months: int
+    amortization_method: AmortizationMethod = AmortizationMethod.REDUCING_BALANCE
     disbursement_date: datetime
     maturity_date: datetime
     last_payment_date: Optional[datetime] = None
     days_in_arrears: int = 0
     arrears_amount: float = 0.0
     status: LoanStatus
+    escalation_level: EscalationLevel = EscalationLevel.BRANCH
+    escalated_at: Optional[datetime] = None
     branch_code: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -54,9 +57,10 @@ class LoanAccountCreate(BaseModel):
     loan_type: str
     principal_amount: float
     outstanding_balance: float
-    monthly_payment: float
+    monthly_payment: Optional[float] = None  # derived from the schedule when omitted
     interest_rate: float
     loan_term_months: int
+    amortization_method: AmortizationMethod = AmortizationMethod.REDUCING_BALANCE
     disbursement_date: datetime
     branch_code: str
 
@@ -0,0 +1,34 @@
+"""
+Member deduplication models for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List
+import uuid
+
+
+class DuplicateCandidate(BaseModel):
+    """Members that probably are the same person."""
+    
+    member_ids: List[str]
+    member_numbers: List[str]
+    score: float  # 1.0 for the same national ID
+    reasons: List[str]  # e.g. same_id_number, same_phone, similar_name
+
+
+class DedupReport(BaseModel):
+    """Result of a membership-wide duplicate scan."""
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    started_at: datetime
+    finished_at: datetime
+    members_scanned: int
+    keys_backfilled: int = 0
+    blocks_compared: int  # blocking keys shared by 2..DEDUP_MAX_BLOCK_SIZE members
+    oversized_blocks: int  # keys too common to compare (e.g. frequent names)
+    comparisons: int
+    duplicate_pairs: int
+    clusters: int
+    pairs: List[DuplicateCandidate] = []
+    elapsed_seconds: float
@@ -0,0 +1,22 @@
+"""
+Note search result model for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from .enums import NoteSource
+
+
+class NoteSearchResult(BaseModel):
+    """A call or promise note matching a search query."""
+    
+    id: str  # call log or promise ID
+    source: NoteSource
+    loan_id: str
+    member_id: str
+    agent_id: Optional[str] = None
+    noted_at: Optional[datetime] = None
+    notes: str
+    score: Optional[float] = None  # text relevance, absent for prefix-only queries
@@ -4,6 +4,7 @@ Partner assignment model for the Stima Sacco Debt Management System.
 
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 import uuid
 
 
@@ -19,6 +20,8 @@ class PartnerAssignment(BaseModel):
     commission_amount: float = 0.0
     status: str = "assigned"  # assigned, in_progress, completed, failed
     notes: str = ""
+    escalation_key: Optional[str] = None  # set on assignments made by the escalation engine
+    branch_code: Optional[str] = None  # the loan's branch, copied for branch-scoped reports
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     @property
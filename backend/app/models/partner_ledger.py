@@ -0,0 +1,55 @@
+"""
+Partner ledger models for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from .enums import LedgerEntryType
+
+
+class PartnerLedgerEntry(BaseModel):
+    """Append-only ledger entry for a partner recovery or commission settlement."""
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    entry_type: LedgerEntryType
+    partner_id: str
+    period: str  # YYYY-MM
+    assignment_id: Optional[str] = None
+    loan_id: Optional[str] = None
+    branch_code: Optional[str] = None  # the assignment's branch, part of its shard key
+    recovered_amount: float = 0.0
+    commission_rate: float = 0.0  # rate in force when the recovery was recorded
+    commission_amount: float = 0.0
+    settled_amount: float = 0.0
+    reference: Optional[str] = None  # external reference, unique per partner
+    batch_id: Optional[str] = None  # entries whose totals are applied together
+    applied: bool = True  # False until the bucket and assignment totals include the entry
+    previous_settled_amount: Optional[float] = None  # bucket's settled amount a settlement was computed from
+    occurred_at: datetime
+    recorded_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class RecoveryCreate(BaseModel):
+    """Model for recording an amount recovered by a partner on an assignment."""
+    
+    assignment_id: str
+    amount: float = Field(gt=0)
+    recovered_at: Optional[datetime] = None
+    reference: Optional[str] = None
+
+
+class PartnerStatement(BaseModel):
+    """Commission statement of a partner for one period, read from the running totals."""
+    
+    partner_id: str
+    partner_name: Optional[str] = None
+    period: str
+    recovery_count: int = 0
+    recovered_amount: float = 0.0
+    commission_amount: float = 0.0
+    settled_amount: float = 0.0
+    outstanding_commission: float = 0.0  # earned in the period but not yet settled
+    settled_at: Optional[datetime] = None
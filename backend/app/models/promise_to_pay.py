@@ -4,6 +4,7 @@ Promise to pay model for the Stima Sacco Debt Management System.
 
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 import uuid
 
 from .enums import PromiseStatus
@@ -22,6 +23,7 @@ class PromiseToPay(BaseModel):
     notes: str = ""
     agent_id: str
     agent_name: str
+    branch_code: Optional[str] = None  # the loan's branch, copied for branch-scoped reports
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -0,0 +1,54 @@
+"""
+Status transition models for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, List, Optional
+import uuid
+
+from .enums import TransitionOutcome
+
+
+class StatusTransition(BaseModel):
+    """Append-only history record of a loan or promise status change."""
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    entity: str  # "loan" or "promise"
+    entity_id: str
+    from_status: str
+    to_status: str
+    reason: str = ""
+    actor: Optional[str] = None
+    batch_id: str
+    occurred_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class StatusTransitionRequest(BaseModel):
+    """Model for requesting a bulk status transition."""
+    
+    ids: List[str]
+    status: str
+    reason: str = ""
+
+
+class TransitionResult(BaseModel):
+    """Per-id outcomes of a bulk status transition."""
+    
+    batch_id: str
+    entity: str
+    to_status: str
+    outcomes: Dict[str, TransitionOutcome]
+
+    @property
+    def applied(self) -> List[str]:
+        """IDs whose status was changed by this transition."""
+        return [entity_id for entity_id, outcome in self.outcomes.items() if outcome == TransitionOutcome.APPLIED]
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Number of records per outcome."""
+        counts: Dict[str, int] = {}
+        for outcome in self.outcomes.values():
+            counts[outcome.value] = counts.get(outcome.value, 0) + 1
+        return counts
@@ -0,0 +1,49 @@
+"""
+User and authentication models for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from .enums import UserRole
+
+
+class User(BaseModel):
+    """API user; collection agents use their ``agent_id`` as ``user_id``."""
+    
+    user_id: str
+    username: str
+    name: str
+    role: UserRole
+    branch_code: Optional[str] = None
+    password_hash: str
+    is_active: bool = True
+    # Tokens issued before this time are rejected (sign out everywhere, role change)
+    tokens_valid_after: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class UserProfile(BaseModel):
+    """The public part of a user, as returned to the client."""
+    
+    user_id: str
+    username: str
+    name: str
+    role: UserRole
+    branch_code: Optional[str] = None
+
+
+class LoginRequest(BaseModel):
+    """Username and password exchanged for an access token."""
+    
+    username: str
+    password: str
+
+
+class AccessToken(BaseModel):
+    """Signed access token issued at login."""
+    
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int  # seconds
+    user: UserProfile
@@ -0,0 +1,28 @@
+"""
+Worklist item model for the Stima Sacco Debt Management System.
+"""
+
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class WorklistItem(BaseModel):
+    """A loan queued for an agent's collection calls."""
+    
+    loan_id: str
+    member_id: str
+    loan_number: str
+    member_number: str
+    branch_code: str
+    agent_id: Optional[str] = None  # None while waiting in the branch pool
+    priority: float
+    ready_at: datetime  # not offered before this time (follow-up or promise due date)
+    reason: str = ""
+    days_in_arrears: int = 0
+    arrears_amount: float = 0.0
+    leased_to: Optional[str] = None
+    leased_until: Optional[datetime] = None
+    last_call_at: Optional[datetime] = None
+    last_call_status: Optional[str] = None
+    generation: Optional[str] = None  # rebuild that placed the item
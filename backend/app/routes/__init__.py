@@ -3,17 +3,46 @@ API routes package for the Stima Sacco Debt Management System.
 """
 
 from fastapi import APIRouter
+from .auth import router as auth_router
 from .dashboard import router as dashboard_router
 from .members import router as members_router
 from .loans import router as loans_router
+from .calls import router as calls_router
+from .promises import router as promises_router
+from .partner_assignments import router as partner_assignments_router
+from .notifications import router as notifications_router
+from .reports import router as reports_router
+from .profix import router as profix_router
+from .escalations import router as escalations_router
+from .partners import router as partners_router
+from .worklists import router as worklists_router
+from .follow_ups import router as follow_ups_router
+from .notes import router as notes_router
+from .events import router as events_router
+from .system import router as system_router
+from .health import router as health_router
 
 # Create main API router
 api_router = APIRouter()
 
 # Include all route modules
+api_router.include_router(auth_router)
 api_router.include_router(dashboard_router)
 api_router.include_router(members_router)
 api_router.include_router(loans_router)
+api_router.include_router(calls_router)
+api_router.include_router(promises_router)
+api_router.include_router(escalations_router)
+api_router.include_router(partners_router)
+api_router.include_router(partner_assignments_router)
+api_router.include_router(notifications_router)
+api_router.include_router(reports_router)
+api_router.include_router(profix_router)
+api_router.include_router(worklists_router)
+api_router.include_router(follow_ups_router)
+api_router.include_router(notes_router)
+api_router.include_router(events_router)
+api_router.include_router(system_router)
 
-__all__ = ["api_router"]
+__all__ = ["api_router", "health_router"]
 
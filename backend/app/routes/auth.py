@@ -0,0 +1,74 @@
+"""
+Authentication API routes.
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.security import HTTPAuthorizationCredentials
+from ..models import AccessToken, LoginRequest, UserProfile
+from ..services import AuthService
+from ..utils import get_current_active_user
+from ..utils.auth import security
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.post("/token", response_model=AccessToken)
+async def login(credentials: LoginRequest) -> AccessToken:
+    """
+    Exchange a username and password for an access token.
+    
+    Args:
+        credentials: Username and password
+    
+    Returns:
+        The access token, its lifetime in seconds and the user's profile
+    
+    Raises:
+        InvalidCredentialsException: If the username or password is wrong
+    """
+    auth_service = AuthService()
+    return await auth_service.login(credentials.username, credentials.password)
+
+
+@router.post("/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Revoke the access token this request was made with.
+    
+    Returns:
+        Confirmation message
+    """
+    auth_service = AuthService()
+    await auth_service.revoke_token(credentials.credentials)
+    return {"message": "Logged out"}
+
+
+@router.post("/logout-all")
+async def logout_everywhere(
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Revoke every access token issued to the current user.
+    
+    Returns:
+        Confirmation message
+    """
+    auth_service = AuthService()
+    await auth_service.revoke_user_tokens(current_user["user_id"])
+    return {"message": "Logged out everywhere"}
+
+
+@router.get("/me", response_model=UserProfile)
+async def get_profile(
+    current_user: dict = Depends(get_current_active_user)
+) -> UserProfile:
+    """
+    Get the current user's profile.
+    
+    Returns:
+        User ID, username, name, role and branch
+    """
+    return UserProfile(**current_user)
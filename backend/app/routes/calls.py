@@ -0,0 +1,86 @@
+"""
+Call log and auto-dialer API routes.
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from typing import List, Optional
+from ..models import CallLog, CallLogCreate
+from ..services import CallService, IdempotencyService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/calls", tags=["calls"])
+
+
+@router.get("", response_model=List[CallLog])
+async def get_calls(
+    skip: int = 0,
+    limit: int = 50,
+    loan_id: Optional[str] = Query(None, description="Only calls about this loan"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[CallLog]:
+    """
+    Get call logs, most recent first.
+    
+    Args:
+        skip: Number of records to skip for pagination
+        limit: Maximum number of records to return
+        loan_id: Optional loan filter
+    
+    Returns:
+        List of call logs
+    """
+    call_service = CallService(current_user)
+    return await call_service.get_calls(skip=skip, limit=limit, loan_id=loan_id)
+
+
+@router.post("", response_model=CallLog)
+async def create_call_log(
+    call_data: CallLogCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> CallLog:
+    """
+    Log a call made by the current agent.
+    
+    Args:
+        call_data: Call details
+        idempotency_key: Optional key; a retried request with the same key
+            returns the original call instead of logging it twice
+    
+    Returns:
+        The logged call
+    
+    Raises:
+        BranchAccessDeniedException: If the loan is outside the agent's branch
+        IdempotencyKeyMismatchException: If the key was used for a different request
+        IdempotencyKeyInProgressException: If the key's first request is still running
+    """
+    call_service = CallService(current_user)
+    return await IdempotencyService().run(
+        "calls", idempotency_key, current_user["user_id"], call_data,
+        lambda: call_service.create_call(call_data, current_user), response,
+    )
+
+
+@router.get("/auto-dial")
+async def auto_dial_next(
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Get the next member for the current agent to call.
+    
+    Returns:
+        The loan, member, phone number (and worklist item, when taken from
+        the agent's worklist)
+    
+    Raises:
+        HTTPException: If there is no loan to call
+    """
+    call_service = CallService(current_user)
+    target = await call_service.next_to_dial(current_user)
+
+    if target is None:
+        raise HTTPException(status_code=404, detail="No loans available for auto dial")
+
+    return target
@@ -2,7 +2,8 @@
 Dashboard API routes.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
 from ..models import DashboardStats
 from ..services import DashboardService
 from ..utils import get_current_active_user
@@ -12,6 +13,7 @@ router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_statistics(
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
     current_user: dict = Depends(get_current_active_user)
 ) -> DashboardStats:
     """
@@ -22,7 +24,33 @@ async def get_dashboard_statistics(
     - NPL statistics
     - Financial totals
     - Today's activity metrics
+    
+    Branch users get their branch's figures; others get every branch's,
+    or one branch's with ``branch_code``.
+    
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
     """
-    dashboard_service = DashboardService()
+    dashboard_service = DashboardService(current_user, branch_code)
     return await dashboard_service.get_dashboard_statistics()
 
+
+@router.get("/npl-summary")
+async def get_npl_summary(
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[dict]:
+    """
+    Get the non-performing loan summary by branch.
+    
+    Returns:
+        Loan count, outstanding balance, arrears and average days in
+        arrears per branch (the user's own branch only for branch users),
+        largest outstanding balance first
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
+    """
+    dashboard_service = DashboardService(current_user, branch_code)
+    return await dashboard_service.get_npl_summary()
+
@@ -0,0 +1,51 @@
+"""
+Escalation API routes.
+"""
+
+from fastapi import APIRouter, Body, Depends, Query
+from typing import List, Optional
+from ..models import EscalationRule
+from ..services import EscalationService
+from ..services.escalation_service import default_escalation_rules
+from ..utils import get_current_active_user, require_role
+
+router = APIRouter(prefix="/escalations", tags=["escalations"])
+
+
+@router.get("/rules", response_model=List[EscalationRule])
+async def get_escalation_rules(
+    current_user: dict = Depends(get_current_active_user)
+) -> List[EscalationRule]:
+    """
+    Get the configured escalation rules.
+    
+    Returns:
+        Rules in ascending order of escalation level
+    """
+    return default_escalation_rules()
+
+
+@router.post("/run")
+async def run_escalations(
+    rules: Optional[List[EscalationRule]] = Body(None, description="Override the configured rules"),
+    dry_run: bool = Query(False, description="Evaluate without writing"),
+    current_user: dict = Depends(require_role("admin"))
+) -> dict:
+    """
+    Escalate the non-performing book and assign external partners.
+    
+    The run covers every branch and writes partner assignments, so it is
+    restricted to admins.
+    
+    Args:
+        rules: Optional rules to use instead of the configured ones
+        dry_run: Report what would change without writing
+        
+    Returns:
+        Run summary with escalation and assignment counts
+        
+    Raises:
+        HTTPException: 403 if the caller is not an admin
+    """
+    escalation_service = EscalationService()
+    return await escalation_service.run_escalations(rules=rules, dry_run=dry_run)
@@ -0,0 +1,64 @@
+"""
+Domain event stream API routes.
+
+Events carry full documents from every branch and offsets only move
+forward, so reading and committing are restricted to admins (the accounts
+downstream consumers run as).
+"""
+
+from fastapi import APIRouter, Depends, Query
+from ..models import EventBatch
+from ..services import EventStreamService
+from ..utils import require_role
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/consumers/{consumer}", response_model=EventBatch)
+async def read_events(
+    consumer: str,
+    limit: int = Query(None, ge=1, le=5000, description="Maximum events to return (default EVENT_BATCH_SIZE)"),
+    current_user: dict = Depends(require_role("admin"))
+) -> EventBatch:
+    """
+    Read the next batch of domain events for a consumer.
+    
+    Reading does not move the consumer's offset; commit ``next_offset``
+    once the batch is processed, so a consumer that fails mid-batch reads
+    the same events again.
+    
+    Args:
+        consumer: Consumer name, e.g. "partner-portal"
+        limit: Maximum number of events to return
+        
+    Returns:
+        Events after the committed offset, in stream order
+        
+    Raises:
+        HTTPException: 403 if the caller is not an admin
+    """
+    event_stream_service = EventStreamService()
+    return await event_stream_service.read(consumer, limit)
+
+
+@router.post("/consumers/{consumer}/offset")
+async def commit_offset(
+    consumer: str,
+    offset: int = Query(..., ge=0, description="Stream position processed up to"),
+    current_user: dict = Depends(require_role("admin"))
+) -> dict:
+    """
+    Commit a consumer's offset.
+    
+    Args:
+        consumer: Consumer name
+        offset: Last stream position the consumer has processed
+        
+    Returns:
+        The committed offset (offsets never move back)
+        
+    Raises:
+        HTTPException: 403 if the caller is not an admin
+    """
+    event_stream_service = EventStreamService()
+    return {"consumer": consumer, "offset": await event_stream_service.commit(consumer, offset)}
@@ -0,0 +1,51 @@
+"""
+Follow-up reminder API routes.
+"""
+
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from ..models import FollowUp, FollowUpStatus
+from ..services import FollowUpService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/follow-ups", tags=["follow-ups"])
+
+
+@router.get("", response_model=List[FollowUp])
+async def get_follow_ups(
+    agent_id: Optional[str] = Query(None, description="Agent ID (defaults to the current user)"),
+    status: Optional[FollowUpStatus] = Query(None, description="Filter by reminder status"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of records to return"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[FollowUp]:
+    """
+    Get an agent's follow-up reminders, earliest due first.
+    
+    Args:
+        agent_id: Agent whose reminders to list
+        status: Optional status filter
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        
+    Returns:
+        List of follow-up reminders
+    """
+    follow_up_service = FollowUpService()
+    return await follow_up_service.get_follow_ups(
+        agent_id or current_user["user_id"], status=status, skip=skip, limit=limit
+    )
+
+
+@router.post("/recover")
+async def recover_missed_follow_ups(
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Fire every pending reminder that is already due.
+    
+    Returns:
+        Number of reminders fired
+    """
+    follow_up_service = FollowUpService()
+    return {"fired": await follow_up_service.recover_missed()}
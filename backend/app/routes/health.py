@@ -0,0 +1,55 @@
+"""
+Liveness and readiness probe routes.
+
+These are mounted at the application root (not under the API prefix) so
+orchestrators and the container entrypoint can probe the backend directly.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Response, status
+from ..config import app_config, get_database
+from ..services.seeding_service import seed_progress, is_seeding_in_progress
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+# Upper bound on the database ping made by the readiness probe
+READINESS_PING_TIMEOUT_SECONDS = 2.0
+
+
+@router.get("/live")
+async def liveness() -> dict:
+    """
+    Liveness probe.
+    
+    Returns 200 as long as the process can serve requests; it never touches
+    the database, so it does not depend on data volume or seeding.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness(response: Response) -> dict:
+    """
+    Readiness probe.
+    
+    Returns 200 once the database answers a ping. Background seeding progress
+    is reported but only gates readiness when SEED_REQUIRED_FOR_READINESS is set.
+    """
+    checks = {"database": "ok", "seeding": dict(seed_progress)}
+    ready = True
+
+    try:
+        await asyncio.wait_for(get_database().command("ping"), timeout=READINESS_PING_TIMEOUT_SECONDS)
+    except Exception as e:
+        checks["database"] = f"unavailable: {type(e).__name__}"
+        ready = False
+
+    if app_config.SEED_REQUIRED_FOR_READINESS and (
+        is_seeding_in_progress() or seed_progress["status"] in ("idle", "waiting", "failed")
+    ):
+        ready = False
+
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if ready else "not_ready", "checks": checks}
@@ -3,9 +3,19 @@ Loan API routes.
 """
 
 from fastapi import APIRouter, HTTPException, Query, Depends
+from datetime import datetime
 from typing import List, Optional
-from ..models import LoanAccount, LoanAccountCreate
-from ..services import LoanService
+from ..models import (
+    Member,
+    LoanAccount,
+    LoanAccountCreate,
+    AmortizationMethod,
+    AmortizationSchedule,
+    StatusTransition,
+    StatusTransitionRequest,
+    TransitionResult,
+)
+from ..services import LoanService, MemberService, AmortizationService, StatusTransitionService
 from ..utils import get_current_active_user
 
 router = APIRouter(prefix="/loans", tags=["loans"])
@@ -17,6 +27,7 @@ async def get_loans(
     limit: int = 50,
     status: Optional[str] = Query(None, description="Filter by loan status"),
     member_search: Optional[str] = Query(None, description="Search by member details"),
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
     current_user: dict = Depends(get_current_active_user)
 ) -> List[LoanAccount]:
     """
@@ -27,11 +38,15 @@ async def get_loans(
         limit: Maximum number of records to return
         status: Optional status filter (performing, non_performing, etc.)
         member_search: Optional search term for member details
+        branch_code: Optional branch filter for users who see every branch
         
     Returns:
         List of loans matching the criteria
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
     """
-    loan_service = LoanService()
+    loan_service = LoanService(current_user, branch_code)
     return await loan_service.get_loans(
         skip=skip,
         limit=limit,
@@ -57,7 +72,7 @@ async def get_loan(
     Raises:
         HTTPException: If loan is not found
     """
-    loan_service = LoanService()
+    loan_service = LoanService(current_user)
     loan = await loan_service.get_loan_by_id(loan_id)
     
     if not loan:
@@ -66,6 +81,139 @@ async def get_loan(
     return loan
 
 
+@router.get("/{loan_id}/member", response_model=Member)
+async def get_loan_member(
+    loan_id: str,
+    current_user: dict = Depends(get_current_active_user)
+) -> Member:
+    """
+    Get the member a loan belongs to.
+    
+    Args:
+        loan_id: Unique identifier of the loan
+        
+    Returns:
+        Member details
+        
+    Raises:
+        HTTPException: If the loan or its member is not found
+    """
+    loan_service = LoanService(current_user)
+    loan = await loan_service.get_loan_by_id(loan_id)
+    
+    if not loan:
+        raise HTTPException(status_code=404, detail="Loan not found")
+    
+    member_service = MemberService(current_user)
+    member = await member_service.get_member_by_id(loan.member_id)
+    
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found")
+    
+    return member
+
+
+@router.get("/{loan_id}/schedule", response_model=AmortizationSchedule)
+async def get_loan_schedule(
+    loan_id: str,
+    method: AmortizationMethod = Query(
+        AmortizationMethod.REDUCING_BALANCE, description="Amortization method"
+    ),
+    current_user: dict = Depends(get_current_active_user)
+) -> AmortizationSchedule:
+    """
+    Get the amortization schedule of a loan.
+    
+    Args:
+        loan_id: Unique identifier of the loan
+        method: Amortization method (reducing_balance or flat_rate)
+        
+    Returns:
+        Instalment schedule in columnar form
+        
+    Raises:
+        HTTPException: If loan is not found
+    """
+    amortization_service = AmortizationService(current_user)
+    schedule = await amortization_service.get_schedule_for_loan_id(loan_id, method)
+    
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Loan not found")
+    
+    return schedule
+
+
+@router.get("/{loan_id}/arrears-position")
+async def get_loan_arrears_position(
+    loan_id: str,
+    as_of: Optional[datetime] = Query(None, description="Position date (defaults to now)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Compare a loan's scheduled position with its actual balance.
+    
+    Args:
+        loan_id: Unique identifier of the loan
+        as_of: Date to evaluate the position at
+        
+    Returns:
+        Expected amount due and balance, actual balance and shortfall
+        
+    Raises:
+        HTTPException: If loan is not found
+    """
+    amortization_service = AmortizationService(current_user)
+    position = await amortization_service.get_expected_vs_actual(loan_id, as_of)
+    
+    if not position:
+        raise HTTPException(status_code=404, detail="Loan not found")
+    
+    return position
+
+
+@router.get("/{loan_id}/status-history", response_model=List[StatusTransition])
+async def get_loan_status_history(
+    loan_id: str,
+    limit: int = Query(50, le=500),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[StatusTransition]:
+    """
+    Get the status transition history of a loan, newest first.
+    
+    Args:
+        loan_id: Unique identifier of the loan
+        limit: Maximum number of transitions to return
+        
+    Returns:
+        Recorded status transitions
+        
+    Raises:
+        LoanNotFoundException: If the loan does not exist (in the user's branch)
+    """
+    transition_service = StatusTransitionService(current_user)
+    return await transition_service.get_history("loan", loan_id, limit)
+
+
+@router.post("/status-transitions", response_model=TransitionResult)
+async def transition_loan_statuses(
+    request: StatusTransitionRequest,
+    current_user: dict = Depends(get_current_active_user)
+) -> TransitionResult:
+    """
+    Move many loans to a new status in one validated bulk operation.
+    
+    Args:
+        request: Loan IDs, target status and reason
+        
+    Returns:
+        Per-loan outcome (applied, unchanged, rejected, not_found, conflict)
+    """
+    transition_service = StatusTransitionService(current_user)
+    return await transition_service.transition(
+        "loan", request.ids, request.status, request.reason, actor=current_user["user_id"]
+    )
+
+
 @router.get("/member/{member_id}", response_model=List[LoanAccount])
 async def get_member_loans(
     member_id: str,
@@ -80,7 +228,7 @@ async def get_member_loans(
     Returns:
         List of loans for the member
     """
-    loan_service = LoanService()
+    loan_service = LoanService(current_user)
     return await loan_service.get_loans_by_member_id(member_id)
 
 
@@ -97,7 +245,10 @@ async def create_loan(
         
     Returns:
         Created loan details
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user creates a loan of another branch
     """
-    loan_service = LoanService()
+    loan_service = LoanService(current_user)
     return await loan_service.create_loan(loan_data)
 
@@ -3,9 +3,9 @@ Member API routes.
 """
 
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List
-from ..models import Member, MemberCreate
-from ..services import MemberService
+from typing import List, Optional
+from ..models import Member, MemberCreate, DedupReport
+from ..services import MemberService, MemberDedupService
 from ..utils import get_current_active_user
 
 router = APIRouter(prefix="/members", tags=["members"])
@@ -16,6 +16,7 @@ async def get_members(
     skip: int = 0,
     limit: int = 50,
     search: str = Query(None, description="Search by name, member number, or phone"),
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
     current_user: dict = Depends(get_current_active_user)
 ) -> List[Member]:
     """
@@ -25,14 +26,56 @@ async def get_members(
         skip: Number of records to skip for pagination
         limit: Maximum number of records to return
         search: Optional search term for filtering members
+        branch_code: Optional branch filter for users who see every branch
         
     Returns:
         List of members matching the criteria
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
     """
-    member_service = MemberService()
+    member_service = MemberService(current_user, branch_code)
     return await member_service.get_members(skip=skip, limit=limit, search=search)
 
 
+@router.get("/duplicates/report", response_model=DedupReport)
+async def get_duplicate_report(
+    current_user: dict = Depends(get_current_active_user)
+) -> DedupReport:
+    """
+    Get the latest duplicate member scan report.
+    
+    Returns:
+        Probable duplicate pairs and clusters found by the last scan
+        
+    Raises:
+        HTTPException: If no scan has run yet
+    """
+    dedup_service = MemberDedupService()
+    report = await dedup_service.get_latest_report()
+    if report is None:
+        raise HTTPException(status_code=404, detail="No duplicate scan has run yet")
+    return report
+
+
+@router.post("/duplicates/scan", response_model=DedupReport)
+async def scan_duplicates(
+    max_block_size: int = Query(None, ge=2, description="Skip blocking keys shared by more members than this"),
+    current_user: dict = Depends(get_current_active_user)
+) -> DedupReport:
+    """
+    Scan all members for probable duplicates.
+    
+    Args:
+        max_block_size: Optional override of DEDUP_MAX_BLOCK_SIZE
+        
+    Returns:
+        The stored scan report
+    """
+    dedup_service = MemberDedupService()
+    return await dedup_service.scan(max_block_size=max_block_size)
+
+
 @router.get("/{member_id}", response_model=Member)
 async def get_member(
     member_id: str,
@@ -50,7 +93,7 @@ async def get_member(
     Raises:
         HTTPException: If member is not found
     """
-    member_service = MemberService()
+    member_service = MemberService(current_user)
     member = await member_service.get_member_by_id(member_id)
     
     if not member:
@@ -62,6 +105,7 @@ async def get_member(
 @router.post("", response_model=Member)
 async def create_member(
     member_data: MemberCreate,
+    force: bool = Query(False, description="Create even if the member probably already exists"),
     current_user: dict = Depends(get_current_active_user)
 ) -> Member:
     """
@@ -69,10 +113,16 @@ async def create_member(
     
     Args:
         member_data: Member creation data
+        force: Skip the probable-duplicate check (exact duplicates are always rejected)
         
     Returns:
         Created member details
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user creates a member of another branch
+        DuplicateMemberException: If the member number or national ID is taken
+        ProbableDuplicateMemberException: If a similar member exists and force is not set
     """
-    member_service = MemberService()
-    return await member_service.create_member(member_data)
+    member_service = MemberService(current_user)
+    return await member_service.create_member(member_data, force=force)
 
@@ -0,0 +1,57 @@
+"""
+Note search API routes.
+"""
+
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from ..models import NoteSearchResult, NoteSource
+from ..services import NoteSearchService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/notes", tags=["notes"])
+
+
+@router.get("/search", response_model=List[NoteSearchResult])
+async def search_notes(
+    q: str = Query(..., min_length=1, description='Words, "quoted phrases" and prefix* terms'),
+    agent_id: Optional[str] = Query(None, description="Filter by agent"),
+    loan_id: Optional[str] = Query(None, description="Filter by loan"),
+    member_id: Optional[str] = Query(None, description="Filter by member"),
+    source: Optional[NoteSource] = Query(None, description="Only call or only promise notes"),
+    date_from: Optional[datetime] = Query(None, description="Notes written at or after"),
+    date_to: Optional[datetime] = Query(None, description="Notes written at or before"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of records to return"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[NoteSearchResult]:
+    """
+    Search call and promise notes.
+    
+    Args:
+        q: Search query
+        agent_id: Optional agent filter
+        loan_id: Optional loan filter
+        member_id: Optional member filter
+        source: Optional note source filter
+        date_from: Optional start of the date range
+        date_to: Optional end of the date range
+        skip: Number of records to skip for pagination
+        limit: Maximum number of records to return
+        
+    Returns:
+        Matching notes, most relevant first (of the user's own branch only
+        for branch users)
+    """
+    note_search_service = NoteSearchService(current_user)
+    return await note_search_service.search(
+        q,
+        agent_id=agent_id,
+        loan_id=loan_id,
+        member_id=member_id,
+        source=source,
+        date_from=date_from,
+        date_to=date_to,
+        skip=skip,
+        limit=limit,
+    )
@@ -0,0 +1,55 @@
+"""
+Notification API routes.
+"""
+
+from fastapi import APIRouter, Depends
+from typing import List
+from ..models import Notification
+from ..services import NotificationService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+
+@router.get("", response_model=List[Notification])
+async def get_notifications(
+    skip: int = 0,
+    limit: int = 20,
+    unread_only: bool = False,
+    current_user: dict = Depends(get_current_active_user)
+) -> List[Notification]:
+    """
+    Get notifications, most recent first.
+    
+    Args:
+        skip: Number of records to skip for pagination
+        limit: Maximum number of records to return
+        unread_only: Only return unread notifications
+        
+    Returns:
+        List of notifications
+    """
+    notification_service = NotificationService()
+    return await notification_service.get_notifications(skip=skip, limit=limit, unread_only=unread_only)
+
+
+@router.put("/{notification_id}/read")
+async def mark_notification_read(
+    notification_id: str,
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Mark a notification as read.
+    
+    Args:
+        notification_id: Unique identifier of the notification
+        
+    Returns:
+        Confirmation message
+        
+    Raises:
+        NotificationNotFoundException: If there is no unread notification with this ID
+    """
+    notification_service = NotificationService()
+    await notification_service.mark_read(notification_id)
+    return {"message": "Notification marked as read"}
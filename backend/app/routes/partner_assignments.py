@@ -0,0 +1,49 @@
+"""
+Partner assignment API routes.
+"""
+
+from fastapi import APIRouter, Depends
+from typing import List
+from ..models import PartnerAssignment, PartnerAssignmentCreate
+from ..services import PartnerService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/partner-assignments", tags=["partners"])
+
+
+@router.get("", response_model=List[PartnerAssignment])
+async def get_partner_assignments(
+    skip: int = 0,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_active_user)
+) -> List[PartnerAssignment]:
+    """
+    Get loan assignments to external partners, most recent first.
+    
+    Args:
+        skip: Number of records to skip for pagination
+        limit: Maximum number of records to return
+        
+    Returns:
+        List of partner assignments
+    """
+    partner_service = PartnerService()
+    return await partner_service.get_assignments(skip=skip, limit=limit)
+
+
+@router.post("", response_model=PartnerAssignment)
+async def create_partner_assignment(
+    assignment_data: PartnerAssignmentCreate,
+    current_user: dict = Depends(get_current_active_user)
+) -> PartnerAssignment:
+    """
+    Assign a loan to an external partner.
+    
+    Args:
+        assignment_data: Loan, partner and expected recovery
+        
+    Returns:
+        Created assignment
+    """
+    partner_service = PartnerService()
+    return await partner_service.create_assignment(assignment_data)
@@ -0,0 +1,151 @@
+"""
+External partner, commission and settlement API routes.
+"""
+
+from fastapi import APIRouter, Depends, Query
+from typing import List
+from ..models import ExternalPartner, ExternalPartnerCreate, PartnerLedgerEntry, PartnerStatement, RecoveryCreate
+from ..services import PartnerService, SettlementService
+from ..utils import get_current_active_user, require_role
+
+router = APIRouter(prefix="/partners", tags=["partners"])
+
+PERIOD_PATTERN = r"^\d{4}-\d{2}$"
+
+
+@router.get("", response_model=List[ExternalPartner])
+async def get_partners(
+    current_user: dict = Depends(get_current_active_user)
+) -> List[ExternalPartner]:
+    """
+    Get active external partners.
+    
+    Returns:
+        List of active partners
+    """
+    partner_service = PartnerService()
+    return await partner_service.get_active_partners()
+
+
+@router.post("", response_model=ExternalPartner)
+async def create_partner(
+    partner_data: ExternalPartnerCreate,
+    current_user: dict = Depends(get_current_active_user)
+) -> ExternalPartner:
+    """
+    Register a new external partner.
+    
+    Args:
+        partner_data: Partner details
+        
+    Returns:
+        Created partner
+    """
+    partner_service = PartnerService()
+    return await partner_service.create_partner(partner_data)
+
+
+@router.post("/recoveries")
+async def record_recoveries(
+    recoveries: List[RecoveryCreate],
+    current_user: dict = Depends(require_role("manager"))
+) -> dict:
+    """
+    Record amounts recovered by partners on their assignments.
+    
+    Args:
+        recoveries: Recovered amounts per assignment (with optional references)
+        
+    Returns:
+        Counts of recorded and duplicate recoveries and the commission earned
+        
+    Raises:
+        HTTPException: 403 if the caller is not a manager or admin
+    """
+    settlement_service = SettlementService()
+    return await settlement_service.record_recoveries(recoveries)
+
+
+@router.get("/statements", response_model=List[PartnerStatement])
+async def get_partner_statements(
+    period: str = Query(..., pattern=PERIOD_PATTERN, description="Period (YYYY-MM)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[PartnerStatement]:
+    """
+    Get every partner's commission statement for a period.
+    
+    Args:
+        period: Calendar month (YYYY-MM)
+        
+    Returns:
+        Statements of partners with activity in the period
+    """
+    settlement_service = SettlementService()
+    return await settlement_service.get_statements(period)
+
+
+@router.get("/{partner_id}/statement", response_model=PartnerStatement)
+async def get_partner_statement(
+    partner_id: str,
+    period: str = Query(..., pattern=PERIOD_PATTERN, description="Period (YYYY-MM)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> PartnerStatement:
+    """
+    Get a partner's commission statement for a period.
+    
+    Args:
+        partner_id: Unique identifier of the partner
+        period: Calendar month (YYYY-MM)
+        
+    Returns:
+        Recovered amount, commission earned, settled and outstanding
+    """
+    settlement_service = SettlementService()
+    return await settlement_service.get_statement(partner_id, period)
+
+
+@router.get("/{partner_id}/ledger", response_model=List[PartnerLedgerEntry])
+async def get_partner_ledger(
+    partner_id: str,
+    period: str = Query(..., pattern=PERIOD_PATTERN, description="Period (YYYY-MM)"),
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[PartnerLedgerEntry]:
+    """
+    Get the ledger entries behind a partner's statement.
+    
+    Args:
+        partner_id: Unique identifier of the partner
+        period: Calendar month (YYYY-MM)
+        skip: Number of entries to skip for pagination
+        limit: Maximum number of entries to return
+        
+    Returns:
+        Recovery and settlement entries, oldest first
+    """
+    settlement_service = SettlementService()
+    return await settlement_service.get_entries(partner_id, period, skip, limit)
+
+
+@router.post("/{partner_id}/settle", response_model=PartnerStatement)
+async def settle_partner_commission(
+    partner_id: str,
+    period: str = Query(..., pattern=PERIOD_PATTERN, description="Period (YYYY-MM)"),
+    current_user: dict = Depends(require_role("manager"))
+) -> PartnerStatement:
+    """
+    Settle a partner's outstanding commission for a period.
+    
+    Args:
+        partner_id: Unique identifier of the partner
+        period: Calendar month (YYYY-MM)
+        
+    Returns:
+        Statement after settlement
+        
+    Raises:
+        HTTPException: 403 if the caller is not a manager or admin
+    """
+    settlement_service = SettlementService()
+    return await settlement_service.settle(partner_id, period)
@@ -0,0 +1,32 @@
+"""
+ProFIX core banking integration API routes.
+"""
+
+from fastapi import APIRouter, Depends
+from ..services import LoanService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/profix", tags=["profix"])
+
+
+@router.get("/sync/{loan_id}")
+async def sync_with_profix(
+    loan_id: str,
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Refresh a loan's outstanding balance from ProFIX.
+    
+    Args:
+        loan_id: Unique identifier of the loan
+        
+    Returns:
+        The updated balance and sync time
+        
+    Raises:
+        LoanNotFoundException: If the loan does not exist
+        ExternalServiceUnavailableException: If ProFIX calls are being rejected (503)
+        ExternalServiceException: If ProFIX kept failing (502)
+    """
+    loan_service = LoanService(current_user)
+    return await loan_service.sync_with_profix(loan_id)
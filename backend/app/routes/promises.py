@@ -0,0 +1,116 @@
+"""
+Promise to pay API routes.
+"""
+
+from fastapi import APIRouter, Depends, Header, Query, Response
+from typing import List, Optional
+from ..models import (
+    PromiseToPay,
+    PromiseToPayCreate,
+    PromiseStatus,
+    StatusTransitionRequest,
+    TransitionResult,
+)
+from ..services import PromiseService, IdempotencyService, StatusTransitionService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/promises", tags=["promises"])
+
+
+@router.get("", response_model=List[PromiseToPay])
+async def get_promises(
+    skip: int = 0,
+    limit: int = 50,
+    status: Optional[str] = Query(None, description="Filter by promise status"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[PromiseToPay]:
+    """
+    Get promises to pay, earliest promised date first.
+    
+    Args:
+        skip: Number of records to skip for pagination
+        limit: Maximum number of records to return
+        status: Optional status filter (pending, kept, broken, ...)
+    
+    Returns:
+        List of promises
+    """
+    promise_service = PromiseService(current_user)
+    return await promise_service.get_promises(skip=skip, limit=limit, status=status)
+
+
+@router.post("", response_model=PromiseToPay)
+async def create_promise(
+    promise_data: PromiseToPayCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> PromiseToPay:
+    """
+    Record a promise to pay taken by the current agent.
+    
+    Args:
+        promise_data: Promise details
+        idempotency_key: Optional key; a retried request with the same key
+            returns the original promise instead of recording it twice
+    
+    Returns:
+        The recorded (pending) promise
+    
+    Raises:
+        BranchAccessDeniedException: If the loan is outside the agent's branch
+        IdempotencyKeyMismatchException: If the key was used for a different request
+        IdempotencyKeyInProgressException: If the key's first request is still running
+    """
+    promise_service = PromiseService(current_user)
+    return await IdempotencyService().run(
+        "promises", idempotency_key, current_user["user_id"], promise_data,
+        lambda: promise_service.create_promise(promise_data, current_user), response,
+    )
+
+
+@router.put("/{promise_id}/status")
+async def update_promise_status(
+    promise_id: str,
+    status: PromiseStatus,
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Update a promise's status through the validated transition engine.
+    
+    Args:
+        promise_id: Unique identifier of the promise
+        status: New status
+    
+    Returns:
+        Confirmation message
+    
+    Raises:
+        PromiseNotFoundException: If the promise does not exist
+        InvalidPromiseStatusException: If the transition is not allowed
+    """
+    transition_service = StatusTransitionService(current_user)
+    await transition_service.transition_one(
+        "promise", promise_id, status.value, reason="status update", actor=current_user["user_id"]
+    )
+    return {"message": "Promise status updated"}
+
+
+@router.post("/status-transitions", response_model=TransitionResult)
+async def transition_promise_statuses(
+    request: StatusTransitionRequest,
+    current_user: dict = Depends(get_current_active_user)
+) -> TransitionResult:
+    """
+    Move many promises to a new status in one validated bulk operation.
+    
+    Args:
+        request: Promise IDs, target status and reason
+    
+    Returns:
+        Per-promise outcome (applied, unchanged, rejected, not_found, conflict)
+    """
+    transition_service = StatusTransitionService(current_user)
+    return await transition_service.transition(
+        "promise", request.ids, request.status, request.reason, actor=current_user["user_id"]
+    )
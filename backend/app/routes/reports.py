@@ -0,0 +1,117 @@
+"""
+Reporting API routes.
+"""
+
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from ..models import PortfolioComparison, PortfolioSnapshot, SnapshotStorage
+from ..services import BalanceSnapshotService, DashboardService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get("/npl-summary")
+async def get_npl_summary(
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[dict]:
+    """
+    Get non-performing loan totals by branch.
+    
+    Returns:
+        Per branch: NPL count, outstanding and arrears totals and average
+        days in arrears, largest outstanding first (the user's own branch
+        only for branch users)
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
+    """
+    dashboard_service = DashboardService(current_user, branch_code)
+    return await dashboard_service.get_npl_summary()
+
+
+@router.get("/collection-performance")
+async def get_collection_performance(
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[dict]:
+    """
+    Get collection performance over the last 30 days.
+    
+    Returns:
+        Per promise status: number of promises and total promised amount
+        (on the user's own branch's loans only for branch users)
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
+    """
+    dashboard_service = DashboardService(current_user, branch_code)
+    return await dashboard_service.get_collection_performance()
+
+
+@router.get("/portfolio-snapshot", response_model=PortfolioSnapshot)
+async def get_portfolio_snapshot(
+    as_of: date = Query(..., description="Business date (YYYY-MM-DD)"),
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> PortfolioSnapshot:
+    """
+    Get the portfolio as recorded by the daily balance snapshots.
+    
+    Args:
+        as_of: Each branch's latest snapshot on or before this date is used
+        
+    Returns:
+        Loan count, outstanding and arrears totals per status, per branch
+        and overall
+        
+    Raises:
+        SnapshotNotFoundException: If no snapshot was taken by that date
+        BranchAccessDeniedException: If a branch user asks for another branch
+    """
+    snapshot_service = BalanceSnapshotService(current_user, branch_code)
+    return await snapshot_service.get_portfolio_as_of(as_of.isoformat())
+
+
+@router.get("/portfolio-comparison", response_model=PortfolioComparison)
+async def get_portfolio_comparison(
+    from_date: date = Query(..., description="Start of the period (YYYY-MM-DD)"),
+    to_date: date = Query(..., description="End of the period (YYYY-MM-DD)"),
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> PortfolioComparison:
+    """
+    Compare the portfolio between two snapshot dates.
+    
+    Returns:
+        Both snapshots, the change in totals and in the NPL book, and the
+        loans and balances that moved between each pair of statuses
+        
+    Raises:
+        SnapshotNotFoundException: If either date has no snapshot on or before it
+        BranchAccessDeniedException: If a branch user asks for another branch
+    """
+    snapshot_service = BalanceSnapshotService(current_user, branch_code)
+    return await snapshot_service.compare(from_date.isoformat(), to_date.isoformat())
+
+
+@router.get("/snapshot-storage", response_model=List[SnapshotStorage])
+async def get_snapshot_storage(
+    limit: int = Query(30, ge=1, le=366, description="Number of business dates"),
+    branch_code: Optional[str] = Query(None, description="Limit to one branch (branch users always see their own)"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[SnapshotStorage]:
+    """
+    Get the storage used by the daily balance snapshots.
+    
+    Returns:
+        Per business date, most recent first: loans recorded, raw and
+        stored bytes, bytes per loan and compression ratio
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
+    """
+    snapshot_service = BalanceSnapshotService(current_user, branch_code)
+    return await snapshot_service.get_storage_stats(limit)
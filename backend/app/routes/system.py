@@ -0,0 +1,71 @@
+"""
+System and operational API routes.
+"""
+
+from fastapi import APIRouter, Depends
+from ..services import SeedingService
+from ..services.seeding_service import seed_progress
+from ..services.follow_up_service import get_scheduler_stats
+from external_integrations.resilience import resilience_stats
+from ..utils import (
+    admission_controller,
+    get_current_active_user,
+    get_logging_stats,
+    query_profiler,
+    single_flight,
+    startup_timer,
+    token_cache,
+)
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/metrics")
+async def get_system_metrics(
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Get operational metrics for this worker process.
+    
+    Returns:
+        Logging pipeline counters (queue depth, dropped and sampled records)
+        the number of slow queries logged by the query profiler, background
+        seeding progress, the follow-up reminder timer wheel, request
+        coalescing counts, admission control (per-class slots, queues
+        and shed requests, rate-limited requests), external dependencies
+        (circuit state, bulkhead occupancy, retries and timeouts) and startup
+        phase durations (imports, startup event, total until ready) and the
+        verified-token cache (size, hits, misses, evictions)
+    """
+    return {
+        "seeding": seed_progress,
+        "follow_up_scheduler": get_scheduler_stats(),
+        "logging": get_logging_stats(),
+        "query_profiler": {
+            "slow_queries": query_profiler.slow_query_count,
+            "slow_query_threshold_ms": query_profiler.slow_query_threshold_ms,
+        },
+        "single_flight": single_flight.stats(),
+        "admission_control": admission_controller.stats(),
+        "external_dependencies": resilience_stats(),
+        "startup": startup_timer.stats(),
+        "auth_token_cache": token_cache.stats(),
+    }
+
+
+@router.get("/seeding")
+async def get_seeding_status(
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Get background seeding progress and the persisted seed manifest.
+    
+    Returns:
+        This process's seeding progress and the manifest (dataset parameters
+        and checkpointed chunks), or null if the database was not seeded
+    """
+    seeding_service = SeedingService()
+    return {
+        "progress": seed_progress,
+        "manifest": await seeding_service.get_manifest(),
+    }
@@ -0,0 +1,76 @@
+"""
+Agent worklist API routes.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from ..models import WorklistItem
+from ..services import WorklistService
+from ..utils import get_current_active_user
+
+router = APIRouter(prefix="/worklists", tags=["worklists"])
+
+
+@router.get("/next", response_model=WorklistItem)
+async def get_next_worklist_item(
+    current_user: dict = Depends(get_current_active_user)
+) -> WorklistItem:
+    """
+    Lease the next loan to call for the current agent.
+    
+    Returns:
+        The highest-priority ready item from the agent's queue, the branch
+        pool, or a colleague's queue in the same branch
+        
+    Raises:
+        HTTPException: If nothing in the agent's branch is ready to call
+    """
+    worklist_service = WorklistService()
+    item = await worklist_service.next_for_agent(current_user["user_id"], current_user.get("branch_code"))
+    if item is None:
+        raise HTTPException(status_code=404, detail="No loans ready to call")
+    return item
+
+
+@router.get("/agents/{agent_id}", response_model=List[WorklistItem])
+async def get_agent_worklist(
+    agent_id: str,
+    ready_only: bool = Query(False, description="Only items that can be called now"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of items to return"),
+    current_user: dict = Depends(get_current_active_user)
+) -> List[WorklistItem]:
+    """
+    Get an agent's queue in priority order.
+    
+    Args:
+        agent_id: Agent ID
+        ready_only: Exclude items held for a follow-up or promise
+        limit: Maximum number of items to return
+        
+    Returns:
+        The agent's worklist items (in the user's own branch only for
+        branch users)
+    """
+    worklist_service = WorklistService(current_user)
+    return await worklist_service.get_queue(agent_id, ready_only=ready_only, limit=limit)
+
+
+@router.post("/rebuild")
+async def rebuild_worklists(
+    branch_code: Optional[str] = Query(None, description="Only rebuild this branch"),
+    current_user: dict = Depends(get_current_active_user)
+) -> dict:
+    """
+    Recompute and redistribute agent worklists.
+    
+    Args:
+        branch_code: Optional branch to rebuild (branch users always rebuild their own)
+        
+    Returns:
+        Rebuild summary with queued, assigned and pooled counts
+        
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
+    """
+    worklist_service = WorklistService(current_user, branch_code)
+    return await worklist_service.rebuild_worklists(branch_code=worklist_service.branch_code)
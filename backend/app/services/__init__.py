@@ -3,14 +3,56 @@ Services package for the Stima Sacco Debt Management System.
 """
 
 from .member_service import MemberService
+from .dedup_service import MemberDedupService
+from .branch_partition_service import BranchPartitionService
 from .loan_service import LoanService
 from .dashboard_service import DashboardService
+from .call_service import CallService
+from .promise_service import PromiseService
+from .partner_service import PartnerService
+from .notification_service import NotificationService
 from .data_generator import DataGeneratorService
+from .arrears_service import ArrearsService
+from .balance_snapshot_service import BalanceSnapshotService
+from .amortization_service import AmortizationService
+from .status_transition_service import StatusTransitionService
+from .escalation_service import EscalationService
+from .settlement_service import SettlementService
+from .worklist_service import WorklistService
+from .note_search_service import NoteSearchService
+from .idempotency_service import IdempotencyService
+from .event_stream_service import EventStreamService
+from .follow_up_service import FollowUpService, start_follow_up_scheduler, stop_follow_up_scheduler
+from .auth_service import AuthService
+from .seeding_service import SeedingService, start_background_seeding, stop_background_seeding
 
 __all__ = [
     "MemberService",
+    "MemberDedupService",
+    "BranchPartitionService",
     "LoanService", 
     "DashboardService",
+    "CallService",
+    "PromiseService",
+    "PartnerService",
+    "NotificationService",
     "DataGeneratorService",
+    "ArrearsService",
+    "BalanceSnapshotService",
+    "AmortizationService",
+    "StatusTransitionService",
+    "EscalationService",
+    "SettlementService",
+    "WorklistService",
+    "FollowUpService",
+    "NoteSearchService",
+    "IdempotencyService",
+    "EventStreamService",
+    "AuthService",
+    "SeedingService",
+    "start_background_seeding",
+    "stop_background_seeding",
+    "start_follow_up_scheduler",
+    "stop_follow_up_scheduler",
 ]
 
@@ -0,0 +1,291 @@
+"""
+Amortization schedule engine.
+
+Schedules are computed in vectorised form for many loans at once: every
+array is shaped ``(loans, max_term)`` and instalments beyond a loan's term
+are masked out. Due dates use calendar-month arithmetic from the
+disbursement date (clamped to month end), replacing the ``term * 30`` days
+approximation.
+
+Each loan's schedule is stored once, in columnar form, in
+``loan_schedules`` (one document per loan and method). It is
+generated lazily on first access and memoised in a bounded in-process LRU
+keyed by the loan terms, so an expected-vs-actual arrears check is an
+indexed lookup plus a binary search over the due dates.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+from ..models import AmortizationMethod, AmortizationSchedule
+from ..config import get_database, app_config
+from ..utils.branch_scope import resolve_branch_scope, scope_query
+from ..utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+
+def add_months(dates: Iterable[datetime], months: np.ndarray) -> np.ndarray:
+    """
+    Add calendar months to dates, clamping the day to the target month's end.
+
+    Args:
+        dates: Start dates, one per row
+        months: Month offsets, shape ``(rows,)`` or ``(rows, k)``
+
+    Returns:
+        datetime64[s] array shaped like ``months``
+    """
+    start = np.array(list(dates), dtype="datetime64[s]")
+    months = np.asarray(months, dtype=np.int64)
+    if months.ndim == 2:
+        start = start[:, None]
+    start_month = start.astype("datetime64[M]")
+    day_offset = (start.astype("datetime64[D]") - start_month.astype("datetime64[D]")).astype(np.int64)
+    time_of_day = start - start.astype("datetime64[D]")
+
+    target_month = start_month + months.astype("timedelta64[M]")
+    days_in_month = (
+        (target_month + np.timedelta64(1, "M")).astype("datetime64[D]") - target_month.astype("datetime64[D]")
+    ).astype(np.int64)
+    target_day = target_month.astype("datetime64[D]") + np.minimum(day_offset, days_in_month - 1)
+    return target_day.astype("datetime64[s]") + time_of_day
+
+
+def instalment_amounts(
+    principal: np.ndarray,
+    annual_rate: np.ndarray,
+    term_months: np.ndarray,
+    method: AmortizationMethod = AmortizationMethod.REDUCING_BALANCE,
+) -> np.ndarray:
+    """Level monthly instalment for each loan under the given method."""
+    principal = np.asarray(principal, dtype=np.float64)
+    rate = np.asarray(annual_rate, dtype=np.float64) / 1200
+    term = np.asarray(term_months, dtype=np.float64)
+    if method == AmortizationMethod.FLAT_RATE:
+        return principal / term + principal * rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = principal * rate / (1 - np.power(1 + rate, -term))
+    return np.where(rate > 0, payment, principal / term)
+
+
+def amortize(
+    principal: np.ndarray,
+    annual_rate: np.ndarray,
+    term_months: np.ndarray,
+    method: AmortizationMethod = AmortizationMethod.REDUCING_BALANCE,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute amortization schedules for many loans at once.
+
+    Returns arrays shaped ``(loans, max_term)``: ``principal``, ``interest``,
+    ``balance`` (after each instalment) and ``cumulative_due``, plus a
+    boolean ``mask`` of real instalments and the per-loan ``payment``.
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    annual_rate = np.asarray(annual_rate, dtype=np.float64)
+    rate = annual_rate[:, None] / 1200
+    term = np.asarray(term_months, dtype=np.int64)
+    max_term = int(term.max()) if term.size else 0
+    k = np.arange(1, max_term + 1)[None, :]
+    mask = k <= term[:, None]
+    payment = instalment_amounts(principal, annual_rate, term, method)[:, None]
+    p = principal[:, None]
+
+    if method == AmortizationMethod.FLAT_RATE:
+        principal_part = np.broadcast_to(p / term[:, None], mask.shape)
+        interest = np.broadcast_to(p * rate, mask.shape)
+        balance = p - principal_part * k
+    else:
+        growth = np.power(1 + rate, k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            balance = np.where(rate > 0, p * growth - payment * (growth - 1) / rate, p - payment * k)
+        previous_balance = np.concatenate([p, balance[:, :-1]], axis=1)
+        interest = previous_balance * rate
+        principal_part = payment - interest
+
+    balance = np.where(mask, np.maximum(balance, 0.0), 0.0)
+    principal_part = np.where(mask, principal_part, 0.0)
+    interest = np.where(mask, interest, 0.0)
+    cumulative_due = np.cumsum(np.where(mask, principal_part + interest, 0.0), axis=1)
+    return {
+        "principal": principal_part,
+        "interest": interest,
+        "balance": balance,
+        "cumulative_due": cumulative_due,
+        "mask": mask,
+        "payment": payment[:, 0],
+    }
+
+
+def _schedule_key(loan: Dict[str, Any], method: AmortizationMethod) -> Tuple:
+    """Fingerprint of the loan terms a schedule was generated from."""
+    return (
+        loan["id"],
+        method.value,
+        round(float(loan["principal_amount"]), 2),
+        round(float(loan["interest_rate"]), 6),
+        int(loan["loan_term_months"]),
+        loan["disbursement_date"].replace(microsecond=0).isoformat(),
+    )
+
+
+class AmortizationService:
+    """Service class for amortization schedules and expected-vs-actual arrears."""
+
+    # Memoised schedules shared by all service instances in this process
+    _cache: "OrderedDict[Tuple, AmortizationSchedule]" = OrderedDict()
+
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
+        self.db = get_database()
+        self.collection = self.db.loan_schedules
+        self.loans = self.db.loan_accounts
+        self.branch_code = resolve_branch_scope(user, branch_code)
+
+    def build_schedules(
+        self,
+        loans: List[Dict[str, Any]],
+        method: AmortizationMethod = AmortizationMethod.REDUCING_BALANCE,
+    ) -> List[AmortizationSchedule]:
+        """Compute schedules for a batch of loan documents in one vectorised pass."""
+        if not loans:
+            return []
+        result = amortize(
+            np.array([loan["principal_amount"] for loan in loans]),
+            np.array([loan["interest_rate"] for loan in loans]),
+            np.array([loan["loan_term_months"] for loan in loans]),
+            method,
+        )
+        months = np.arange(1, result["mask"].shape[1] + 1)[None, :].repeat(len(loans), axis=0)
+        due_dates = add_months([loan["disbursement_date"] for loan in loans], months)
+        generated_at = datetime.utcnow()
+
+        schedules = []
+        for i, loan in enumerate(loans):
+            n = int(loan["loan_term_months"])
+            schedules.append(AmortizationSchedule(
+                loan_id=loan["id"],
+                method=method,
+                fingerprint="|".join(map(str, _schedule_key(loan, method))),
+                monthly_payment=round(float(result["payment"][i]), 2),
+                due_dates=due_dates[i, :n].astype("datetime64[ms]").tolist(),
+                principal=np.round(result["principal"][i, :n], 2).tolist(),
+                interest=np.round(result["interest"][i, :n], 2).tolist(),
+                balance=np.round(result["balance"][i, :n], 2).tolist(),
+                cumulative_due=np.round(result["cumulative_due"][i, :n], 2).tolist(),
+                generated_at=generated_at,
+            ))
+        return schedules
+
+    async def get_schedule(
+        self,
+        loan: Dict[str, Any],
+        method: AmortizationMethod = AmortizationMethod.REDUCING_BALANCE,
+    ) -> AmortizationSchedule:
+        """Get a loan's schedule from the memo cache, the store, or by generating it."""
+        key = _schedule_key(loan, method)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        fingerprint = "|".join(map(str, key))
+        stored = await self.collection.find_one({"loan_id": loan["id"], "method": method.value}, {"_id": 0})
+        if stored is not None and stored.get("fingerprint") == fingerprint:
+            schedule = AmortizationSchedule(**stored)
+        else:
+            schedule = self.build_schedules([loan], method)[0]
+            await self.collection.replace_one(
+                {"loan_id": loan["id"], "method": method.value}, schedule.dict(), upsert=True
+            )
+        self._remember(key, schedule)
+        return schedule
+
+    async def get_schedule_for_loan_id(
+        self,
+        loan_id: str,
+        method: AmortizationMethod = AmortizationMethod.REDUCING_BALANCE,
+    ) -> Optional[AmortizationSchedule]:
+        """Get the schedule for a loan by ID, or None if the loan does not exist (in the branch scope)."""
+        loan = await self.loans.find_one(scope_query({"id": loan_id}, self.branch_code), {"_id": 0})
+        if loan is None:
+            return None
+        return await self.get_schedule(loan, method)
+
+    async def materialize_schedules(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 5000,
+        method: AmortizationMethod = AmortizationMethod.REDUCING_BALANCE,
+    ) -> int:
+        """Precompute and store schedules for all matching loans, chunk by chunk."""
+        projection = {"_id": 0, "id": 1, "principal_amount": 1, "interest_rate": 1,
+                      "loan_term_months": 1, "disbursement_date": 1}
+        written = 0
+        chunk: List[Dict[str, Any]] = []
+        async for loan in self.loans.find(query or {}, projection).batch_size(chunk_size):
+            chunk.append(loan)
+            if len(chunk) >= chunk_size:
+                written += await self._store(self.build_schedules(chunk, method))
+                chunk = []
+        if chunk:
+            written += await self._store(self.build_schedules(chunk, method))
+        return written
+
+    async def get_expected_vs_actual(self, loan_id: str, as_of: Optional[datetime] = None) -> Optional[dict]:
+        """
+        Compare the scheduled position of a loan with its actual balance.
+
+        Expected figures come from the stored schedule (binary search over the
+        due dates); the actual principal repaid is derived from the
+        outstanding balance. None if the loan does not exist (in the branch scope).
+        """
+        loan = await self.loans.find_one(scope_query({"id": loan_id}, self.branch_code), {"_id": 0})
+        if loan is None:
+            return None
+        as_of = as_of or datetime.utcnow()
+        method = AmortizationMethod(loan.get("amortization_method", AmortizationMethod.REDUCING_BALANCE.value))
+        schedule = await self.get_schedule(loan, method)
+
+        instalments_due = bisect.bisect_right(schedule.due_dates, as_of)
+        expected_due = schedule.cumulative_due[instalments_due - 1] if instalments_due else 0.0
+        expected_balance = schedule.balance[instalments_due - 1] if instalments_due else loan["principal_amount"]
+        actual_balance = loan["outstanding_balance"]
+        principal_shortfall = max(actual_balance - expected_balance, 0.0)
+        instalments_behind = principal_shortfall / schedule.monthly_payment if schedule.monthly_payment else 0.0
+        next_due_date = schedule.due_dates[instalments_due] if instalments_due < len(schedule.due_dates) else None
+
+        return {
+            "loan_id": loan_id,
+            "as_of": as_of,
+            "instalments_due": instalments_due,
+            "expected_amount_due": round(expected_due, 2),
+            "expected_balance": round(expected_balance, 2),
+            "actual_balance": round(actual_balance, 2),
+            "principal_shortfall": round(principal_shortfall, 2),
+            "instalments_behind": round(instalments_behind, 2),
+            "recorded_arrears_amount": loan.get("arrears_amount", 0.0),
+            "next_due_date": next_due_date,
+        }
+
+    async def _store(self, schedules: List[AmortizationSchedule]) -> int:
+        if not schedules:
+            return 0
+        operations = [
+            ReplaceOne({"loan_id": s.loan_id, "method": s.method.value}, s.dict(), upsert=True)
+            for s in schedules
+        ]
+        await self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def _remember(self, key: Tuple, schedule: AmortizationSchedule) -> None:
+        self._cache[key] = schedule
+        self._cache.move_to_end(key)
+        while len(self._cache) > app_config.SCHEDULE_CACHE_SIZE:
+            self._cache.popitem(last=False)
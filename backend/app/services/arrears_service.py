@@ -0,0 +1,321 @@
+"""
+End-of-day arrears recomputation for loan accounts.
+
+The batch streams open loans with a server-side cursor in ``id`` order,
+recomputes ``days_in_arrears``, ``arrears_amount`` and ``status`` for each
+chunk with vectorised ``numpy`` arithmetic, and writes back only the loans
+whose values changed through unordered ``bulk_write`` calls that overlap
+with reading the next chunk. Updates are guarded on the status that was read,
+and reclassifications are appended to the status transition history. Each run
+is recorded in ``batch_runs`` so a run that exceeds its time window can be
+resumed from the last processed id.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from ..models import LoanStatus
+from ..config import get_database, app_config
+from ..utils.logging_config import get_logger
+from ..utils.lazy_import import lazy_import
+from .event_stream_service import EventStreamService
+from .status_transition_service import StatusTransitionService
+
+np = lazy_import("numpy")
+logger = get_logger(__name__)
+
+JOB_NAME = "arrears_recompute"
+
+# Average Gregorian month in seconds, used to place monthly due dates
+MONTH_SECONDS = 30.436875 * 86400
+
+# Fields needed to recompute arrears
+LOAN_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "branch_code": 1,
+    "monthly_payment": 1,
+    "loan_term_months": 1,
+    "outstanding_balance": 1,
+    "disbursement_date": 1,
+    "last_payment_date": 1,
+    "days_in_arrears": 1,
+    "arrears_amount": 1,
+    "status": 1,
+}
+
+
+def _to_datetime64(values: List[Optional[datetime]]) -> np.ndarray:
+    """Convert datetimes (or None) to a datetime64[s] array with NaT for missing values."""
+    return np.array(values, dtype="datetime64[s]")
+
+
+def compute_arrears(
+    loans: List[Dict[str, Any]],
+    as_of: datetime,
+    npl_days: int,
+    default_days: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Recompute arrears for a chunk of loans.
+
+    Instalments fall due monthly from the disbursement date for
+    ``loan_term_months`` months. Every instalment due after the last payment
+    (or after disbursement if nothing was paid) and on or before ``as_of``
+    is in arrears; days in arrears count from the oldest missed due date.
+
+    Returns arrays ``days_in_arrears``, ``arrears_amount`` and ``status``
+    aligned with ``loans``.
+    """
+    monthly_payment = np.array([loan.get("monthly_payment") or 0.0 for loan in loans], dtype=np.float64)
+    term = np.array([loan.get("loan_term_months") or 0 for loan in loans], dtype=np.int64)
+    balance = np.array([loan.get("outstanding_balance") or 0.0 for loan in loans], dtype=np.float64)
+    disbursed = _to_datetime64([loan.get("disbursement_date") for loan in loans])
+    last_paid = _to_datetime64([loan.get("last_payment_date") for loan in loans])
+    anchor = np.where(np.isnat(last_paid), disbursed, last_paid)
+    today = np.datetime64(as_of, "s")
+
+    seconds_since_disbursement = (today - disbursed).astype(np.float64)
+    seconds_to_anchor = (anchor - disbursed).astype(np.float64)
+
+    # Instalments due so far, and instalments covered up to the last payment
+    due = np.clip(np.floor(seconds_since_disbursement / MONTH_SECONDS), 0, term)
+    covered = np.clip(np.floor(seconds_to_anchor / MONTH_SECONDS), 0, term)
+    missed = np.maximum(due - covered, 0)
+
+    oldest_missed_due = disbursed + ((covered + 1) * MONTH_SECONDS).astype("timedelta64[s]")
+    days_in_arrears = np.where(
+        missed > 0,
+        ((today - oldest_missed_due).astype(np.int64) // 86400),
+        0,
+    ).clip(min=0)
+    arrears_amount = np.round(np.minimum(missed * monthly_payment, np.maximum(balance, 0.0)), 2)
+
+    status = np.where(
+        days_in_arrears >= default_days,
+        LoanStatus.DEFAULTED.value,
+        np.where(days_in_arrears >= npl_days, LoanStatus.NON_PERFORMING.value, LoanStatus.PERFORMING.value),
+    )
+    return {"days_in_arrears": days_in_arrears, "arrears_amount": arrears_amount, "status": status}
+
+
+class ArrearsService:
+    """Service class for the end-of-day arrears batch."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.loan_accounts
+        self.runs = self.db.batch_runs
+        self.transitions = StatusTransitionService()
+
+    async def recompute_arrears(
+        self,
+        as_of: Optional[datetime] = None,
+        chunk_size: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        resume: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Recompute arrears and reclassify every open loan.
+
+        Args:
+            as_of: Business date to compute arrears at (defaults to now)
+            chunk_size: Loans per cursor batch and per bulk_write
+            window_seconds: Stop (resumably) once the run exceeds this window
+            resume: Continue an unfinished run for the same business date
+
+        Returns:
+            Run summary with processed/modified counts and throughput
+        """
+        as_of = as_of or datetime.utcnow()
+        chunk_size = chunk_size or app_config.ARREARS_BATCH_CHUNK_SIZE
+        window_seconds = window_seconds or app_config.ARREARS_BATCH_WINDOW_SECONDS
+        business_date = as_of.strftime("%Y-%m-%d")
+
+        run = await self._start_run(business_date, resume)
+        query: Dict[str, Any] = {"status": {"$ne": LoanStatus.CLOSED.value}}
+        if run.get("last_id"):
+            query["id"] = {"$gt": run["last_id"]}
+            logger.info(f"Resuming arrears run for {business_date} after loan {run['last_id']}")
+
+        started = time.perf_counter()
+        processed = modified = 0
+        last_id = run.get("last_id")
+        completed = True
+        in_flight: Optional[tuple] = None
+
+        cursor = self.collection.find(query, LOAN_PROJECTION).sort("id", 1).batch_size(chunk_size)
+        chunk: List[Dict[str, Any]] = []
+        async for loan in cursor:
+            chunk.append(loan)
+            if len(chunk) < chunk_size:
+                continue
+            # Write this chunk while the cursor fetches the next one
+            in_flight_next = self._submit(chunk, as_of, str(run["_id"]))
+            processed += len(chunk)
+            last_id = chunk[-1]["id"]
+            chunk = []
+            if in_flight is not None:
+                modified += await self._complete(run["_id"], in_flight)
+            in_flight = in_flight_next
+            if time.perf_counter() - started > window_seconds:
+                completed = False
+                await cursor.close()
+                break
+
+        if completed and chunk:
+            in_flight_next = self._submit(chunk, as_of, str(run["_id"]))
+            processed += len(chunk)
+            last_id = chunk[-1]["id"]
+            if in_flight is not None:
+                modified += await self._complete(run["_id"], in_flight)
+            in_flight = in_flight_next
+        if in_flight is not None:
+            modified += await self._complete(run["_id"], in_flight)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "business_date": business_date,
+            "processed": processed,
+            "modified": modified,
+            "elapsed_seconds": round(elapsed, 2),
+            "loans_per_second": round(processed / elapsed, 1) if elapsed else 0.0,
+            "window_seconds": window_seconds,
+            "completed": completed,
+        }
+        await self.runs.update_one(
+            {"_id": run["_id"]},
+            {"$set": {
+                "status": "completed" if completed else "incomplete",
+                "last_id": None if completed else last_id,
+                "finished_at": datetime.utcnow(),
+                "elapsed_seconds": summary["elapsed_seconds"],
+                "loans_per_second": summary["loans_per_second"],
+            }},
+        )
+
+        if completed:
+            logger.info(
+                f"Arrears run {business_date}: {processed} loans, {modified} updated in "
+                f"{summary['elapsed_seconds']}s ({summary['loans_per_second']} loans/s)"
+            )
+        else:
+            logger.warning(
+                f"Arrears run {business_date} exceeded its {window_seconds}s window after {processed} loans; "
+                f"re-run to resume from loan {last_id}"
+            )
+        return summary
+
+    def _changed_operations(
+        self, loans: List[Dict[str, Any]], as_of: datetime, batch_id: str
+    ) -> Tuple[List[UpdateOne], List[Tuple[str, str, str]], List[str]]:
+        """
+        Recompute a chunk and build updates for the loans whose values changed.
+
+        Returns the updates, the ``(loan_id, from_status, to_status)``
+        reclassifications among them and the ids of the updated loans.
+        """
+        result = compute_arrears(
+            loans, as_of, app_config.ARREARS_NPL_DAYS, app_config.ARREARS_DEFAULT_DAYS
+        )
+        old_days = np.array([loan.get("days_in_arrears") or 0 for loan in loans], dtype=np.int64)
+        old_amount = np.array([loan.get("arrears_amount") or 0.0 for loan in loans], dtype=np.float64)
+        old_status = np.array([loan.get("status") for loan in loans], dtype=object)
+
+        changed = (
+            (result["days_in_arrears"] != old_days)
+            | (np.abs(result["arrears_amount"] - old_amount) >= 0.01)
+            | (result["status"].astype(object) != old_status)
+        )
+        operations = []
+        status_changes = []
+        loan_ids = []
+        for i in np.flatnonzero(changed):
+            update = {
+                "days_in_arrears": int(result["days_in_arrears"][i]),
+                "arrears_amount": float(result["arrears_amount"][i]),
+                "status": str(result["status"][i]),
+                "arrears_updated_at": as_of,
+            }
+            if update["status"] != old_status[i]:
+                update.update(status_changed_at=as_of, status_transition_id=batch_id)
+                status_changes.append((loans[i]["id"], old_status[i], update["status"]))
+            # Guarded on the status read, so a concurrent transition is not overwritten; the
+            # branch code completes the shard key so the update targets one shard
+            operations.append(UpdateOne(
+                {"branch_code": loans[i].get("branch_code"), "id": loans[i]["id"], "status": old_status[i]},
+                {"$set": update},
+            ))
+            loan_ids.append(loans[i]["id"])
+        return operations, status_changes, loan_ids
+
+    def _submit(self, loans: List[Dict[str, Any]], as_of: datetime, batch_id: str) -> tuple:
+        """Start writing a chunk's changes; returns the in-flight write handle."""
+        operations, status_changes, loan_ids = self._changed_operations(loans, as_of, batch_id)
+        write = self._write(operations, status_changes, loan_ids, batch_id, as_of)
+        return asyncio.ensure_future(write), loans[-1]["id"], len(loans)
+
+    async def _complete(self, run_id, in_flight: tuple) -> int:
+        """Wait for a chunk write, then checkpoint the run past that chunk."""
+        task, last_id, count = in_flight
+        modified = await task
+        await self.runs.update_one(
+            {"_id": run_id},
+            {"$set": {"last_id": last_id}, "$inc": {"processed": count, "modified": modified}},
+        )
+        return modified
+
+    async def _write(
+        self,
+        operations: List[UpdateOne],
+        status_changes: List[Tuple[str, str, str]],
+        loan_ids: List[str],
+        batch_id: str,
+        as_of: datetime,
+    ) -> int:
+        if not operations:
+            return 0
+        result = await self.collection.bulk_write(operations, ordered=False)
+        if status_changes and result.matched_count < len(operations):
+            # Some guarded updates missed; keep only the reclassifications that landed
+            moved = set()
+            async for loan in self.collection.find(
+                {"id": {"$in": [change[0] for change in status_changes]}, "status_transition_id": batch_id},
+                {"_id": 0, "id": 1},
+            ):
+                moved.add(loan["id"])
+            status_changes = [change for change in status_changes if change[0] in moved]
+        await self.transitions.record_transitions(
+            "loan", status_changes, batch_id, reason="arrears recompute", actor=JOB_NAME, occurred_at=as_of
+        )
+        await EventStreamService().publish_updated("loan", loan_ids)
+        return result.modified_count
+
+    async def _start_run(self, business_date: str, resume: bool) -> Dict[str, Any]:
+        """Resume an unfinished run for the business date or start a new one."""
+        if resume:
+            run = await self.runs.find_one(
+                {"job": JOB_NAME, "business_date": business_date, "status": {"$in": ["running", "incomplete"]}},
+                sort=[("started_at", -1)],
+            )
+            if run is not None:
+                await self.runs.update_one({"_id": run["_id"]}, {"$set": {"status": "running"}})
+                return run
+        run = {
+            "job": JOB_NAME,
+            "business_date": business_date,
+            "status": "running",
+            "started_at": datetime.utcnow(),
+            "last_id": None,
+            "processed": 0,
+            "modified": 0,
+        }
+        result = await self.runs.insert_one(run)
+        run["_id"] = result.inserted_id
+        return run
@@ -0,0 +1,108 @@
+"""
+Authentication service: login, token revocation and demo users.
+
+Password hashing is CPU-bound (PBKDF2), so it runs in the default executor
+instead of on the event loop. Revoking a token records its id in
+``revoked_tokens`` (expired by a TTL index once the token would have expired
+anyway) and evicts it from this worker's verified-token cache; other workers
+drop their cached copy within ``AUTH_TOKEN_CACHE_TTL_SECONDS``.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from ..models import AccessToken, User, UserProfile, UserRole
+from ..config import get_database
+from ..utils.auth import (
+    PASSWORD_ITERATIONS,
+    create_access_token,
+    decode_access_token,
+    hash_password,
+    verify_password,
+)
+from ..utils.exceptions import InvalidCredentialsException
+from ..utils.logging_config import get_logger
+from ..utils.token_cache import token_cache, token_digest
+
+logger = get_logger(__name__)
+
+# Demo accounts seeded with the dummy data (the login page lists them); the
+# agent works the first generated agent's worklist
+DEMO_USERS = [
+    {"user_id": "admin", "username": "admin", "password": "admin123", "name": "System Administrator",
+     "role": UserRole.ADMIN, "branch_code": None},
+    {"user_id": "agent_001", "username": "agent", "password": "agent123", "name": "Agent 001",
+     "role": UserRole.AGENT, "branch_code": "001"},
+    {"user_id": "manager_001", "username": "manager", "password": "manager123", "name": "Branch Manager",
+     "role": UserRole.MANAGER, "branch_code": "001"},
+]
+
+# Verified against when the username is unknown, so a miss takes as long as a wrong password
+_DUMMY_HASH = f"pbkdf2_sha256${PASSWORD_ITERATIONS}${'0' * 32}${'0' * 64}"
+
+
+class AuthService:
+    """Service class for logins and token revocation."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.users = self.db.users
+        self.revoked_tokens = self.db.revoked_tokens
+
+    async def login(self, username: str, password: str) -> AccessToken:
+        """
+        Exchange a username and password for an access token.
+
+        Raises:
+            InvalidCredentialsException: If the user is unknown or inactive, or the password is wrong
+        """
+        user = await self.users.find_one({"username": username, "is_active": True}, {"_id": 0})
+        password_hash = user["password_hash"] if user is not None else _DUMMY_HASH
+        loop = asyncio.get_running_loop()
+        valid = await loop.run_in_executor(None, verify_password, password, password_hash)
+        if user is None or not valid:
+            raise InvalidCredentialsException()
+
+        profile = UserProfile(**user)
+        token, expires_in = create_access_token(profile.dict())
+        return AccessToken(access_token=token, expires_in=expires_in, user=profile)
+
+    async def revoke_token(self, token: str) -> None:
+        """Revoke one token (logout); unknown or malformed tokens are ignored."""
+        token_cache.evict(token_digest(token))
+        claims = decode_access_token(token, verify_exp=False)
+        if claims is None:
+            return
+        await self.revoked_tokens.update_one(
+            {"jti": claims["jti"]},
+            {"$setOnInsert": {
+                "jti": claims["jti"],
+                "user_id": claims["sub"],
+                "expires_at": datetime.utcfromtimestamp(claims["exp"]),
+                "revoked_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+
+    async def revoke_user_tokens(self, user_id: str) -> None:
+        """Invalidate every token issued to a user so far (sign out everywhere)."""
+        # MongoDB keeps milliseconds; round up so no token issued before now survives
+        now = datetime.utcnow()
+        valid_after = now + timedelta(microseconds=-now.microsecond % 1000)
+        await self.users.update_one({"user_id": user_id}, {"$set": {"tokens_valid_after": valid_after}})
+        token_cache.evict_user(user_id)
+
+    async def ensure_demo_users(self) -> None:
+        """Create the demo accounts if they do not exist (existing ones are left alone)."""
+        loop = asyncio.get_running_loop()
+        for demo in DEMO_USERS:
+            if await self.users.find_one({"username": demo["username"]}, {"_id": 1}) is not None:
+                continue
+            password_hash = await loop.run_in_executor(None, hash_password, demo["password"])
+            fields: Dict[str, Any] = {key: value for key, value in demo.items() if key != "password"}
+            user = User(**fields, password_hash=password_hash)
+            await self.users.update_one(
+                {"username": user.username}, {"$setOnInsert": user.dict()}, upsert=True
+            )
+        logger.info("Demo users ensured")
@@ -0,0 +1,454 @@
+"""
+Daily loan balance snapshots in delta-encoded columnar chunks.
+
+``loan_accounts`` only holds current balances (arrears runs and ProFIX
+syncs overwrite them in place). The end-of-day snapshot records every
+loan's outstanding balance, arrears, days in arrears and status per branch,
+so point-in-time and period-over-period reports read the snapshots and
+never scan the live collection.
+
+Layout:
+
+- Each loan gets a fixed position in its branch the first time it is
+  snapshotted (``balance_snapshot_loans``, one document per chunk of
+  ``SNAPSHOT_CHUNK_SIZE`` positions), so loan ids are stored once rather
+  than every day. A position without a loan (deleted, or moved to another
+  branch) has status code 0.
+- ``balance_snapshots`` holds one document per business date, branch and
+  chunk, with one binary column per field, aligned by position.
+- A column holds full values on keyframe days (a branch's first snapshot,
+  then every ``SNAPSHOT_KEYFRAME_DAYS``) and otherwise the change since the
+  previous snapshot, which is zero for most loans on most days. Values are
+  byte-shuffled (the first byte of every value, then the second, ...) and
+  zlib-compressed, so runs of zero bytes collapse.
+- Every chunk also stores loan counts and balance sums per status, so a
+  point-in-time total reads a few small documents and decodes nothing.
+  Status migrations between two dates decode both dates, replaying at most
+  ``SNAPSHOT_KEYFRAME_DAYS - 1`` deltas after the last keyframe.
+
+The latest date may be snapshotted again (the new snapshot replaces it), but
+not an earlier one: later deltas are relative to it.
+"""
+
+from __future__ import annotations
+
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import bson
+from pymongo import DESCENDING, UpdateOne
+
+from ..models import (
+    BranchPortfolioSnapshot,
+    LoanStatus,
+    PortfolioComparison,
+    PortfolioPosition,
+    PortfolioSnapshot,
+    SnapshotStorage,
+    StatusMigration,
+)
+from ..config import get_database, app_config
+from ..utils.branch_scope import resolve_branch_scope, scope_query
+from ..utils.exceptions import SnapshotNotFoundException
+from ..utils.lazy_import import lazy_import
+from ..utils.logging_config import get_logger
+
+np = lazy_import("numpy")
+
+logger = get_logger(__name__)
+
+# Stored columns and their little-endian dtypes; amounts are in cents
+COLUMNS = {
+    "balance_cents": "<i8",
+    "arrears_cents": "<i8",
+    "days_in_arrears": "<i4",
+    "status": "<i1",
+}
+
+# Codes of the status column; 0 is a position without a loan
+STATUS_CODES = {status.value: code for code, status in enumerate(LoanStatus, start=1)}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+COMPRESSION_LEVEL = 6
+
+LOAN_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "outstanding_balance": 1,
+    "arrears_amount": 1,
+    "days_in_arrears": 1,
+    "status": 1,
+}
+
+# Totals are kept as [loans, outstanding cents, arrears cents] while summing
+Totals = List[int]
+
+
+def encode_column(values: np.ndarray, previous: Optional[np.ndarray] = None) -> bytes:
+    """
+    Encode a column for storage: its change since ``previous`` (when given,
+    zero-padded or cut to the same length), byte-shuffled and compressed.
+    """
+    if previous is not None:
+        values = values - _aligned(previous, len(values), values.dtype)
+    shuffled = np.ascontiguousarray(values).view(np.uint8).reshape(-1, values.dtype.itemsize).T
+    return zlib.compress(shuffled.tobytes(), COMPRESSION_LEVEL)
+
+
+def decode_column(data: bytes, dtype: str, previous: Optional[np.ndarray] = None) -> np.ndarray:
+    """Inverse of ``encode_column``, given the same ``previous`` values."""
+    dtype = np.dtype(dtype)
+    shuffled = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(dtype.itemsize, -1)
+    values = shuffled.T.copy().view(dtype).ravel()
+    if previous is not None:
+        values = values + _aligned(previous, len(values), dtype)
+    return values
+
+
+def _aligned(values: np.ndarray, length: int, dtype) -> np.ndarray:
+    aligned = np.zeros(length, dtype=dtype)
+    count = min(length, len(values))
+    aligned[:count] = values[:count]
+    return aligned
+
+
+def _place(array: np.ndarray, start: int, values: np.ndarray) -> np.ndarray:
+    """Write ``values`` at ``start``, growing the array if needed."""
+    end = start + len(values)
+    if end > len(array):
+        array = _aligned(array, end, array.dtype)
+    array[start:end] = values
+    return array
+
+
+def chunk_totals(columns: Dict[str, np.ndarray]) -> Dict[str, Dict[str, int]]:
+    """Loan count and balance sums (in cents) per status in a chunk."""
+    totals = {}
+    for code, name in STATUS_NAMES.items():
+        mask = columns["status"] == code
+        loans = int(mask.sum())
+        if loans:
+            totals[name] = {
+                "loans": loans,
+                "outstanding_cents": int(columns["balance_cents"][mask].sum()),
+                "arrears_cents": int(columns["arrears_cents"][mask].sum()),
+            }
+    return totals
+
+
+def _position(totals: Totals) -> PortfolioPosition:
+    return PortfolioPosition(loans=totals[0], outstanding=totals[1] / 100, arrears=totals[2] / 100)
+
+
+def _add(into: Dict[str, Totals], status: str, totals: Iterable[int]) -> None:
+    current = into.setdefault(status, [0, 0, 0])
+    for index, value in enumerate(totals):
+        current[index] += value
+
+
+def _sum(by_status: Dict[str, Totals]) -> Totals:
+    return [sum(totals[index] for totals in by_status.values()) for index in range(3)]
+
+
+def _difference(later: PortfolioPosition, earlier: PortfolioPosition) -> PortfolioPosition:
+    return PortfolioPosition(
+        loans=later.loans - earlier.loans,
+        outstanding=round(later.outstanding - earlier.outstanding, 2),
+        arrears=round(later.arrears - earlier.arrears, 2),
+    )
+
+
+def _days_between(earlier: str, later: str) -> int:
+    return (datetime.strptime(later, "%Y-%m-%d") - datetime.strptime(earlier, "%Y-%m-%d")).days
+
+
+class BalanceSnapshotService:
+    """Service class for taking and querying daily balance snapshots."""
+
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
+        self.db = get_database()
+        self.snapshots = self.db.balance_snapshots
+        self.positions = self.db.balance_snapshot_loans
+        self.branch_code = resolve_branch_scope(user, branch_code)
+        self.chunk_size = app_config.SNAPSHOT_CHUNK_SIZE
+        self.keyframe_days = app_config.SNAPSHOT_KEYFRAME_DAYS
+
+    async def take_snapshot(self, business_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record every loan's balances and status for a business date.
+
+        Args:
+            business_date: YYYY-MM-DD; defaults to today
+
+        Returns:
+            Per branch: loans recorded, chunks, whether it was a keyframe,
+            raw and stored bytes (or why the branch was skipped)
+        """
+        business_date = business_date or datetime.utcnow().strftime("%Y-%m-%d")
+        if self.branch_code is not None:
+            branches = [self.branch_code]
+        else:
+            branches = sorted(branch for branch in await self.db.loan_accounts.distinct("branch_code") if branch)
+        results = {}
+        for branch in branches:
+            results[branch] = await self._snapshot_branch(branch, business_date)
+        return {"business_date": business_date, "branches": results}
+
+    async def _snapshot_branch(self, branch: str, business_date: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        latest = await self._latest_date(branch)
+        if latest is not None and latest > business_date:
+            logger.warning(f"Balance snapshot of branch {branch} for {business_date} skipped: {latest} already taken")
+            return {"skipped": f"a later snapshot ({latest}) exists"}
+        if latest == business_date:
+            await self.snapshots.delete_many({"branch_code": branch, "business_date": business_date})
+            latest = await self._latest_date(branch)
+
+        loan_ids, new_from = await self._assign_positions(branch)
+        columns = await self._read_loans(branch, loan_ids)
+
+        keyframe_date = await self._keyframe_date(branch, business_date)
+        keyframe = latest is None or keyframe_date is None or _days_between(keyframe_date, business_date) >= self.keyframe_days
+        previous = None if keyframe else await self._decode(branch, latest, COLUMNS)
+
+        # Positions are written first: snapshot columns refer to them
+        if len(loan_ids) > new_from:
+            await self.positions.bulk_write([
+                UpdateOne(
+                    {"branch_code": branch, "chunk": chunk},
+                    {"$set": {"loan_ids": loan_ids[chunk * self.chunk_size:(chunk + 1) * self.chunk_size]}},
+                    upsert=True,
+                )
+                for chunk in range(new_from // self.chunk_size, -(-len(loan_ids) // self.chunk_size))
+            ], ordered=False)
+
+        documents = []
+        for chunk, start in enumerate(range(0, len(loan_ids), self.chunk_size)):
+            end = min(start + self.chunk_size, len(loan_ids))
+            values = {name: column[start:end] for name, column in columns.items()}
+            document = {
+                "id": f"{branch}:{business_date}:{chunk}",
+                "branch_code": branch,
+                "business_date": business_date,
+                "chunk": chunk,
+                "start": start,
+                "loan_count": end - start,
+                "keyframe": keyframe,
+                "columns": {
+                    name: encode_column(column, None if previous is None else previous[name][start:end])
+                    for name, column in values.items()
+                },
+                "totals": chunk_totals(values),
+                "raw_bytes": sum(column.nbytes for column in values.values()),
+                "stored_bytes": 0,
+                "created_at": datetime.utcnow(),
+            }
+            document["stored_bytes"] = len(bson.encode(document))
+            documents.append(document)
+        if documents:
+            await self.snapshots.insert_many(documents, ordered=False)
+
+        result = {
+            "loans": int((columns["status"] != 0).sum()),
+            "chunks": len(documents),
+            "keyframe": keyframe,
+            "raw_bytes": sum(document["raw_bytes"] for document in documents),
+            "stored_bytes": sum(document["stored_bytes"] for document in documents),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"Balance snapshot of branch {branch} for {business_date}: {result}")
+        return result
+
+    async def _assign_positions(self, branch: str) -> Tuple[List[str], int]:
+        """
+        The branch's loan ids by position, with new loans appended.
+
+        Returns:
+            The ids and the first new position
+        """
+        loan_ids: List[str] = []
+        async for chunk in self.positions.find({"branch_code": branch}, {"_id": 0, "loan_ids": 1}).sort("chunk", 1):
+            loan_ids.extend(chunk["loan_ids"])
+        known = set(loan_ids)
+        new_from = len(loan_ids)
+        async for loan in self.db.loan_accounts.find({"branch_code": branch}, {"_id": 0, "id": 1}):
+            if loan["id"] not in known:
+                known.add(loan["id"])
+                loan_ids.append(loan["id"])
+        return loan_ids, new_from
+
+    async def _read_loans(self, branch: str, loan_ids: List[str]) -> Dict[str, np.ndarray]:
+        """The branch's current loan values as columns aligned with ``loan_ids``."""
+        position_of = {loan_id: position for position, loan_id in enumerate(loan_ids)}
+        positions, balances, arrears, days, statuses = [], [], [], [], []
+        async for loan in self.db.loan_accounts.find({"branch_code": branch}, LOAN_PROJECTION).batch_size(self.chunk_size):
+            position = position_of.get(loan["id"])
+            if position is None:
+                continue  # created since the positions were assigned; recorded tomorrow
+            positions.append(position)
+            balances.append(loan.get("outstanding_balance") or 0.0)
+            arrears.append(loan.get("arrears_amount") or 0.0)
+            days.append(loan.get("days_in_arrears") or 0)
+            statuses.append(STATUS_CODES.get(loan.get("status"), 0))
+
+        columns = {name: np.zeros(len(loan_ids), dtype=dtype) for name, dtype in COLUMNS.items()}
+        index = np.asarray(positions, dtype=np.int64)
+        columns["balance_cents"][index] = np.round(np.asarray(balances, dtype=np.float64) * 100)
+        columns["arrears_cents"][index] = np.round(np.asarray(arrears, dtype=np.float64) * 100)
+        columns["days_in_arrears"][index] = days
+        columns["status"][index] = statuses
+        return columns
+
+    async def _latest_date(self, branch: str, as_of: Optional[str] = None) -> Optional[str]:
+        """The latest snapshot date of a branch, on or before ``as_of`` if given."""
+        query: Dict[str, Any] = {"branch_code": branch, "chunk": 0}
+        if as_of is not None:
+            query["business_date"] = {"$lte": as_of}
+        document = await self.snapshots.find_one(query, {"_id": 0, "business_date": 1}, sort=[("business_date", DESCENDING)])
+        return document["business_date"] if document else None
+
+    async def _keyframe_date(self, branch: str, as_of: str) -> Optional[str]:
+        document = await self.snapshots.find_one(
+            {"branch_code": branch, "chunk": 0, "keyframe": True, "business_date": {"$lte": as_of}},
+            {"_id": 0, "business_date": 1},
+            sort=[("business_date", DESCENDING)],
+        )
+        return document["business_date"] if document else None
+
+    async def _decode(self, branch: str, business_date: str, names: Iterable[str]) -> Dict[str, np.ndarray]:
+        """A branch's columns on a snapshot date, replayed from the keyframe before it."""
+        names = list(names)
+        keyframe_date = await self._keyframe_date(branch, business_date)
+        if keyframe_date is None:
+            raise SnapshotNotFoundException(business_date)
+        state = {name: np.zeros(0, dtype=COLUMNS[name]) for name in names}
+        projection = {"_id": 0, "start": 1, "keyframe": 1, **{f"columns.{name}": 1 for name in names}}
+        async for document in self.snapshots.find(
+            {"branch_code": branch, "business_date": {"$gte": keyframe_date, "$lte": business_date}}, projection
+        ).sort([("business_date", 1), ("chunk", 1)]):
+            start = document["start"]
+            for name in names:
+                previous = None if document["keyframe"] else state[name][start:]
+                state[name] = _place(state[name], start, decode_column(document["columns"][name], COLUMNS[name], previous))
+        return state
+
+    async def _branches(self) -> List[str]:
+        if self.branch_code is not None:
+            return [self.branch_code]
+        return sorted(await self.snapshots.distinct("branch_code"))
+
+    async def get_portfolio_as_of(self, as_of: str) -> PortfolioSnapshot:
+        """
+        The portfolio as recorded by each branch's latest snapshot on or before a date.
+
+        Raises:
+            SnapshotNotFoundException: If no branch in scope has a snapshot by then
+        """
+        branches = []
+        by_status: Dict[str, Totals] = {}
+        for branch in await self._branches():
+            business_date = await self._latest_date(branch, as_of)
+            if business_date is None:
+                continue
+            branch_by_status: Dict[str, Totals] = {}
+            async for document in self.snapshots.find(
+                {"branch_code": branch, "business_date": business_date}, {"_id": 0, "totals": 1}
+            ):
+                for status, totals in document["totals"].items():
+                    values = (totals["loans"], totals["outstanding_cents"], totals["arrears_cents"])
+                    _add(branch_by_status, status, values)
+                    _add(by_status, status, values)
+            branches.append(BranchPortfolioSnapshot(
+                branch_code=branch,
+                business_date=business_date,
+                total=_position(_sum(branch_by_status)),
+                by_status={status: _position(totals) for status, totals in branch_by_status.items()},
+            ))
+        if not branches:
+            raise SnapshotNotFoundException(as_of)
+        return PortfolioSnapshot(
+            as_of=as_of,
+            branches=branches,
+            total=_position(_sum(by_status)),
+            by_status={status: _position(totals) for status, totals in by_status.items()},
+        )
+
+    async def compare(self, from_date: str, to_date: str) -> PortfolioComparison:
+        """
+        Change in the portfolio between two dates, with loans counted by status migration.
+
+        Raises:
+            SnapshotNotFoundException: If either date has no snapshot on or before it
+        """
+        earlier = await self.get_portfolio_as_of(from_date)
+        later = await self.get_portfolio_as_of(to_date)
+        earlier_dates = {branch.branch_code: branch.business_date for branch in earlier.branches}
+        later_dates = {branch.branch_code: branch.business_date for branch in later.branches}
+
+        # (from code, to code) -> [loans, outstanding cents before, outstanding cents after]
+        migrations: Dict[Tuple[int, int], Totals] = {}
+        names = ("status", "balance_cents")
+        for branch in sorted(earlier_dates.keys() | later_dates.keys()):
+            empty = {name: np.zeros(0, dtype=COLUMNS[name]) for name in names}
+            before = await self._decode(branch, earlier_dates[branch], names) if branch in earlier_dates else empty
+            after = await self._decode(branch, later_dates[branch], names) if branch in later_dates else empty
+            length = max(len(before["status"]), len(after["status"]))
+            from_status = _aligned(before["status"], length, np.int64)
+            to_status = _aligned(after["status"], length, np.int64)
+            present = (from_status != 0) | (to_status != 0)
+            keys, inverse = np.unique(from_status[present] * 256 + to_status[present], return_inverse=True)
+            loans = np.bincount(inverse, minlength=len(keys))
+            balance_from = np.bincount(inverse, _aligned(before["balance_cents"], length, np.int64)[present], len(keys))
+            balance_to = np.bincount(inverse, _aligned(after["balance_cents"], length, np.int64)[present], len(keys))
+            for index, key in enumerate(keys.tolist()):
+                _add(migrations, (key // 256, key % 256), (int(loans[index]), int(balance_from[index]), int(balance_to[index])))
+
+        return PortfolioComparison(
+            from_snapshot=earlier,
+            to_snapshot=later,
+            change=_difference(later.total, earlier.total),
+            npl_change=_difference(later.npl, earlier.npl),
+            migrations=[
+                StatusMigration(
+                    from_status=STATUS_NAMES.get(from_code),
+                    to_status=STATUS_NAMES.get(to_code),
+                    loans=totals[0],
+                    outstanding_from=totals[1] / 100,
+                    outstanding_to=totals[2] / 100,
+                )
+                for (from_code, to_code), totals in sorted(migrations.items())
+            ],
+        )
+
+    async def get_storage_stats(self, limit: int = 30) -> List[SnapshotStorage]:
+        """Storage used per business date, most recent first."""
+        pipeline = [
+            {"$match": scope_query({}, self.branch_code)},
+            {"$group": {
+                "_id": "$business_date",
+                "branches": {"$addToSet": "$branch_code"},
+                "chunks": {"$sum": 1},
+                "loans": {"$sum": "$loan_count"},
+                "keyframe": {"$max": "$keyframe"},
+                "raw_bytes": {"$sum": "$raw_bytes"},
+                "stored_bytes": {"$sum": "$stored_bytes"},
+            }},
+            {"$sort": {"_id": -1}},
+            {"$limit": limit},
+        ]
+        return [
+            SnapshotStorage(
+                business_date=row["_id"],
+                branches=len(row["branches"]),
+                chunks=row["chunks"],
+                loans=row["loans"],
+                keyframe=bool(row["keyframe"]),
+                raw_bytes=row["raw_bytes"],
+                stored_bytes=row["stored_bytes"],
+                bytes_per_loan=round(row["stored_bytes"] / row["loans"], 3) if row["loans"] else 0.0,
+                compression_ratio=round(row["raw_bytes"] / row["stored_bytes"], 2) if row["stored_bytes"] else 0.0,
+            )
+            for row in await self.snapshots.aggregate(pipeline).to_list(limit)
+        ]
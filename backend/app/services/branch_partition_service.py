@@ -0,0 +1,104 @@
+"""
+Branch partitioning: branch codes on loan activity, and sharding.
+
+Calls, promises and partner assignments copy their loan's ``branch_code``
+when they are created, so branch dashboards and reports filter them
+directly. Records written before that are backfilled from their loans here.
+On a sharded cluster the branch-partitioned collections are then sharded on
+``SHARD_KEYS`` (see ``config.indexes``).
+"""
+
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+from ..config import get_database
+from ..config.indexes import SHARD_KEYS, COLLECTION_INDEXES, shard_compatible
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Collections whose records take their branch from the loan they belong to
+LOAN_ACTIVITY_COLLECTIONS = ("call_logs", "promises_to_pay", "partner_assignments")
+
+
+class BranchPartitionService:
+    """Service class for branch code backfills and collection sharding."""
+
+    def __init__(self):
+        self.db = get_database()
+
+    async def backfill_branch_codes(self, batch_size: int = 5000) -> Dict[str, int]:
+        """
+        Copy loans' branch codes onto the calls, promises and assignments
+        that do not have one.
+
+        Returns:
+            Records updated per collection
+        """
+        return {
+            collection: await self._backfill(collection, batch_size)
+            for collection in LOAN_ACTIVITY_COLLECTIONS
+        }
+
+    async def _backfill(self, collection: str, batch_size: int) -> int:
+        updated = 0
+        batch: List[Dict[str, Any]] = []
+        async for record in self.db[collection].find(
+            {"branch_code": None}, {"_id": 0, "id": 1, "loan_id": 1}
+        ).batch_size(batch_size):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                updated += await self._write_branch_codes(collection, batch)
+                batch = []
+        if batch:
+            updated += await self._write_branch_codes(collection, batch)
+        logger.info(f"Backfilled branch codes on {updated} {collection} records")
+        return updated
+
+    async def _write_branch_codes(self, collection: str, records: List[Dict[str, Any]]) -> int:
+        loan_ids = list({record["loan_id"] for record in records})
+        branches = {
+            loan["id"]: loan["branch_code"]
+            async for loan in self.db.loan_accounts.find(
+                {"id": {"$in": loan_ids}}, {"_id": 0, "id": 1, "branch_code": 1}
+            )
+        }
+        # Run before sharding: setting a shard key value on a sharded collection needs a
+        # retryable write, and records without a branch sit in the null shard key range
+        operations = [
+            UpdateOne({"branch_code": None, "id": record["id"]}, {"$set": {"branch_code": branches[record["loan_id"]]}})
+            for record in records
+            if branches.get(record["loan_id"])
+        ]
+        if operations:
+            await self.db[collection].bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def shard_collections(self) -> List[str]:
+        """
+        Shard the branch-partitioned collections on their shard keys.
+
+        Must run through mongos after ``ensure_indexes`` (with ``MONGO_SHARDED``
+        set) and the backfill. Unique indexes a sharded collection cannot keep
+        are dropped first; collections already sharded are left alone.
+
+        Returns:
+            The collections sharded by this call
+        """
+        admin = self.db.client.admin
+        await admin.command("enableSharding", self.db.name)
+        sharded = []
+        for collection, shard_key in SHARD_KEYS.items():
+            namespace = f"{self.db.name}.{collection}"
+            if await self.db.client.config.collections.find_one({"_id": namespace, "key": {"$exists": True}}):
+                continue
+            existing = await self.db[collection].index_information()
+            for index in COLLECTION_INDEXES[collection]:
+                name = index.document["name"]
+                if name in existing and not shard_compatible(collection, index):
+                    await self.db[collection].drop_index(name)
+            await admin.command("shardCollection", namespace, key=shard_key, unique=True)
+            logger.info(f"Sharded {namespace} on {shard_key}")
+            sharded.append(collection)
+        return sharded
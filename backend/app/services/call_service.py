@@ -0,0 +1,123 @@
+"""
+Call log service for business logic operations.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..models import CallLog, CallLogCreate, CallStatus, LoanAccount, Member
+from ..config import get_database
+from ..utils.branch_scope import check_branch, loan_branch_code, resolve_branch_scope, scope_query
+from .event_stream_service import EventStreamService
+from .follow_up_service import FollowUpService
+from .note_search_service import NoteSearchService
+from .worklist_service import WorklistService
+
+DIAL_READY_MESSAGE = "Ready to dial. Click 'Start Call' to begin."
+
+
+class CallService:
+    """Service class for call log operations and the auto-dialer."""
+
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
+        self.db = get_database()
+        self.collection = self.db.call_logs
+        self.branch_code = resolve_branch_scope(user, branch_code)
+
+    async def get_calls(self, skip: int = 0, limit: int = 50, loan_id: Optional[str] = None) -> List[CallLog]:
+        """Get call logs, most recent first, optionally for one loan."""
+        query = scope_query({}, self.branch_code)
+        if loan_id:
+            query["loan_id"] = loan_id
+
+        calls = await self.collection.find(query).sort("call_start_time", -1).skip(skip).limit(limit).to_list(limit)
+        return [CallLog(**call) for call in calls]
+
+    async def create_call(self, call_data: CallLogCreate, current_user: Dict[str, Any]) -> CallLog:
+        """
+        Log a call made by the current user.
+
+        The call updates the agent's worklist, schedules any follow-up,
+        is indexed for note search and is published to the event stream.
+
+        Raises:
+            BranchAccessDeniedException: If the loan is outside the service's branch
+        """
+        branch_code = await loan_branch_code(self.db, call_data.loan_id)
+        check_branch(branch_code, self.branch_code)
+        call_log = CallLog(
+            **call_data.dict(exclude={"agent_id", "agent_name"}),
+            call_start_time=datetime.utcnow(),
+            agent_id=current_user["user_id"],
+            agent_name=current_user["name"],
+            branch_code=branch_code
+        )
+
+        # Simulate call duration for completed calls
+        if call_data.call_status == CallStatus.SUCCESSFUL:
+            call_log.call_end_time = datetime.utcnow() + timedelta(minutes=random.randint(2, 15))
+            call_log.call_duration_seconds = random.randint(120, 900)
+            call_log.recording_url = f"https://recordings.stimasacco.co.ke/{call_log.id}.mp3"
+
+        await self.collection.insert_one(call_log.dict())
+        await WorklistService().on_call_logged(call_log)
+        await FollowUpService().schedule_from_call(call_log)
+        await NoteSearchService().index_note("call", call_log.dict())
+        await EventStreamService().publish("call_log", "created", call_log.dict())
+        return call_log
+
+    async def next_to_dial(self, current_user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The next loan for the agent to call.
+
+        Taken from the agent's precomputed worklist; before worklists are
+        built, the first non-performing loan not called in the last day.
+
+        Returns:
+            The loan, its member and the number to dial, or None if there is
+            nothing to call
+        """
+        item = await WorklistService().next_for_agent(current_user["user_id"], current_user.get("branch_code"))
+        if item is not None:
+            loan = await self.db.loan_accounts.find_one({"id": item.loan_id})
+            member = await self.db.members.find_one({"id": item.member_id})
+            if loan and member:
+                return {
+                    "loan": LoanAccount(**loan),
+                    "member": Member(**member),
+                    "phone_number": member["phone_number"],
+                    "worklist_item": item,
+                    "message": DIAL_READY_MESSAGE
+                }
+
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        pipeline = [
+            {"$match": {"status": "non_performing"}},
+            {"$lookup": {
+                "from": "call_logs",
+                "localField": "id",
+                "foreignField": "loan_id",
+                "as": "recent_calls"
+            }},
+            {"$match": {
+                "$or": [
+                    {"recent_calls": {"$size": 0}},
+                    {"recent_calls.call_start_time": {"$lt": yesterday}}
+                ]
+            }},
+            {"$limit": 1}
+        ]
+
+        loans = await self.db.loan_accounts.aggregate(pipeline).to_list(1)
+        if not loans:
+            return None
+
+        loan = loans[0]
+        member = await self.db.members.find_one({"id": loan["member_id"]})
+        return {
+            "loan": LoanAccount(**loan),
+            "member": Member(**member),
+            "phone_number": member["phone_number"],
+            "message": DIAL_READY_MESSAGE
+        }
@@ -1,24 +1,79 @@
 """
 Dashboard service for business logic operations.
+
+Dashboard reads are requested by many agents at once, so identical
+concurrent calls are coalesced into one set of queries (``single_flight``).
+A service created for a user reports on that user's branch only (see
+``utils.branch_scope``), and the branch is part of the coalescing key.
 """
 
 from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 from ..models import DashboardStats
 from ..config import get_database
+from ..utils.branch_scope import resolve_branch_scope, scope_query
+from ..utils.single_flight import single_flight, call_key
 
 
 class DashboardService:
     """Service class for dashboard-related operations."""
     
-    def __init__(self):
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
         self.db = get_database()
+        self.user = user
+        self.branch_code = resolve_branch_scope(user, branch_code)
+
+    def _call_key(self, namespace: str) -> str:
+        return call_key(namespace, {"branch_code": self.branch_code}, user=self.user)
+
+    def _scoped(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        return scope_query(query, self.branch_code)
 
     async def get_dashboard_statistics(self) -> DashboardStats:
-        """Get comprehensive dashboard statistics."""
+        """Get comprehensive dashboard statistics (shared with concurrent callers in the same scope)."""
+        return await single_flight.do(self._call_key("dashboard_stats"), self._compute_dashboard_statistics)
+
+    async def get_npl_summary(self) -> List[Dict[str, Any]]:
+        """Get non-performing loan totals by branch, largest outstanding first."""
+        return await single_flight.do(self._call_key("npl_summary"), self._compute_npl_summary)
+
+    async def get_collection_performance(self) -> List[Dict[str, Any]]:
+        """Get counts and amounts of the last 30 days' promises by status."""
+        return await single_flight.do(
+            self._call_key("collection_performance"), self._compute_collection_performance
+        )
+
+    async def _compute_collection_performance(self) -> List[Dict[str, Any]]:
+        last_30_days = datetime.utcnow() - timedelta(days=30)
+        pipeline = [
+            {"$match": self._scoped({"promised_date": {"$gte": last_30_days}})},
+            {"$group": {
+                "_id": "$status",
+                "count": {"$sum": 1},
+                "total_amount": {"$sum": "$promised_amount"}
+            }}
+        ]
+        return await self.db.promises_to_pay.aggregate(pipeline).to_list(100)
+
+    async def _compute_npl_summary(self) -> List[Dict[str, Any]]:
+        pipeline = [
+            {"$match": self._scoped({"status": "non_performing"})},
+            {"$group": {
+                "_id": "$branch_code",
+                "total_loans": {"$sum": 1},
+                "total_outstanding": {"$sum": "$outstanding_balance"},
+                "total_arrears": {"$sum": "$arrears_amount"},
+                "avg_days_arrears": {"$avg": "$days_in_arrears"}
+            }},
+            {"$sort": {"total_outstanding": -1}}
+        ]
+        return await self.db.loan_accounts.aggregate(pipeline).to_list(100)
+
+    async def _compute_dashboard_statistics(self) -> DashboardStats:
         # Get basic counts
-        total_members = await self.db.members.count_documents({})
-        total_loans = await self.db.loan_accounts.count_documents({})
-        total_npl_loans = await self.db.loan_accounts.count_documents({"status": "non_performing"})
+        total_members = await self.db.members.count_documents(self._scoped({}))
+        total_loans = await self.db.loan_accounts.count_documents(self._scoped({}))
+        total_npl_loans = await self.db.loan_accounts.count_documents(self._scoped({"status": "non_performing"}))
         
         # Calculate financial totals
         portfolio_totals = await self._calculate_portfolio_totals()
@@ -44,6 +99,7 @@ class DashboardService:
     async def _calculate_portfolio_totals(self) -> dict:
         """Calculate portfolio financial totals."""
         pipeline = [
+            {"$match": self._scoped({})},
             {
                 "$group": {
                     "_id": None,
@@ -74,23 +130,23 @@ class DashboardService:
         tomorrow_start = datetime.combine(today + timedelta(days=1), datetime.min.time())
         
         # Count today's calls
-        calls_today = await self.db.call_logs.count_documents({
+        calls_today = await self.db.call_logs.count_documents(self._scoped({
             "call_start_time": {"$gte": today_start}
-        })
+        }))
         
         # Count promises due today
-        promises_due_today = await self.db.promises_to_pay.count_documents({
+        promises_due_today = await self.db.promises_to_pay.count_documents(self._scoped({
             "promised_date": {
                 "$gte": today_start,
                 "$lt": tomorrow_start
             },
             "status": "pending"
-        })
+        }))
         
         # Count pending escalations
-        escalations_pending = await self.db.partner_assignments.count_documents({
+        escalations_pending = await self.db.partner_assignments.count_documents(self._scoped({
             "status": "assigned"
-        })
+        }))
         
         return {
             "calls_today": calls_today,
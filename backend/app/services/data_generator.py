@@ -1,122 +1,502 @@
 """
 Data generation service for creating dummy data.
+
+Members are generated in fixed-size chunks. Every chunk draws from its own
+``numpy`` random generator seeded with ``(seed, chunk_index)``, so a chunk is
+reproducible on its own and the whole portfolio is deterministic for a given
+seed regardless of batch concurrency. All fields are sampled as vectors and
+the dependent collections (loans, call logs, promises, partner assignments
+and notifications) are derived from the in-memory chunk, so nothing is read
+back from the database. Chunks are written with concurrent unordered
+``insert_many`` batches, optionally paced to a rows-per-second target.
 """
 
-import random
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from ..models import Agent, ExternalPartner, LoanStatus, PartnerType, CallStatus, CallType, PromiseStatus, NoteSource
+from ..config import get_database, app_config
+from ..utils.logging_config import get_logger
+from ..utils.lazy_import import lazy_import
+from .amortization_service import add_months, instalment_amounts
+from .note_search_service import note_entry
+from .dedup_service import blocking_keys
+
+np = lazy_import("numpy")
+logger = get_logger(__name__)
+
+KENYAN_NAMES = [
+    ("John", "Kamau"), ("Mary", "Wanjiku"), ("Peter", "Mwangi"), ("Grace", "Akinyi"),
+    ("David", "Kiprotich"), ("Agnes", "Nyong'o"), ("Samuel", "Ochieng"), ("Faith", "Wambui"),
+    ("Michael", "Ruto"), ("Joyce", "Chebet"), ("Joseph", "Mutua"), ("Esther", "Wairimu"),
+    ("Daniel", "Kinyua"), ("Rose", "Atieno"), ("Francis", "Mburu"), ("Lucy", "Jepkoech")
+]
+
+DUPLICATE_KEY_ERROR = 11000
 
-from ..models import Member, LoanAccount, ExternalPartner, LoanStatus, PartnerType
-from ..config import get_database
+BRANCH_CODES = ["001", "002", "003", "004", "005", "006", "007", "008", "009", "010"]
+
+CALL_NOTES = [
+    "Member promised to pay by end of month",
+    "Member requested loan restructuring",
+    "Member cited delayed salary payment",
+    "Spoke to spouse, member travelling upcountry",
+    "Member disputes arrears amount, asked for statement",
+    "Member lost employment, exploring guarantor recovery",
+    "Number unreachable, will try alternate contact",
+    "Member agreed to partial payment via M-Pesa",
+]
+
+PROMISE_NOTES = [
+    "Payment via M-Pesa paybill",
+    "Will deposit at branch",
+    "Salary advance expected",
+    "Proceeds from harvest sale",
+    "",
+]
+
+# Default sampling distributions; any key can be overridden per run.
+DEFAULT_DISTRIBUTIONS: Dict[str, Any] = {
+    "loans_per_member_weights": [1 / 3, 1 / 3, 1 / 3],  # P(1 loan), P(2 loans), P(3 loans)
+    "npl_rate": 0.33,
+    "mobile_loan_rate": 0.5,
+    "principal_range": (50000, 2000000),  # KES
+    "interest_rate_range": (12.0, 24.0),
+    "loan_terms_months": [6, 12, 18, 24, 36],
+    "calls_per_npl_loan": 2.0,  # Poisson mean
+    "call_status_weights": [0.4, 0.35, 0.15, 0.1],  # successful, no_answer, busy, disconnected
+    "promise_rate": 0.5,  # of successful calls
+    "promise_kept_rate": 0.5,  # of promises already due
+    "assignment_rate": 0.1,  # of NPL loans more than 180 days in arrears
+    "agent_count": 20,
+}
 
 
 class DataGeneratorService:
     """Service for generating realistic dummy data."""
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        member_count: Optional[int] = None,
+        seed: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        rows_per_second: Optional[float] = None,
+        distributions: Optional[Dict[str, Any]] = None,
+        now: Optional[datetime] = None,
+    ):
         self.db = get_database()
+        self.member_count = member_count if member_count is not None else app_config.SEED_MEMBER_COUNT
+        self.seed = seed if seed is not None else app_config.SEED_RANDOM_SEED
+        self.batch_size = batch_size or app_config.SEED_BATCH_SIZE
+        self.concurrency = concurrency or app_config.SEED_CONCURRENCY
+        self.rows_per_second = (
+            rows_per_second if rows_per_second is not None else app_config.SEED_ROWS_PER_SECOND
+        )
+        self.distributions = {**DEFAULT_DISTRIBUTIONS, **(distributions or {})}
+        self.now = now or datetime.utcnow().replace(microsecond=0)
+        self.partners = self._build_external_partners()
+        self.agents = self._build_agents()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._rows_written = 0
+        self._started_at = 0.0
 
     async def generate_dummy_data_if_needed(self):
         """Generate dummy data if the database is empty."""
         member_count = await self.db.members.count_documents({})
         if member_count > 0:
             return
-        
-        print("Generating dummy data...")
-        await self._generate_members()
-        await self._generate_loans()
-        await self._generate_external_partners()
-        print("Dummy data generated successfully!")
-
-    async def _generate_members(self):
-        """Generate dummy members."""
-        kenyan_names = [
-            ("John", "Kamau"), ("Mary", "Wanjiku"), ("Peter", "Mwangi"), ("Grace", "Akinyi"),
-            ("David", "Kiprotich"), ("Agnes", "Nyong'o"), ("Samuel", "Ochieng"), ("Faith", "Wambui"),
-            ("Michael", "Ruto"), ("Joyce", "Chebet"), ("Joseph", "Mutua"), ("Esther", "Wairimu"),
-            ("Daniel", "Kinyua"), ("Rose", "Atieno"), ("Francis", "Mburu"), ("Lucy", "Jepkoech")
-        ]
-        
-        branch_codes = ["001", "002", "003", "004", "005", "006", "007", "008", "009", "010"]
-        
+
+        logger.info(f"Generating dummy data for {self.member_count} members (seed {self.seed})...")
+        stats = await self.generate()
+        logger.info(
+            f"Dummy data generated successfully: {stats['rows']} rows in "
+            f"{stats['elapsed_seconds']}s ({stats['rows_per_second']} rows/s)"
+        )
+
+    async def generate(
+        self,
+        completed_chunks: Iterable[int] = (),
+        on_chunk_written: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Generate the portfolio and return per-collection counts and throughput.
+
+        Args:
+            completed_chunks: Chunk indices already written by a previous run, to skip
+            on_chunk_written: Awaited with ``(chunk_index, rows)`` after each chunk is durable
+
+        Inserts tolerate duplicate ``id`` keys, so re-writing a chunk that was
+        interrupted part-way (same seed and reference time) is idempotent.
+        """
+        self._rows_written = 0
+        self._started_at = time.perf_counter()
+        completed = set(completed_chunks)
+        counts: Dict[str, int] = {}
+
+        await self._insert("external_partners", [dict(p) for p in self.partners])
+        counts["external_partners"] = len(self.partners)
+        await self._insert("agents", [
+            Agent(**agent, capacity=app_config.WORKLIST_AGENT_CAPACITY, created_at=self.now).dict()
+            for agent in self.agents
+        ])
+        counts["agents"] = len(self.agents)
+
+        loop = asyncio.get_running_loop()
+        pending = set()
+        for chunk_index in range(self.chunk_count):
+            if chunk_index in completed:
+                continue
+            # Sampling is CPU-bound; keep it off the event loop
+            documents = await loop.run_in_executor(None, self.build_chunk, chunk_index)
+            for collection, docs in documents.items():
+                counts[collection] = counts.get(collection, 0) + len(docs)
+            # Bound in-flight chunks so generation overlaps with writes without unbounded memory
+            if len(pending) >= self.concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            pending.add(asyncio.ensure_future(self.write_chunk(chunk_index, documents, on_chunk_written)))
+        if pending:
+            await asyncio.gather(*pending)
+
+        elapsed = time.perf_counter() - self._started_at
+        rows = sum(counts.values())
+        return {
+            "counts": counts,
+            "rows": rows,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0,
+        }
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of member chunks in the portfolio."""
+        return (self.member_count + self.batch_size - 1) // self.batch_size
+
+    def chunk_bounds(self, chunk_index: int) -> tuple:
+        """Global member index range [start, stop) covered by a chunk."""
+        start = chunk_index * self.batch_size
+        return start, min(start + self.batch_size, self.member_count)
+
+    def build_chunk(self, chunk_index: int) -> Dict[str, List[dict]]:
+        """Build all documents for one member chunk, deterministically."""
+        rng = np.random.default_rng([self.seed, chunk_index])
+        start, stop = self.chunk_bounds(chunk_index)
+        members = self._build_members(rng, start, stop)
+        loans = self._build_loans(rng, members)
+        call_logs = self._build_call_logs(rng, members, loans)
+        promises = self._build_promises(rng, call_logs)
+        notes = [note_entry(NoteSource.CALL.value, call) for call in call_logs]
+        notes += [note_entry(NoteSource.PROMISE.value, promise) for promise in promises]
+        return {
+            "members": members,
+            "loan_accounts": loans,
+            "call_logs": call_logs,
+            "promises_to_pay": promises,
+            "partner_assignments": self._build_partner_assignments(rng, loans),
+            "notifications": self._build_notifications(promises),
+            "note_index": [note for note in notes if note is not None],
+        }
+
+    async def write_chunk(
+        self,
+        chunk_index: int,
+        documents: Dict[str, List[dict]],
+        on_chunk_written: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ) -> None:
+        """Insert a chunk's documents with bounded concurrency and optional pacing."""
+        async with self._semaphore:
+            rows = 0
+            for collection, docs in documents.items():
+                for offset in range(0, len(docs), self.batch_size):
+                    batch = docs[offset:offset + self.batch_size]
+                    await self._insert(collection, batch)
+                    rows += len(batch)
+                    self._rows_written += len(batch)
+                    await self._pace()
+            if on_chunk_written is not None:
+                await on_chunk_written(chunk_index, rows)
+
+    async def _insert(self, collection: str, documents: List[dict]) -> None:
+        """Unordered insert that skips documents already written by an interrupted run."""
+        if not documents:
+            return
+        try:
+            await self.db[collection].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+
+    async def _pace(self) -> None:
+        """Sleep just enough to stay at or below the rows-per-second target."""
+        if not self.rows_per_second:
+            return
+        expected_elapsed = self._rows_written / self.rows_per_second
+        actual_elapsed = time.perf_counter() - self._started_at
+        if expected_elapsed > actual_elapsed:
+            await asyncio.sleep(expected_elapsed - actual_elapsed)
+
+    def _uuids(self, rng: np.random.Generator, count: int) -> List[str]:
+        """Deterministic version-4 UUID strings drawn from ``rng``."""
+        raw = rng.bytes(16 * count)
+        return [str(uuid.UUID(bytes=raw[i * 16:(i + 1) * 16], version=4)) for i in range(count)]
+
+    def _days_ago(self, days: np.ndarray) -> List[datetime]:
+        """Convert an array of day offsets into datetimes before ``now``."""
+        now = np.datetime64(self.now, "s")
+        seconds = (np.asarray(days, dtype=np.float64) * 86400).astype("timedelta64[s]")
+        return (now - seconds).astype("datetime64[ms]").tolist()
+
+    def _build_members(self, rng: np.random.Generator, start: int, stop: int) -> List[dict]:
+        """Generate dummy members for the global index range [start, stop)."""
+        count = stop - start
+        names = rng.integers(0, len(KENYAN_NAMES), count)
+        # Phones and national IDs are bijections of the global index, so they never collide
+        index = np.arange(start, stop, dtype=np.int64)
+        phones = 700000000 + (index * 7919) % 100000000
+        id_numbers = 10000000 + (index * 7927) % 30000000
+        po_boxes = rng.integers(1, 10000, count)
+        branches = rng.integers(0, len(BRANCH_CODES), count)
+        registration_dates = self._days_ago(rng.integers(30, 1826, count))
+        ids = self._uuids(rng, count)
+
         members = []
-        for i in range(1000):
-            first_name, last_name = random.choice(kenyan_names)
-            member = Member(
-                member_number=f"STM{10000 + i}",
-                first_name=first_name,
-                last_name=last_name,
-                email=f"{first_name.lower()}.{last_name.lower()}@email.com",
-                phone_number=f"+254{random.randint(700000000, 799999999)}",
-                id_number=f"{random.randint(10000000, 39999999)}",
-                address=f"P.O. Box {random.randint(1, 9999)}, Nairobi",
-                branch_code=random.choice(branch_codes),
-                registration_date=datetime.utcnow() - timedelta(days=random.randint(30, 1825))
-            )
-            members.append(member.dict())
-        
-        await self.db.members.insert_many(members)
+        for i in range(count):
+            first_name, last_name = KENYAN_NAMES[names[i]]
+            members.append({
+                "id": ids[i],
+                "member_number": f"STM{10000 + start + i}",
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": f"{first_name.lower()}.{last_name.lower()}@email.com",
+                "phone_number": f"+254{phones[i]}",
+                "id_number": str(id_numbers[i]),
+                "address": f"P.O. Box {po_boxes[i]}, Nairobi",
+                "branch_code": BRANCH_CODES[branches[i]],
+                "registration_date": registration_dates[i],
+                "status": "active",
+                "created_at": self.now,
+            })
+            members[-1]["dedup_keys"] = blocking_keys(members[-1])
+        return members
+
+    def _build_loans(self, rng: np.random.Generator, members: List[dict]) -> List[dict]:
+        """Generate dummy loan accounts for a chunk of members."""
+        dist = self.distributions
+        weights = np.asarray(dist["loans_per_member_weights"], dtype=np.float64)
+        per_member = rng.choice(np.arange(1, len(weights) + 1), size=len(members), p=weights / weights.sum())
+        owner = np.repeat(np.arange(len(members)), per_member)
+        # Sequence number of each loan within its member (1-based)
+        sequence = np.arange(len(owner)) - np.repeat(np.cumsum(per_member) - per_member, per_member) + 1
+        count = len(owner)
+
+        low, high = dist["principal_range"]
+        principal = rng.integers(low, high + 1, count).astype(np.float64)
+        interest_rate = rng.uniform(*dist["interest_rate_range"], count)
+        term_months = rng.choice(np.asarray(dist["loan_terms_months"]), count)
+        loan_type_mobile = rng.random(count) < dist["mobile_loan_rate"]
+        disbursement_days = rng.integers(30, 731, count)
+        is_npl = rng.random(count) < dist["npl_rate"]
+
+        days_in_arrears = np.where(is_npl, rng.integers(90, 731, count), rng.integers(0, 31, count))
+        balance_factor = np.where(is_npl, rng.uniform(0.6, 1.2, count), rng.uniform(0.2, 0.8, count))
+        outstanding_balance = principal * balance_factor
+        arrears_amount = np.where(is_npl, outstanding_balance * rng.uniform(0.3, 0.8, count), 0.0)
+        last_payment_days = np.where(is_npl, days_in_arrears, rng.integers(1, 31, count))
+        monthly_payment = np.round(instalment_amounts(principal, interest_rate, term_months), 2)
+
+        disbursement_dates = self._days_ago(disbursement_days)
+        maturity_dates = add_months(disbursement_dates, term_months).astype("datetime64[ms]").tolist()
+        last_payment_dates = self._days_ago(last_payment_days)
+        ids = self._uuids(rng, count)
 
-    async def _generate_loans(self):
-        """Generate dummy loan accounts."""
-        members_list = await self.db.members.find().to_list(1000)
         loans = []
-        
-        for i, member in enumerate(members_list):
-            # Each member can have 1-3 loans
-            num_loans = random.randint(1, 3)
-            
-            for j in range(num_loans):
-                loan_type = random.choice(["branch", "mobile"])
-                principal = random.randint(50000, 2000000)  # 50K to 2M KES
-                interest_rate = random.uniform(12.0, 24.0)
-                term_months = random.choice([6, 12, 18, 24, 36])
-                
-                disbursement_date = datetime.utcnow() - timedelta(days=random.randint(30, 730))
-                maturity_date = disbursement_date + timedelta(days=term_months * 30)
-                
-                # Calculate if loan should be NPL (33% NPL rate)
-                is_npl = random.random() < 0.33
-                
-                if is_npl:
-                    days_in_arrears = random.randint(90, 730)
-                    outstanding_balance = principal * random.uniform(0.6, 1.2)
-                    arrears_amount = outstanding_balance * random.uniform(0.3, 0.8)
-                    status = LoanStatus.NON_PERFORMING
-                    last_payment_date = datetime.utcnow() - timedelta(days=days_in_arrears)
-                else:
-                    days_in_arrears = random.randint(0, 30)
-                    outstanding_balance = principal * random.uniform(0.2, 0.8)
-                    arrears_amount = 0.0
-                    status = LoanStatus.PERFORMING
-                    last_payment_date = datetime.utcnow() - timedelta(days=random.randint(1, 30))
-                
-                monthly_payment = (principal / term_months) * (1 + interest_rate/100/12)
-                
-                loan = LoanAccount(
-                    loan_number=f"LN{member['member_number']}{j+1:02d}",
-                    member_id=member['id'],
-                    member_number=member['member_number'],
-                    loan_type=loan_type,
-                    principal_amount=principal,
-                    outstanding_balance=outstanding_balance,
-                    monthly_payment=monthly_payment,
-                    interest_rate=interest_rate,
-                    loan_term_months=term_months,
-                    disbursement_date=disbursement_date,
-                    maturity_date=maturity_date,
-                    last_payment_date=last_payment_date,
-                    days_in_arrears=days_in_arrears,
-                    arrears_amount=arrears_amount,
-                    status=status,
-                    branch_code=member['branch_code']
-                )
-                loans.append(loan.dict())
-        
-        await self.db.loan_accounts.insert_many(loans)
-
-    async def _generate_external_partners(self):
-        """Generate dummy external partners."""
+        for i in range(count):
+            member = members[owner[i]]
+            loans.append({
+                "id": ids[i],
+                "loan_number": f"LN{member['member_number']}{sequence[i]:02d}",
+                "member_id": member["id"],
+                "member_number": member["member_number"],
+                "loan_type": "mobile" if loan_type_mobile[i] else "branch",
+                "principal_amount": float(principal[i]),
+                "outstanding_balance": float(outstanding_balance[i]),
+                "monthly_payment": float(monthly_payment[i]),
+                "interest_rate": float(interest_rate[i]),
+                "loan_term_months": int(term_months[i]),
+                "disbursement_date": disbursement_dates[i],
+                "maturity_date": maturity_dates[i],
+                "last_payment_date": last_payment_dates[i],
+                "days_in_arrears": int(days_in_arrears[i]),
+                "arrears_amount": float(arrears_amount[i]),
+                "status": LoanStatus.NON_PERFORMING.value if is_npl[i] else LoanStatus.PERFORMING.value,
+                "branch_code": member["branch_code"],
+                "created_at": self.now,
+            })
+        return loans
+
+    def _build_call_logs(self, rng: np.random.Generator, members: List[dict], loans: List[dict]) -> List[dict]:
+        """Generate collection call history for the chunk's NPL loans."""
+        dist = self.distributions
+        phone_numbers = {member["id"]: member["phone_number"] for member in members}
+        npl = [loan for loan in loans if loan["status"] == LoanStatus.NON_PERFORMING.value]
+        per_loan = rng.poisson(dist["calls_per_npl_loan"], len(npl))
+        owner = np.repeat(np.arange(len(npl)), per_loan)
+        count = len(owner)
+
+        statuses = list(CallStatus)
+        weights = np.asarray(dist["call_status_weights"], dtype=np.float64)
+        status_index = rng.choice(len(statuses), size=count, p=weights / weights.sum())
+        agent_index = rng.integers(0, len(self.agents), count)
+        note_index = rng.integers(0, len(CALL_NOTES), count)
+        start_days = rng.uniform(0, 60, count)
+        durations = rng.integers(120, 901, count)
+        follow_up_required = rng.random(count) < 0.3
+        follow_up_days = start_days - rng.integers(1, 15, count)
+        start_times = self._days_ago(start_days)
+        end_times = self._days_ago(start_days - durations / 86400)
+        follow_up_dates = self._days_ago(follow_up_days)
+        ids = self._uuids(rng, count)
+
+        calls = []
+        for i in range(count):
+            loan = npl[owner[i]]
+            agent = self.agents[agent_index[i]]
+            successful = statuses[status_index[i]] == CallStatus.SUCCESSFUL
+            calls.append({
+                "id": ids[i],
+                "loan_id": loan["id"],
+                "member_id": loan["member_id"],
+                "call_type": CallType.OUTBOUND.value,
+                "phone_number": phone_numbers[loan["member_id"]],
+                "call_start_time": start_times[i],
+                "call_end_time": end_times[i] if successful else None,
+                "call_duration_seconds": int(durations[i]) if successful else None,
+                "call_status": statuses[status_index[i]].value,
+                "notes": CALL_NOTES[note_index[i]] if successful else "",
+                "agent_id": agent["agent_id"],
+                "agent_name": agent["name"],
+                "recording_url": f"https://recordings.stimasacco.co.ke/{ids[i]}.mp3" if successful else None,
+                "follow_up_required": bool(follow_up_required[i]),
+                "follow_up_date": follow_up_dates[i] if follow_up_required[i] else None,
+                "branch_code": loan["branch_code"],
+                "created_at": start_times[i],
+            })
+        return calls
+
+    def _build_promises(self, rng: np.random.Generator, call_logs: List[dict]) -> List[dict]:
+        """Generate promises to pay from a share of the successful calls."""
+        dist = self.distributions
+        successful = [call for call in call_logs if call["call_status"] == CallStatus.SUCCESSFUL.value]
+        keep = rng.random(len(successful)) < dist["promise_rate"]
+        calls = [call for call, kept in zip(successful, keep) if kept]
+        count = len(calls)
+
+        days_after_call = rng.integers(3, 31, count)
+        kept = rng.random(count) < dist["promise_kept_rate"]
+        amounts = rng.uniform(2000, 50000, count).round(-2)
+        note_index = rng.integers(0, len(PROMISE_NOTES), count)
+        ids = self._uuids(rng, count)
+
+        promises = []
+        for i, call in enumerate(calls):
+            promised_date = call["call_start_time"] + timedelta(days=int(days_after_call[i]))
+            if promised_date > self.now:
+                status = PromiseStatus.PENDING
+            else:
+                status = PromiseStatus.KEPT if kept[i] else PromiseStatus.BROKEN
+            promises.append({
+                "id": ids[i],
+                "loan_id": call["loan_id"],
+                "member_id": call["member_id"],
+                "call_id": call["id"],
+                "promised_amount": float(amounts[i]),
+                "promised_date": promised_date,
+                "status": status.value,
+                "notes": PROMISE_NOTES[note_index[i]],
+                "agent_id": call["agent_id"],
+                "agent_name": call["agent_name"],
+                "branch_code": call["branch_code"],
+                "created_at": call["call_start_time"],
+                "updated_at": min(promised_date, self.now),
+            })
+        return promises
+
+    def _build_partner_assignments(self, rng: np.random.Generator, loans: List[dict]) -> List[dict]:
+        """Assign a share of long-overdue NPL loans to external partners."""
+        dist = self.distributions
+        candidates = [
+            loan for loan in loans
+            if loan["status"] == LoanStatus.NON_PERFORMING.value and loan["days_in_arrears"] > 180
+        ]
+        chosen = rng.random(len(candidates)) < dist["assignment_rate"]
+        loans = [loan for loan, picked in zip(candidates, chosen) if picked]
+        count = len(loans)
+
+        partner_index = rng.integers(0, len(self.partners), count)
+        assigned_dates = self._days_ago(rng.integers(1, 90, count))
+        ids = self._uuids(rng, count)
+
+        return [
+            {
+                "id": ids[i],
+                "loan_id": loan["id"],
+                "partner_id": self.partners[partner_index[i]]["id"],
+                "assigned_date": assigned_dates[i],
+                "expected_recovery_amount": round(loan["arrears_amount"], 2),
+                "actual_recovery_amount": 0.0,
+                "commission_amount": 0.0,
+                "status": "assigned",
+                "notes": "",
+                "branch_code": loan["branch_code"],
+                "created_at": assigned_dates[i],
+            }
+            for i, loan in enumerate(loans)
+        ]
+
+    def _build_notifications(self, promises: List[dict]) -> List[dict]:
+        """Generate promise-due reminders for agents on pending promises."""
+        pending = [p for p in promises if p["status"] == PromiseStatus.PENDING.value]
+        return [
+            {
+                "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"promise_due/{promise['id']}")),
+                "recipient_id": promise["agent_id"],
+                "recipient_type": "agent",
+                "notification_type": "promise_due",
+                "title": "Promise to pay due",
+                "message": (
+                    f"KES {promise['promised_amount']:,.0f} promised on loan {promise['loan_id']} "
+                    f"is due {promise['promised_date']:%Y-%m-%d}"
+                ),
+                "is_read": False,
+                "sent_at": promise["created_at"],
+                "read_at": None,
+            }
+            for promise in pending
+        ]
+
+    def _build_agents(self) -> List[dict]:
+        """Collection agents used for generated call history (spread across branches)."""
+        return [
+            {
+                "agent_id": f"agent_{i + 1:03d}",
+                "name": f"Agent {i + 1:03d}",
+                "branch_code": BRANCH_CODES[i % len(BRANCH_CODES)],
+            }
+            for i in range(self.distributions["agent_count"])
+        ]
+
+    def _build_external_partners(self) -> List[dict]:
+        """Generate dummy external partners with ids derived from the seed."""
         partners = [
             ExternalPartner(
                 partner_name="Elite Recovery Services",
@@ -143,6 +523,10 @@ class DataGeneratorService:
                 commission_rate=20.0
             )
         ]
-        
-        await self.db.external_partners.insert_many([p.dict() for p in partners])
-
+        documents = []
+        for partner in partners:
+            document = partner.dict()
+            document["id"] = str(uuid.uuid5(uuid.NAMESPACE_URL, f"partner/{self.seed}/{partner.partner_name}"))
+            document["created_at"] = self.now
+            documents.append(document)
+        return documents
@@ -0,0 +1,306 @@
+"""
+Member deduplication and identity resolution.
+
+Members are never compared all-pairs. Each member gets blocking keys, stored
+in ``dedup_keys`` under a multikey index:
+
+- ``id:<national id>`` and ``phone:<last 9 digits>`` for exact identifiers
+- ``name:<sorted name tokens>`` so swapped first and last names collide
+- ``lsh:<band>:<hash>`` MinHash bands over name character trigrams, so
+  misspelt names (``Wanjiku`` / ``Wanjku``) share a band with high probability
+
+Only members sharing a key are compared, and keys shared by more than
+``DEDUP_MAX_BLOCK_SIZE`` members (very common names) are too unselective to
+compare and are skipped, so a scan costs time roughly linear in the number of
+members. Candidate pairs are scored on the national ID, phone and name
+similarity; probable duplicates are grouped into clusters with union-find.
+
+The same keys back the on-insert check in ``MemberService.create_member``: a
+new member is compared against the members returned by one indexed
+``dedup_keys`` lookup.
+"""
+
+import random
+import re
+import time
+import unicodedata
+import zlib
+from datetime import datetime
+from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+
+from ..models import DedupReport, DuplicateCandidate
+from ..config import get_database, app_config
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# MinHash signature length and band layout (bands x rows)
+MINHASH_BANDS = 4
+MINHASH_ROWS = 3
+MINHASH_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+MINHASH_A = [_rng.randrange(1, 1 << 31) for _ in range(MINHASH_BANDS * MINHASH_ROWS)]
+MINHASH_B = [_rng.randrange(0, 1 << 31) for _ in range(MINHASH_BANDS * MINHASH_ROWS)]
+_MASK = (1 << 32) - 1
+
+# Candidate pairs kept in a stored report
+REPORT_PAIR_LIMIT = 10000
+
+MEMBER_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "member_number": 1,
+    "first_name": 1,
+    "last_name": 1,
+    "phone_number": 1,
+    "id_number": 1,
+    "dedup_keys": 1,
+}
+
+
+def normalize_name(first_name: str, last_name: str) -> str:
+    """Lower-case, accent-free name with its tokens sorted."""
+    text = unicodedata.normalize("NFKD", f"{first_name} {last_name}")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(sorted(re.findall(r"[a-z]+", text)))
+
+
+def normalize_phone(phone_number: str) -> str:
+    """Kenyan phone number in ``+254XXXXXXXXX`` form (last nine digits)."""
+    digits = re.sub(r"\D", "", phone_number or "")
+    return f"+254{digits[-9:]}" if len(digits) >= 9 else digits
+
+
+def normalize_id_number(id_number: str) -> str:
+    """National ID with separators and leading zeros removed."""
+    return re.sub(r"[^0-9A-Z]", "", (id_number or "").upper()).lstrip("0")
+
+
+@lru_cache(maxsize=65536)
+def minhash_bands(name: str) -> Tuple[str, ...]:
+    """LSH band keys from a MinHash signature over the name's character trigrams."""
+    padded = f" {name} "
+    shingles = {padded[i:i + 3] for i in range(max(len(padded) - 2, 1))}
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+    signature = [
+        min(((a * h + b) % MINHASH_PRIME) & _MASK for h in hashes)
+        for a, b in zip(MINHASH_A, MINHASH_B)
+    ]
+    return tuple(
+        f"lsh:{band}:{zlib.crc32(repr(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]).encode()):08x}"
+        for band in range(MINHASH_BANDS)
+    )
+
+
+def blocking_keys(member: Dict[str, Any]) -> List[str]:
+    """Blocking keys for a member document or creation payload."""
+    keys = []
+    id_number = normalize_id_number(member.get("id_number", ""))
+    if id_number:
+        keys.append(f"id:{id_number}")
+    phone = normalize_phone(member.get("phone_number", ""))
+    if phone:
+        keys.append(f"phone:{phone}")
+    name = normalize_name(member.get("first_name", ""), member.get("last_name", ""))
+    if name:
+        keys.append(f"name:{name}")
+        keys.extend(minhash_bands(name))
+    return keys
+
+
+def score_pair(a: Dict[str, Any], b: Dict[str, Any]) -> Tuple[float, List[str]]:
+    """
+    Likelihood that two members are the same person, with the evidence.
+
+    The same national ID is decisive. Otherwise a shared phone number, or a
+    national ID one edit apart (a typo), counts only together with a
+    similar name.
+    """
+    reasons = []
+    name_a = normalize_name(a["first_name"], a["last_name"])
+    name_b = normalize_name(b["first_name"], b["last_name"])
+    name_similarity = SequenceMatcher(None, name_a, name_b).ratio()
+    if name_similarity >= app_config.DEDUP_NAME_SIMILARITY:
+        reasons.append("similar_name" if name_similarity < 1 else "same_name")
+
+    id_a, id_b = normalize_id_number(a["id_number"]), normalize_id_number(b["id_number"])
+    if id_a and id_a == id_b:
+        return 1.0, ["same_id_number"] + reasons
+    near_id = bool(id_a and id_b) and len(id_a) == len(id_b) and _within_one_edit(id_a, id_b)
+    same_phone = normalize_phone(a["phone_number"]) == normalize_phone(b["phone_number"])
+    if same_phone:
+        reasons.append("same_phone")
+    if near_id:
+        reasons.append("similar_id_number")
+
+    score = 0.5 * name_similarity + (0.3 if same_phone else 0.0) + (0.2 if near_id else 0.0)
+    if name_similarity < app_config.DEDUP_NAME_SIMILARITY or not (same_phone or near_id):
+        score = min(score, 0.49)
+    return round(score, 3), reasons
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Equal-length strings differing by one substitution or one adjacent transposition."""
+    diffs = [i for i in range(len(a)) if a[i] != b[i]]
+    if len(diffs) == 1:
+        return True
+    return len(diffs) == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, x: str) -> str:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: str, b: str) -> None:
+        self.parent[self.find(a)] = self.find(b)
+
+
+class MemberDedupService:
+    """Service class for probable-duplicate detection across members."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.members
+        self.reports = self.db.member_dedup_reports
+
+    async def find_candidates(self, member: Dict[str, Any], limit: int = 50) -> List[DuplicateCandidate]:
+        """Existing members that probably are ``member`` (checked before insert)."""
+        keys = blocking_keys(member)
+        if not keys:
+            return []
+        # Identifier keys are selective; name keys can be shared by many members,
+        # so they are looked up separately and capped without crowding the former out
+        identifier_keys = [key for key in keys if key.startswith(("id:", "phone:"))]
+        name_keys = [key for key in keys if key not in identifier_keys]
+        others: Dict[str, Dict[str, Any]] = {}
+        for block in (identifier_keys, name_keys):
+            if block:
+                async for other in self.collection.find({"dedup_keys": {"$in": block}}, MEMBER_PROJECTION).limit(limit):
+                    others.setdefault(other["id"], other)
+
+        candidates = []
+        for other in others.values():
+            if other["id"] == member.get("id"):
+                continue
+            score, reasons = score_pair(member, other)
+            if score >= 0.5:
+                candidates.append(DuplicateCandidate(
+                    member_ids=[other["id"]],
+                    member_numbers=[other["member_number"]],
+                    score=score,
+                    reasons=reasons,
+                ))
+        return sorted(candidates, key=lambda candidate: candidate.score, reverse=True)
+
+    async def backfill_keys(self, batch_size: int = 5000) -> int:
+        """Compute ``dedup_keys`` for members that do not have them yet."""
+        updated = 0
+        operations: List[UpdateOne] = []
+        async for member in self.collection.find(
+            {"dedup_keys": {"$exists": False}}, MEMBER_PROJECTION
+        ).batch_size(batch_size):
+            operations.append(UpdateOne({"id": member["id"]}, {"$set": {"dedup_keys": blocking_keys(member)}}))
+            if len(operations) >= batch_size:
+                await self.collection.bulk_write(operations, ordered=False)
+                updated += len(operations)
+                operations = []
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+        return updated
+
+    async def scan(self, max_block_size: Optional[int] = None) -> DedupReport:
+        """
+        Find probable duplicate members across the whole membership.
+
+        Returns:
+            The stored report with duplicate pairs, clusters and block statistics
+        """
+        started = time.perf_counter()
+        started_at = datetime.utcnow()
+        max_block_size = max_block_size or app_config.DEDUP_MAX_BLOCK_SIZE
+        backfilled = await self.backfill_keys()
+
+        # Group members by blocking key on the server; singleton keys never leave it
+        pipeline = [
+            {"$project": {"_id": 0, "id": 1, "dedup_keys": 1}},
+            {"$unwind": "$dedup_keys"},
+            {"$group": {"_id": "$dedup_keys", "ids": {"$push": "$id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]
+        pairs: Set[Tuple[str, str]] = set()
+        blocks = oversized = 0
+        async for block in self.collection.aggregate(pipeline, allowDiskUse=True):
+            if block["count"] > max_block_size:
+                oversized += 1
+                continue
+            blocks += 1
+            pairs.update(combinations(sorted(set(block["ids"])), 2))
+
+        duplicates = await self._score_pairs(pairs)
+        clusters = _UnionFind()
+        for candidate in duplicates:
+            clusters.union(*candidate.member_ids)
+        cluster_count = len({clusters.find(member_id) for member_id in clusters.parent})
+
+        report = DedupReport(
+            started_at=started_at,
+            finished_at=datetime.utcnow(),
+            members_scanned=await self.collection.estimated_document_count(),
+            keys_backfilled=backfilled,
+            blocks_compared=blocks,
+            oversized_blocks=oversized,
+            comparisons=len(pairs),
+            duplicate_pairs=len(duplicates),
+            clusters=cluster_count,
+            pairs=sorted(duplicates, key=lambda candidate: candidate.score, reverse=True)[:REPORT_PAIR_LIMIT],
+            elapsed_seconds=round(time.perf_counter() - started, 2),
+        )
+        await self.reports.insert_one(report.dict())
+        logger.info(
+            f"Member dedup scan: {report.comparisons} comparisons in {blocks} blocks "
+            f"({oversized} oversized skipped), {report.duplicate_pairs} probable duplicate pairs "
+            f"in {cluster_count} clusters, {report.elapsed_seconds}s"
+        )
+        return report
+
+    async def get_latest_report(self) -> Optional[DedupReport]:
+        """Get the most recent scan report."""
+        report = await self.reports.find_one({}, {"_id": 0}, sort=[("started_at", -1)])
+        return DedupReport(**report) if report else None
+
+    async def _score_pairs(self, pairs: Iterable[Tuple[str, str]], batch_size: int = 5000) -> List[DuplicateCandidate]:
+        """Load the paired members in batches and keep the probable duplicates."""
+        pairs = sorted(pairs)
+        duplicates = []
+        for offset in range(0, len(pairs), batch_size):
+            batch = pairs[offset:offset + batch_size]
+            ids = list({member_id for pair in batch for member_id in pair})
+            members = {
+                member["id"]: member
+                async for member in self.collection.find({"id": {"$in": ids}}, MEMBER_PROJECTION)
+            }
+            for a, b in batch:
+                if a not in members or b not in members:
+                    continue
+                score, reasons = score_pair(members[a], members[b])
+                if score >= 0.5:
+                    duplicates.append(DuplicateCandidate(
+                        member_ids=[a, b],
+                        member_numbers=[members[a]["member_number"], members[b]["member_number"]],
+                        score=score,
+                        reasons=reasons,
+                    ))
+        return duplicates
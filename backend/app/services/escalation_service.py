@@ -0,0 +1,333 @@
+"""
+Rule-driven escalation of the non-performing loan book.
+
+The engine streams non-performing and defaulted loans in ``id`` order. For
+each chunk it counts broken promises and unsuccessful calls with two indexed
+aggregations over the chunk's loan ids, evaluates the escalation rules with
+vectorised ``numpy`` comparisons and raises ``escalation_level`` where a rule
+matches (levels only ever go up). Loans that reach ``external_partner``
+without an active assignment are placed with partners by spare capacity,
+cheapest commission first, and written with ``insert_many``. Automatic
+assignments get an id derived from the loan, level and the number of earlier
+automatic assignments of the loan, so the unique ``id`` index keeps a re-run
+from double-assigning a loan while a loan whose assignment was completed or
+recalled can be escalated again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateMany
+from pymongo.errors import BulkWriteError
+
+from ..models import CallStatus, EscalationLevel, EscalationRule, LoanStatus, PartnerAssignment, PromiseStatus
+from ..config import get_database, app_config
+from ..utils.logging_config import get_logger
+from ..utils.lazy_import import lazy_import
+from .event_stream_service import EventStreamService
+
+np = lazy_import("numpy")
+logger = get_logger(__name__)
+
+JOB_NAME = "escalation"
+
+# Escalation levels in ascending order of severity
+LEVEL_RANK = {
+    EscalationLevel.BRANCH.value: 0,
+    EscalationLevel.HEAD_OFFICE.value: 1,
+    EscalationLevel.EXTERNAL_PARTNER.value: 2,
+}
+LEVELS = sorted(LEVEL_RANK, key=LEVEL_RANK.get)
+
+ACTIVE_ASSIGNMENT_STATUSES = ["assigned", "in_progress"]
+
+# Capacity assumed for partners created before capacities were recorded
+DEFAULT_PARTNER_CAPACITY = 5000
+
+FAILED_CALL_STATUSES = [CallStatus.NO_ANSWER.value, CallStatus.BUSY.value, CallStatus.DISCONNECTED.value]
+
+LOAN_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "days_in_arrears": 1,
+    "outstanding_balance": 1,
+    "escalation_level": 1,
+    "branch_code": 1,
+}
+
+
+def default_escalation_rules() -> List[EscalationRule]:
+    """Escalation rules from the application configuration."""
+    return [
+        EscalationRule(
+            level=EscalationLevel.HEAD_OFFICE,
+            min_days_in_arrears=app_config.ESCALATION_HEAD_OFFICE_DAYS,
+            min_broken_promises=app_config.ESCALATION_HEAD_OFFICE_BROKEN_PROMISES,
+            min_failed_calls=app_config.ESCALATION_HEAD_OFFICE_FAILED_CALLS,
+        ),
+        EscalationRule(
+            level=EscalationLevel.EXTERNAL_PARTNER,
+            min_days_in_arrears=app_config.ESCALATION_EXTERNAL_DAYS,
+            min_broken_promises=app_config.ESCALATION_EXTERNAL_BROKEN_PROMISES,
+            min_failed_calls=app_config.ESCALATION_EXTERNAL_FAILED_CALLS,
+        ),
+    ]
+
+
+def evaluate_rules(
+    days_in_arrears: np.ndarray,
+    broken_promises: np.ndarray,
+    failed_calls: np.ndarray,
+    rules: List[EscalationRule],
+) -> np.ndarray:
+    """Return the highest matching escalation rank (see ``LEVEL_RANK``) for each loan."""
+    rank = np.zeros(len(days_in_arrears), dtype=np.int64)
+    for rule in rules:
+        matches = (days_in_arrears >= rule.min_days_in_arrears) & (
+            (broken_promises >= rule.min_broken_promises) | (failed_calls >= rule.min_failed_calls)
+        )
+        rank = np.where(matches, np.maximum(rank, LEVEL_RANK[rule.level.value]), rank)
+    return rank
+
+
+class PartnerAllocator:
+    """
+    Places loans with partners within their spare capacity.
+
+    The cheapest commission rate wins; partners with equal rates are filled
+    evenly by utilisation.
+    """
+
+    def __init__(self, partners: List[Dict[str, Any]], active_counts: Dict[str, int]):
+        self.capacity = {p["id"]: max(int(p.get("max_active_assignments") or 0), 0) for p in partners}
+        self.load = {p["id"]: active_counts.get(p["id"], 0) for p in partners}
+        self._heap: List[Tuple[float, float, str]] = []
+        for partner in partners:
+            if self.spare(partner["id"]) > 0:
+                self._heap.append((float(partner["commission_rate"]), self._utilisation(partner["id"]), partner["id"]))
+        heapq.heapify(self._heap)
+
+    def spare(self, partner_id: str) -> int:
+        return self.capacity[partner_id] - self.load[partner_id]
+
+    def allocate(self) -> Optional[str]:
+        """Take one slot from the best partner; None when every partner is full."""
+        if not self._heap:
+            return None
+        rate, _, partner_id = heapq.heappop(self._heap)
+        self.load[partner_id] += 1
+        if self.spare(partner_id) > 0:
+            heapq.heappush(self._heap, (rate, self._utilisation(partner_id), partner_id))
+        return partner_id
+
+    def _utilisation(self, partner_id: str) -> float:
+        return self.load[partner_id] / self.capacity[partner_id] if self.capacity[partner_id] else 1.0
+
+
+class EscalationService:
+    """Service class for escalating non-performing loans and assigning partners."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.loans = self.db.loan_accounts
+        self.assignments = self.db.partner_assignments
+        self.runs = self.db.batch_runs
+
+    async def run_escalations(
+        self,
+        rules: Optional[List[EscalationRule]] = None,
+        chunk_size: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate the escalation rules across the NPL book and apply them.
+
+        Args:
+            rules: Escalation rules (defaults to the configured rules)
+            chunk_size: Loans evaluated per batch
+            dry_run: Evaluate and allocate without writing anything
+
+        Returns:
+            Run summary with per-level escalation and assignment counts
+        """
+        rules = rules or default_escalation_rules()
+        chunk_size = chunk_size or app_config.ESCALATION_BATCH_CHUNK_SIZE
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        allocator = await self._load_allocator()
+        stats = {
+            "processed": 0,
+            "escalated_head_office": 0,
+            "escalated_external_partner": 0,
+            "assigned": 0,
+            "already_assigned": 0,
+            "no_capacity": 0,
+        }
+
+        query = {"status": {"$in": [LoanStatus.NON_PERFORMING.value, LoanStatus.DEFAULTED.value]}}
+        chunk: List[Dict[str, Any]] = []
+        async for loan in self.loans.find(query, LOAN_PROJECTION).sort("id", 1).batch_size(chunk_size):
+            chunk.append(loan)
+            if len(chunk) >= chunk_size:
+                await self._process_chunk(chunk, rules, allocator, stats, now, dry_run)
+                chunk = []
+        if chunk:
+            await self._process_chunk(chunk, rules, allocator, stats, now, dry_run)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            **stats,
+            "dry_run": dry_run,
+            "elapsed_seconds": round(elapsed, 2),
+            "loans_per_second": round(stats["processed"] / elapsed, 1) if elapsed else 0.0,
+        }
+        if not dry_run:
+            await self.runs.insert_one({
+                "job": JOB_NAME,
+                "business_date": now.strftime("%Y-%m-%d"),
+                "status": "completed",
+                "started_at": now,
+                "finished_at": datetime.utcnow(),
+                "rules": [rule.dict() for rule in rules],
+                **summary,
+            })
+        logger.info(
+            f"Escalation run: {stats['processed']} loans, {stats['escalated_head_office']} to head office, "
+            f"{stats['escalated_external_partner']} to external partners, {stats['assigned']} assigned "
+            f"({stats['no_capacity']} without partner capacity) in {summary['elapsed_seconds']}s"
+        )
+        return summary
+
+    async def _process_chunk(
+        self,
+        loans: List[Dict[str, Any]],
+        rules: List[EscalationRule],
+        allocator: PartnerAllocator,
+        stats: Dict[str, int],
+        now: datetime,
+        dry_run: bool,
+    ) -> None:
+        ids = [loan["id"] for loan in loans]
+        broken, failed = await asyncio.gather(
+            self._count_by_loan(self.db.promises_to_pay, {
+                "loan_id": {"$in": ids}, "status": PromiseStatus.BROKEN.value,
+            }),
+            self._count_by_loan(self.db.call_logs, {
+                "loan_id": {"$in": ids}, "call_status": {"$in": FAILED_CALL_STATUSES},
+            }),
+        )
+        target = evaluate_rules(
+            np.array([loan.get("days_in_arrears") or 0 for loan in loans], dtype=np.int64),
+            np.array([broken.get(loan_id, 0) for loan_id in ids], dtype=np.int64),
+            np.array([failed.get(loan_id, 0) for loan_id in ids], dtype=np.int64),
+            rules,
+        )
+        current = np.array([LEVEL_RANK.get(loan.get("escalation_level"), 0) for loan in loans], dtype=np.int64)
+        stats["processed"] += len(loans)
+
+        # Raise escalation levels, one UpdateMany per target level
+        operations = []
+        for rank in range(1, len(LEVELS)):
+            raised = [ids[i] for i in np.flatnonzero((target == rank) & (current < rank))]
+            stats[f"escalated_{LEVELS[rank]}"] += len(raised)
+            if raised:
+                operations.append(UpdateMany(
+                    {"id": {"$in": raised}, "escalation_level": {"$nin": LEVELS[rank:]}},
+                    {"$set": {"escalation_level": LEVELS[rank], "escalated_at": now}},
+                ))
+        if operations and not dry_run:
+            await self.loans.bulk_write(operations, ordered=False)
+            await EventStreamService().publish_updated("loan", [
+                ids[i] for i in np.flatnonzero(target > current)
+            ])
+
+        # Assign every externally escalated loan that has no active assignment yet
+        external = [loans[i] for i in np.flatnonzero(target == LEVEL_RANK[EscalationLevel.EXTERNAL_PARTNER.value])]
+        if external:
+            await self._assign_partners(external, allocator, stats, now, dry_run)
+
+    async def _assign_partners(
+        self,
+        loans: List[Dict[str, Any]],
+        allocator: PartnerAllocator,
+        stats: Dict[str, int],
+        now: datetime,
+        dry_run: bool,
+    ) -> None:
+        active = set()
+        generations: Dict[str, int] = defaultdict(int)
+        async for assignment in self.assignments.find(
+            {"loan_id": {"$in": [loan["id"] for loan in loans]}},
+            {"_id": 0, "loan_id": 1, "status": 1, "escalation_key": 1},
+        ):
+            if assignment.get("status") in ACTIVE_ASSIGNMENT_STATUSES:
+                active.add(assignment["loan_id"])
+            elif assignment.get("escalation_key"):
+                generations[assignment["loan_id"]] += 1
+        stats["already_assigned"] += len(active)
+
+        # Largest balances are placed first while capacity lasts
+        pending = sorted(
+            (loan for loan in loans if loan["id"] not in active),
+            key=lambda loan: loan.get("outstanding_balance") or 0.0,
+            reverse=True,
+        )
+        documents = []
+        for loan in pending:
+            partner_id = allocator.allocate()
+            if partner_id is None:
+                stats["no_capacity"] += 1
+                continue
+            # Earlier automatic assignments that ended make this a new escalation with its own id
+            escalation_key = f"{loan['id']}:{EscalationLevel.EXTERNAL_PARTNER.value}:{generations[loan['id']]}"
+            documents.append(PartnerAssignment(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"escalation/{escalation_key}")),
+                loan_id=loan["id"],
+                partner_id=partner_id,
+                assigned_date=now,
+                expected_recovery_amount=round(loan.get("outstanding_balance") or 0.0, 2),
+                notes="Automatic escalation",
+                escalation_key=escalation_key,
+                branch_code=loan.get("branch_code"),
+            ).dict())
+        if dry_run or not documents:
+            stats["assigned"] += len(documents)
+            return
+
+        try:
+            result = await self.assignments.insert_many(documents, ordered=False)
+            stats["assigned"] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # A previous run already made these assignments (same derived ids)
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            stats["assigned"] += e.details.get("nInserted", 0)
+            stats["already_assigned"] += len(errors)
+            failed = {error["index"] for error in errors}
+            documents = [document for index, document in enumerate(documents) if index not in failed]
+        await EventStreamService().publish_many("partner_assignment", "created", documents)
+
+    async def _count_by_loan(self, collection, match: Dict[str, Any]) -> Dict[str, int]:
+        pipeline = [{"$match": match}, {"$group": {"_id": "$loan_id", "count": {"$sum": 1}}}]
+        return {row["_id"]: row["count"] async for row in collection.aggregate(pipeline)}
+
+    async def _load_allocator(self) -> PartnerAllocator:
+        partners = await self.db.external_partners.find(
+            {"is_active": True}, {"_id": 0, "id": 1, "commission_rate": 1, "max_active_assignments": 1}
+        ).to_list(None)
+        for partner in partners:
+            partner.setdefault("max_active_assignments", DEFAULT_PARTNER_CAPACITY)
+        pipeline = [
+            {"$match": {"status": {"$in": ACTIVE_ASSIGNMENT_STATUSES}}},
+            {"$group": {"_id": "$partner_id", "count": {"$sum": 1}}},
+        ]
+        active_counts = {row["_id"]: row["count"] async for row in self.assignments.aggregate(pipeline)}
+        return PartnerAllocator(partners, active_counts)
@@ -0,0 +1,259 @@
+"""
+Domain event stream (outbox and change data capture).
+
+Downstream consumers (dashboard rollups, partner portals) follow an ordered
+stream of domain events in ``domain_events`` instead of polling the source
+collections. Each event has a stream position ``seq``; a consumer reads the
+events after its committed offset in batches and commits the last position
+it processed, so it resumes where it left off after a restart.
+
+Events get into the stream in one of two ways (``EVENT_SOURCE``):
+
+- ``change_stream``: a relay (``python -m app.jobs.relay_events``) tails a
+  MongoDB change stream over the source collections and appends every
+  insert, update and delete, saving the resume token with each batch. Writes
+  made by any code path are captured, and a relay restart resumes from the
+  saved token.
+- ``outbox``: for standalone servers without change streams, the write
+  paths append their own events right after writing (``publish``).
+
+``auto`` picks change streams when the server is a replica set member.
+
+Positions are allocated in blocks from a counter, so a writer that
+allocated a position but has not inserted its event yet leaves a gap.
+Readers stop at a gap until it is filled or older than
+``EVENT_GAP_GRACE_SECONDS`` (an abandoned allocation), so consumers never
+skip an event that is about to land.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from ..models import DomainEvent, EventBatch
+from ..config import get_database, app_config
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Source collections and the entity name their events carry
+SOURCE_COLLECTIONS: Dict[str, str] = {
+    "call_logs": "call_log",
+    "promises_to_pay": "promise",
+    "partner_assignments": "partner_assignment",
+    "loan_accounts": "loan",
+}
+
+# Collection holding each entity's records
+ENTITY_COLLECTIONS: Dict[str, str] = {entity: collection for collection, entity in SOURCE_COLLECTIONS.items()}
+
+CHANGE_ACTIONS = {"insert": "created", "update": "updated", "replace": "updated", "delete": "deleted"}
+
+# Records re-read per query when publishing bulk updates
+IDS_PER_READ = 5000
+
+COUNTER_ID = "domain_events"
+RELAY_CONSUMER = "_change_stream_relay"
+
+# Resolved stream source for this process ("change_stream" or "outbox")
+_event_source: Optional[str] = None
+
+
+async def resolve_event_source(db=None) -> str:
+    """Decide once per process whether events come from change streams or the outbox."""
+    global _event_source
+    if _event_source is None:
+        configured = app_config.EVENT_SOURCE
+        if configured == "auto":
+            db = db if db is not None else get_database()
+            try:
+                hello = await db.command("hello")
+                configured = "change_stream" if hello.get("setName") else "outbox"
+            except Exception:
+                configured = "outbox"
+        _event_source = configured
+        logger.info(f"Domain events sourced from {_event_source}")
+    return _event_source
+
+
+class EventStreamService:
+    """Service class for appending, reading and relaying domain events."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.domain_events
+        self.consumers = self.db.event_consumers
+
+    async def publish(self, entity: str, action: str, document: Dict[str, Any]) -> None:
+        """
+        Record a write made by an application write path.
+
+        Only appends in outbox mode; with change streams the relay captures the
+        write itself. A failed append is logged rather than failing the write
+        that has already been made.
+        """
+        await self.publish_many(entity, action, [document])
+
+    async def publish_many(self, entity: str, action: str, documents: List[Dict[str, Any]]) -> None:
+        """Record a batch write in one append (outbox mode only)."""
+        if not documents or await resolve_event_source(self.db) != "outbox":
+            return
+        now = datetime.utcnow()
+        try:
+            await self.append([
+                {
+                    "event_type": f"{entity}.{action}",
+                    "entity": entity,
+                    "entity_id": document["id"],
+                    "occurred_at": now,
+                    "payload": document,
+                }
+                for document in documents
+            ])
+        except PyMongoError as e:
+            logger.error(f"Failed to publish {len(documents)} {entity}.{action} events: {str(e)}")
+
+    async def publish_updated(self, entity: str, ids: List[str]) -> None:
+        """
+        Record records updated in bulk, re-reading them for the event payloads.
+
+        For write paths that update with ``UpdateOne``/``UpdateMany`` and do not
+        hold the written documents; nothing is read outside outbox mode.
+        """
+        if not ids or await resolve_event_source(self.db) != "outbox":
+            return
+        collection = self.db[ENTITY_COLLECTIONS[entity]]
+        for offset in range(0, len(ids), IDS_PER_READ):
+            documents = await collection.find(
+                {"id": {"$in": ids[offset:offset + IDS_PER_READ]}}, {"_id": 0}
+            ).to_list(None)
+            await self.publish_many(entity, "updated", documents)
+
+    async def append(self, events: List[Dict[str, Any]]) -> List[DomainEvent]:
+        """Assign stream positions to events and store them; events with a known id are stored once."""
+        if not events:
+            return []
+        counter = await self.db.event_counters.find_one_and_update(
+            {"id": COUNTER_ID},
+            {"$inc": {"seq": len(events)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        first = counter["seq"] - len(events) + 1
+        stored = [DomainEvent(seq=first + offset, **event) for offset, event in enumerate(events)]
+        try:
+            await self.collection.insert_many([event.dict() for event in stored], ordered=False)
+        except BulkWriteError as e:
+            # Relayed changes replayed after a restart already have their event
+            if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+        return stored
+
+    async def read(self, consumer: str, limit: Optional[int] = None) -> EventBatch:
+        """Read the next batch of events after the consumer's committed offset."""
+        limit = limit or app_config.EVENT_BATCH_SIZE
+        offset = await self.get_offset(consumer)
+        documents = await self.collection.find(
+            {"seq": {"$gt": offset}}, {"_id": 0}
+        ).sort("seq", 1).limit(limit).to_list(limit)
+
+        grace_cutoff = datetime.utcnow() - timedelta(seconds=app_config.EVENT_GAP_GRACE_SECONDS)
+        events: List[DomainEvent] = []
+        expected = offset + 1
+        for document in documents:
+            if document["seq"] != expected and document["recorded_at"] > grace_cutoff:
+                break  # an earlier position may still be written
+            events.append(DomainEvent(**document))
+            expected = document["seq"] + 1
+        return EventBatch(
+            consumer=consumer,
+            offset=offset,
+            next_offset=events[-1].seq if events else offset,
+            events=events,
+        )
+
+    async def get_offset(self, consumer: str) -> int:
+        state = await self.consumers.find_one({"id": consumer}, {"_id": 0, "offset": 1})
+        return state.get("offset", 0) if state else 0
+
+    async def commit(self, consumer: str, offset: int) -> int:
+        """Record that the consumer processed every event up to ``offset``; offsets never move back."""
+        state = await self.consumers.find_one_and_update(
+            {"id": consumer},
+            {"$max": {"offset": offset}, "$set": {"committed_at": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return state["offset"]
+
+    async def consume(
+        self,
+        consumer: str,
+        handler: Callable[[List[DomainEvent]], Awaitable[None]],
+        batch_size: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+    ) -> None:
+        """Deliver batches to ``handler`` forever, committing after each one it handles."""
+        poll_seconds = poll_seconds or app_config.EVENT_POLL_SECONDS
+        while True:
+            batch = await self.read(consumer, batch_size)
+            if batch.events:
+                await handler(batch.events)
+                await self.commit(consumer, batch.next_offset)
+            if len(batch.events) < (batch_size or app_config.EVENT_BATCH_SIZE):
+                await asyncio.sleep(poll_seconds)
+
+    async def relay_changes(self, batch_size: Optional[int] = None, max_wait_seconds: float = 0.5) -> None:
+        """
+        Append the source collections' changes to the stream, resuming from the saved token.
+
+        Changes are appended in batches of up to ``batch_size``, or whatever
+        arrived within ``max_wait_seconds``.
+        """
+        batch_size = batch_size or app_config.EVENT_BATCH_SIZE
+        state = await self.consumers.find_one({"id": RELAY_CONSUMER}, {"_id": 0, "resume_token": 1})
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(SOURCE_COLLECTIONS)},
+            "operationType": {"$in": list(CHANGE_ACTIONS)},
+        }}]
+        async with self.db.watch(
+            pipeline,
+            full_document="updateLookup",
+            resume_after=state.get("resume_token") if state else None,
+        ) as stream:
+            logger.info("Relaying change stream into domain_events")
+            while stream.alive:
+                events = []
+                deadline = asyncio.get_running_loop().time() + max_wait_seconds
+                while len(events) < batch_size and asyncio.get_running_loop().time() < deadline:
+                    change = await stream.try_next()
+                    if change is None:
+                        await asyncio.sleep(0.05)
+                        continue
+                    events.append(self._change_event(change))
+                if events:
+                    await self.append(events)
+                    await self.consumers.update_one(
+                        {"id": RELAY_CONSUMER},
+                        {"$set": {"resume_token": stream.resume_token, "committed_at": datetime.utcnow()}},
+                        upsert=True,
+                    )
+
+    @staticmethod
+    def _change_event(change: Dict[str, Any]) -> Dict[str, Any]:
+        entity = SOURCE_COLLECTIONS[change["ns"]["coll"]]
+        document = change.get("fullDocument") or {}
+        document.pop("_id", None)
+        return {
+            # Derived from the change's resume token, so a replayed change is stored once
+            "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"change/{change['_id']['_data']}")),
+            "event_type": f"{entity}.{CHANGE_ACTIONS[change['operationType']]}",
+            "entity": entity,
+            "entity_id": document.get("id") or str(change["documentKey"]["_id"]),
+            "occurred_at": change.get("wallTime") or datetime.utcnow(),
+            "payload": document,
+        }
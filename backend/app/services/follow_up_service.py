@@ -0,0 +1,290 @@
+"""
+Follow-up and callback reminders.
+
+A call logged with a follow-up date becomes a document in ``follow_ups``,
+the persisted index of due reminders. Each worker process runs a
+``FollowUpScheduler`` that holds only the reminders due within the next
+window in a hierarchical timer wheel, refilling it from the
+``(status, due_at)`` index as the window moves, so memory is bounded by the
+window rather than by the backlog of reminders. When a timer expires the
+reminder is claimed with a status-guarded update (so only one worker fires
+it), an agent notification is written, and the loan's worklist item is made
+ready and handed back to the agent who asked for the callback.
+
+On startup, reminders that fell due while no process was running are
+recovered with a single range query on the same index.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from ..models import CallLog, FollowUp, FollowUpStatus, Notification
+from ..config import get_database, app_config
+from ..utils.logging_config import get_logger
+from ..utils.timer_wheel import TimerWheel
+
+logger = get_logger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Reminders claimed and fired per round trip
+FIRE_BATCH_SIZE = 500
+
+
+def _seconds(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds()
+
+
+class FollowUpService:
+    """Service class for persisted follow-up reminders."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.follow_ups
+
+    async def schedule_from_call(self, call: CallLog) -> Optional[FollowUp]:
+        """
+        Persist the follow-up requested by a call and arm its timer.
+
+        A new follow-up supersedes any reminder still pending for the loan.
+
+        Returns:
+            The scheduled follow-up, or None if the call did not ask for one
+        """
+        if not call.follow_up_required or call.follow_up_date is None:
+            return None
+        follow_up = FollowUp(
+            id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"follow_up/{call.id}")),
+            call_id=call.id,
+            loan_id=call.loan_id,
+            member_id=call.member_id,
+            agent_id=call.agent_id,
+            agent_name=call.agent_name,
+            due_at=call.follow_up_date,
+            notes=call.notes,
+        )
+        superseded = [
+            doc["id"] async for doc in self.collection.find(
+                {"loan_id": call.loan_id, "status": FollowUpStatus.PENDING.value, "id": {"$ne": follow_up.id}},
+                {"_id": 0, "id": 1},
+            )
+        ]
+        if superseded:
+            await self.collection.update_many(
+                {"id": {"$in": superseded}, "status": FollowUpStatus.PENDING.value},
+                {"$set": {"status": FollowUpStatus.CANCELLED.value}},
+            )
+        await self.collection.replace_one({"id": follow_up.id}, follow_up.dict(), upsert=True)
+
+        if follow_up_scheduler is not None:
+            for follow_up_id in superseded:
+                follow_up_scheduler.cancel(follow_up_id)
+            follow_up_scheduler.add(follow_up)
+        return follow_up
+
+    async def get_follow_ups(
+        self,
+        agent_id: str,
+        status: Optional[FollowUpStatus] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[FollowUp]:
+        """Get an agent's follow-ups, earliest due first."""
+        query: Dict[str, Any] = {"agent_id": agent_id}
+        if status:
+            query["status"] = FollowUpStatus(status).value
+        follow_ups = await self.collection.find(query, {"_id": 0}).sort("due_at", 1).skip(skip).limit(limit).to_list(limit)
+        return [FollowUp(**follow_up) for follow_up in follow_ups]
+
+    async def get_pending_between(
+        self, after: datetime, until: datetime, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Pending reminders due in ``(after, until]``, earliest first."""
+        return await self.collection.find(
+            {"status": FollowUpStatus.PENDING.value, "due_at": {"$gt": after, "$lte": until}},
+            {"_id": 0, "id": 1, "due_at": 1},
+        ).sort("due_at", 1).limit(limit).to_list(limit)
+
+    async def recover_missed(self, now: Optional[datetime] = None) -> int:
+        """Fire every pending reminder that is already due, e.g. after downtime."""
+        now = now or datetime.utcnow()
+        fired = 0
+        batch: List[str] = []
+        async for doc in self.collection.find(
+            {"status": FollowUpStatus.PENDING.value, "due_at": {"$lte": now}}, {"_id": 0, "id": 1}
+        ).sort("due_at", 1).batch_size(FIRE_BATCH_SIZE):
+            batch.append(doc["id"])
+            if len(batch) >= FIRE_BATCH_SIZE:
+                fired += await self.fire(batch, now)
+                batch = []
+        if batch:
+            fired += await self.fire(batch, now)
+        if fired:
+            logger.info(f"Recovered {fired} follow-up reminders that fell due while stopped")
+        return fired
+
+    async def fire(self, follow_up_ids: List[str], now: Optional[datetime] = None) -> int:
+        """
+        Claim and fire due reminders.
+
+        Reminders already fired or cancelled (by this or another worker) are
+        skipped. Each fired reminder notifies its agent and makes the loan's
+        worklist item ready for that agent.
+
+        Returns:
+            Number of reminders fired by this call
+        """
+        if not follow_up_ids:
+            return 0
+        now = now or datetime.utcnow()
+        claim = str(uuid.uuid4())
+        await self.collection.update_many(
+            {"id": {"$in": follow_up_ids}, "status": FollowUpStatus.PENDING.value},
+            {"$set": {"status": FollowUpStatus.FIRED.value, "fired_at": now, "fire_claim": claim}},
+        )
+        claimed = await self.collection.find(
+            {"id": {"$in": follow_up_ids}, "fire_claim": claim}, {"_id": 0}
+        ).to_list(None)
+        if not claimed:
+            return 0
+
+        notifications = []
+        reminder_notifications = []
+        worklist_updates = []
+        for follow_up in claimed:
+            notification = Notification(
+                recipient_id=follow_up["agent_id"],
+                recipient_type="agent",
+                notification_type="follow_up_due",
+                title="Follow-up call due",
+                message=f"Call back member {follow_up['member_id']} about loan {follow_up['loan_id']}"
+                        + (f": {follow_up['notes']}" if follow_up.get("notes") else ""),
+                sent_at=now,
+            )
+            notifications.append(notification.dict())
+            reminder_notifications.append(UpdateOne(
+                {"id": follow_up["id"]}, {"$set": {"notification_id": notification.id}}
+            ))
+            worklist_updates.append(UpdateOne(
+                {"loan_id": follow_up["loan_id"]},
+                {
+                    "$set": {"agent_id": follow_up["agent_id"], "reason": "follow_up"},
+                    "$min": {"ready_at": follow_up["due_at"]},
+                },
+            ))
+        await asyncio.gather(
+            self.db.notifications.insert_many(notifications, ordered=False),
+            self.collection.bulk_write(reminder_notifications, ordered=False),
+            self.db.worklist_items.bulk_write(worklist_updates, ordered=False),
+        )
+        return len(claimed)
+
+
+class FollowUpScheduler:
+    """Per-process timer wheel over the reminders due within the next window."""
+
+    def __init__(self, service: Optional[FollowUpService] = None):
+        self.service = service or FollowUpService()
+        self.wheel = TimerWheel(
+            tick_seconds=app_config.FOLLOW_UP_TICK_SECONDS, max_timers=app_config.FOLLOW_UP_MAX_TIMERS
+        )
+        self.window = timedelta(minutes=app_config.FOLLOW_UP_WINDOW_MINUTES)
+        self.loaded_until: Optional[datetime] = None
+        self.fired = 0
+        self.recovered = 0
+
+    def add(self, follow_up: FollowUp) -> bool:
+        """Arm a new reminder if it falls inside the loaded window."""
+        if self.loaded_until is None or follow_up.due_at > self.loaded_until:
+            return False  # picked up by a later refill
+        if self.wheel.schedule(follow_up.id, _seconds(follow_up.due_at)):
+            return True
+        # Wheel full: shrink the window so the next refill loads it
+        self.loaded_until = follow_up.due_at - timedelta(microseconds=1)
+        return False
+
+    def cancel(self, follow_up_id: str) -> bool:
+        return self.wheel.cancel(follow_up_id)
+
+    async def run(self) -> None:
+        """Recover missed reminders, then fire reminders as their timers expire."""
+        now = datetime.utcnow()
+        self.wheel.start(_seconds(now))
+        self.loaded_until = now
+        try:
+            self.recovered = await self.service.recover_missed(now)
+            await self._refill(now)
+        except Exception as e:
+            logger.error(f"Follow-up recovery failed: {str(e)}", exc_info=True)
+        while True:
+            await asyncio.sleep(self.wheel.tick_seconds)
+            now = datetime.utcnow()
+            try:
+                expired = self.wheel.advance(_seconds(now))
+                if expired:
+                    self.fired += await self.service.fire([key for key, _ in expired], now)
+                if now + self.window / 2 >= self.loaded_until:
+                    await self._refill(now)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Follow-up scheduler tick failed: {str(e)}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "timers": len(self.wheel),
+            "max_timers": self.wheel.max_timers,
+            "loaded_until": self.loaded_until,
+            "fired": self.fired,
+            "recovered": self.recovered,
+        }
+
+    async def _refill(self, now: datetime) -> None:
+        """Load pending reminders due between the loaded window's end and ``now + window``."""
+        capacity = self.wheel.max_timers - len(self.wheel)
+        if capacity <= 0:
+            return
+        until = now + self.window
+        due = await self.service.get_pending_between(self.loaded_until, until, capacity)
+        for follow_up in due:
+            self.wheel.schedule(follow_up["id"], _seconds(follow_up["due_at"]))
+        # When the wheel fills up, the window ends at the last reminder it could hold
+        self.loaded_until = due[-1]["due_at"] if len(due) >= capacity else until
+
+
+# Scheduler for this process, running while the application is up
+follow_up_scheduler: Optional[FollowUpScheduler] = None
+
+_scheduler_task: Optional[asyncio.Task] = None
+
+
+def start_follow_up_scheduler() -> Optional[asyncio.Task]:
+    """Start this process's follow-up reminder scheduler (if enabled)."""
+    global follow_up_scheduler, _scheduler_task
+    if not app_config.FOLLOW_UP_SCHEDULER_ENABLED:
+        return None
+    if _scheduler_task is None or _scheduler_task.done():
+        follow_up_scheduler = FollowUpScheduler()
+        _scheduler_task = asyncio.ensure_future(follow_up_scheduler.run())
+    return _scheduler_task
+
+
+async def stop_follow_up_scheduler() -> None:
+    """Stop the scheduler; pending reminders stay in ``follow_ups``."""
+    global follow_up_scheduler
+    if _scheduler_task is not None and not _scheduler_task.done():
+        _scheduler_task.cancel()
+        try:
+            await _scheduler_task
+        except asyncio.CancelledError:
+            pass
+    follow_up_scheduler = None
+
+
+def get_scheduler_stats() -> Optional[Dict[str, Any]]:
+    """Timer wheel statistics for this process, or None if the scheduler is not running."""
+    return follow_up_scheduler.stats() if follow_up_scheduler is not None else None
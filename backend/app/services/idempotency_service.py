@@ -0,0 +1,191 @@
+"""
+Idempotency keys for retried writes.
+
+A client that may retry a write (agents on flaky branch links) sends an
+``Idempotency-Key`` header. The first request with a key claims it in
+``idempotency_keys`` with a single insert on the unique ``id`` index, runs
+the write and stores the response on the claimed record; a TTL index
+expires records after ``IDEMPOTENCY_KEY_TTL_HOURS``. A later request with
+the same key gets the stored response back without writing again.
+
+Duplicates arriving while the first request is still running are
+coalesced: within a process they await the same in-flight write, which
+runs in its own task so a disconnecting client does not abort it for the
+others, and across processes they poll the record until the response is
+stored. A
+claim left behind by a crashed request can be taken over once its lock
+expires, and a failed write releases its claim so the client can retry.
+Keys are scoped per endpoint and per user, and reusing a key with a
+different request body is rejected.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..config import get_database, app_config
+from ..utils.exceptions import (
+    InvalidIdempotencyKeyException,
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyMismatchException,
+)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+_VALID_KEY = re.compile(r"^[\x21-\x7e]{1,255}$")
+
+# Interval between checks while another process finishes the same request
+POLL_INTERVAL_SECONDS = 0.05
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+# Writes in flight in this process, with their request fingerprint, by scoped key
+_inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a request body, to detect a key reused for another request."""
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """Service class for running writes at most once per idempotency key."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.idempotency_keys
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        user_id: str,
+        payload: Any,
+        write: Callable[[], Awaitable[Any]],
+        response: Optional[Response] = None,
+    ) -> Any:
+        """
+        Run ``write`` once for ``key``, or return the response it already produced.
+
+        Args:
+            scope: Endpoint the key belongs to, e.g. ``"calls"``
+            key: Client-supplied idempotency key; without one, ``write`` just runs
+            user_id: Caller, so different users' keys never collide
+            payload: Request body, fingerprinted to detect key reuse
+            write: Coroutine factory performing the write and returning the response
+            response: Outgoing response, flagged with ``Idempotent-Replayed`` on replays
+
+        Raises:
+            InvalidIdempotencyKeyException: If the key is malformed
+            IdempotencyKeyMismatchException: If the key was used with a different body
+            IdempotencyKeyInProgressException: If the original request is still running
+        """
+        if key is None:
+            return await write()
+        if not _VALID_KEY.match(key):
+            raise InvalidIdempotencyKeyException(key)
+
+        record_id = f"{scope}:{user_id}:{key}"
+        fingerprint = request_fingerprint(payload)
+        inflight = _inflight.get(record_id)
+        if inflight is None:
+            task = asyncio.ensure_future(self._run_once(record_id, key, fingerprint, write))
+            _inflight[record_id] = (fingerprint, task)
+            task.add_done_callback(lambda done: _forget(record_id, done))
+            leader = True
+        else:
+            inflight_fingerprint, task = inflight
+            if inflight_fingerprint != fingerprint:
+                raise IdempotencyKeyMismatchException(key)
+            leader = False
+        # Shielded so a cancelled request does not cancel the write the others are waiting on
+        result, replayed = await asyncio.shield(task)
+        if replayed or not leader:
+            self._mark_replayed(response)
+        return result
+
+    async def _run_once(self, record_id: str, key: str, fingerprint: str, write: Callable[[], Awaitable[Any]]):
+        now = datetime.utcnow()
+        deadline = now + timedelta(seconds=app_config.IDEMPOTENCY_WAIT_SECONDS)
+        while True:
+            claimed = await self._claim(record_id, fingerprint, now)
+            if claimed is None:
+                break
+            if claimed["request_hash"] != fingerprint:
+                raise IdempotencyKeyMismatchException(key)
+            if claimed["status"] == COMPLETED:
+                return claimed["response"], True
+            if now >= deadline:
+                raise IdempotencyKeyInProgressException(key)
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+            now = datetime.utcnow()
+
+        try:
+            result = await write()
+        except BaseException:
+            await self.collection.delete_one({"id": record_id, "status": IN_PROGRESS})
+            raise
+        await self.collection.update_one(
+            {"id": record_id},
+            {"$set": {"status": COMPLETED, "response": jsonable_encoder(result), "completed_at": datetime.utcnow()}},
+        )
+        return result, False
+
+    async def _claim(self, record_id: str, fingerprint: str, now: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Claim the key for this request.
+
+        Returns:
+            None if this request now owns the key, otherwise the existing record
+        """
+        lock_until = now + timedelta(seconds=app_config.IDEMPOTENCY_LOCK_SECONDS)
+        try:
+            await self.collection.insert_one({
+                "id": record_id,
+                "request_hash": fingerprint,
+                "status": IN_PROGRESS,
+                "locked_until": lock_until,
+                "created_at": now,
+                "expires_at": now + timedelta(hours=app_config.IDEMPOTENCY_KEY_TTL_HOURS),
+            })
+            return None
+        except DuplicateKeyError:
+            pass
+        # Take over a claim abandoned by a request that crashed mid-write
+        taken = await self.collection.find_one_and_update(
+            {"id": record_id, "status": IN_PROGRESS, "request_hash": fingerprint, "locked_until": {"$lt": now}},
+            {"$set": {"locked_until": lock_until}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if taken is not None:
+            return None
+        existing = await self.collection.find_one({"id": record_id}, {"_id": 0})
+        if existing is None:
+            # Released by a failed write (or expired) in the meantime; claim it on the next pass
+            return {"request_hash": fingerprint, "status": IN_PROGRESS}
+        return existing
+
+    @staticmethod
+    def _mark_replayed(response: Optional[Response]) -> None:
+        if response is not None:
+            response.headers[REPLAYED_HEADER] = "true"
+
+
+def _forget(record_id: str, task: asyncio.Future) -> None:
+    """Drop a finished write from the in-flight table."""
+    if _inflight.get(record_id, (None, None))[1] is task:
+        del _inflight[record_id]
+    # Retrieved here so a failure nobody awaited any more is not reported as never retrieved
+    if not task.cancelled():
+        task.exception()
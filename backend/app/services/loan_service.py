@@ -1,19 +1,29 @@
 """
 Loan service for business logic operations.
+
+A service created for a user is limited to that user's branch (see
+``utils.branch_scope``); one created without a user sees every branch.
 """
 
-from typing import List, Optional
-from datetime import datetime, timedelta
-from ..models import LoanAccount, LoanAccountCreate, LoanStatus
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from external_integrations.profix_client import get_profix_client
+from ..models import LoanAccount, LoanAccountCreate, LoanStatus, TransitionOutcome
 from ..config import get_database
+from ..utils.branch_scope import check_branch, loan_branch_code, resolve_branch_scope, scope_query
+from ..utils.exceptions import LoanNotFoundException
+from .amortization_service import add_months, instalment_amounts
+from .event_stream_service import EventStreamService
+from .status_transition_service import StatusTransitionService
 
 
 class LoanService:
     """Service class for loan-related operations."""
     
-    def __init__(self):
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
         self.db = get_database()
         self.collection = self.db.loan_accounts
+        self.branch_code = resolve_branch_scope(user, branch_code)
 
     async def get_loans(
         self,
@@ -31,13 +41,13 @@ class LoanService:
         if member_search:
             # Find members first, then filter loans
             members_collection = self.db.members
-            members = await members_collection.find({
+            members = await members_collection.find(scope_query({
                 "$or": [
                     {"first_name": {"$regex": member_search, "$options": "i"}},
                     {"last_name": {"$regex": member_search, "$options": "i"}},
                     {"member_number": {"$regex": member_search, "$options": "i"}}
                 ]
-            }).to_list(None)
+            }, self.branch_code), {"_id": 0, "id": 1}).to_list(None)
             
             member_ids = [member["id"] for member in members]
             if member_ids:
@@ -46,28 +56,44 @@ class LoanService:
                 # No matching members found
                 return []
         
+        query = scope_query(query, self.branch_code)
         loans_data = await self.collection.find(query).skip(skip).limit(limit).to_list(limit)
         return [LoanAccount(**loan) for loan in loans_data]
 
     async def get_loan_by_id(self, loan_id: str) -> Optional[LoanAccount]:
         """Get loan by ID."""
-        loan_data = await self.collection.find_one({"id": loan_id})
+        loan_data = await self.collection.find_one(scope_query({"id": loan_id}, self.branch_code))
         return LoanAccount(**loan_data) if loan_data else None
 
     async def get_loans_by_member_id(self, member_id: str) -> List[LoanAccount]:
         """Get all loans for a specific member."""
-        loans_data = await self.collection.find({"member_id": member_id}).to_list(None)
+        loans_data = await self.collection.find(scope_query({"member_id": member_id}, self.branch_code)).to_list(None)
         return [LoanAccount(**loan) for loan in loans_data]
 
     async def create_loan(self, loan_data: LoanAccountCreate) -> LoanAccount:
-        """Create a new loan account."""
-        # Calculate maturity date
-        maturity_date = loan_data.disbursement_date + timedelta(
-            days=loan_data.loan_term_months * 30
-        )
+        """
+        Create a new loan account.
+        
+        Raises:
+            BranchAccessDeniedException: If the loan belongs to another branch than the user's
+        """
+        check_branch(loan_data.branch_code, self.branch_code)
+        # Maturity is the last instalment's due date, in calendar months
+        maturity_date = add_months(
+            [loan_data.disbursement_date], [loan_data.loan_term_months]
+        ).astype("datetime64[ms]").tolist()[0]
+        
+        fields = loan_data.dict()
+        if fields["monthly_payment"] is None:
+            fields["monthly_payment"] = round(float(instalment_amounts(
+                [loan_data.principal_amount],
+                [loan_data.interest_rate],
+                [loan_data.loan_term_months],
+                loan_data.amortization_method,
+            )[0]), 2)
         
         loan = LoanAccount(
-            **loan_data.dict(),
+            **fields,
             maturity_date=maturity_date,
             status=LoanStatus.PERFORMING
         )
@@ -76,16 +102,71 @@ class LoanService:
         return loan
 
     async def update_loan(self, loan_id: str, update_data: dict) -> Optional[LoanAccount]:
-        """Update loan information."""
-        result = await self.collection.update_one(
-            {"id": loan_id},
-            {"$set": update_data}
-        )
+        """
+        Update loan information.
+        
+        A status change goes through the transition engine, so it is validated
+        against the current status and recorded in the status history.
+        """
+        update_data = dict(update_data)
+        if "branch_code" in update_data:
+            check_branch(update_data["branch_code"], self.branch_code)
+        if self.branch_code is not None and await self.get_loan_by_id(loan_id) is None:
+            return None
+        new_status = update_data.pop("status", None)
+        transitioned = updated = False
+        
+        if new_status is not None:
+            # The transition engine publishes the status change itself
+            outcome = await StatusTransitionService(branch_code=self.branch_code).transition_one(
+                "loan", loan_id, new_status, reason="loan update"
+            )
+            transitioned = outcome == TransitionOutcome.APPLIED
         
-        if result.modified_count > 0:
-            return await self.get_loan_by_id(loan_id)
+        if update_data:
+            # The branch code completes the shard key, so the update targets one shard
+            branch_code = self.branch_code or await loan_branch_code(self.db, loan_id)
+            result = await self.collection.update_one(
+                {"branch_code": branch_code, "id": loan_id},
+                {"$set": update_data}
+            )
+            updated = result.modified_count > 0
+        
+        if transitioned or updated:
+            loan = await self.get_loan_by_id(loan_id)
+            if loan is not None and updated:
+                await EventStreamService().publish("loan", "updated", loan.dict())
+            return loan
         return None
 
+    async def sync_with_profix(self, loan_id: str) -> Dict[str, Any]:
+        """
+        Refresh a loan's outstanding balance from ProFIX.
+        
+        Raises:
+            LoanNotFoundException: If the loan does not exist
+            ExternalServiceUnavailableException: If ProFIX calls are being rejected
+            ExternalServiceException: If ProFIX kept failing
+        """
+        loan = await self.collection.find_one(scope_query({"id": loan_id}, self.branch_code), {"_id": 0})
+        if not loan:
+            raise LoanNotFoundException(loan_id)
+        
+        updated_balance = await get_profix_client().get_outstanding_balance(loan)
+        await self.collection.update_one(
+            {"branch_code": loan.get("branch_code"), "id": loan_id},
+            {"$set": {"outstanding_balance": updated_balance, "updated_at": datetime.utcnow()}}
+        )
+        await EventStreamService().publish_updated("loan", [loan_id])
+        
+        return {
+            "message": "Loan data synchronized with ProFIX",
+            "loan_id": loan_id,
+            "updated_balance": updated_balance,
+            "sync_time": datetime.utcnow(),
+            "success": True
+        }
+
     async def get_npl_loans(self, skip: int = 0, limit: int = 50) -> List[LoanAccount]:
         """Get non-performing loans."""
         return await self.get_loans(
@@ -96,15 +177,18 @@ class LoanService:
 
     async def get_total_loans_count(self) -> int:
         """Get total count of loans."""
-        return await self.collection.count_documents({})
+        return await self.collection.count_documents(scope_query({}, self.branch_code))
 
     async def get_npl_loans_count(self) -> int:
         """Get count of non-performing loans."""
-        return await self.collection.count_documents({"status": LoanStatus.NON_PERFORMING})
+        return await self.collection.count_documents(
+            scope_query({"status": LoanStatus.NON_PERFORMING}, self.branch_code)
+        )
 
     async def calculate_portfolio_totals(self) -> dict:
         """Calculate portfolio totals."""
         pipeline = [
+            {"$match": scope_query({}, self.branch_code)},
             {
                 "$group": {
                     "_id": None,
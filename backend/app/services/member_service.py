@@ -1,18 +1,31 @@
 """
 Member service for business logic operations.
+
+A service created for a user is limited to that user's branch (see
+``utils.branch_scope``); one created without a user sees every branch.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
 from ..models import Member, MemberCreate
 from ..config import get_database
+from ..utils.branch_scope import check_branch, resolve_branch_scope, scope_query
+from ..utils.exceptions import DuplicateMemberException, ProbableDuplicateMemberException
+from .dedup_service import MemberDedupService, blocking_keys
+
+# Fields that feed a member's dedup blocking keys
+DEDUP_FIELDS = {"first_name", "last_name", "phone_number", "id_number"}
 
 
 class MemberService:
     """Service class for member-related operations."""
     
-    def __init__(self):
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
         self.db = get_database()
         self.collection = self.db.members
+        self.branch_code = resolve_branch_scope(user, branch_code)
 
     async def get_members(
         self, 
@@ -33,37 +46,81 @@ class MemberService:
                 ]
             }
         
+        query = scope_query(query, self.branch_code)
         members_data = await self.collection.find(query).skip(skip).limit(limit).to_list(limit)
         return [Member(**member) for member in members_data]
 
     async def get_member_by_id(self, member_id: str) -> Optional[Member]:
         """Get member by ID."""
-        member_data = await self.collection.find_one({"id": member_id})
+        member_data = await self.collection.find_one(scope_query({"id": member_id}, self.branch_code))
         return Member(**member_data) if member_data else None
 
     async def get_member_by_number(self, member_number: str) -> Optional[Member]:
         """Get member by member number."""
-        member_data = await self.collection.find_one({"member_number": member_number})
+        member_data = await self.collection.find_one(scope_query({"member_number": member_number}, self.branch_code))
         return Member(**member_data) if member_data else None
 
-    async def create_member(self, member_data: MemberCreate) -> Member:
-        """Create a new member."""
+    async def create_member(self, member_data: MemberCreate, force: bool = False) -> Member:
+        """
+        Create a new member.
+        
+        Raises:
+            BranchAccessDeniedException: If the member belongs to another branch than the user's
+            DuplicateMemberException: If the member number or national ID is taken
+            ProbableDuplicateMemberException: If the member probably already exists
+                under another number (bypassed with ``force``)
+        """
         from datetime import datetime
         
+        check_branch(member_data.branch_code, self.branch_code)
         member = Member(
             **member_data.dict(),
             registration_date=datetime.utcnow()
         )
+        document = member.dict()
+        
+        candidates = await MemberDedupService().find_candidates(document)
+        for candidate in candidates:
+            if "same_id_number" in candidate.reasons:
+                raise DuplicateMemberException(member.id_number, "ID number")
+        if candidates and not force:
+            raise ProbableDuplicateMemberException(
+                [number for candidate in candidates for number in candidate.member_numbers]
+            )
         
-        await self.collection.insert_one(member.dict())
+        document["dedup_keys"] = blocking_keys(document)
+        try:
+            await self.collection.insert_one(document)
+        except DuplicateKeyError as e:
+            if "id_number" in str(e):
+                raise DuplicateMemberException(member.id_number, "ID number")
+            raise DuplicateMemberException(member.member_number)
         return member
 
     async def update_member(self, member_id: str, update_data: dict) -> Optional[Member]:
-        """Update member information."""
-        result = await self.collection.update_one(
-            {"id": member_id},
-            {"$set": update_data}
-        )
+        """
+        Update member information (a branch user cannot move a member to another branch).
+        
+        Raises:
+            BranchAccessDeniedException: If the member would move to another branch than the user's
+            DuplicateMemberException: If the new member number or national ID is taken
+        """
+        update = dict(update_data)
+        if "branch_code" in update:
+            check_branch(update["branch_code"], self.branch_code)
+        if DEDUP_FIELDS & update.keys():
+            current = await self.collection.find_one(scope_query({"id": member_id}, self.branch_code), {"_id": 0})
+            if current:
+                update["dedup_keys"] = blocking_keys({**current, **update})
+        try:
+            result = await self.collection.update_one(
+                scope_query({"id": member_id}, self.branch_code),
+                {"$set": update}
+            )
+        except DuplicateKeyError as e:
+            if "id_number" in str(e):
+                raise DuplicateMemberException(update.get("id_number", ""), "ID number")
+            raise DuplicateMemberException(update.get("member_number", ""))
         
         if result.modified_count > 0:
             return await self.get_member_by_id(member_id)
@@ -71,10 +128,10 @@ class MemberService:
 
     async def delete_member(self, member_id: str) -> bool:
         """Delete a member."""
-        result = await self.collection.delete_one({"id": member_id})
+        result = await self.collection.delete_one(scope_query({"id": member_id}, self.branch_code))
         return result.deleted_count > 0
 
     async def get_total_members_count(self) -> int:
         """Get total count of members."""
-        return await self.collection.count_documents({})
+        return await self.collection.count_documents(scope_query({}, self.branch_code))
 
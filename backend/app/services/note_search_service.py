@@ -0,0 +1,194 @@
+"""
+Full-text search over call and promise notes.
+
+Notes are copied into ``note_index`` as they are written, one document per
+call log or promise with non-empty notes. That collection carries a MongoDB
+text index on ``notes`` for word and phrase queries ranked by text score,
+and a multikey index on ``terms`` (the note's distinct lower-cased tokens)
+for prefix queries, which become anchored regular expressions answered from
+index bounds. Agent, loan, member and date filters apply in the same query,
+and entries copy their call's or promise's ``branch_code`` so branch users
+only find their branch's notes (run ``index_notes`` to add it to entries
+indexed before).
+
+Query syntax: plain words are stemmed and a note matching any of them
+qualifies (more matches rank higher), ``"quoted phrases"`` must appear
+verbatim, and ``word*`` matches words starting with ``word``.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+from ..models import NoteSearchResult, NoteSource
+from ..config import get_database
+from ..utils.branch_scope import resolve_branch_scope, scope_query
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+QUERY_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+# Shortest prefix accepted in a ``word*`` query
+MIN_PREFIX_LENGTH = 2
+
+# Source collections and the field recording when each note was written
+NOTE_SOURCES: Dict[str, Tuple[str, str]] = {
+    NoteSource.CALL.value: ("call_logs", "call_start_time"),
+    NoteSource.PROMISE.value: ("promises_to_pay", "created_at"),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Distinct lower-cased word tokens of a text, in first-seen order."""
+    return list(dict.fromkeys(TOKEN_PATTERN.findall(text.lower())))
+
+
+def note_entry(source: str, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Index entry for a call log or promise document, or None if it has no notes."""
+    notes = (document.get("notes") or "").strip()
+    if not notes:
+        return None
+    _, time_field = NOTE_SOURCES[source]
+    return {
+        "id": document["id"],
+        "source": source,
+        "loan_id": document["loan_id"],
+        "member_id": document["member_id"],
+        "agent_id": document.get("agent_id"),
+        "branch_code": document.get("branch_code"),
+        "noted_at": document.get(time_field) or document.get("created_at"),
+        "notes": notes,
+        "terms": tokenize(notes),
+    }
+
+
+def parse_query(query: str) -> Tuple[List[str], List[str], List[str]]:
+    """Split a query into words, quoted phrases and prefixes."""
+    words: List[str] = []
+    phrases: List[str] = []
+    prefixes: List[str] = []
+    for phrase, token in QUERY_PATTERN.findall(query):
+        if phrase:
+            phrases.append(" ".join(TOKEN_PATTERN.findall(phrase.lower())))
+        elif token.endswith("*"):
+            tokens = TOKEN_PATTERN.findall(token.lower())
+            # Leading tokens of a prefix like "follow-u*" match as whole words
+            words.extend(tokens[:-1])
+            if tokens and len(tokens[-1]) >= MIN_PREFIX_LENGTH:
+                prefixes.append(tokens[-1])
+        else:
+            words.extend(TOKEN_PATTERN.findall(token.lower()))
+    return words, [phrase for phrase in phrases if phrase], prefixes
+
+
+class NoteSearchService:
+    """Service class for indexing and searching collection notes."""
+
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
+        self.db = get_database()
+        self.collection = self.db.note_index
+        self.branch_code = resolve_branch_scope(user, branch_code)
+
+    async def index_note(self, source: NoteSource, document: Dict[str, Any]) -> bool:
+        """Add or refresh one call log's or promise's notes in the index."""
+        source = NoteSource(source).value
+        entry = note_entry(source, document)
+        if entry is None:
+            await self.collection.delete_one({"id": document["id"]})
+            return False
+        await self.collection.replace_one({"id": entry["id"]}, entry, upsert=True)
+        return True
+
+    async def reindex(self, sources: Iterable[NoteSource] = tuple(NoteSource), batch_size: int = 5000) -> Dict[str, int]:
+        """Rebuild the index from the source collections (for data written before indexing existed)."""
+        counts: Dict[str, int] = {}
+        for source in sources:
+            source = NoteSource(source).value
+            collection, time_field = NOTE_SOURCES[source]
+            projection = {"_id": 0, "id": 1, "loan_id": 1, "member_id": 1, "agent_id": 1,
+                          "branch_code": 1, "notes": 1, "created_at": 1, time_field: 1}
+            batch: List[ReplaceOne] = []
+            counts[source] = 0
+            async for document in self.db[collection].find(
+                {"notes": {"$nin": ["", None]}}, projection
+            ).batch_size(batch_size):
+                entry = note_entry(source, document)
+                if entry is None:
+                    continue
+                batch.append(ReplaceOne({"id": entry["id"]}, entry, upsert=True))
+                if len(batch) >= batch_size:
+                    await self.collection.bulk_write(batch, ordered=False)
+                    counts[source] += len(batch)
+                    batch = []
+            if batch:
+                await self.collection.bulk_write(batch, ordered=False)
+                counts[source] += len(batch)
+        return counts
+
+    async def search(
+        self,
+        query: str,
+        agent_id: Optional[str] = None,
+        loan_id: Optional[str] = None,
+        member_id: Optional[str] = None,
+        source: Optional[NoteSource] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> List[NoteSearchResult]:
+        """
+        Search notes, best matches first.
+
+        Results are ranked by text score when the query has words or
+        phrases, and newest first for prefix-only queries.
+        """
+        words, phrases, prefixes = parse_query(query)
+        if not (words or phrases or prefixes):
+            return []
+        match = self.build_filter(words, phrases, prefixes, agent_id, loan_id, member_id, source, date_from, date_to)
+
+        projection: Dict[str, Any] = {"_id": 0, "terms": 0}
+        if words or phrases:
+            projection = {"_id": 0, "id": 1, "source": 1, "loan_id": 1, "member_id": 1, "agent_id": 1,
+                          "noted_at": 1, "notes": 1, "score": {"$meta": "textScore"}}
+            sort = [("score", {"$meta": "textScore"}), ("noted_at", -1)]
+        else:
+            sort = [("noted_at", -1)]
+        results = await self.collection.find(match, projection).sort(sort).skip(skip).limit(limit).to_list(limit)
+        return [NoteSearchResult(**result) for result in results]
+
+    def build_filter(
+        self,
+        words: List[str],
+        phrases: List[str],
+        prefixes: List[str],
+        agent_id: Optional[str] = None,
+        loan_id: Optional[str] = None,
+        member_id: Optional[str] = None,
+        source: Optional[NoteSource] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Index query for a parsed search, within the service's branch scope."""
+        match: Dict[str, Any] = scope_query({}, self.branch_code)
+        if agent_id:
+            match["agent_id"] = agent_id
+        if loan_id:
+            match["loan_id"] = loan_id
+        if member_id:
+            match["member_id"] = member_id
+        if source:
+            match["source"] = NoteSource(source).value
+        if date_from or date_to:
+            match["noted_at"] = {}
+            if date_from:
+                match["noted_at"]["$gte"] = date_from
+            if date_to:
+                match["noted_at"]["$lte"] = date_to
+        if words or phrases:
+            match["$text"] = {"$search": " ".join(words + [f'"{phrase}"' for phrase in phrases])}
+        if prefixes:
+            match["$and"] = [{"terms": {"$regex": f"^{re.escape(prefix)}"}} for prefix in prefixes]
+        return match
@@ -0,0 +1,41 @@
+"""
+Notification service for business logic operations.
+"""
+
+from datetime import datetime
+from typing import List
+
+from ..models import Notification
+from ..config import get_database
+from ..utils.exceptions import NotificationNotFoundException
+
+
+class NotificationService:
+    """Service class for notification operations."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.notifications
+
+    async def get_notifications(self, skip: int = 0, limit: int = 20, unread_only: bool = False) -> List[Notification]:
+        """Get notifications, most recent first."""
+        query = {}
+        if unread_only:
+            query["is_read"] = False
+
+        notifications = await self.collection.find(query).sort("sent_at", -1).skip(skip).limit(limit).to_list(limit)
+        return [Notification(**notification) for notification in notifications]
+
+    async def mark_read(self, notification_id: str) -> None:
+        """
+        Mark a notification as read.
+
+        Raises:
+            NotificationNotFoundException: If there is no unread notification with this ID
+        """
+        result = await self.collection.update_one(
+            {"id": notification_id},
+            {"$set": {"is_read": True, "read_at": datetime.utcnow()}}
+        )
+        if result.modified_count == 0:
+            raise NotificationNotFoundException(notification_id)
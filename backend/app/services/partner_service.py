@@ -0,0 +1,54 @@
+"""
+External partner service for business logic operations.
+
+The active partner list is read on every escalation screen, so identical
+concurrent reads are coalesced (``single_flight``).
+"""
+
+from datetime import datetime
+from typing import List
+
+from ..models import ExternalPartner, ExternalPartnerCreate, PartnerAssignment, PartnerAssignmentCreate
+from ..config import get_database
+from ..utils.branch_scope import loan_branch_code
+from ..utils.single_flight import single_flight, call_key
+from .event_stream_service import EventStreamService
+
+
+class PartnerService:
+    """Service class for external partners and their loan assignments."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.external_partners
+        self.assignments = self.db.partner_assignments
+
+    async def get_active_partners(self) -> List[ExternalPartner]:
+        """Get active external partners (shared with concurrent callers)."""
+        partners = await single_flight.do(
+            call_key("partners", {"is_active": True}),
+            lambda: self.collection.find({"is_active": True}).to_list(100),
+        )
+        return [ExternalPartner(**partner) for partner in partners]
+
+    async def create_partner(self, partner_data: ExternalPartnerCreate) -> ExternalPartner:
+        """Register a new external partner."""
+        partner = ExternalPartner(**partner_data.dict())
+        await self.collection.insert_one(partner.dict())
+        return partner
+
+    async def get_assignments(self, skip: int = 0, limit: int = 50) -> List[PartnerAssignment]:
+        """Get partner assignments, most recently assigned first."""
+        assignments = await self.assignments.find().sort("assigned_date", -1).skip(skip).limit(limit).to_list(limit)
+        return [PartnerAssignment(**assignment) for assignment in assignments]
+
+    async def create_assignment(self, assignment_data: PartnerAssignmentCreate) -> PartnerAssignment:
+        """Assign a loan to an external partner."""
+        assignment = PartnerAssignment(
+            **assignment_data.dict(),
+            assigned_date=datetime.utcnow(),
+            branch_code=await loan_branch_code(self.db, assignment_data.loan_id)
+        )
+        await self.assignments.insert_one(assignment.dict())
+        await EventStreamService().publish("partner_assignment", "created", assignment.dict())
+        return assignment
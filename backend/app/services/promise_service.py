@@ -0,0 +1,52 @@
+"""
+Promise to pay service for business logic operations.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from ..models import PromiseToPay, PromiseToPayCreate, PromiseStatus
+from ..config import get_database
+from ..utils.branch_scope import check_branch, loan_branch_code, resolve_branch_scope, scope_query
+from .event_stream_service import EventStreamService
+from .note_search_service import NoteSearchService
+from .worklist_service import WorklistService
+
+
+class PromiseService:
+    """Service class for promise to pay operations."""
+
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
+        self.db = get_database()
+        self.collection = self.db.promises_to_pay
+        self.branch_code = resolve_branch_scope(user, branch_code)
+
+    async def get_promises(self, skip: int = 0, limit: int = 50, status: Optional[str] = None) -> List[PromiseToPay]:
+        """Get promises, earliest promised date first, optionally by status."""
+        query = scope_query({}, self.branch_code)
+        if status:
+            query["status"] = status
+
+        promises = await self.collection.find(query).sort("promised_date", 1).skip(skip).limit(limit).to_list(limit)
+        return [PromiseToPay(**promise) for promise in promises]
+
+    async def create_promise(self, promise_data: PromiseToPayCreate, current_user: Dict[str, Any]) -> PromiseToPay:
+        """
+        Record a pending promise taken by the current user.
+
+        Raises:
+            BranchAccessDeniedException: If the loan is outside the service's branch
+        """
+        branch_code = await loan_branch_code(self.db, promise_data.loan_id)
+        check_branch(branch_code, self.branch_code)
+        promise = PromiseToPay(
+            **promise_data.dict(exclude={"agent_id", "agent_name"}),
+            status=PromiseStatus.PENDING,
+            agent_id=current_user["user_id"],
+            agent_name=current_user["name"],
+            branch_code=branch_code
+        )
+        await self.collection.insert_one(promise.dict())
+        await WorklistService().on_promise_created(promise)
+        await NoteSearchService().index_note("promise", promise.dict())
+        await EventStreamService().publish("promise", "created", promise.dict())
+        return promise
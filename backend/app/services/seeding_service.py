@@ -0,0 +1,245 @@
+"""
+Background, resumable dummy-data seeding.
+
+Seeding runs as a background task after startup so the API accepts traffic
+immediately. A manifest document in ``seed_manifest`` records the dataset
+parameters (seed, size, batch size and reference time) and the chunks that
+have been written. A crashed or restarted process resumes from the missing
+chunks instead of treating a half-populated database as done, and a lease on
+the manifest keeps several worker processes from seeding concurrently. The
+other workers poll the manifest until it completes, taking over the lease
+if its holder stops renewing it.
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from ..config import get_database, app_config, ensure_indexes
+from ..utils.logging_config import get_logger
+from .auth_service import AuthService
+from .data_generator import DataGeneratorService
+from .note_search_service import NoteSearchService
+
+logger = get_logger(__name__)
+
+MANIFEST_ID = "dummy_data"
+
+# How long a seeding process may go without checkpointing before another may take over
+LEASE_SECONDS = 120
+
+# How often a worker without the lease re-reads the manifest
+WAIT_POLL_SECONDS = 5.0
+
+# Seeding progress for this process, reported by the health and system endpoints
+seed_progress: Dict[str, Any] = {
+    "status": "idle",  # idle, waiting, running, completed, skipped, failed
+    "chunks_completed": 0,
+    "chunk_count": 0,
+    "rows_written": 0,
+    "started_at": None,
+    "completed_at": None,
+    "error": None,
+}
+
+_seed_task: Optional[asyncio.Task] = None
+
+
+class SeedingService:
+    """Service coordinating resumable dummy-data generation through a manifest."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.manifests = self.db.seed_manifest
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def run(self) -> None:
+        """Seed the database if needed, resuming an interrupted run."""
+        seed_progress.update(status="running", started_at=datetime.utcnow(), error=None)
+        try:
+            await ensure_indexes(self.db)
+            if not app_config.SEED_DUMMY_DATA:
+                seed_progress["status"] = "skipped"
+                return
+            if app_config.SEED_DEMO_USERS:
+                await AuthService().ensure_demo_users()
+            manifest = await self._load_or_create_manifest()
+            if manifest is None:
+                seed_progress["status"] = "skipped"
+                logger.info("Database already holds data not created by the seeder; skipping seeding")
+                return
+            if manifest["status"] == "completed":
+                self._report_completed(manifest)
+                if await self.db.note_index.find_one({}, {"_id": 1}) is None:
+                    # Seeded before notes were indexed for search
+                    await self._index_notes()
+                return
+            if not await self._acquire_lease():
+                logger.info("Another process holds the seeding lease; waiting for it to finish")
+                manifest = await self._wait_for_lease()
+                if manifest is None:
+                    return
+            await self._seed(manifest)
+        except asyncio.CancelledError:
+            seed_progress["status"] = "idle"
+            raise
+        except Exception as e:
+            seed_progress.update(status="failed", error=str(e))
+            logger.error(f"Dummy data seeding failed: {str(e)}", exc_info=True)
+
+    async def get_manifest(self) -> Optional[dict]:
+        """Get the seed manifest, if any."""
+        return await self.manifests.find_one({"_id": MANIFEST_ID}, {"_id": 0})
+
+    async def _load_or_create_manifest(self) -> Optional[dict]:
+        manifest = await self.manifests.find_one({"_id": MANIFEST_ID})
+        if manifest is not None:
+            return manifest
+        # Pre-existing data without a manifest was not produced by this seeder
+        if await self.db.members.find_one({}, {"_id": 1}) is not None:
+            return None
+
+        generator = DataGeneratorService()
+        manifest = {
+            "_id": MANIFEST_ID,
+            "seed": generator.seed,
+            "member_count": generator.member_count,
+            "batch_size": generator.batch_size,
+            "chunk_count": generator.chunk_count,
+            "now": generator.now,
+            "status": "in_progress",
+            "completed_chunks": [],
+            "rows_written": 0,
+            "lease_owner": None,
+            "lease_expires_at": datetime.utcnow() - timedelta(seconds=1),
+            "created_at": datetime.utcnow(),
+            "completed_at": None,
+        }
+        try:
+            await self.manifests.insert_one(manifest)
+        except DuplicateKeyError:
+            # Another worker created it first
+            return await self.manifests.find_one({"_id": MANIFEST_ID})
+        return manifest
+
+    async def _acquire_lease(self) -> bool:
+        now = datetime.utcnow()
+        result = await self.manifests.update_one(
+            {
+                "_id": MANIFEST_ID,
+                "status": "in_progress",
+                "$or": [{"lease_expires_at": {"$lt": now}}, {"lease_owner": self.owner}],
+            },
+            {"$set": {"lease_owner": self.owner, "lease_expires_at": now + timedelta(seconds=LEASE_SECONDS)}},
+        )
+        return result.modified_count > 0
+
+    async def _wait_for_lease(self) -> Optional[dict]:
+        """
+        Poll the manifest while another process seeds.
+
+        Returns:
+            None once the manifest is completed, or the current manifest if
+            the lease expired and this process took it over
+        """
+        seed_progress["status"] = "waiting"
+        while True:
+            await asyncio.sleep(WAIT_POLL_SECONDS)
+            manifest = await self.manifests.find_one({"_id": MANIFEST_ID}) or {}
+            if manifest.get("status") == "completed":
+                self._report_completed(manifest)
+                return None
+            if await self._acquire_lease():
+                logger.info("Seeding lease expired; resuming seeding from this worker")
+                seed_progress["status"] = "running"
+                return await self.manifests.find_one({"_id": MANIFEST_ID})
+
+    async def _seed(self, manifest: dict) -> None:
+        completed = set(manifest["completed_chunks"])
+        seed_progress.update(
+            chunk_count=manifest["chunk_count"],
+            chunks_completed=len(completed),
+            rows_written=manifest.get("rows_written", 0),
+        )
+        if completed:
+            logger.info(
+                f"Resuming dummy data seeding: {len(completed)}/{manifest['chunk_count']} chunks already written"
+            )
+        else:
+            logger.info(f"Seeding dummy data for {manifest['member_count']} members in the background...")
+
+        generator = DataGeneratorService(
+            member_count=manifest["member_count"],
+            seed=manifest["seed"],
+            batch_size=manifest["batch_size"],
+            now=manifest["now"],
+        )
+        stats = await generator.generate(completed_chunks=completed, on_chunk_written=self._checkpoint)
+        if completed:
+            # Chunks written by an earlier run may predate note indexing
+            await self._index_notes()
+
+        await self.manifests.update_one(
+            {"_id": MANIFEST_ID},
+            {"$set": {"status": "completed", "completed_at": datetime.utcnow(), "lease_owner": None}},
+        )
+        seed_progress.update(status="completed", completed_at=datetime.utcnow())
+        logger.info(
+            f"Dummy data seeding completed: {stats['rows']} rows in {stats['elapsed_seconds']}s "
+            f"({stats['rows_per_second']} rows/s)"
+        )
+
+    async def _checkpoint(self, chunk_index: int, rows: int) -> None:
+        """Record a durable chunk and renew the lease."""
+        await self.manifests.update_one(
+            {"_id": MANIFEST_ID},
+            {
+                "$addToSet": {"completed_chunks": chunk_index},
+                "$inc": {"rows_written": rows},
+                "$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)},
+            },
+        )
+        seed_progress["chunks_completed"] += 1
+        seed_progress["rows_written"] += rows
+
+    async def _index_notes(self) -> None:
+        """Index the seeded call and promise notes for search (new chunks index their own)."""
+        counts = await NoteSearchService().reindex()
+        logger.info(f"Indexed seeded notes for search: {counts}")
+
+    def _report_completed(self, manifest: dict) -> None:
+        seed_progress.update(
+            status="completed",
+            chunk_count=manifest["chunk_count"],
+            chunks_completed=len(manifest["completed_chunks"]),
+            rows_written=manifest.get("rows_written", 0),
+            completed_at=manifest.get("completed_at"),
+        )
+
+
+def start_background_seeding() -> asyncio.Task:
+    """Ensure indexes and seed dummy data (if enabled) in a background task."""
+    global _seed_task
+    if _seed_task is None or _seed_task.done():
+        _seed_task = asyncio.ensure_future(SeedingService().run())
+    return _seed_task
+
+
+async def stop_background_seeding() -> None:
+    """Cancel an in-flight seeding task; completed chunks stay checkpointed."""
+    if _seed_task is not None and not _seed_task.done():
+        _seed_task.cancel()
+        try:
+            await _seed_task
+        except asyncio.CancelledError:
+            pass
+
+
+def is_seeding_in_progress() -> bool:
+    """Whether this process is currently writing seed data."""
+    return seed_progress["status"] == "running"
@@ -0,0 +1,386 @@
+"""
+Partner commission and settlement ledger.
+
+Every recovery a partner makes is appended to ``partner_ledger`` with the
+commission computed at the partner's rate at that moment. The same write
+increments running totals in ``partner_ledger_buckets``, one document per
+partner and month (``_id`` ``"<partner_id>:<YYYY-MM>"``). Statements and
+month-end settlement read those buckets, so their cost depends on the number
+of partners, not on the number of recovery events. The ledger stays the
+source of truth: ``rebuild_bucket`` re-derives a bucket from its entries.
+
+Entries are written before the totals they feed, with ``applied: false``,
+and flipped once the totals include them. Every ``$inc`` is guarded by the
+entry's ``batch_id`` in the target's ``applied_batches``, so a batch is
+applied at most once per bucket and assignment; a retried write and the
+``reconcile`` pass finish any batch an interrupted write left unapplied.
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ..models import LedgerEntryType, PartnerLedgerEntry, PartnerStatement, RecoveryCreate
+from ..config import get_database
+from ..utils.exceptions import AssignmentNotFoundException, PartnerNotFoundException, StatusConflictException
+
+# Attempts at the optimistic settlement update before reporting a conflict
+SETTLE_ATTEMPTS = 3
+
+# Recently applied batch ids kept on each bucket and assignment to guard re-application
+APPLIED_BATCHES_KEPT = 200
+
+# Unapplied entries younger than this belong to writes that may still be running
+RECONCILE_GRACE_SECONDS = 300
+
+
+def ledger_period(moment: datetime) -> str:
+    """Ledger period (calendar month) of a timestamp."""
+    return moment.strftime("%Y-%m")
+
+
+def bucket_id(partner_id: str, period: str) -> str:
+    return f"{partner_id}:{period}"
+
+
+class SettlementService:
+    """Service class for partner recoveries, commission statements and settlement."""
+
+    def __init__(self):
+        self.db = get_database()
+        self.ledger = self.db.partner_ledger
+        self.buckets = self.db.partner_ledger_buckets
+        self.assignments = self.db.partner_assignments
+        self.partners = self.db.external_partners
+
+    async def record_recoveries(self, recoveries: List[RecoveryCreate]) -> Dict[str, Any]:
+        """
+        Record recovered amounts against partner assignments.
+
+        Ledger entries are inserted in one ``insert_many``; entries whose
+        ``reference`` was already recorded for the partner are skipped. The
+        period buckets and the assignments' recovery and commission totals
+        are then incremented with one ``$inc`` per bucket and per assignment.
+        A resent recovery whose earlier attempt stopped before its totals
+        were applied has them applied now.
+
+        Returns:
+            Counts of recorded and duplicate recoveries and the commission added
+        """
+        if not recoveries:
+            return {"recorded": 0, "duplicates": 0, "commission_amount": 0.0}
+
+        assignment_ids = list({recovery.assignment_id for recovery in recoveries})
+        assignments = {
+            a["id"]: a async for a in self.assignments.find(
+                {"id": {"$in": assignment_ids}}, {"_id": 0, "id": 1, "partner_id": 1, "loan_id": 1, "branch_code": 1}
+            )
+        }
+        for assignment_id in assignment_ids:
+            if assignment_id not in assignments:
+                raise AssignmentNotFoundException(assignment_id)
+        partner_ids = list({a["partner_id"] for a in assignments.values()})
+        rates = {
+            p["id"]: p.get("commission_rate", 0.0) async for p in self.partners.find(
+                {"id": {"$in": partner_ids}}, {"_id": 0, "id": 1, "commission_rate": 1}
+            )
+        }
+
+        now = datetime.utcnow()
+        batch_id = str(uuid.uuid4())
+        entries = []
+        for recovery in recoveries:
+            assignment = assignments[recovery.assignment_id]
+            rate = rates.get(assignment["partner_id"], 0.0)
+            occurred_at = recovery.recovered_at or now
+            entry = PartnerLedgerEntry(
+                entry_type=LedgerEntryType.RECOVERY,
+                partner_id=assignment["partner_id"],
+                period=ledger_period(occurred_at),
+                assignment_id=assignment["id"],
+                loan_id=assignment["loan_id"],
+                branch_code=assignment.get("branch_code"),
+                recovered_amount=round(recovery.amount, 2),
+                commission_rate=rate,
+                commission_amount=round(recovery.amount * rate / 100, 2),
+                reference=recovery.reference,
+                batch_id=batch_id,
+                applied=False,
+                occurred_at=occurred_at,
+                recorded_at=now,
+            )
+            if recovery.reference:
+                # The same reference always maps to the same entry id, so a resent recovery is a duplicate
+                entry.id = str(uuid.uuid5(
+                    uuid.NAMESPACE_URL, f"partner_ledger/{assignment['partner_id']}/{recovery.reference}"
+                ))
+            entries.append(entry.dict())
+
+        recorded = await self._insert_entries(entries)
+        # This batch, plus any batch of a resent recovery that an earlier attempt left unapplied
+        batch_ids = await self.ledger.distinct(
+            "batch_id", {"id": {"$in": [entry["id"] for entry in entries]}, "applied": False}
+        )
+        await self._apply_batches(batch_ids, now)
+        return {
+            "recorded": len(recorded),
+            "duplicates": len(entries) - len(recorded),
+            "commission_amount": round(sum(entry["commission_amount"] for entry in recorded), 2),
+        }
+
+    async def get_statement(self, partner_id: str, period: str) -> PartnerStatement:
+        """Get a partner's statement for a period from its running totals."""
+        partner = await self.partners.find_one({"id": partner_id}, {"_id": 0, "partner_name": 1})
+        if partner is None:
+            raise PartnerNotFoundException(partner_id)
+        bucket = await self.buckets.find_one({"_id": bucket_id(partner_id, period)}) or {}
+        return self._statement(partner_id, period, bucket, partner.get("partner_name"))
+
+    async def get_statements(self, period: str) -> List[PartnerStatement]:
+        """Get every partner's statement for a period (one bucket read per partner)."""
+        names = {
+            p["id"]: p.get("partner_name") async for p in self.partners.find(
+                {}, {"_id": 0, "id": 1, "partner_name": 1}
+            )
+        }
+        buckets = await self.buckets.find({"period": period}).to_list(None)
+        return [
+            self._statement(bucket["partner_id"], period, bucket, names.get(bucket["partner_id"]))
+            for bucket in buckets
+        ]
+
+    async def get_entries(
+        self, partner_id: str, period: str, skip: int = 0, limit: int = 100
+    ) -> List[PartnerLedgerEntry]:
+        """Get the ledger entries behind a statement, oldest first."""
+        entries = await self.ledger.find(
+            {"partner_id": partner_id, "period": period}, {"_id": 0}
+        ).sort("occurred_at", 1).skip(skip).limit(limit).to_list(limit)
+        return [PartnerLedgerEntry(**entry) for entry in entries]
+
+    async def settle(self, partner_id: str, period: str) -> PartnerStatement:
+        """
+        Settle a partner's outstanding commission for a period.
+
+        The settlement entry is inserted unapplied first, then the bucket's
+        ``settled_amount`` is advanced with an optimistic, guarded update so
+        concurrent settlements cannot pay twice; a lost race removes the
+        entry again. Late recoveries after a settlement leave a new
+        outstanding balance that the next settlement pays.
+        """
+        key = bucket_id(partner_id, period)
+        for _ in range(SETTLE_ATTEMPTS):
+            bucket = await self.buckets.find_one({"_id": key})
+            if bucket is None:
+                return await self.get_statement(partner_id, period)
+            previous = bucket.get("settled_amount")
+            outstanding = round(bucket.get("commission_amount", 0.0) - (previous or 0.0), 2)
+            if outstanding <= 0:
+                return await self.get_statement(partner_id, period)
+
+            now = datetime.utcnow()
+            entry = PartnerLedgerEntry(
+                entry_type=LedgerEntryType.SETTLEMENT,
+                partner_id=partner_id,
+                period=period,
+                settled_amount=outstanding,
+                applied=False,
+                previous_settled_amount=previous,
+                occurred_at=now,
+                recorded_at=now,
+            ).dict()
+            entry["batch_id"] = entry["id"]
+            await self.ledger.insert_one(entry)
+            if await self._apply_settlement(entry):
+                return await self.get_statement(partner_id, period)
+            await self.ledger.delete_one({"id": entry["id"], "applied": False})
+        raise StatusConflictException("settlement", key)
+
+    async def reconcile(self, grace_seconds: float = RECONCILE_GRACE_SECONDS) -> Dict[str, int]:
+        """
+        Finish ledger writes that stopped between the entry and its totals.
+
+        Unapplied recoveries have their totals applied. An unapplied
+        settlement is applied if the bucket has not been settled since it
+        was computed, and removed otherwise, as it was never paid.
+
+        Args:
+            grace_seconds: Leave entries recorded more recently than this to
+            the writes that may still be applying them
+
+        Returns:
+            Counts of recoveries and settlements applied and settlements removed
+        """
+        now = datetime.utcnow()
+        stale = {"applied": False, "recorded_at": {"$lt": now - timedelta(seconds=grace_seconds)}}
+        batch_ids = await self.ledger.distinct(
+            "batch_id", {**stale, "entry_type": LedgerEntryType.RECOVERY.value}
+        )
+        counts = {
+            "recoveries": await self._apply_batches(batch_ids, now),
+            "settlements": 0,
+            "discarded_settlements": 0,
+        }
+        async for entry in self.ledger.find({**stale, "entry_type": LedgerEntryType.SETTLEMENT.value}, {"_id": 0}):
+            if await self._apply_settlement(entry):
+                counts["settlements"] += 1
+            else:
+                await self.ledger.delete_one({"id": entry["id"], "applied": False})
+                counts["discarded_settlements"] += 1
+        return counts
+
+    async def rebuild_bucket(self, partner_id: str, period: str) -> PartnerStatement:
+        """Recompute a bucket's totals from its ledger entries."""
+        pipeline = [
+            {"$match": {"partner_id": partner_id, "period": period, "applied": {"$ne": False}}},
+            {"$group": {
+                "_id": "$entry_type",
+                "count": {"$sum": 1},
+                "recovered_amount": {"$sum": "$recovered_amount"},
+                "commission_amount": {"$sum": "$commission_amount"},
+                "settled_amount": {"$sum": "$settled_amount"},
+            }},
+        ]
+        totals = {row["_id"]: row async for row in self.ledger.aggregate(pipeline)}
+        recovery = totals.get(LedgerEntryType.RECOVERY.value, {})
+        settlement = totals.get(LedgerEntryType.SETTLEMENT.value, {})
+        await self.buckets.update_one(
+            {"_id": bucket_id(partner_id, period)},
+            {"$set": {
+                "partner_id": partner_id,
+                "period": period,
+                "recovery_count": recovery.get("count", 0),
+                "recovered_amount": round(recovery.get("recovered_amount", 0.0), 2),
+                "commission_amount": round(recovery.get("commission_amount", 0.0), 2),
+                "settled_amount": round(settlement.get("settled_amount", 0.0), 2),
+                "updated_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+        return await self.get_statement(partner_id, period)
+
+    async def _insert_entries(self, entries: List[dict]) -> List[dict]:
+        """Insert ledger entries and return the ones that were not duplicates."""
+        try:
+            await self.ledger.insert_many(entries, ordered=False)
+            return entries
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            duplicates = {error["index"] for error in errors}
+            return [entry for index, entry in enumerate(entries) if index not in duplicates]
+
+    async def _apply_batches(self, batch_ids: List[str], now: datetime) -> int:
+        """Apply the totals of the batches' unapplied recovery entries and mark them applied."""
+        if not batch_ids:
+            return 0
+        batches: Dict[str, List[dict]] = defaultdict(list)
+        async for entry in self.ledger.find(
+            {"batch_id": {"$in": batch_ids}, "applied": False, "entry_type": LedgerEntryType.RECOVERY.value},
+            {"_id": 0},
+        ):
+            batches[entry["batch_id"]].append(entry)
+        for batch_id, entries in batches.items():
+            await self._apply_totals(batch_id, entries, now)
+            await self.ledger.update_many({"batch_id": batch_id, "applied": False}, {"$set": {"applied": True}})
+        return sum(len(entries) for entries in batches.values())
+
+    async def _apply_settlement(self, entry: dict) -> bool:
+        """Advance the bucket by a settlement entry unless it was settled since; mark the entry applied."""
+        key = bucket_id(entry["partner_id"], entry["period"])
+        result = await self.buckets.update_one(
+            {
+                "_id": key,
+                "settled_amount": entry.get("previous_settled_amount"),
+                "applied_batches": {"$ne": entry["batch_id"]},
+            },
+            {
+                "$inc": {"settled_amount": entry["settled_amount"]},
+                "$set": {"settled_at": entry["occurred_at"]},
+                "$push": {"applied_batches": {"$each": [entry["batch_id"]], "$slice": -APPLIED_BATCHES_KEPT}},
+            },
+        )
+        if not result.modified_count and not await self.buckets.find_one(
+            {"_id": key, "applied_batches": entry["batch_id"]}, {"_id": 1}
+        ):
+            return False
+        await self.ledger.update_one({"id": entry["id"]}, {"$set": {"applied": True}})
+        return True
+
+    async def _apply_totals(self, batch_id: str, entries: List[dict], now: datetime) -> None:
+        """Increment period buckets and assignment totals by one batch of entries, at most once each."""
+        bucket_totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(
+            lambda: {"recovery_count": 0, "recovered_amount": 0.0, "commission_amount": 0.0}
+        )
+        assignment_totals: Dict[Tuple[Optional[str], str], Dict[str, float]] = defaultdict(
+            lambda: {"actual_recovery_amount": 0.0, "commission_amount": 0.0}
+        )
+        for entry in entries:
+            bucket = bucket_totals[(entry["partner_id"], entry["period"])]
+            bucket["recovery_count"] += 1
+            bucket["recovered_amount"] += entry["recovered_amount"]
+            bucket["commission_amount"] += entry["commission_amount"]
+            assignment = assignment_totals[(entry.get("branch_code"), entry["assignment_id"])]
+            assignment["actual_recovery_amount"] += entry["recovered_amount"]
+            assignment["commission_amount"] += entry["commission_amount"]
+
+        applied = {"applied_batches": {"$each": [batch_id], "$slice": -APPLIED_BATCHES_KEPT}}
+        # A bucket that already has the batch fails the upsert with a duplicate _id, which is the skip
+        await self._bulk_write(self.buckets, [
+            UpdateOne(
+                {"_id": bucket_id(partner_id, period), "applied_batches": {"$ne": batch_id}},
+                {
+                    "$inc": {field: round(value, 2) for field, value in totals.items()},
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {"partner_id": partner_id, "period": period},
+                    "$push": applied,
+                },
+                upsert=True,
+            )
+            for (partner_id, period), totals in bucket_totals.items()
+        ])
+
+        # Filtered on the full shard key ({branch_code, id}) so each update targets one shard
+        operations: List[Any] = [
+            UpdateOne(
+                {"branch_code": branch_code, "id": assignment_id, "applied_batches": {"$ne": batch_id}},
+                {"$inc": {field: round(value, 2) for field, value in totals.items()}, "$push": applied},
+            )
+            for (branch_code, assignment_id), totals in assignment_totals.items()
+        ]
+        operations.append(UpdateMany(
+            {"id": {"$in": [assignment_id for _, assignment_id in assignment_totals]}, "status": "assigned"},
+            {"$set": {"status": "in_progress"}},
+        ))
+        await self.assignments.bulk_write(operations, ordered=False)
+
+    @staticmethod
+    async def _bulk_write(collection, operations: List[Any]) -> None:
+        """Run an unordered bulk_write, ignoring duplicate key errors."""
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+
+    def _statement(
+        self, partner_id: str, period: str, bucket: Dict[str, Any], partner_name: Optional[str]
+    ) -> PartnerStatement:
+        commission_amount = round(bucket.get("commission_amount", 0.0), 2)
+        settled_amount = round(bucket.get("settled_amount") or 0.0, 2)
+        return PartnerStatement(
+            partner_id=partner_id,
+            partner_name=partner_name,
+            period=period,
+            recovery_count=bucket.get("recovery_count", 0),
+            recovered_amount=round(bucket.get("recovered_amount", 0.0), 2),
+            commission_amount=commission_amount,
+            settled_amount=settled_amount,
+            outstanding_commission=round(commission_amount - settled_amount, 2),
+            settled_at=bucket.get("settled_at"),
+        )
@@ -0,0 +1,320 @@
+"""
+Validated, bulk status transitions for loans and promises to pay.
+
+Each record moves only if its current status allows the target status, and
+the write filters on the expected prior status so a concurrent change is
+detected rather than overwritten. Records are grouped by prior status into
+``UpdateMany`` operations sent in a single ``bulk_write``, so reclassifying a
+whole portfolio costs one write round trip instead of one per record. Every
+applied change is appended to ``status_transitions`` and published to the
+domain event stream. A service built for a
+branch user only reads and writes that branch's records; ids of other
+branches come back as not found.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Type
+
+from pymongo import UpdateMany
+
+from ..models import (
+    LoanStatus,
+    PromiseStatus,
+    StatusTransition,
+    TransitionOutcome,
+    TransitionResult,
+)
+from ..config import get_database
+from ..utils.branch_scope import resolve_branch_scope, scope_query
+from ..utils.exceptions import (
+    StimaException,
+    LoanNotFoundException,
+    InvalidLoanStatusException,
+    PromiseNotFoundException,
+    InvalidPromiseStatusException,
+    StatusConflictException,
+)
+from .event_stream_service import EventStreamService
+
+# Allowed target statuses for each current loan status
+LOAN_TRANSITIONS: Dict[str, Set[str]] = {
+    LoanStatus.PERFORMING.value: {
+        LoanStatus.NON_PERFORMING.value, LoanStatus.DEFAULTED.value, LoanStatus.CLOSED.value,
+    },
+    LoanStatus.NON_PERFORMING.value: {
+        LoanStatus.PERFORMING.value, LoanStatus.DEFAULTED.value, LoanStatus.CLOSED.value,
+    },
+    LoanStatus.DEFAULTED.value: {
+        LoanStatus.PERFORMING.value, LoanStatus.NON_PERFORMING.value, LoanStatus.CLOSED.value,
+    },
+    LoanStatus.CLOSED.value: set(),
+}
+
+# Allowed target statuses for each current promise status
+PROMISE_TRANSITIONS: Dict[str, Set[str]] = {
+    PromiseStatus.PENDING.value: {
+        PromiseStatus.KEPT.value, PromiseStatus.BROKEN.value, PromiseStatus.EXPIRED.value,
+    },
+    PromiseStatus.KEPT.value: set(),
+    PromiseStatus.BROKEN.value: set(),
+    PromiseStatus.EXPIRED.value: set(),
+}
+
+# Maximum ids per UpdateMany filter, keeping each operation well under the BSON limit
+IDS_PER_OPERATION = 10000
+
+
+class EntitySpec(NamedTuple):
+    """How status transitions apply to one kind of record."""
+    collection: str
+    statuses: Type[Any]
+    rules: Dict[str, Set[str]]
+    timestamp_field: str
+    not_found_exception: Type[StimaException]
+    invalid_exception: Type[StimaException]
+
+
+ENTITIES: Dict[str, EntitySpec] = {
+    "loan": EntitySpec(
+        "loan_accounts", LoanStatus, LOAN_TRANSITIONS, "status_changed_at",
+        LoanNotFoundException, InvalidLoanStatusException,
+    ),
+    "promise": EntitySpec(
+        "promises_to_pay", PromiseStatus, PROMISE_TRANSITIONS, "updated_at",
+        PromiseNotFoundException, InvalidPromiseStatusException,
+    ),
+}
+
+
+def allowed_prior_statuses(entity: str, to_status: str) -> List[str]:
+    """Statuses from which ``entity`` records may move to ``to_status``."""
+    rules = ENTITIES[entity].rules
+    return [status for status, targets in rules.items() if to_status in targets]
+
+
+class StatusTransitionService:
+    """Service class for guarded, bulk status transitions and their history."""
+
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
+        self.db = get_database()
+        self.history = self.db.status_transitions
+        self.branch_code = resolve_branch_scope(user, branch_code)
+
+    async def transition(
+        self,
+        entity: str,
+        ids: Iterable[str],
+        to_status: str,
+        reason: str = "",
+        actor: Optional[str] = None,
+    ) -> TransitionResult:
+        """
+        Move many records to ``to_status``, validating each against its current status.
+
+        Args:
+            entity: "loan" or "promise"
+            ids: Record IDs to transition
+            to_status: Target status
+            reason: Free-text reason stored in the history
+            actor: User or job applying the transition
+
+        Returns:
+            Per-id outcomes (applied, unchanged, rejected, not_found, conflict)
+        """
+        spec, to_status = self._resolve(entity, to_status)
+        ids = list(dict.fromkeys(ids))
+        current: Dict[str, Optional[str]] = {}
+        for offset in range(0, len(ids), IDS_PER_OPERATION):
+            chunk = ids[offset:offset + IDS_PER_OPERATION]
+            async for doc in self.db[spec.collection].find(
+                scope_query({"id": {"$in": chunk}}, self.branch_code), {"_id": 0, "id": 1, "status": 1}
+            ):
+                current[doc["id"]] = doc.get("status")
+        return await self._transition(entity, spec, ids, current, to_status, reason, actor)
+
+    async def reclassify(
+        self,
+        entity: str,
+        query: Dict[str, Any],
+        to_status: str,
+        reason: str = "",
+        actor: Optional[str] = None,
+    ) -> TransitionResult:
+        """
+        Move every record matching ``query`` that may legally reach ``to_status``.
+
+        Records already in the target status or in a status that cannot reach
+        it are not selected, so the outcomes only cover candidate records.
+        """
+        spec, to_status = self._resolve(entity, to_status)
+        match = scope_query(
+            {"$and": [query, {"status": {"$in": allowed_prior_statuses(entity, to_status)}}]}, self.branch_code
+        )
+        current: Dict[str, Optional[str]] = {}
+        async for doc in self.db[spec.collection].find(match, {"_id": 0, "id": 1, "status": 1}):
+            current[doc["id"]] = doc.get("status")
+        return await self._transition(entity, spec, list(current), current, to_status, reason, actor)
+
+    async def transition_one(
+        self,
+        entity: str,
+        entity_id: str,
+        to_status: str,
+        reason: str = "",
+        actor: Optional[str] = None,
+    ) -> TransitionOutcome:
+        """
+        Transition a single record, raising the entity's exception on failure.
+
+        Returns:
+            APPLIED, or UNCHANGED if the record already had the target status
+        """
+        result = await self.transition(entity, [entity_id], to_status, reason, actor)
+        outcome = result.outcomes[entity_id]
+        spec = ENTITIES[entity]
+        if outcome == TransitionOutcome.NOT_FOUND:
+            raise spec.not_found_exception(entity_id)
+        if outcome == TransitionOutcome.REJECTED:
+            doc = await self.db[spec.collection].find_one(
+                scope_query({"id": entity_id}, self.branch_code), {"_id": 0, "status": 1}
+            )
+            raise spec.invalid_exception(doc.get("status") if doc else "unknown", result.to_status)
+        if outcome == TransitionOutcome.CONFLICT:
+            raise StatusConflictException(entity, entity_id)
+        return outcome
+
+    async def record_transitions(
+        self,
+        entity: str,
+        changes: List[Tuple[str, str, str]],
+        batch_id: str,
+        reason: str = "",
+        actor: Optional[str] = None,
+        occurred_at: Optional[datetime] = None,
+    ) -> int:
+        """Append ``(entity_id, from_status, to_status)`` changes made elsewhere to the history."""
+        if not changes:
+            return 0
+        occurred_at = occurred_at or datetime.utcnow()
+        events = [
+            StatusTransition(
+                entity=entity,
+                entity_id=entity_id,
+                from_status=from_status,
+                to_status=to_status,
+                reason=reason,
+                actor=actor,
+                batch_id=batch_id,
+                occurred_at=occurred_at,
+            ).dict()
+            for entity_id, from_status, to_status in changes
+        ]
+        await self.history.insert_many(events, ordered=False)
+        return len(events)
+
+    async def get_history(self, entity: str, entity_id: str, limit: int = 50) -> List[StatusTransition]:
+        """
+        Get the status history of a record, newest first.
+
+        Raises:
+            StimaException: The entity's not-found exception, if a branch-scoped
+            service is asked for another branch's record
+        """
+        if self.branch_code is not None:
+            spec = ENTITIES[entity]
+            if not await self.db[spec.collection].find_one(
+                scope_query({"id": entity_id}, self.branch_code), {"_id": 0, "id": 1}
+            ):
+                raise spec.not_found_exception(entity_id)
+        events = await self.history.find(
+            {"entity": entity, "entity_id": entity_id}, {"_id": 0}
+        ).sort("occurred_at", -1).limit(limit).to_list(limit)
+        return [StatusTransition(**event) for event in events]
+
+    def _resolve(self, entity: str, to_status: str) -> Tuple[EntitySpec, str]:
+        """Look up the entity's rules and normalise the target status value."""
+        spec = ENTITIES.get(entity)
+        if spec is None:
+            raise ValueError(f"Unknown entity for status transitions: {entity}")
+        try:
+            return spec, spec.statuses(to_status).value
+        except ValueError:
+            raise spec.invalid_exception("any status", to_status)
+
+    async def _transition(
+        self,
+        entity: str,
+        spec: EntitySpec,
+        ids: List[str],
+        current: Dict[str, Optional[str]],
+        to_status: str,
+        reason: str,
+        actor: Optional[str],
+    ) -> TransitionResult:
+        batch_id = str(uuid.uuid4())
+        now = datetime.utcnow()
+
+        outcomes: Dict[str, TransitionOutcome] = {}
+        groups: Dict[str, List[str]] = {}
+        for entity_id in ids:
+            if entity_id not in current:
+                outcomes[entity_id] = TransitionOutcome.NOT_FOUND
+            elif current[entity_id] == to_status:
+                outcomes[entity_id] = TransitionOutcome.UNCHANGED
+            elif to_status not in spec.rules.get(current[entity_id], ()):
+                outcomes[entity_id] = TransitionOutcome.REJECTED
+            else:
+                outcomes[entity_id] = TransitionOutcome.CONFLICT  # until the write confirms it
+                groups.setdefault(current[entity_id], []).append(entity_id)
+
+        applied = await self._apply(spec, groups, to_status, batch_id, now)
+        changes = []
+        for from_status, group in groups.items():
+            for entity_id in group:
+                if entity_id in applied:
+                    outcomes[entity_id] = TransitionOutcome.APPLIED
+                    changes.append((entity_id, from_status, to_status))
+        await self.record_transitions(entity, changes, batch_id, reason, actor, now)
+        await EventStreamService().publish_updated(entity, [change[0] for change in changes])
+
+        return TransitionResult(batch_id=batch_id, entity=entity, to_status=to_status, outcomes=outcomes)
+
+    async def _apply(
+        self,
+        spec: EntitySpec,
+        groups: Dict[str, List[str]],
+        to_status: str,
+        batch_id: str,
+        now: datetime,
+    ) -> Set[str]:
+        """Write all grouped transitions in one bulk_write and return the ids that moved."""
+        candidates = [entity_id for group in groups.values() for entity_id in group]
+        if not candidates:
+            return set()
+        update = {"$set": {"status": to_status, spec.timestamp_field: now, "status_transition_id": batch_id}}
+        operations = [
+            UpdateMany(
+                scope_query(
+                    {"id": {"$in": group[offset:offset + IDS_PER_OPERATION]}, "status": from_status},
+                    self.branch_code,
+                ),
+                update,
+            )
+            for from_status, group in groups.items()
+            for offset in range(0, len(group), IDS_PER_OPERATION)
+        ]
+        result = await self.db[spec.collection].bulk_write(operations, ordered=False)
+        if result.modified_count == len(candidates):
+            return set(candidates)
+
+        # Some records changed status after they were read; find the ones this batch moved
+        applied: Set[str] = set()
+        for offset in range(0, len(candidates), IDS_PER_OPERATION):
+            chunk = candidates[offset:offset + IDS_PER_OPERATION]
+            async for doc in self.db[spec.collection].find(
+                scope_query({"id": {"$in": chunk}, "status_transition_id": batch_id}, self.branch_code),
+                {"_id": 0, "id": 1},
+            ):
+                applied.add(doc["id"])
+        return applied
@@ -0,0 +1,347 @@
+"""
+Precomputed per-agent call worklists.
+
+A rebuild streams the non-performing and defaulted loans still worked by the
+branches, scores them, and deals each branch's loans to its active agents,
+highest priority first, always to the least-loaded agent with spare
+capacity. Loans beyond a branch's capacity wait in the branch pool
+(``agent_id`` None). Every item carries ``ready_at``: a loan is not offered
+before its latest call's follow-up date, its retry delay after an
+unsuccessful call, or the day after a pending promise falls due.
+
+Asking for the next loan is a single ``find_one_and_update`` on the
+``agent_queue`` index that leases the top ready item by pushing its
+``ready_at`` past the lease. Logging a call or a promise reschedules only
+that loan's item, so queues stay current between rebuilds without
+re-aggregating call history. An agent whose own queue has nothing ready
+takes the top item from the branch pool, then from colleagues in the same
+branch, and keeps it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReplaceOne, ReturnDocument
+
+from ..models import CallLog, CallStatus, EscalationLevel, LoanStatus, PromiseStatus, PromiseToPay, WorklistItem
+from ..config import get_database, app_config
+from ..utils.branch_scope import resolve_branch_scope, scope_query
+from ..utils.logging_config import get_logger
+from ..utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+logger = get_logger(__name__)
+
+WORKLIST_STATUSES = [LoanStatus.NON_PERFORMING.value, LoanStatus.DEFAULTED.value]
+
+# Priority weight of the arrears amount (per factor of ten) and boost for an overdue promise
+ARREARS_WEIGHT = 10.0
+OVERDUE_PROMISE_BOOST = 30.0
+
+# A promise is given until the day after it falls due before the loan is called again
+PROMISE_GRACE = timedelta(days=1)
+
+# Minimum gap before calling a member again after a successful call
+CONTACTED_COOLDOWN = timedelta(days=1)
+
+LOAN_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "loan_number": 1,
+    "member_id": 1,
+    "member_number": 1,
+    "branch_code": 1,
+    "days_in_arrears": 1,
+    "arrears_amount": 1,
+}
+
+
+def priority_scores(
+    days_in_arrears: np.ndarray,
+    arrears_amount: np.ndarray,
+    overdue_promise: np.ndarray,
+) -> np.ndarray:
+    """Call priority: days in arrears, plus the arrears size on a log scale, plus an overdue-promise boost."""
+    return np.round(
+        days_in_arrears
+        + ARREARS_WEIGHT * np.log10(1 + np.maximum(arrears_amount, 0.0))
+        + OVERDUE_PROMISE_BOOST * overdue_promise,
+        2,
+    )
+
+
+def next_call_time(
+    called_at: datetime,
+    call_status: str,
+    follow_up_date: Optional[datetime] = None,
+) -> datetime:
+    """When a loan may be called again after a call."""
+    if follow_up_date is not None:
+        return follow_up_date
+    if call_status == CallStatus.SUCCESSFUL.value:
+        return called_at + CONTACTED_COOLDOWN
+    return called_at + timedelta(hours=app_config.WORKLIST_RETRY_HOURS)
+
+
+def deal_items(items: List[Dict[str, Any]], agents: List[Dict[str, Any]]) -> None:
+    """
+    Assign a branch's items to its agents in place.
+
+    Items are taken in descending priority and each goes to the agent with
+    the fewest items so far that still has capacity; the rest stay unassigned.
+    An item leased to an agent stays with that agent.
+    """
+    heap = [(0, agent["agent_id"], agent.get("capacity") or app_config.WORKLIST_AGENT_CAPACITY) for agent in agents]
+    heapq.heapify(heap)
+    for item in sorted(items, key=lambda item: item["priority"], reverse=True):
+        if item.get("leased_to"):
+            item["agent_id"] = item["leased_to"]
+            continue
+        if not heap:
+            item["agent_id"] = None
+            continue
+        load, agent_id, capacity = heapq.heappop(heap)
+        item["agent_id"] = agent_id
+        if load + 1 < capacity:
+            heapq.heappush(heap, (load + 1, agent_id, capacity))
+
+
+class WorklistService:
+    """Service class for agent call queues."""
+
+    def __init__(self, user: Optional[Dict[str, Any]] = None, branch_code: Optional[str] = None):
+        self.db = get_database()
+        self.collection = self.db.worklist_items
+        self.branch_code = resolve_branch_scope(user, branch_code)
+        self.agents = self.db.agents
+        self.loans = self.db.loan_accounts
+
+    async def rebuild_worklists(self, branch_code: Optional[str] = None, chunk_size: int = 5000) -> Dict[str, Any]:
+        """
+        Recompute and redistribute the worklists.
+
+        Args:
+            branch_code: Only rebuild this branch's worklists
+            chunk_size: Loans scored per batch and items per bulk_write
+
+        Returns:
+            Rebuild summary with queued, assigned and pooled counts
+        """
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        generation = str(uuid.uuid4())
+        query: Dict[str, Any] = {
+            "status": {"$in": WORKLIST_STATUSES},
+            "escalation_level": {"$ne": EscalationLevel.EXTERNAL_PARTNER.value},
+        }
+        if branch_code:
+            query["branch_code"] = branch_code
+
+        items_by_branch: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        chunk: List[Dict[str, Any]] = []
+        async for loan in self.loans.find(query, LOAN_PROJECTION).batch_size(chunk_size):
+            chunk.append(loan)
+            if len(chunk) >= chunk_size:
+                for item in await self._score_chunk(chunk, now, generation):
+                    items_by_branch[item["branch_code"]].append(item)
+                chunk = []
+        if chunk:
+            for item in await self._score_chunk(chunk, now, generation):
+                items_by_branch[item["branch_code"]].append(item)
+
+        agents_by_branch = await self._active_agents(branch_code)
+        items: List[Dict[str, Any]] = []
+        for branch, branch_items in items_by_branch.items():
+            deal_items(branch_items, agents_by_branch.get(branch, []))
+            items.extend(branch_items)
+
+        for offset in range(0, len(items), chunk_size):
+            await self.collection.bulk_write([
+                ReplaceOne({"loan_id": item["loan_id"]}, item, upsert=True)
+                for item in items[offset:offset + chunk_size]
+            ], ordered=False)
+        stale: Dict[str, Any] = {"generation": {"$ne": generation}}
+        if branch_code:
+            stale["branch_code"] = branch_code
+        removed = (await self.collection.delete_many(stale)).deleted_count
+
+        pooled = sum(1 for item in items if item["agent_id"] is None)
+        summary = {
+            "generation": generation,
+            "queued": len(items),
+            "assigned": len(items) - pooled,
+            "pooled": pooled,
+            "removed": removed,
+            "agents": sum(len(agents) for agents in agents_by_branch.values()),
+            "elapsed_seconds": round(time.perf_counter() - started, 2),
+        }
+        logger.info(
+            f"Worklists rebuilt: {summary['queued']} loans, {summary['assigned']} assigned to "
+            f"{summary['agents']} agents, {pooled} pooled in {summary['elapsed_seconds']}s"
+        )
+        return summary
+
+    async def next_for_agent(self, agent_id: str, branch_code: Optional[str] = None) -> Optional[WorklistItem]:
+        """
+        Lease the highest-priority ready loan for an agent.
+
+        The item's ``ready_at`` moves past the lease, so it is not offered to
+        anyone else until the lease expires or a call is logged.
+
+        Returns:
+            The leased item, or None if nothing in the agent's reach is ready
+        """
+        now = datetime.utcnow()
+        leased_until = now + timedelta(minutes=app_config.WORKLIST_LEASE_MINUTES)
+        update = {"$set": {
+            "agent_id": agent_id,
+            "ready_at": leased_until,
+            "leased_to": agent_id,
+            "leased_until": leased_until,
+        }}
+        sources: List[Dict[str, Any]] = [{"agent_id": agent_id}]
+        if branch_code:
+            sources += [{"branch_code": branch_code, "agent_id": None}, {"branch_code": branch_code}]
+        for source in sources:
+            item = await self.collection.find_one_and_update(
+                {**source, "ready_at": {"$lte": now}},
+                update,
+                sort=[("priority", -1)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if item is not None:
+                return WorklistItem(**item)
+        return None
+
+    async def get_queue(self, agent_id: str, ready_only: bool = False, limit: int = 50) -> List[WorklistItem]:
+        """Get an agent's queue in priority order (only the items of the branch scope)."""
+        query: Dict[str, Any] = scope_query({"agent_id": agent_id}, self.branch_code)
+        if ready_only:
+            query["ready_at"] = {"$lte": datetime.utcnow()}
+        items = await self.collection.find(query, {"_id": 0}).sort("priority", -1).limit(limit).to_list(limit)
+        return [WorklistItem(**item) for item in items]
+
+    async def on_call_logged(self, call: CallLog) -> bool:
+        """Reschedule a loan's item after a call and release its lease."""
+        called_at = call.call_start_time or datetime.utcnow()
+        call_status = CallStatus(call.call_status).value
+        result = await self.collection.update_one(
+            {"loan_id": call.loan_id},
+            {
+                "$set": {
+                    "ready_at": next_call_time(called_at, call_status, call.follow_up_date),
+                    "last_call_at": called_at,
+                    "last_call_status": call_status,
+                },
+                "$unset": {"leased_to": "", "leased_until": ""},
+            },
+        )
+        return result.matched_count > 0
+
+    async def on_promise_created(self, promise: PromiseToPay) -> bool:
+        """Hold a loan's item until the day after its promise falls due."""
+        result = await self.collection.update_one(
+            {"loan_id": promise.loan_id},
+            {"$max": {"ready_at": promise.promised_date + PROMISE_GRACE}},
+        )
+        return result.matched_count > 0
+
+    async def _score_chunk(
+        self, loans: List[Dict[str, Any]], now: datetime, generation: str
+    ) -> List[Dict[str, Any]]:
+        """Build worklist items for a chunk of loans."""
+        ids = [loan["id"] for loan in loans]
+        last_calls, promised, leases = await asyncio.gather(
+            self._last_calls(ids), self._pending_promises(ids), self._leases(ids, now)
+        )
+        overdue = np.array(
+            [loan["id"] in promised and promised[loan["id"]] + PROMISE_GRACE <= now for loan in loans], dtype=bool
+        )
+        priority = priority_scores(
+            np.array([loan.get("days_in_arrears") or 0 for loan in loans], dtype=np.float64),
+            np.array([loan.get("arrears_amount") or 0.0 for loan in loans], dtype=np.float64),
+            overdue.astype(np.float64),
+        )
+
+        items = []
+        for i, loan in enumerate(loans):
+            ready_at, reason = now, "promise_overdue" if overdue[i] else "arrears"
+            call = last_calls.get(loan["id"])
+            if call is not None:
+                call_ready = next_call_time(
+                    call["called_at"], CallStatus(call["call_status"]).value, call.get("follow_up_date")
+                )
+                if call_ready > ready_at:
+                    ready_at, reason = call_ready, "follow_up" if call.get("follow_up_date") else "retry"
+            if loan["id"] in promised and not overdue[i] and promised[loan["id"]] + PROMISE_GRACE > ready_at:
+                ready_at, reason = promised[loan["id"]] + PROMISE_GRACE, "promise"
+
+            item = WorklistItem(
+                loan_id=loan["id"],
+                member_id=loan["member_id"],
+                loan_number=loan["loan_number"],
+                member_number=loan["member_number"],
+                branch_code=loan["branch_code"],
+                priority=float(priority[i]),
+                ready_at=ready_at,
+                reason=reason,
+                days_in_arrears=loan.get("days_in_arrears") or 0,
+                arrears_amount=loan.get("arrears_amount") or 0.0,
+                last_call_at=call["called_at"] if call else None,
+                last_call_status=call["call_status"] if call else None,
+                generation=generation,
+            ).dict()
+            lease = leases.get(loan["id"])
+            if lease is not None:
+                # Keep a loan that is being called off other queues until its lease ends
+                item.update(ready_at=max(ready_at, lease["leased_until"]), **lease)
+            items.append(item)
+        return items
+
+    async def _last_calls(self, loan_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Latest call per loan."""
+        pipeline = [
+            {"$match": {"loan_id": {"$in": loan_ids}}},
+            {"$sort": {"loan_id": 1, "call_start_time": -1}},
+            {"$group": {
+                "_id": "$loan_id",
+                "called_at": {"$first": "$call_start_time"},
+                "call_status": {"$first": "$call_status"},
+                "follow_up_date": {"$first": "$follow_up_date"},
+            }},
+        ]
+        return {row["_id"]: row async for row in self.db.call_logs.aggregate(pipeline)}
+
+    async def _pending_promises(self, loan_ids: List[str]) -> Dict[str, datetime]:
+        """Earliest pending promise date per loan."""
+        pipeline = [
+            {"$match": {"loan_id": {"$in": loan_ids}, "status": PromiseStatus.PENDING.value}},
+            {"$group": {"_id": "$loan_id", "promised_date": {"$min": "$promised_date"}}},
+        ]
+        return {row["_id"]: row["promised_date"] async for row in self.db.promises_to_pay.aggregate(pipeline)}
+
+    async def _leases(self, loan_ids: List[str], now: datetime) -> Dict[str, Dict[str, Any]]:
+        """Unexpired leases on the loans' current items."""
+        return {
+            item["loan_id"]: {"leased_to": item["leased_to"], "leased_until": item["leased_until"]}
+            async for item in self.collection.find(
+                {"loan_id": {"$in": loan_ids}, "leased_until": {"$gt": now}},
+                {"_id": 0, "loan_id": 1, "leased_to": 1, "leased_until": 1},
+            )
+        }
+
+    async def _active_agents(self, branch_code: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        query: Dict[str, Any] = {"is_active": True}
+        if branch_code:
+            query["branch_code"] = branch_code
+        agents: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        async for agent in self.agents.find(query, {"_id": 0, "agent_id": 1, "branch_code": 1, "capacity": 1}):
+            agents[agent["branch_code"]].append(agent)
+        return agents
@@ -2,30 +2,100 @@
 Utility functions for the Stima Sacco Debt Management System.
 """
 
-from .auth import get_current_user, get_current_active_user, require_role
+from .auth import (
+    get_current_user,
+    get_current_active_user,
+    require_role,
+    user_from_token,
+    authenticate_token,
+    create_access_token,
+    decode_access_token,
+    secret_key_is_insecure,
+    hash_password,
+    verify_password,
+)
 from .exceptions import (
     StimaException,
     MemberNotFoundException,
     LoanNotFoundException,
     DuplicateMemberException,
+    ProbableDuplicateMemberException,
     InvalidLoanStatusException,
+    InvalidPromiseStatusException,
+    PromiseNotFoundException,
+    PartnerNotFoundException,
+    AssignmentNotFoundException,
+    NotificationNotFoundException,
+    SnapshotNotFoundException,
+    InvalidCredentialsException,
+    InsecureSecretKeyException,
+    BranchAccessDeniedException,
+    StatusConflictException,
+    InvalidIdempotencyKeyException,
+    IdempotencyKeyMismatchException,
+    IdempotencyKeyInProgressException,
     DatabaseConnectionException,
     ExternalServiceException,
+    ExternalServiceUnavailableException,
 )
-from .logging_config import setup_logging, get_logger
+from .logging_config import setup_logging, shutdown_logging, get_logger, get_logging_stats
+from .request_id import RequestIdMiddleware
+from .query_profiler import query_profiler, QueryProfilerMiddleware
+from .single_flight import single_flight, call_key
+from .admission_control import admission_controller, AdmissionControlMiddleware
+from .lazy_import import lazy_import
+from .startup_metrics import startup_timer
+from .token_cache import token_cache
+from .branch_scope import resolve_branch_scope, scope_query
 
 __all__ = [
     "get_current_user",
     "get_current_active_user",
     "require_role",
+    "user_from_token",
+    "authenticate_token",
+    "create_access_token",
+    "decode_access_token",
+    "secret_key_is_insecure",
+    "hash_password",
+    "verify_password",
     "StimaException",
     "MemberNotFoundException",
     "LoanNotFoundException",
     "DuplicateMemberException",
+    "ProbableDuplicateMemberException",
     "InvalidLoanStatusException",
+    "InvalidPromiseStatusException",
+    "PromiseNotFoundException",
+    "PartnerNotFoundException",
+    "AssignmentNotFoundException",
+    "NotificationNotFoundException",
+    "SnapshotNotFoundException",
+    "InvalidCredentialsException",
+    "InsecureSecretKeyException",
+    "BranchAccessDeniedException",
+    "StatusConflictException",
+    "InvalidIdempotencyKeyException",
+    "IdempotencyKeyMismatchException",
+    "IdempotencyKeyInProgressException",
     "DatabaseConnectionException",
     "ExternalServiceException",
+    "ExternalServiceUnavailableException",
     "setup_logging",
+    "shutdown_logging",
     "get_logger",
+    "get_logging_stats",
+    "RequestIdMiddleware",
+    "query_profiler",
+    "QueryProfilerMiddleware",
+    "single_flight",
+    "call_key",
+    "admission_controller",
+    "AdmissionControlMiddleware",
+    "lazy_import",
+    "startup_timer",
+    "token_cache",
+    "resolve_branch_scope",
+    "scope_query",
 ]
 
@@ -0,0 +1,293 @@
+"""
+Admission control: priority classes, per-class concurrency and per-user rate limits.
+
+Every request is classified by method and path into a priority class:
+
+- ``critical``: the agents' calling loop (logging calls and promises,
+  taking the next loan to dial)
+- ``interactive``: ordinary lookups and edits
+- ``reports``: dashboards, reports, searches and batch triggers
+
+Each class has its own concurrency limit on this worker, so a burst of
+reports can hold at most its own slots and never the slots that call
+logging needs. A request that finds its class full waits in that class's
+queue; it is shed with 503 once it has queued for longer than the class's
+queue budget, and arrivals are shed immediately while the head of the queue
+is already over budget (a standing queue only adds latency). ``reports``
+requests are also not admitted while ``critical`` requests are queuing.
+
+Each user (or client address, for unauthenticated requests) has a token
+bucket; report requests cost more tokens than the rest. An empty bucket
+gets 429. Every rejection carries ``Retry-After``.
+"""
+
+import asyncio
+import json
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Pattern, Tuple
+
+from ..config.settings import app_config
+from .auth import user_from_token
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CRITICAL = "critical"
+INTERACTIVE = "interactive"
+REPORTS = "reports"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# (methods or None for any, path pattern, class); the first match wins
+ROUTE_CLASSES: List[Tuple[Optional[set], Pattern, str]] = [
+    (WRITE_METHODS, re.compile(r"^/api/(calls|promises)(/|$)"), CRITICAL),
+    ({"GET"}, re.compile(r"^/api/(calls/auto-dial|worklists/next)$"), CRITICAL),
+    (None, re.compile(r"^/api/(reports|dashboard|events)(/|$)"), REPORTS),
+    (None, re.compile(r"^/api/partners/(statements|[^/]+/(statement|ledger))$"), REPORTS),
+    (None, re.compile(r"^/api/notes/search$"), REPORTS),
+    (WRITE_METHODS, re.compile(
+        r"^/api/(members/duplicates/scan|worklists/rebuild|escalations/run|follow-ups/recover"
+        r"|loans/status-transitions|promises/status-transitions)$"
+    ), REPORTS),
+]
+
+# Never limited: probes and API docs
+EXEMPT_PATHS = re.compile(r"^/(health|docs|redoc|openapi\.json)(/|$)")
+
+# Most clients whose token buckets are remembered
+MAX_TRACKED_CLIENTS = 100000
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Priority class for a request, or None if it is exempt from admission control."""
+    if method == "OPTIONS" or EXEMPT_PATHS.match(path):
+        return None
+    for methods, pattern, priority_class in ROUTE_CLASSES:
+        if (methods is None or method in methods) and pattern.match(path):
+            return priority_class
+    return INTERACTIVE
+
+
+class ClassLimiter:
+    """Concurrency slots and a FIFO wait queue for one priority class."""
+
+    def __init__(self, name: str, concurrency: int, max_queue_seconds: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue_seconds = max_queue_seconds
+        self.active = 0
+        self.waiters: Deque[Tuple[asyncio.Future, float]] = deque()
+        # Exponentially weighted mean time a request holds a slot
+        self.service_seconds = 0.05
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+
+    def has_waiters(self) -> bool:
+        while self.waiters and self.waiters[0][0].done():
+            self.waiters.popleft()
+        return bool(self.waiters)
+
+    def queue_age(self, now: float) -> float:
+        """How long the oldest waiter has been queued."""
+        return now - self.waiters[0][1] if self.has_waiters() else 0.0
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new arrival."""
+        backlog = (len(self.waiters) + 1) * self.service_seconds / max(self.concurrency, 1)
+        return max(1, math.ceil(backlog))
+
+    async def acquire(self) -> bool:
+        """Take a slot, queuing up to the class's budget; False if the request is shed."""
+        now = time.monotonic()
+        if self.active < self.concurrency and not self.has_waiters():
+            self.active += 1
+            self.admitted += 1
+            return True
+        if self.queue_age(now) > self.max_queue_seconds:
+            self.shed += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((future, now))
+        self.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_queue_seconds)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the wait expired
+                self.admitted += 1
+                return True
+            future.cancel()
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(0.0)
+            else:
+                future.cancel()
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self, held_seconds: float) -> None:
+        """Return a slot, handing it straight to the next waiter if there is one."""
+        if held_seconds:
+            self.service_seconds += 0.1 * (held_seconds - self.service_seconds)
+        while self.waiters:
+            future, _ = self.waiters.popleft()
+            if not future.done():
+                future.set_result(True)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "waiting": sum(1 for future, _ in self.waiters if not future.done()),
+            "queue_age_ms": round(self.queue_age(time.monotonic()) * 1000, 1),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "mean_service_ms": round(self.service_seconds * 1000, 1),
+        }
+
+
+class TokenBuckets:
+    """Per-client token buckets, least recently seen clients forgotten first."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.limited = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, client: str, cost: float) -> float:
+        """Spend ``cost`` tokens; returns 0 if allowed, else seconds until enough tokens refill."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+            self.limited += 1
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionController:
+    """Process-wide admission state shared by the middleware and the metrics route."""
+
+    def __init__(self):
+        self.enabled = app_config.ADMISSION_CONTROL_ENABLED
+        self.limiters = {
+            CRITICAL: ClassLimiter(
+                CRITICAL, app_config.ADMISSION_CRITICAL_CONCURRENCY, app_config.ADMISSION_CRITICAL_QUEUE_MS / 1000
+            ),
+            INTERACTIVE: ClassLimiter(
+                INTERACTIVE, app_config.ADMISSION_INTERACTIVE_CONCURRENCY, app_config.ADMISSION_INTERACTIVE_QUEUE_MS / 1000
+            ),
+            REPORTS: ClassLimiter(
+                REPORTS, app_config.ADMISSION_REPORTS_CONCURRENCY, app_config.ADMISSION_REPORTS_QUEUE_MS / 1000
+            ),
+        }
+        self.buckets = TokenBuckets(app_config.RATE_LIMIT_PER_SECOND, app_config.RATE_LIMIT_BURST)
+        self.costs = {CRITICAL: 1.0, INTERACTIVE: 1.0, REPORTS: app_config.RATE_LIMIT_REPORT_COST}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "classes": {name: limiter.stats() for name, limiter in self.limiters.items()},
+            "rate_limited": self.buckets.limited,
+            "tracked_clients": len(self.buckets),
+        }
+
+
+admission_controller = AdmissionController()
+
+
+def _client_id(scope) -> str:
+    """
+    Rate-limit identity: the authenticated user, else the client address.
+
+    Behind a proxy the server must take the address from ``X-Forwarded-For``
+    (nginx.conf and ``forwarded_allow_ips`` in gunicorn.conf.py), or every
+    anonymous caller shares the proxy's bucket.
+    """
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                user = user_from_token(token)
+                if user is not None:
+                    return f"user:{user['user_id']}"
+            break
+    client = scope.get("client")
+    return f"addr:{client[0]}" if client else "addr:unknown"
+
+
+async def _reject(send, status_code: int, error: str, message: str, retry_after: int) -> None:
+    body = json.dumps({"error": error, "message": message, "status_code": status_code}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying ``admission_controller`` to each HTTP request."""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.enabled:
+            await self.app(scope, receive, send)
+            return
+        priority_class = classify(scope["method"], scope["path"])
+        if priority_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        wait = controller.buckets.take(_client_id(scope), controller.costs[priority_class])
+        if wait:
+            await _reject(send, 429, "Too Many Requests", "Rate limit exceeded; slow down", math.ceil(wait))
+            return
+
+        limiter = controller.limiters[priority_class]
+        critical = controller.limiters[CRITICAL]
+        if priority_class == REPORTS and critical.has_waiters():
+            limiter.shed += 1
+            await _reject(send, 503, "Service Unavailable",
+                          "Busy with call logging; retry the report shortly", critical.retry_after())
+            return
+        if not await limiter.acquire():
+            logger.warning(f"Shed {scope['method']} {scope['path']} ({priority_class} queue over budget)")
+            await _reject(send, 503, "Service Unavailable", "Server busy; retry shortly", limiter.retry_after())
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - started)
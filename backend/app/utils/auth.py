@@ -1,14 +1,164 @@
 """
 Authentication utilities and dependencies.
+
+Access tokens are HS256 JWTs signed with ``SECRET_KEY`` (``sub`` is the
+user id, ``jti`` the token id used for revocation). A token is accepted if
+its signature and expiry are valid, it has not been revoked, and its user is
+active and has not had their tokens invalidated since it was issued. No
+token is issued or accepted while ``SECRET_KEY`` is a published value,
+unless ``ALLOW_INSECURE_SECRET_KEY`` is set for development. The
+verified user is then cached per token (``token_cache``), so the dependency
+and ``require_role`` cost a cache lookup on the hot path.
 """
 
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+import uuid
+from datetime import timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+
+import jwt
+
+from ..config.settings import INSECURE_SECRET_KEYS, app_config
+from .exceptions import InsecureSecretKeyException
+from .token_cache import token_cache, token_digest
 
 # Security scheme
 security = HTTPBearer()
 
+ALGORITHM = "HS256"
+
+PASSWORD_ITERATIONS = 260_000
+
+# User fields cached with a verified token and passed to the routes
+USER_PROJECTION = {"_id": 0, "user_id": 1, "username": 1, "name": 1, "role": 1, "branch_code": 1, "tokens_valid_after": 1}
+
+
+def hash_password(password: str) -> str:
+    """PBKDF2-SHA256 hash of a password, as ``pbkdf2_sha256$iterations$salt$hash``."""
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PASSWORD_ITERATIONS)
+    return f"pbkdf2_sha256${PASSWORD_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    try:
+        _, iterations, salt, expected = password_hash.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+def secret_key_is_insecure() -> bool:
+    """Whether tokens would be signed with a published key that is not explicitly allowed."""
+    return app_config.SECRET_KEY in INSECURE_SECRET_KEYS and not app_config.ALLOW_INSECURE_SECRET_KEY
+
+
+def create_access_token(user: Dict[str, Any], expires_minutes: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Issue an access token for a user.
+    
+    Returns:
+        The token and its lifetime in seconds
+        
+    Raises:
+        InsecureSecretKeyException: If SECRET_KEY is a published value
+    """
+    if secret_key_is_insecure():
+        raise InsecureSecretKeyException()
+    lifetime = (expires_minutes if expires_minutes is not None else app_config.ACCESS_TOKEN_EXPIRE_MINUTES) * 60
+    # Fractional, so a token issued just after a sign-out-everywhere is not caught by it
+    issued_at = time.time()
+    claims = {
+        "sub": user["user_id"],
+        "role": user["role"],
+        "iat": issued_at,
+        "exp": int(issued_at) + lifetime,
+        "jti": uuid.uuid4().hex,
+    }
+    return jwt.encode(claims, app_config.SECRET_KEY, algorithm=ALGORITHM), lifetime
+
+
+def decode_access_token(token: str, verify_exp: bool = True) -> Optional[Dict[str, Any]]:
+    """The claims of a correctly signed (and, by default, unexpired) token, or None."""
+    if secret_key_is_insecure():
+        return None
+    try:
+        return jwt.decode(
+            token,
+            app_config.SECRET_KEY,
+            algorithms=[ALGORITHM],
+            options={"require": ["sub", "iat", "exp", "jti"], "verify_exp": verify_exp},
+        )
+    except jwt.PyJWTError:
+        return None
+
+
+def user_from_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a bearer token to its user, or None if it is not valid.
+    
+    Used by the admission control middleware, which rate-limits per user
+    before routing and cannot await a user lookup: a cached token returns
+    its user, any other correctly signed token the identity it claims
+    (``user_id`` and ``role``). The request dependencies do the full check.
+    """
+    if not token:
+        return None
+    user = token_cache.get(token_digest(token))
+    if user is not None:
+        return user
+    claims = decode_access_token(token)
+    if claims is None:
+        return None
+    return {"user_id": claims["sub"], "role": claims.get("role")}
+
+
+async def authenticate_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    The user a token authenticates, or None if it is not valid.
+    
+    Verified tokens are cached until they expire, for at most
+    ``AUTH_TOKEN_CACHE_TTL_SECONDS``.
+    """
+    digest = token_digest(token)
+    user = token_cache.get(digest)
+    if user is not None:
+        return user
+    
+    claims = decode_access_token(token)
+    if claims is None:
+        return None
+    user = await _load_user(claims)
+    if user is None:
+        return None
+    token_cache.put(digest, user, claims["exp"])
+    return user
+
+
+async def _load_user(claims: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The active user named by verified claims, unless the token was revoked."""
+    # Imported here: app.config.database imports app.utils
+    from ..config.database import get_database
+    
+    db = get_database()
+    revoked, record = await asyncio.gather(
+        db.revoked_tokens.find_one({"jti": claims["jti"]}, {"_id": 1}),
+        db.users.find_one({"user_id": claims["sub"], "is_active": True}, USER_PROJECTION),
+    )
+    if revoked is not None or record is None:
+        return None
+    valid_after = record.pop("tokens_valid_after", None)
+    if valid_after is not None and claims["iat"] < valid_after.replace(tzinfo=timezone.utc).timestamp():
+        return None
+    return record
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -16,36 +166,24 @@ async def get_current_user(
     """
     Get current authenticated user.
     
-    In a production system, this would validate JWT tokens and return user info.
-    For demo purposes, we return a mock user.
+    Raises:
+        HTTPException: 401 if the token is invalid, expired or revoked, or
+            its user is inactive
     """
-    # In a real system, you would:
-    # 1. Decode and validate the JWT token
-    # 2. Check token expiration
-    # 3. Retrieve user information from database
-    # 4. Handle token refresh if needed
-    
-    if not credentials.credentials:
+    user = await authenticate_token(credentials.credentials)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    # Mock user for demo purposes
-    return {
-        "user_id": "demo_user",
-        "name": "Demo Agent",
-        "role": "agent",
-        "branch_code": "001"
-    }
+    return user
 
 
 async def get_current_active_user(
     current_user: Dict[str, Any] = Depends(get_current_user)
 ) -> Dict[str, Any]:
-    """Get current active user (additional validation can be added here)."""
-    # Add any additional user validation logic here
+    """Get current active user (inactive users are rejected when their token is verified)."""
     return current_user
 
 
@@ -53,6 +191,9 @@ def require_role(required_role: str):
     """
     Dependency factory to require specific user roles.
     
+    The role is read from the user cached with the verified token, so the
+    check makes no lookup.
+    
     Args:
         required_role: The role required to access the endpoint
         
@@ -0,0 +1,67 @@
+"""
+Branch scoping of member, loan and report queries.
+
+Members and loans carry the ``branch_code`` of the branch that owns them,
+and the calls, promises and partner assignments made on a loan copy it.
+A user with a branch (other than an admin) works only that branch's
+records; admins and head-office users (no branch) see every branch and may
+narrow to one. Services resolve the scope once from the user and put
+``branch_code`` first in their filters, which is the leading field of the
+branch indexes and of the shard keys (see ``config.indexes``), so a
+branch's queries read only that branch's index range or shards.
+"""
+
+from typing import Any, Dict, Optional
+
+from ..config.settings import app_config
+from .exceptions import BranchAccessDeniedException
+
+# Roles that see every branch whatever branch their user record names
+ALL_BRANCH_ROLES = frozenset({"admin"})
+
+
+def resolve_branch_scope(
+    user: Optional[Dict[str, Any]], branch_code: Optional[str] = None
+) -> Optional[str]:
+    """
+    The branch a user's queries are limited to, or None for all branches.
+
+    Args:
+        user: The current user; None for internal callers (jobs, other services)
+        branch_code: Branch asked for by the caller, if any
+
+    Raises:
+        BranchAccessDeniedException: If a branch user asks for another branch
+    """
+    if user is None or not app_config.BRANCH_SCOPING_ENABLED:
+        return branch_code
+    own_branch = user.get("branch_code")
+    if not own_branch or user.get("role") in ALL_BRANCH_ROLES:
+        return branch_code
+    if branch_code is not None and branch_code != own_branch:
+        raise BranchAccessDeniedException(branch_code)
+    return own_branch
+
+
+def scope_query(query: Dict[str, Any], branch_code: Optional[str]) -> Dict[str, Any]:
+    """A query limited to one branch (unchanged when ``branch_code`` is None)."""
+    if branch_code is None:
+        return query
+    return {"branch_code": branch_code, **query}
+
+
+async def loan_branch_code(db, loan_id: str) -> Optional[str]:
+    """The branch of a loan, copied onto the calls, promises and assignments made on it."""
+    loan = await db.loan_accounts.find_one({"id": loan_id}, {"_id": 0, "branch_code": 1})
+    return loan.get("branch_code") if loan else None
+
+
+def check_branch(branch_code: Optional[str], scope: Optional[str]) -> None:
+    """
+    Reject a write of a record to a branch outside the scope.
+
+    Raises:
+        BranchAccessDeniedException: If the scope is one branch and ``branch_code`` is another
+    """
+    if scope is not None and branch_code != scope:
+        raise BranchAccessDeniedException(branch_code or "(none)")
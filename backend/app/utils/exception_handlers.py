@@ -7,6 +7,7 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import logging
+import math
 
 from ..utils.exceptions import StimaException
 
@@ -16,13 +17,15 @@ logger = logging.getLogger(__name__)
 async def stima_exception_handler(request: Request, exc: StimaException):
     """Handle custom Stima exceptions."""
     logger.error(f"Stima exception: {exc.message}")
+    retry_after = getattr(exc, "retry_after", 0)
     return JSONResponse(
         status_code=exc.status_code,
         content={
             "error": "Application Error",
             "message": exc.message,
             "status_code": exc.status_code
-        }
+        },
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after else None
     )
 
 
@@ -33,8 +33,19 @@ class LoanNotFoundException(StimaException):
 class DuplicateMemberException(StimaException):
     """Exception raised when attempting to create a duplicate member."""
     
-    def __init__(self, member_number: str):
-        message = f"Member with number {member_number} already exists"
+    def __init__(self, value: str, field: str = "number"):
+        message = f"Member with {field} {value} already exists"
+        super().__init__(message, status.HTTP_409_CONFLICT)
+
+
+class ProbableDuplicateMemberException(StimaException):
+    """Exception raised when a new member probably duplicates existing members."""
+    
+    def __init__(self, member_numbers: list):
+        message = (
+            f"Member probably already exists as {', '.join(member_numbers)}; "
+            "resubmit with force=true to create anyway"
+        )
         super().__init__(message, status.HTTP_409_CONFLICT)
 
 
@@ -46,6 +57,111 @@ class InvalidLoanStatusException(StimaException):
         super().__init__(message, status.HTTP_400_BAD_REQUEST)
 
 
+class InvalidPromiseStatusException(StimaException):
+    """Exception raised when an invalid promise status transition is attempted."""
+    
+    def __init__(self, current_status: str, new_status: str):
+        message = f"Cannot change promise status from {current_status} to {new_status}"
+        super().__init__(message, status.HTTP_400_BAD_REQUEST)
+
+
+class PromiseNotFoundException(StimaException):
+    """Exception raised when a promise to pay is not found."""
+    
+    def __init__(self, promise_id: str):
+        message = f"Promise with ID {promise_id} not found"
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class PartnerNotFoundException(StimaException):
+    """Exception raised when an external partner is not found."""
+    
+    def __init__(self, partner_id: str):
+        message = f"Partner with ID {partner_id} not found"
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class AssignmentNotFoundException(StimaException):
+    """Exception raised when a partner assignment is not found."""
+    
+    def __init__(self, assignment_id: str):
+        message = f"Partner assignment with ID {assignment_id} not found"
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class NotificationNotFoundException(StimaException):
+    """Exception raised when a notification is not found."""
+    
+    def __init__(self, notification_id: str):
+        message = f"Notification with ID {notification_id} not found"
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class SnapshotNotFoundException(StimaException):
+    """Exception raised when no balance snapshot was taken on or before a date."""
+    
+    def __init__(self, as_of: str):
+        message = f"No balance snapshot on or before {as_of}"
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class InvalidCredentialsException(StimaException):
+    """Exception raised when a login's username or password is wrong."""
+    
+    def __init__(self):
+        super().__init__("Invalid username or password", status.HTTP_401_UNAUTHORIZED)
+
+
+class InsecureSecretKeyException(StimaException):
+    """Exception raised when tokens would be signed with a public SECRET_KEY."""
+    
+    def __init__(self):
+        super().__init__(
+            "SECRET_KEY is not set to a private value; access tokens are disabled",
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+class BranchAccessDeniedException(StimaException):
+    """Exception raised when a branch user reads or writes another branch's records."""
+    
+    def __init__(self, branch_code: str):
+        message = f"Access to branch {branch_code} is not allowed for this user"
+        super().__init__(message, status.HTTP_403_FORBIDDEN)
+
+
+class StatusConflictException(StimaException):
+    """Exception raised when a record's status changed while a transition was applied."""
+    
+    def __init__(self, entity: str, entity_id: str):
+        message = f"Status of {entity} {entity_id} changed concurrently; retry the transition"
+        super().__init__(message, status.HTTP_409_CONFLICT)
+
+
+class InvalidIdempotencyKeyException(StimaException):
+    """Exception raised when an Idempotency-Key header is malformed."""
+    
+    def __init__(self, key: str):
+        message = f"Invalid Idempotency-Key {key[:64]!r}: use 1-255 printable ASCII characters"
+        super().__init__(message, status.HTTP_400_BAD_REQUEST)
+
+
+class IdempotencyKeyMismatchException(StimaException):
+    """Exception raised when an idempotency key is reused for a different request."""
+    
+    def __init__(self, key: str):
+        message = f"Idempotency-Key {key} was already used with a different request body"
+        super().__init__(message, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+class IdempotencyKeyInProgressException(StimaException):
+    """Exception raised when the original request for an idempotency key is still running."""
+    
+    def __init__(self, key: str):
+        message = f"Request with Idempotency-Key {key} is still being processed; retry shortly"
+        super().__init__(message, status.HTTP_409_CONFLICT)
+
+
 class DatabaseConnectionException(StimaException):
     """Exception raised when database connection fails."""
     
@@ -61,3 +177,11 @@ class ExternalServiceException(StimaException):
         message = f"External service {service_name} error: {error_message}"
         super().__init__(message, status.HTTP_502_BAD_GATEWAY)
 
+
+class ExternalServiceUnavailableException(StimaException):
+    """Exception raised when an external service is not being called (circuit open or at capacity)."""
+    
+    def __init__(self, service_name: str, reason: str, retry_after: float = 0):
+        message = f"External service {service_name} unavailable: {reason}"
+        self.retry_after = retry_after
+        super().__init__(message, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,37 @@
+"""
+Deferred imports for heavy modules that are not needed to serve requests.
+
+``np = lazy_import("numpy")`` binds a stand-in module that imports numpy on
+its first attribute access, so importing a service that only uses numpy
+inside its functions (batch recomputes, seeding) does not add numpy's import
+time to API cold start. Modules using a lazy import for type annotations need
+``from __future__ import annotations`` so the annotations are not evaluated
+at import time.
+"""
+
+import importlib
+import sys
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Module stand-in that imports the real module on first attribute access."""
+
+    def __getattr__(self, attribute: str):
+        module = self.__dict__.get("_module")
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return getattr(module, attribute)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__.get("_module") is not None
+
+
+def lazy_import(name: str) -> ModuleType:
+    """The module if it is already imported, otherwise a ``LazyModule`` for it."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
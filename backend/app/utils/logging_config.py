@@ -1,63 +1,203 @@
 """
 Logging configuration and utilities.
+
+Log records are handed to a bounded in-memory queue on the calling thread
+and written to stdout/file by a background ``QueueListener`` thread, so a
+log call on the request path never blocks the event loop on I/O. Output is
+structured JSON (or plain text for local development), every record carries
+the current request id, and high-volume INFO/DEBUG logs can be sampled.
 """
 
+import atexit
+import contextvars
+import copy
 import logging
+import queue
+import random
 import sys
+import threading
+import zlib
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from datetime import datetime
+from typing import Optional
+
+from pythonjsonlogger import jsonlogger
+
+# Request id of the request currently being served (set by RequestIdMiddleware)
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+_sampling_filter: Optional["SamplingFilter"] = None
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that never blocks: records are dropped (and counted) when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message now so later mutation of args cannot change it,
+        # but leave exception formatting to the listener thread.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request id to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Sample INFO and DEBUG records at a fixed rate.
+
+    Sampling is keyed on the request id, so a sampled request keeps all of
+    its log lines. Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.sample_rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            keep = (zlib.crc32(request_id.encode()) % 10000) < self.sample_rate * 10000
+        else:
+            keep = random.random() < self.sample_rate
+        if not keep:
+            self.sampled_out += 1
+        return keep
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    """Create the output formatter for the requested format."""
+    if log_format == "json":
+        return jsonlogger.JsonFormatter(
+            fmt="%(asctime)s %(levelname)s %(name)s %(message)s %(request_id)s",
+            datefmt="%Y-%m-%dT%H:%M:%S",
+            rename_fields={"asctime": "timestamp", "levelname": "level", "name": "logger"},
+        )
+    return logging.Formatter(
+        fmt='%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
 
 
-def setup_logging(log_level: str = "INFO", log_file: str = None):
+def setup_logging(
+    log_level: str = "INFO",
+    log_file: str = None,
+    log_format: str = "json",
+    queue_size: int = 10000,
+    info_sample_rate: float = 1.0,
+):
     """
     Set up logging configuration for the application.
-    
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional log file path
+        log_format: Output format, "json" or "text"
+        queue_size: Maximum number of records buffered before dropping
+        info_sample_rate: Fraction of INFO/DEBUG records to keep (0.0-1.0)
     """
-    # Create formatter
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+    global _listener, _queue_handler, _sampling_filter
+
+    shutdown_logging()
+
+    formatter = _build_formatter(log_format)
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper()))
-    
+
     # Remove existing handlers
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
-    
-    # Console handler
+
+    # Output handlers run on the listener thread, off the event loop
+    output_handlers = []
+
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
-    
+    output_handlers.append(console_handler)
+
     # File handler (optional)
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        
+
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
-    
+        output_handlers.append(file_handler)
+
+    # Non-blocking queue handler on the root logger
+    _sampling_filter = SamplingFilter(info_sample_rate)
+    _queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size))
+    _queue_handler.addFilter(RequestContextFilter())
+    _queue_handler.addFilter(_sampling_filter)
+    root_logger.addHandler(_queue_handler)
+
+    _listener = QueueListener(_queue_handler.queue, *output_handlers, respect_handler_level=True)
+    _listener.start()
+
     # Set specific logger levels
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
     logging.getLogger("motor").setLevel(logging.WARNING)
 
 
+def shutdown_logging():
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logging_stats() -> dict:
+    """Get queue depth and drop/sampling counters for the logging pipeline."""
+    if _queue_handler is None:
+        return {"queued": 0, "capacity": 0, "dropped": 0, "sampled_out": 0}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "capacity": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped,
+        "sampled_out": _sampling_filter.sampled_out if _sampling_filter else 0,
+    }
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance with the specified name.
-    
+
     Args:
         name: Logger name (usually __name__)
-        
+
     Returns:
         Logger instance
     """
     return logging.getLogger(name)
 
+
+atexit.register(shutdown_logging)
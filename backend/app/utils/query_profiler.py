@@ -0,0 +1,304 @@
+"""
+MongoDB query profiling and slow-query logging.
+
+A pymongo ``CommandListener`` records every command issued by the Motor
+client. Commands issued while serving an HTTP request are collected into a
+per-request trace (Motor copies the request's context into its executor
+threads, so a ``ContextVar`` is enough to correlate them). Commands slower
+than ``SLOW_QUERY_THRESHOLD_MS`` are logged together with their ``explain``
+plan, and a debug request header returns the full trace inline.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pymongo import monitoring
+
+from ..config.settings import app_config
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Commands worth profiling; handshake/heartbeat/session traffic is ignored.
+PROFILED_COMMANDS = {
+    "find",
+    "getMore",
+    "aggregate",
+    "count",
+    "distinct",
+    "insert",
+    "update",
+    "delete",
+    "findAndModify",
+}
+
+# Commands the server can explain with executionStats verbosity.
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+# Driver-added fields that must be stripped before re-issuing a command as explain.
+_DRIVER_FIELDS = {
+    "lsid",
+    "$db",
+    "$clusterTime",
+    "$readPreference",
+    "txnNumber",
+    "autocommit",
+    "startTransaction",
+    "readConcern",
+    "writeConcern",
+    "cursor",
+}
+
+_current_trace: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar(
+    "query_trace", default=None
+)
+
+
+def query_shape(value: Any) -> Any:
+    """
+    Reduce a filter, update or pipeline to its shape.
+
+    Field names and operators are kept, literal values are replaced with
+    ``"?"`` so traces can be grouped and logged without leaking member data.
+    """
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, (dict, list, tuple)) for item in value):
+            return [query_shape(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def _command_shape(command_name: str, command: Dict[str, Any]) -> Any:
+    """Extract the filter shape from a command document."""
+    if command_name == "find":
+        return query_shape(command.get("filter", {}))
+    if command_name == "aggregate":
+        return query_shape(command.get("pipeline", []))
+    if command_name in ("count", "distinct", "findAndModify"):
+        return query_shape(command.get("query", {}))
+    if command_name == "update":
+        return [query_shape(update.get("q", {})) for update in command.get("updates", [])[:1]]
+    if command_name == "delete":
+        return [query_shape(delete.get("q", {})) for delete in command.get("deletes", [])[:1]]
+    if command_name == "insert":
+        return {"documents": len(command.get("documents", []))}
+    return None
+
+
+def _docs_returned(command_name: str, reply: Dict[str, Any]) -> Optional[int]:
+    """Count the documents returned (or written) by a command reply."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        if batch is not None:
+            return len(batch)
+    if command_name == "distinct":
+        return len(reply.get("values", []))
+    if "n" in reply:
+        return reply["n"]
+    return None
+
+
+def _find_execution_stats(explain: Any) -> Optional[Dict[str, Any]]:
+    """Locate the executionStats section in an explain result of any shape."""
+    if isinstance(explain, dict):
+        stats = explain.get("executionStats")
+        if isinstance(stats, dict):
+            return stats
+        for item in explain.values():
+            found = _find_execution_stats(item)
+            if found:
+                return found
+    elif isinstance(explain, list):
+        for item in explain:
+            found = _find_execution_stats(item)
+            if found:
+                return found
+    return None
+
+
+def _winning_stage(explain: Any) -> Optional[str]:
+    """Summarise the winning plan as a chain of stage names (e.g. FETCH>IXSCAN)."""
+    if isinstance(explain, dict):
+        plan = explain.get("winningPlan")
+        if isinstance(plan, dict):
+            plan = plan.get("queryPlan", plan)
+            stages = []
+            while isinstance(plan, dict):
+                if "stage" in plan:
+                    stages.append(plan["stage"])
+                plan = plan.get("inputStage")
+            return ">".join(stages) or None
+        for item in explain.values():
+            found = _winning_stage(item)
+            if found:
+                return found
+    elif isinstance(explain, list):
+        for item in explain:
+            found = _winning_stage(item)
+            if found:
+                return found
+    return None
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Command listener collecting per-request traces and flagging slow queries."""
+
+    def __init__(self, slow_query_threshold_ms: float = 100.0):
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.slow_query_count = 0
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name not in PROFILED_COMMANDS:
+            return
+        command = event.command
+        collection_key = "collection" if event.command_name == "getMore" else event.command_name
+        entry = {
+            "command": event.command_name,
+            "collection": command.get(collection_key),
+            "database": event.database_name,
+            "filter": _command_shape(event.command_name, command),
+            "duration_ms": None,
+            "docs_examined": None,
+            "docs_returned": None,
+            "plan": None,
+            "_command": command if event.command_name in EXPLAINABLE_COMMANDS else None,
+            "_trace": _current_trace.get(),
+        }
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = entry
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        entry = self._pop(event)
+        if entry is None:
+            return
+        entry["docs_returned"] = _docs_returned(event.command_name, event.reply)
+        self._finish(entry, event.duration_micros)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        entry = self._pop(event)
+        if entry is None:
+            return
+        failure = event.failure
+        entry["error"] = str(failure.get("errmsg", "")) if isinstance(failure, dict) else str(failure)
+        self._finish(entry, event.duration_micros)
+
+    def _pop(self, event) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), None)
+
+    def _finish(self, entry: Dict[str, Any], duration_micros: int) -> None:
+        entry["duration_ms"] = round(duration_micros / 1000, 3)
+        entry["slow"] = entry["duration_ms"] >= self.slow_query_threshold_ms
+        trace = entry.pop("_trace")
+        if trace is not None:
+            trace.append(entry)
+            return
+        # Outside a request (startup, batch jobs): log immediately, no explain.
+        if entry["slow"]:
+            self.slow_query_count += 1
+            logger.warning(f"Slow query: {json.dumps(public_entry(entry), default=str)}")
+
+
+@contextlib.contextmanager
+def query_trace() -> Iterator[List[Dict[str, Any]]]:
+    """Collect the commands issued inside the block, as a request's trace (for jobs and benchmarks)."""
+    trace: List[Dict[str, Any]] = []
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def public_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip private bookkeeping fields from a trace entry."""
+    return {key: value for key, value in entry.items() if not key.startswith("_")}
+
+
+async def explain_entry(client, entry: Dict[str, Any]) -> None:
+    """Run ``explain`` for a traced command and record docs examined and plan."""
+    command = entry.get("_command")
+    if not command:
+        return
+    explained = {key: value for key, value in command.items() if key not in _DRIVER_FIELDS}
+    try:
+        result = await client[entry["database"]].command(
+            {"explain": explained, "verbosity": "executionStats"}
+        )
+    except Exception as e:
+        entry["plan"] = f"explain failed: {e}"
+        return
+    stats = _find_execution_stats(result) or {}
+    entry["docs_examined"] = stats.get("totalDocsExamined")
+    entry["keys_examined"] = stats.get("totalKeysExamined")
+    entry["plan"] = _winning_stage(result)
+
+
+# Global profiler instance registered on every Motor client
+query_profiler = QueryProfiler(app_config.SLOW_QUERY_THRESHOLD_MS)
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware that opens a query trace for each HTTP request.
+
+    Slow commands are explained and logged once the response has been sent.
+    When the request carries the ``X-Query-Trace`` header (and tracing is
+    enabled in configuration), every command is explained before the
+    response starts and the trace is returned in the ``X-Query-Trace``
+    response header.
+    """
+
+    header_name = b"x-query-trace"
+
+    def __init__(self, app, client_provider: Callable[[], Any], debug_header_enabled: bool = False):
+        self.app = app
+        self.client_provider = client_provider
+        self.debug_header_enabled = debug_header_enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace: List[Dict[str, Any]] = []
+        token = _current_trace.set(trace)
+        debug = self.debug_header_enabled and any(
+            name == self.header_name for name, _ in scope.get("headers", [])
+        )
+
+        async def send_with_trace(message):
+            if debug and message["type"] == "http.response.start":
+                await asyncio.gather(*(explain_entry(self.client_provider(), entry) for entry in trace))
+                payload = json.dumps([public_entry(entry) for entry in trace], default=str)
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (self.header_name, payload.encode("latin-1", "replace"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            _current_trace.reset(token)
+            slow = [entry for entry in trace if entry.get("slow")]
+            if slow:
+                asyncio.ensure_future(self._log_slow_queries(scope.get("path", ""), slow, explained=debug))
+
+    async def _log_slow_queries(self, path: str, entries: List[Dict[str, Any]], explained: bool) -> None:
+        """Explain and log slow commands issued while serving a request."""
+        client = self.client_provider()
+        for entry in entries:
+            if app_config.SLOW_QUERY_EXPLAIN and not explained:
+                await explain_entry(client, entry)
+            query_profiler.slow_query_count += 1
+            logger.warning(f"Slow query on {path}: {json.dumps(public_entry(entry), default=str)}")
@@ -0,0 +1,55 @@
+"""
+Request id correlation middleware.
+"""
+
+import re
+import uuid
+
+from .logging_config import request_id_var
+
+# Accept caller-supplied ids only if they are short and header-safe
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware binding a request id to the request context.
+
+    The id is taken from the incoming ``X-Request-ID`` header (for example
+    one set by nginx or the frontend) or generated, made available to log
+    records through ``request_id_var`` and echoed on the response.
+    """
+
+    header_name = b"x-request-id"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == self.header_name:
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (self.header_name, request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,109 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When many callers ask for the same result at once (every agent opening the
+dashboard at shift start), only the first runs the query; the others await
+the same in-flight call and share its result, so N concurrent callers cost
+one database round trip. Nothing is cached: once the call completes, the
+next caller runs the query again.
+
+Calls are identified by a namespace plus the normalized query parameters.
+``SINGLE_FLIGHT_SCOPE`` adds the caller's branch and/or role to the key for
+results that must not be shared across those boundaries.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from ..config.settings import app_config
+
+# User attributes added to call keys for each SINGLE_FLIGHT_SCOPE setting
+SCOPE_FIELDS = {
+    "global": (),
+    "branch": ("branch_code",),
+    "role": ("role",),
+    "branch_role": ("branch_code", "role"),
+}
+
+
+def call_key(namespace: str, params: Optional[Dict[str, Any]] = None, user: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Normalized key for a call: parameters are order-insensitive and ``None``
+    values are dropped, so equivalent queries coalesce.
+    """
+    scoped = {key: value for key, value in (params or {}).items() if value is not None}
+    if user is not None:
+        for field in SCOPE_FIELDS.get(app_config.SINGLE_FLIGHT_SCOPE, ()):
+            scoped[f"_{field}"] = user.get(field)
+    return f"{namespace}:{json.dumps(scoped, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls with the same key within one event loop."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``call`` unless a call with the same key is already in flight, in
+        which case wait for that one and return its result (or raise its error).
+        """
+        stats = self._namespace_stats(key)
+        stats["calls"] += 1
+        if not self.enabled:
+            stats["executions"] += 1
+            return await call()
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            stats["executions"] += 1
+            # Run in its own task so cancelling the caller that started it
+            # (a client disconnect) neither cancels nor fails the other waiters
+            inflight = self._inflight[key] = asyncio.ensure_future(call())
+            inflight.add_done_callback(lambda task: self._finished(key, task, stats))
+        else:
+            stats["coalesced"] += 1
+        # Shielded so a cancelled waiter does not cancel the shared call
+        return await asyncio.shield(inflight)
+
+    def _finished(self, key: str, task: asyncio.Future, stats: Dict[str, int]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieving the error also keeps asyncio from logging it when every waiter has gone
+        if task.cancelled() or task.exception() is not None:
+            stats["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-namespace call counts and the share of calls served by another caller's query."""
+        totals = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+        namespaces = {}
+        for namespace, counts in self._stats.items():
+            namespaces[namespace] = {**counts, "coalescing_ratio": _ratio(counts)}
+            for name in totals:
+                totals[name] += counts[name]
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._inflight),
+            **totals,
+            "coalescing_ratio": _ratio(totals),
+            "namespaces": namespaces,
+        }
+
+    def _namespace_stats(self, key: str) -> Dict[str, int]:
+        namespace = key.split(":", 1)[0]
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+        return stats
+
+
+def _ratio(counts: Dict[str, int]) -> float:
+    return round(counts["coalesced"] / counts["calls"], 4) if counts["calls"] else 0.0
+
+
+# Process-wide coalescer used by the services
+single_flight = SingleFlight(enabled=app_config.SINGLE_FLIGHT_ENABLED)
@@ -0,0 +1,49 @@
+"""
+Startup timing for this process.
+
+``main`` marks when it starts importing, when the application object is
+built and when the startup event has finished; ``/system/metrics`` reports
+the phases so a cold-start regression shows up next to the other
+operational metrics. ``benchmarks/startup.py`` measures the import phase
+offline with ``-X importtime``.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+
+class StartupTimer:
+    """Durations of the startup phases of this process (seconds)."""
+
+    def __init__(self):
+        self.import_started: Optional[float] = None
+        self.app_built: Optional[float] = None
+        self.startup_started: Optional[float] = None
+        self.ready: Optional[float] = None
+
+    def mark_imported(self, import_started: float) -> None:
+        """Record the application object as built (``import_started`` from ``time.perf_counter``)."""
+        self.import_started = import_started
+        self.app_built = time.perf_counter()
+
+    def mark_startup_started(self) -> None:
+        self.startup_started = time.perf_counter()
+
+    def mark_ready(self) -> None:
+        self.ready = time.perf_counter()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "import_seconds": _elapsed(self.import_started, self.app_built),
+            "startup_event_seconds": _elapsed(self.startup_started, self.ready),
+            "ready_seconds": _elapsed(self.import_started, self.ready),
+        }
+
+
+def _elapsed(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round(end - start, 4)
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,135 @@
+"""
+Hierarchical timer wheel.
+
+Timers are kept in a few levels of slot rings, each level's slots spanning a
+whole turn of the level below (seconds, minutes, hours with the default
+sizes). Scheduling and cancelling are O(1); advancing the clock costs O(1)
+per tick plus the timers that expire or cascade down a level. Only timers
+within the wheel's horizon are accepted and the number held is capped, so
+memory stays bounded however many timers exist in the backing store.
+"""
+
+import math
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+
+class TimerWheel:
+    """Hierarchical timer wheel keyed by caller-supplied timer keys."""
+
+    def __init__(self, tick_seconds: float = 1.0, wheel_sizes: Sequence[int] = (60, 60, 24), max_timers: int = 100000):
+        self.tick_seconds = tick_seconds
+        self.wheel_sizes = list(wheel_sizes)
+        self.max_timers = max_timers
+        # Ticks covered by one slot of each level
+        self._spans = [math.prod(self.wheel_sizes[:level]) for level in range(len(self.wheel_sizes))]
+        self._slots: List[List[Dict[Hashable, Tuple[int, Any]]]] = [
+            [{} for _ in range(size)] for size in self.wheel_sizes
+        ]
+        self._locations: Dict[Hashable, Tuple[int, int]] = {}
+        self._current_tick = 0
+        self._started = False
+
+    @property
+    def horizon_seconds(self) -> float:
+        """How far ahead of the current time timers can be scheduled."""
+        return self._spans[-1] * self.wheel_sizes[-1] * self.tick_seconds
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._locations
+
+    def start(self, now: float) -> None:
+        """Set the wheel's clock (seconds since the epoch)."""
+        self._current_tick = self._tick(now)
+        self._started = True
+
+    def schedule(self, key: Hashable, due: float, payload: Any = None) -> bool:
+        """
+        Add or move a timer.
+
+        Returns:
+            False if the timer is beyond the horizon or the wheel is full
+        """
+        # Timers already due fire on the next tick
+        tick = max(math.ceil(due / self.tick_seconds), self._current_tick + 1)
+        delta = tick - self._current_tick
+        if delta >= self._spans[-1] * self.wheel_sizes[-1]:
+            return False
+        if key in self._locations:
+            self.cancel(key)
+        elif len(self._locations) >= self.max_timers:
+            return False
+        self._place(key, tick, payload)
+        return True
+
+    def cancel(self, key: Hashable) -> bool:
+        """Remove a timer; returns whether it was scheduled."""
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+        level, slot = location
+        del self._slots[level][slot][key]
+        return True
+
+    def advance(self, now: float) -> List[Tuple[Hashable, Any]]:
+        """
+        Move the clock to ``now`` and return the ``(key, payload)`` of expired timers.
+
+        A jump longer than the horizon (a stalled process) expires what is due
+        and re-places the rest instead of stepping through every tick.
+        """
+        target = self._tick(now)
+        if not self._started:
+            self.start(now)
+        expired: List[Tuple[Hashable, Any]] = []
+        if target - self._current_tick >= self._spans[-1] * self.wheel_sizes[-1]:
+            timers = self._drain()
+            self._current_tick = target
+            for key, (tick, payload) in timers.items():
+                if tick <= target:
+                    expired.append((key, payload))
+                else:
+                    self._place(key, tick, payload)
+            return expired
+
+        while self._current_tick < target:
+            self._current_tick += 1
+            # Cascade higher levels whose slot boundary was reached, top down
+            for level in range(len(self.wheel_sizes) - 1, 0, -1):
+                if self._current_tick % self._spans[level] == 0:
+                    self._cascade(level, (self._current_tick // self._spans[level]) % self.wheel_sizes[level])
+            slot = self._slots[0][self._current_tick % self.wheel_sizes[0]]
+            for key in [key for key, (tick, _) in slot.items() if tick <= self._current_tick]:
+                _, payload = slot.pop(key)
+                del self._locations[key]
+                expired.append((key, payload))
+        return expired
+
+    def _tick(self, moment: float) -> int:
+        return math.floor(moment / self.tick_seconds)
+
+    def _place(self, key: Hashable, tick: int, payload: Any) -> None:
+        delta = tick - self._current_tick
+        level = 0
+        while level < len(self.wheel_sizes) - 1 and delta >= self._spans[level + 1]:
+            level += 1
+        slot = (tick // self._spans[level]) % self.wheel_sizes[level]
+        self._slots[level][slot][key] = (tick, payload)
+        self._locations[key] = (level, slot)
+
+    def _cascade(self, level: int, slot: int) -> None:
+        timers = self._slots[level][slot]
+        self._slots[level][slot] = {}
+        for key, (tick, payload) in timers.items():
+            self._place(key, tick, payload)
+
+    def _drain(self) -> Dict[Hashable, Tuple[int, Any]]:
+        timers: Dict[Hashable, Tuple[int, Any]] = {}
+        for level in self._slots:
+            for slot in level:
+                timers.update(slot)
+                slot.clear()
+        self._locations.clear()
+        return timers
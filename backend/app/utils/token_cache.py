@@ -0,0 +1,89 @@
+"""
+Per-worker cache of verified access tokens.
+
+Verifying a token means checking its signature and then loading the user it
+names (active, role, branch, not revoked). Every request carries a token and
+dashboards poll, so a verified token's user is kept in a bounded LRU cache
+keyed by the SHA-256 digest of the token (the raw token is never stored).
+A cache hit costs a hash and a dictionary lookup.
+
+An entry lives until the token expires or ``AUTH_TOKEN_CACHE_TTL_SECONDS``
+have passed, whichever is first, so a revocation made in another worker
+(logout, deactivation, role change) is seen there within that TTL; the
+worker that revokes evicts its own entries at once.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..config.settings import app_config
+
+
+def token_digest(token: str) -> bytes:
+    """Cache key for a token."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified tokens and their users."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # digest -> (expires_at epoch seconds, user)
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, digest: bytes) -> Optional[Dict[str, Any]]:
+        """The cached user for a token digest, or None if absent or expired."""
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.time():
+            del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return user
+
+    def put(self, digest: bytes, user: Dict[str, Any], token_expires_at: float) -> None:
+        """Cache a verified token's user until the token expires or the TTL passes."""
+        if self.max_size <= 0:
+            return
+        self._entries[digest] = (min(token_expires_at, time.time() + self.ttl_seconds), user)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def evict(self, digest: bytes) -> None:
+        self._entries.pop(digest, None)
+
+    def evict_user(self, user_id: str) -> int:
+        """Drop every cached token of a user; returns how many were dropped."""
+        digests = [digest for digest, (_, user) in self._entries.items() if user["user_id"] == user_id]
+        for digest in digests:
+            del self._entries[digest]
+        return len(digests)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+token_cache = VerifiedTokenCache(app_config.AUTH_TOKEN_CACHE_SIZE, app_config.AUTH_TOKEN_CACHE_TTL_SECONDS)
@@ -0,0 +1,20 @@
+"""
+Gunicorn worker class for the production server profile.
+
+Pins uvicorn to uvloop and httptools (rather than "auto", which silently
+falls back to asyncio and h11 when they are missing) and gives in-flight
+requests gunicorn's ``graceful_timeout`` to finish after SIGTERM.
+"""
+
+from uvicorn.workers import UvicornWorker as _UvicornWorker
+
+
+class UvicornWorker(_UvicornWorker):
+    """Uvicorn worker on uvloop and httptools with graceful drain."""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Stop accepting, then wait this long for open requests before cancelling them
+        self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout
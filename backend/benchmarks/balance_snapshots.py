@@ -0,0 +1,178 @@
+"""
+Daily balance snapshot storage and query benchmark.
+
+Loads a synthetic portfolio (100k loans over 10 branches by default), then
+simulates a run of business days: each day a share of loans repay, some
+change status and a few are disbursed, and the snapshot is taken. Reports
+stored bytes per snapshot (keyframe and delta days), bytes per loan, and
+the latency of point-in-time and period-over-period queries, next to the
+size of storing every loan as its own BSON document each day.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.balance_snapshots --mongo-url mongodb://localhost:27017
+    python -m benchmarks.balance_snapshots --loans 1000000 --days 30 --output snapshots.json
+    python -m benchmarks.balance_snapshots --mongo-url "" --loans 5000 --days 10   # mongomock smoke run
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import bson
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.run import percentile, use_local_database  # noqa: E402
+
+BRANCHES = [f"{number:03d}" for number in range(1, 11)]
+STATUSES = ["performing", "non_performing", "defaulted", "closed"]
+
+
+def new_loan(index: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "id": f"bench_loan_{index}",
+        "branch_code": rng.choice(BRANCHES),
+        "outstanding_balance": round(rng.uniform(5_000, 500_000), 2),
+        "arrears_amount": 0.0,
+        "days_in_arrears": 0,
+        "status": rng.choices(STATUSES, weights=[80, 12, 5, 3])[0],
+    }
+
+
+async def load(database, loans: int, rng: random.Random) -> None:
+    started = time.perf_counter()
+    for start in range(0, loans, 10_000):
+        await database.loan_accounts.insert_many([new_loan(index, rng) for index in range(start, min(start + 10_000, loans))])
+    await database.loan_accounts.create_index([("branch_code", 1), ("status", 1)])
+    print(f"Loaded {loans:,} loans in {time.perf_counter() - started:.1f}s")
+
+
+async def churn(database, loans: int, rng: random.Random, args: argparse.Namespace) -> int:
+    """One business day of repayments, arrears, status changes and disbursements."""
+    from pymongo import UpdateOne
+
+    operations = []
+    for index in rng.sample(range(loans), int(loans * args.repaying)):
+        operations.append(UpdateOne(
+            {"id": f"bench_loan_{index}", "status": {"$ne": "closed"}},
+            {"$inc": {"outstanding_balance": -round(rng.uniform(500, 5_000), 2)}},
+        ))
+    for index in rng.sample(range(loans), int(loans * args.migrating)):
+        operations.append(UpdateOne(
+            {"id": f"bench_loan_{index}"},
+            {"$set": {"status": rng.choice(STATUSES), "days_in_arrears": rng.randint(0, 365),
+                      "arrears_amount": round(rng.uniform(0, 50_000), 2)}},
+        ))
+    if operations:
+        await database.loan_accounts.bulk_write(operations, ordered=False)
+    disbursed = int(loans * args.disbursing)
+    if disbursed:
+        await database.loan_accounts.insert_many([new_loan(index, rng) for index in range(loans, loans + disbursed)])
+    return loans + disbursed
+
+
+async def measure(call: Callable[[], Awaitable[Any]], runs: int) -> Dict[str, float]:
+    await call()
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    from app.config import ensure_indexes
+    from app.services import BalanceSnapshotService
+
+    rng = random.Random(args.seed)
+    database = use_local_database(args.mongo_url, args.database)
+    await database.balance_snapshots.delete_many({})
+    await database.balance_snapshot_loans.delete_many({})
+    await database.loan_accounts.delete_many({})
+    await load(database, args.loans, rng)
+    await ensure_indexes(database)
+
+    # Storing every loan as its own document each day, for comparison
+    sample = await database.loan_accounts.find_one({}, {"_id": 0})
+    per_loan_document = len(bson.encode({**sample, "business_date": "2026-01-01"}))
+
+    service = BalanceSnapshotService()
+    first_day = date.fromisoformat(args.start)
+    loans = args.loans
+    days = []
+    for offset in range(args.days):
+        business_date = (first_day + timedelta(days=offset)).isoformat()
+        if offset:
+            loans = await churn(database, loans, rng, args)
+        started = time.perf_counter()
+        result = await service.take_snapshot(business_date)
+        seconds = time.perf_counter() - started
+        stored = sum(branch["stored_bytes"] for branch in result["branches"].values())
+        days.append({
+            "business_date": business_date,
+            "keyframe": any(branch["keyframe"] for branch in result["branches"].values()),
+            "loans": loans,
+            "stored_bytes": stored,
+            "bytes_per_loan": round(stored / loans, 3),
+            "seconds": round(seconds, 3),
+        })
+        print(f"{business_date}  {'keyframe' if days[-1]['keyframe'] else 'delta   '}"
+              f"{stored:>14,} bytes{days[-1]['bytes_per_loan']:>10} B/loan{seconds:>9.2f}s")
+
+    last = days[-1]["business_date"]
+    queries = {
+        "portfolio_as_of": await measure(lambda: service.get_portfolio_as_of(last), args.runs),
+        "comparison": await measure(lambda: service.compare(args.start, last), args.runs),
+    }
+    total = sum(day["stored_bytes"] for day in days)
+    naive = sum(day["loans"] for day in days) * per_loan_document
+    print(f"\nStored {total:,} bytes for {len(days)} snapshots; one document per loan per day "
+          f"would be {naive:,} bytes ({naive / total:.1f}x)")
+    for name, result in queries.items():
+        print(f"{name:<18} p50 {result['p50_ms']:>9} ms  p95 {result['p95_ms']:>9} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "days": days,
+            "queries": queries,
+            "stored_bytes": total,
+            "per_loan_document_bytes": naive,
+        }, indent=2))
+        print(f"Results written to {args.output}")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark daily balance snapshot storage and queries")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017", help="MongoDB to benchmark against (empty for mongomock)")
+    parser.add_argument("--database", default="stima_sacco_snapshot_benchmark", help="Benchmark database name (emptied first)")
+    parser.add_argument("--loans", type=int, default=100_000, help="Loans loaded before the first day")
+    parser.add_argument("--days", type=int, default=14, help="Business days to snapshot")
+    parser.add_argument("--start", default="2026-01-01", help="First business date (YYYY-MM-DD)")
+    parser.add_argument("--repaying", type=float, default=0.05, help="Share of loans repaying each day")
+    parser.add_argument("--migrating", type=float, default=0.005, help="Share of loans changing status each day")
+    parser.add_argument("--disbursing", type=float, default=0.001, help="New loans each day, as a share of the book")
+    parser.add_argument("--runs", type=int, default=20, help="Measured runs per query")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
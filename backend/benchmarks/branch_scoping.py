@@ -0,0 +1,200 @@
+"""
+Branch-scoped dashboard and report benchmark.
+
+Seeds a real mongod with ``DataGeneratorService`` (10 branches, 1M loans by
+default), builds the indexes, then runs the dashboard, report and loan-list
+queries the way each caller issues them: for an admin over every branch and
+for a manager of each branch. Every command the services issue is traced
+and explained, so the report shows latency next to the documents and index
+keys each query examined. A branch query should examine at most that
+branch's documents; ``--check`` fails the run if one examines more.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.branch_scoping --mongo-url mongodb://localhost:27017
+    python -m benchmarks.branch_scoping --loans 100000 --runs 5 --output branches.json
+    python -m benchmarks.branch_scoping --skip-load --check
+    python -m benchmarks.branch_scoping --mongo-url "" --loans 2000   # mongomock smoke run, no explain
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.run import percentile, use_local_database  # noqa: E402
+
+ADMIN = {"user_id": "bench_admin", "name": "Head Office", "role": "admin", "branch_code": None}
+
+# Collections read by the scenarios, counted per branch for the --check bound
+COLLECTIONS = ("members", "loan_accounts", "call_logs", "promises_to_pay", "partner_assignments")
+
+
+def build_scenarios() -> Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]]:
+    """Named service calls, each run as the given user."""
+    from app.services import DashboardService, LoanService
+
+    return {
+        "dashboard_stats": lambda user: DashboardService(user).get_dashboard_statistics(),
+        "npl_summary": lambda user: DashboardService(user).get_npl_summary(),
+        "collection_performance": lambda user: DashboardService(user).get_collection_performance(),
+        "npl_loans_page": lambda user: LoanService(user).get_npl_loans(limit=50),
+    }
+
+
+def connect(mongo_url: str, database_name: str) -> Any:
+    """Point the application at the benchmark database, with the query profiler listening."""
+    if not mongo_url:
+        return use_local_database(None, database_name)
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.config.database import db_config
+    from app.utils.query_profiler import query_profiler
+
+    db_config._client = AsyncIOMotorClient(mongo_url, event_listeners=[query_profiler])
+    db_config._database = db_config._client[database_name]
+    return db_config._database
+
+
+async def load(database, loans: int) -> None:
+    """Generate members with about ``loans`` loans across the generator's branches."""
+    from app.services.data_generator import DEFAULT_DISTRIBUTIONS, DataGeneratorService
+
+    weights = DEFAULT_DISTRIBUTIONS["loans_per_member_weights"]
+    loans_per_member = sum((count + 1) * weight for count, weight in enumerate(weights)) / sum(weights)
+    started = time.perf_counter()
+    await DataGeneratorService(member_count=round(loans / loans_per_member)).generate_dummy_data_if_needed()
+    print(f"Seeded {await database.loan_accounts.estimated_document_count():,} loans "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+async def branch_counts(database, branches: List[str]) -> Dict[str, Dict[str, int]]:
+    """Documents per collection for every branch and in total (key ``"all"``)."""
+    counts: Dict[str, Dict[str, int]] = {}
+    for collection in COLLECTIONS:
+        rows = await database[collection].aggregate([
+            {"$group": {"_id": "$branch_code", "count": {"$sum": 1}}},
+        ]).to_list(None)
+        per_branch = {row["_id"]: row["count"] for row in rows}
+        counts[collection] = {branch: per_branch.get(branch, 0) for branch in branches}
+        counts[collection]["all"] = sum(per_branch.values())
+    return counts
+
+
+async def explained_trace(client, call: Callable[[], Awaitable[Any]]) -> List[Dict[str, Any]]:
+    """The commands a call issues, each explained with executionStats."""
+    from app.utils.query_profiler import explain_entry, public_entry, query_trace
+
+    with query_trace() as trace:
+        await call()
+    await asyncio.gather(*(explain_entry(client, entry) for entry in trace))
+    return [public_entry(entry) for entry in trace]
+
+
+async def measure(client, call: Callable[[], Awaitable[Any]], runs: int) -> Dict[str, Any]:
+    await call()
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    commands = await explained_trace(client, call)
+    return {
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "docs_examined": sum(command.get("docs_examined") or 0 for command in commands),
+        "keys_examined": sum(command.get("keys_examined") or 0 for command in commands),
+        "commands": commands,
+    }
+
+
+def over_branch(result: Dict[str, Any], counts: Dict[str, Dict[str, int]], branch: str) -> List[str]:
+    """Commands of a branch run that examined more documents than the branch holds."""
+    problems = []
+    for command in result["commands"]:
+        bound = counts.get(command["collection"], {}).get(branch)
+        examined = command.get("docs_examined")
+        if bound is not None and examined is not None and examined > bound:
+            problems.append(f"{command['command']} on {command['collection']}: {examined:,} > {bound:,}")
+    return problems
+
+
+async def main(args: argparse.Namespace) -> int:
+    from app.config import ensure_indexes
+    from app.services.data_generator import BRANCH_CODES
+
+    database = connect(args.mongo_url, args.database)
+    if not args.skip_load and await database.loan_accounts.estimated_document_count() == 0:
+        print(f"Loading about {args.loans:,} loans over {len(BRANCH_CODES)} branches into {args.database} ...")
+        await load(database, args.loans)
+    started = time.perf_counter()
+    await ensure_indexes(database)
+    print(f"Indexes ready in {time.perf_counter() - started:.1f}s")
+
+    branches = args.branches or BRANCH_CODES
+    counts = await branch_counts(database, branches)
+    client = database.client
+    results: Dict[str, Dict[str, Any]] = {}
+    problems: List[str] = []
+    for name, scenario in build_scenarios().items():
+        results[name] = {"all": await measure(client, lambda: scenario(ADMIN), args.runs)}
+        for branch in branches:
+            manager = {"user_id": f"bench_{branch}", "name": f"Manager {branch}", "role": "manager", "branch_code": branch}
+            result = await measure(client, lambda: scenario(manager), args.runs)
+            results[name][branch] = result
+            problems += [f"{name} [{branch}] {problem}" for problem in over_branch(result, counts, branch)]
+
+    header = f"{'query':<24}{'scope':>7}{'p50 ms':>10}{'p95 ms':>10}{'docs':>12}{'keys':>12}"
+    print(header)
+    print("-" * len(header))
+    for name, scopes in results.items():
+        branch_results = [scopes[branch] for branch in branches]
+        rows = [("all", scopes["all"]), ("branch", {
+            "p50_ms": round(statistics.median(result["p50_ms"] for result in branch_results), 3),
+            "p95_ms": round(statistics.median(result["p95_ms"] for result in branch_results), 3),
+            "docs_examined": max(result["docs_examined"] for result in branch_results),
+            "keys_examined": max(result["keys_examined"] for result in branch_results),
+        })]
+        for scope, row in rows:
+            print(f"{name:<24}{scope:>7}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+                  f"{row['docs_examined']:>12,}{row['keys_examined']:>12,}")
+    print("\n(branch rows: median latency and largest docs/keys examined over the branches)")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"counts": counts, "results": results}, indent=2, default=str))
+        print(f"Results written to {args.output}")
+    if problems:
+        print("\nBranch queries examining more documents than their branch holds:")
+        for problem in problems:
+            print(f"  {problem}")
+        if args.check:
+            return 1
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark branch-scoped dashboard and report queries")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017",
+                        help="MongoDB to benchmark against (empty for mongomock, without explain)")
+    parser.add_argument("--database", default="stima_sacco_branch_benchmark", help="Benchmark database name")
+    parser.add_argument("--loans", type=int, default=1_000_000, help="Loans to generate (across all branches)")
+    parser.add_argument("--skip-load", action="store_true", help="Use the data already loaded")
+    parser.add_argument("--branches", nargs="*", help="Branches to run the branch queries for (default all)")
+    parser.add_argument("--runs", type=int, default=20, help="Measured runs per query and scope")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 if a branch query examined more documents than its branch holds")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,191 @@
+"""
+Note search latency benchmark.
+
+Loads synthetic call and promise notes straight into ``note_index`` (10M by
+default) on a real mongod, builds the search indexes, and measures
+``NoteSearchService.search`` latency for word, phrase and prefix queries,
+with and without agent, loan and date filters. Text queries need a real
+MongoDB; mongomock-motor does not implement ``$text``.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.note_search --mongo-url mongodb://localhost:27017
+    python -m benchmarks.note_search --notes 1000000 --queries 500 --output notes.json
+    python -m benchmarks.note_search --skip-load
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.run import percentile, use_local_database  # noqa: E402
+
+# Extra words mixed into generated notes so the term dictionary has a realistic spread
+FILLER_WORDS = [
+    "guarantor", "employer", "payslip", "chama", "harvest", "school", "fees", "hospital", "bill",
+    "transfer", "paybill", "till", "branch", "deposit", "restructure", "reschedule", "waiver",
+    "penalty", "statement", "dispute", "spouse", "relative", "upcountry", "travelling", "unreachable",
+    "voicemail", "callback", "evening", "weekend", "bonus", "dividend", "shares", "collateral",
+    "logbook", "auction", "demand", "letter", "lawyer", "partial", "instalment", "arrears",
+]
+
+
+def build_notes(rnd: random.Random, count: int, agents: List[str], loans: List[str], now: datetime) -> List[dict]:
+    """Synthetic note index entries built like ``note_entry`` output."""
+    from app.services.data_generator import CALL_NOTES, PROMISE_NOTES
+    from app.services.note_search_service import tokenize
+
+    sentences = [note for note in CALL_NOTES + PROMISE_NOTES if note]
+    notes = []
+    for _ in range(count):
+        text = f"{rnd.choice(sentences)}. {' '.join(rnd.sample(FILLER_WORDS, rnd.randint(2, 8)))}"
+        loan_id = rnd.choice(loans)
+        notes.append({
+            "id": str(uuid.UUID(int=rnd.getrandbits(128), version=4)),
+            "source": "call" if rnd.random() < 0.8 else "promise",
+            "loan_id": loan_id,
+            "member_id": f"member-{loan_id}",
+            "agent_id": rnd.choice(agents),
+            "noted_at": now - timedelta(seconds=rnd.randint(0, 365 * 86400)),
+            "notes": text,
+            "terms": tokenize(text),
+        })
+    return notes
+
+
+async def load_notes(database, total: int, batch_size: int, concurrency: int, seed: int) -> float:
+    """Insert ``total`` synthetic notes with bounded concurrency; returns notes per second."""
+    rnd = random.Random(seed)
+    agents = [f"agent_{i:03d}" for i in range(1, 201)]
+    loans = [f"loan-{i}" for i in range(max(total // 20, 1))]
+    now = datetime.utcnow()
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = set()
+    started = time.perf_counter()
+
+    async def write(batch: List[dict]) -> None:
+        async with semaphore:
+            await database.note_index.insert_many(batch, ordered=False)
+
+    for offset in range(0, total, batch_size):
+        batch = build_notes(rnd, min(batch_size, total - offset), agents, loans, now)
+        if len(pending) >= concurrency:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        pending.add(asyncio.ensure_future(write(batch)))
+        if (offset // batch_size) % 100 == 0:
+            print(f"  loaded {offset:,} / {total:,} notes", flush=True)
+    if pending:
+        await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - started
+    return total / elapsed if elapsed else 0.0
+
+
+def build_queries(now: datetime) -> Dict[str, Callable[[random.Random], Dict[str, Any]]]:
+    """Named query generators exercising each search path."""
+    month_ago = now - timedelta(days=30)
+    return {
+        "word": lambda rnd: {"query": rnd.choice(["salary", "restructuring", "guarantor", "harvest"])},
+        "two_words": lambda rnd: {"query": "statement dispute"},
+        "phrase": lambda rnd: {"query": rnd.choice(['"partial payment"', '"delayed salary"', '"end of month"'])},
+        "prefix": lambda rnd: {"query": rnd.choice(["restruct*", "guaran*", "paybi*", "upcoun*"])},
+        "word_agent": lambda rnd: {"query": "salary", "agent_id": f"agent_{rnd.randint(1, 200):03d}"},
+        "word_date_range": lambda rnd: {"query": "salary", "date_from": month_ago, "date_to": now},
+        "prefix_loan": lambda rnd: {"query": "pay*", "loan_id": f"loan-{rnd.randint(0, 999)}"},
+        "phrase_prefix_agent": lambda rnd: {
+            "query": '"m-pesa" guaran*', "agent_id": f"agent_{rnd.randint(1, 200):03d}",
+        },
+    }
+
+
+async def run_query(service, make_query, count: int, concurrency: int, seed: int) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    queries = iter([make_query(rnd) for _ in range(count)])
+    latencies: List[float] = []
+    hits: List[int] = []
+
+    async def worker():
+        for params in queries:
+            start = time.perf_counter()
+            results = await service.search(limit=20, **params)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits.append(len(results))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "mean_hits": round(statistics.fmean(hits), 1) if hits else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    database = use_local_database(args.mongo_url, args.database)
+    from app.config import ensure_indexes
+    from app.services.note_search_service import NoteSearchService
+
+    existing = await database.note_index.estimated_document_count()
+    if not args.skip_load and existing < args.notes:
+        print(f"Loading {args.notes - existing:,} notes into {args.database}.note_index ...")
+        rate = await load_notes(database, args.notes - existing, args.batch_size, args.concurrency, args.seed + existing)
+        print(f"Loaded at {rate:,.0f} notes/s")
+    started = time.perf_counter()
+    await ensure_indexes(database)
+    print(f"Indexes ready in {time.perf_counter() - started:.1f}s")
+
+    service = NoteSearchService()
+    results: Dict[str, Dict[str, Any]] = {}
+    for index, (name, make_query) in enumerate(build_queries(datetime.utcnow()).items()):
+        await run_query(service, make_query, args.warmup, args.concurrency, args.seed + index)
+        results[name] = await run_query(service, make_query, args.queries, args.concurrency, args.seed + index)
+
+    header = f"{'query':<24}{'n':>6}{'hits':>7}{'p50':>10}{'p95':>10}{'p99':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        print(
+            f"{name:<24}{result['queries']:>6}{result['mean_hits']:>7}"
+            f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+        )
+
+    if args.output:
+        report = {"notes": await database.note_index.estimated_document_count(), "results": results}
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark note search latency")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017", help="MongoDB to benchmark against")
+    parser.add_argument("--database", default="stima_sacco_note_benchmark", help="Benchmark database name")
+    parser.add_argument("--notes", type=int, default=10_000_000, help="Notes to load")
+    parser.add_argument("--skip-load", action="store_true", help="Use the notes already loaded")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Notes per insert_many")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent loaders and query clients")
+    parser.add_argument("--queries", type=int, default=200, help="Measured queries per query type")
+    parser.add_argument("--warmup", type=int, default=20, help="Warm-up queries per query type")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
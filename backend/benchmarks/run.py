@@ -0,0 +1,343 @@
+"""
+Load-test and benchmark runner for the API hot paths.
+
+Starts the application in-process against a local Mongo stand-in
+(mongomock-motor by default, or a real mongod via ``--mongo-url``), seeds it
+with ``DataGeneratorService`` at the requested scale and drives the hot
+endpoints with concurrent clients. Latency percentiles and throughput are
+reported per scenario and can be compared against a stored baseline.
+Every request comes from one user, so the in-process app runs without
+admission control (its per-user rate limit would answer most requests with
+429) unless ``--admission-control`` is given; a server benchmarked over
+``--base-url`` should be started with ``ADMISSION_CONTROL_ENABLED=false``.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.run --members 2000 --concurrency 32 --requests 500
+    python -m benchmarks.run --app server:app --output bench.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --base-url http://localhost:8001 --skip-seed
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import os
+import random
+import secrets
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# The in-process app refuses to issue tokens with a published SECRET_KEY; sign with a throwaway one
+os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+
+# Apps without the auth routes (the legacy server) accept any bearer token
+FALLBACK_TOKEN = "benchmark-token"
+
+# Default regression tolerance when comparing against a baseline (fraction)
+DEFAULT_TOLERANCE = 0.20
+
+
+class Scenario:
+    """A named request generator for one API hot path."""
+
+    def __init__(self, name: str, path_factory: Callable[[random.Random], str]):
+        self.name = name
+        self.path_factory = path_factory
+
+
+def build_scenarios(search_terms: List[str]) -> List[Scenario]:
+    """Build the hot-path scenarios exercised by the benchmark."""
+    return [
+        Scenario("dashboard_stats", lambda rnd: "/api/dashboard/stats"),
+        Scenario("members_search", lambda rnd: f"/api/members?search={rnd.choice(search_terms)}"),
+        Scenario("loans_member_search", lambda rnd: f"/api/loans?member_search={rnd.choice(search_terms)}"),
+        Scenario("calls_auto_dial", lambda rnd: "/api/calls/auto-dial"),
+        Scenario("reports_npl_summary", lambda rnd: "/api/reports/npl-summary"),
+        Scenario("reports_collection_performance", lambda rnd: "/api/reports/collection-performance"),
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+
+def use_local_database(mongo_url: Optional[str], database_name: str) -> Any:
+    """Point the shared database configuration at the benchmark database."""
+    from app.config.database import db_config
+
+    if mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(mongo_url)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+
+        client = AsyncMongoMockClient()
+
+    db_config._client = client
+    db_config._database = client[database_name]
+    return db_config._database
+
+
+def load_app(app_path: str, database) -> Any:
+    """Import the ASGI app (``module:attribute``) and bind it to the benchmark database."""
+    module_name, _, attribute = app_path.partition(":")
+    module = importlib.import_module(module_name)
+    # The legacy server module keeps its own module-level handles.
+    if hasattr(module, "db"):
+        module.db = database
+    if hasattr(module, "client"):
+        module.client = database.client
+    return getattr(module, attribute or "app")
+
+
+async def seed_database(database, members: int) -> List[str]:
+    """Seed the benchmark database and return search terms drawn from it."""
+    from app.services.auth_service import AuthService
+    from app.services.data_generator import DataGeneratorService
+
+    if await database.members.count_documents({}) == 0:
+        generator = DataGeneratorService(member_count=members)
+        await generator.generate_dummy_data_if_needed()
+    await AuthService().ensure_demo_users()
+
+    sample = await database.members.find({}, {"last_name": 1, "member_number": 1}).to_list(200)
+    terms = {member["last_name"] for member in sample}
+    terms.update(member["member_number"] for member in sample[:20])
+    return sorted(terms) or ["Kamau"]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    total_requests: int,
+    concurrency: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """Drive one scenario with ``concurrency`` workers and collect latencies."""
+    rnd = random.Random(seed)
+    paths = [scenario.path_factory(rnd) for _ in range(total_requests)]
+    latencies: List[float] = []
+    errors = 0
+    statuses: Dict[int, int] = {}
+    cursor = iter(paths)
+
+    async def worker():
+        nonlocal errors
+        for path in cursor:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status >= 400 or status == 0:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> None:
+    """Authenticate the client's requests as the benchmark user."""
+    response = await client.post("/api/auth/token", json={"username": username, "password": password})
+    if response.status_code == 200:
+        token = response.json()["access_token"]
+    elif is_unrouted(response):
+        token = FALLBACK_TOKEN
+    else:
+        raise RuntimeError(f"Benchmark login failed: HTTP {response.status_code} {response.text[:200]}")
+    client.headers["Authorization"] = f"Bearer {token}"
+
+
+def is_unrouted(response: httpx.Response) -> bool:
+    """Detect the framework's own 404/405 for a path the app does not serve."""
+    if response.status_code == 405:
+        return True
+    if response.status_code != 404:
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return True
+    return "Not Found" in (body.get("detail"), body.get("message"))
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> List[str]:
+    """
+    Return human-readable regressions of ``results`` against ``baseline``.
+
+    Any failed or non-2xx response is a regression on its own: latency and
+    throughput of errors and 429s say nothing about the endpoint.
+    """
+    regressions = []
+    for name, current in results.items():
+        if current.get("skipped"):
+            continue
+        failed = failed_requests(current)
+        if failed:
+            regressions.append(f"{name}: {failed}/{current['requests']} requests failed or were not 2xx")
+        previous = baseline.get(name)
+        if not previous or previous.get("skipped"):
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+    return regressions
+
+
+def failed_requests(result: Dict[str, Any]) -> int:
+    """Requests of a scenario result that failed or answered with a non-2xx status."""
+    statuses = result.get("statuses")
+    if statuses is None:
+        return result.get("errors", 0)
+    # Status keys are strings once a result has been through JSON
+    return sum(count for status, count in statuses.items() if not 200 <= int(status) < 300)
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    """Print a fixed-width summary table."""
+    header = f"{'scenario':<34}{'reqs':>7}{'err':>6}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        if result.get("skipped"):
+            print(f"{name:<34}{'skipped: ' + result['reason']:>53}")
+            continue
+        print(
+            f"{name:<34}{result['requests']:>7}{result['errors']:>6}{result['rps']:>10}"
+            f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+        )
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+        search_terms = args.search_terms or ["Kamau", "Wanjiku", "Mwangi", "STM100"]
+    else:
+        database = use_local_database(args.mongo_url, args.database)
+        app = load_app(args.app, database)
+        from app.utils import admission_controller
+
+        admission_controller.enabled = args.admission_control
+        search_terms = args.search_terms or (
+            ["Kamau"] if args.skip_seed else await seed_database(database, args.members)
+        )
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://benchmark"
+
+    scenarios = build_scenarios(search_terms)
+    if args.scenarios:
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.scenarios]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        await login(client, args.username, args.password)
+        for index, scenario in enumerate(scenarios):
+            probe = await client.get(scenario.path_factory(random.Random(args.seed)))
+            if is_unrouted(probe):
+                results[scenario.name] = {"skipped": True, "reason": "route not served by this app"}
+                continue
+            # Warm-up, then the measured run
+            await run_scenario(client, scenario, args.warmup, args.concurrency, args.seed + index)
+            results[scenario.name] = await run_scenario(
+                client, scenario, args.requests, args.concurrency, args.seed + index
+            )
+
+    print_report(results)
+
+    report = {
+        "app": args.base_url or args.app,
+        "members": args.members,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "admission_control": args.admission_control,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if not baseline_path.exists():
+            print(f"\nBaseline {baseline_path} not found; nothing to compare")
+            return 0
+        baseline = json.loads(baseline_path.read_text()).get("results", {})
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Stima Sacco API hot paths")
+    parser.add_argument("--app", default="main:app", help="ASGI app to load in-process (module:attribute)")
+    parser.add_argument("--base-url", help="Benchmark a running server over HTTP instead of in-process")
+    parser.add_argument("--mongo-url", help="Use a real mongod instead of mongomock-motor")
+    parser.add_argument("--database", default="stima_sacco_benchmark", help="Benchmark database name")
+    parser.add_argument("--members", type=int, default=1000, help="Members to seed (loans are 1-3 per member)")
+    parser.add_argument("--skip-seed", action="store_true", help="Use the database as-is")
+    parser.add_argument("--username", default="agent", help="User the requests are made as")
+    parser.add_argument("--password", default="agent123", help="Password of --username")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per scenario")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Warm-up requests per scenario")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for request parameters")
+    parser.add_argument("--scenarios", nargs="*", help="Only run the named scenarios")
+    parser.add_argument("--search-terms", nargs="*", help="Override member search terms")
+    parser.add_argument("--admission-control", action="store_true",
+                        help="Keep the in-process app's admission control and rate limits on")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a stored results JSON and fail on regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed regression fraction")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,140 @@
+"""
+Import-time profile of the API and a cold-start budget.
+
+Imports the application module in fresh interpreters and reports the median
+time to import it (the app object built, routes registered) and the median
+wall time of the whole process. One further run with ``-X importtime``
+(which slows imports down, so it is not timed) breaks the import time down
+by top-level package and also warms the bytecode cache, as in the container
+image, which precompiles ``/backend``. Heavy modules the API defers until
+first use (``DEFERRED_MODULES``) must not be imported at startup; the run
+fails if one is, or if the median import time exceeds the budget.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --budget-ms 800 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Median time to import the app module; override with STARTUP_BUDGET_MS
+DEFAULT_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS") or 1500)
+
+# Loaded on first use (batch recomputes, seeding, a configured ProFIX URL)
+DEFERRED_MODULES = ("numpy", "httpx")
+
+CHILD_SCRIPT = """
+import importlib, json, sys, time
+started = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "deferred_loaded": [name for name in {deferred!r} if name in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Entries of ``-X importtime`` output: module, self and cumulative microseconds."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_part, cumulative_us, name = line.split("|")
+        self_us = self_part.rsplit(":", 1)[1]
+        entries.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return entries
+
+
+def by_package(entries: List[Dict[str, Any]], top: int) -> List[Dict[str, Any]]:
+    """Self import time summed per top-level package, largest first."""
+    totals: Dict[str, int] = defaultdict(int)
+    for entry in entries:
+        totals[entry["module"].split(".")[0]] += entry["self_us"]
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": package, "ms": round(us / 1000, 1)} for package, us in ranked]
+
+
+def import_in_child(module: str, importtime: bool = False) -> Dict[str, Any]:
+    """Import ``module`` in a fresh interpreter (with ``-X importtime`` output under ``stderr``)."""
+    script = CHILD_SCRIPT.format(module=module, deferred=DEFERRED_MODULES)
+    command = [sys.executable, "-X", "importtime", "-c", script] if importtime else [sys.executable, "-c", script]
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=False)
+    process_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = process_ms
+    result["stderr"] = completed.stderr
+    return result
+
+
+def measure(module: str, runs: int, top: int = 15) -> Dict[str, Any]:
+    """Median import and process times over ``runs`` fresh interpreters, plus the package breakdown."""
+    profile = import_in_child(module, importtime=True)
+    results = [import_in_child(module) for _ in range(runs)]
+    return {
+        "module": module,
+        "runs": runs,
+        "import_ms": round(statistics.median(r["import_ms"] for r in results), 1),
+        "process_ms": round(statistics.median(r["process_ms"] for r in results), 1),
+        "deferred_loaded": sorted({name for r in results + [profile] for name in r["deferred_loaded"]}),
+        "packages": by_package(parse_importtime(profile["stderr"]), top),
+    }
+
+
+def main(args: argparse.Namespace) -> int:
+    report = measure(args.module, args.runs, args.top)
+    report["budget_ms"] = args.budget_ms
+
+    print(f"{report['module']}: import {report['import_ms']:.1f} ms, "
+          f"process {report['process_ms']:.1f} ms (median of {report['runs']}), budget {args.budget_ms:.0f} ms")
+    print(f"\n{'package':<28}{'self ms':>10}")
+    for row in report["packages"]:
+        print(f"{row['package']:<28}{row['ms']:>10.1f}")
+
+    failures = []
+    if report["deferred_loaded"]:
+        failures.append(f"deferred modules imported at startup: {', '.join(report['deferred_loaded'])}")
+    if report["import_ms"] > args.budget_ms:
+        failures.append(f"import took {report['import_ms']:.1f} ms, budget is {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+
+    if args.output:
+        report["passed"] = not failures
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+    return 1 if failures else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Profile API import time against a startup budget")
+    parser.add_argument("--module", default="main", help="Module that builds the ASGI app")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list by import time")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Median import time budget")
+    parser.add_argument("--output", help="Write the profile as JSON to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
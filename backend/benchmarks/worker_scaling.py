@@ -0,0 +1,200 @@
+"""
+Throughput scaling of the production server profile with the worker count.
+
+Starts ``gunicorn -c gunicorn.conf.py`` with 1, 2, 4, ... workers against a
+real mongod (workers are separate processes, so they cannot share a
+mongomock database), drives the hot paths with ``benchmarks.run`` over HTTP
+and reports requests per second per worker count, the speedup over one
+worker and the scaling efficiency (speedup / workers).
+
+The load generator is a single process; raise ``--concurrency`` until the
+one-worker run is saturated, and run it on another machine when measuring
+more workers than that process can keep busy.
+
+Usage (from the ``backend`` directory):
+
+    python -m benchmarks.worker_scaling --mongo-url mongodb://localhost:27017
+    python -m benchmarks.worker_scaling --workers 1 2 4 8 --concurrency 128 --output scaling.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks import run  # noqa: E402
+
+
+def default_worker_counts() -> List[int]:
+    """Powers of two up to the available cores, plus the core count itself."""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def start_server(args: argparse.Namespace, workers: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        MONGO_URL=args.mongo_url,
+        DB_NAME=args.database,
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_BIND=f"127.0.0.1:{args.port}",
+        SEED_MEMBER_COUNT=str(args.members),
+        SEED_REQUIRED_FOR_READINESS="true",
+        # Workers refuse to start with a published key; all of them share this one
+        SECRET_KEY=os.environ.get("SECRET_KEY") or secrets.token_urlsafe(32),
+        # One benchmark user would be rate limited; measure raw throughput
+        ADMISSION_CONTROL_ENABLED="false",
+        LOG_LEVEL="WARNING",
+    )
+    return subprocess.Popen(
+        ["gunicorn", "-c", "gunicorn.conf.py", args.app],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+def wait_until_ready(base_url: str, workers: int, process: subprocess.Popen, timeout: float) -> None:
+    """Wait until readiness answers 200 repeatedly (every worker up, seeding done)."""
+    deadline = time.monotonic() + timeout
+    consecutive = 0
+    while consecutive < workers * 2:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server with {workers} workers not ready within {timeout}s")
+        try:
+            ready = httpx.get(f"{base_url}/health/ready", timeout=5).status_code == 200
+        except httpx.HTTPError:
+            ready = False
+        consecutive = consecutive + 1 if ready else 0
+        time.sleep(0.1 if ready else 1)
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    """SIGTERM (graceful drain), then kill if it does not exit in time."""
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=45)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def measure(args: argparse.Namespace, workers: int) -> Dict[str, Dict[str, Any]]:
+    """Run the hot-path scenarios against a server with ``workers`` workers."""
+    base_url = f"http://127.0.0.1:{args.port}"
+    process = start_server(args, workers)
+    try:
+        wait_until_ready(base_url, workers, process, args.ready_timeout)
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            argv = [
+                "--base-url", base_url,
+                "--concurrency", str(args.concurrency),
+                "--requests", str(args.requests),
+                "--warmup", str(args.warmup),
+                "--output", output.name,
+            ]
+            if args.scenarios:
+                argv += ["--scenarios", *args.scenarios]
+            print(f"\n== {workers} worker(s) ==")
+            asyncio.run(run.main(run.parse_args(argv)))
+            return json.loads(Path(output.name).read_text())["results"]
+    finally:
+        stop_server(process)
+
+
+def scaling_table(results: Dict[int, Dict[str, Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Per scenario: rps, p95, speedup over the smallest worker count and efficiency."""
+    counts = sorted(results)
+    table: Dict[str, List[Dict[str, Any]]] = {}
+    for name in results[counts[0]]:
+        base = results[counts[0]][name]
+        if base.get("skipped") or not base["rps"]:
+            continue
+        rows = []
+        for workers in counts:
+            current = results[workers].get(name, {})
+            if current.get("skipped") or "rps" not in current:
+                continue
+            speedup = current["rps"] / base["rps"]
+            rows.append({
+                "workers": workers,
+                "rps": current["rps"],
+                "p95_ms": current["p95_ms"],
+                "errors": current["errors"],
+                "speedup": round(speedup, 2),
+                "efficiency": round(speedup * counts[0] / workers, 2),
+            })
+        table[name] = rows
+    return table
+
+
+def print_scaling(table: Dict[str, List[Dict[str, Any]]]) -> None:
+    header = f"{'scenario':<34}{'workers':>8}{'rps':>10}{'p95':>10}{'speedup':>9}{'eff.':>7}"
+    print("\n" + header)
+    print("-" * len(header))
+    for name, rows in table.items():
+        for row in rows:
+            print(
+                f"{name:<34}{row['workers']:>8}{row['rps']:>10}{row['p95_ms']:>10}"
+                f"{row['speedup']:>9}{row['efficiency']:>7}"
+            )
+
+
+def main(args: argparse.Namespace) -> int:
+    worker_counts = args.workers or default_worker_counts()
+    results = {workers: measure(args, workers) for workers in worker_counts}
+    table = scaling_table(results)
+    print_scaling(table)
+    if args.output:
+        report = {
+            "app": args.app,
+            "members": args.members,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "cores": os.cpu_count(),
+            "scaling": table,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure throughput scaling with the gunicorn worker count")
+    parser.add_argument("--app", default="main:app", help="ASGI app gunicorn serves (module:attribute)")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017", help="mongod shared by the workers")
+    parser.add_argument("--database", default="stima_sacco_benchmark", help="Benchmark database name")
+    parser.add_argument("--members", type=int, default=1000, help="Members to seed on the first run")
+    parser.add_argument("--workers", type=int, nargs="*", help="Worker counts to measure (default 1, 2, 4 ... cores)")
+    parser.add_argument("--port", type=int, default=8101, help="Port the benchmark server listens on")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients per scenario")
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="Warm-up requests per scenario")
+    parser.add_argument("--scenarios", nargs="*", help="Only run the named scenarios")
+    parser.add_argument("--ready-timeout", type=float, default=300.0, help="Seconds to wait for readiness")
+    parser.add_argument("--output", help="Write the scaling table as JSON to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
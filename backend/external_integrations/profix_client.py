@@ -0,0 +1,129 @@
+"""
+ProFIX core banking client.
+
+Every request goes through the ``profix`` resilience policy (bulkhead,
+timeout, circuit breaker, retries), so a slow or unavailable ProFIX cannot
+hold more than ``PROFIX_MAX_CONCURRENCY`` requests of a worker.
+
+Without ``PROFIX_API_URL`` the client simulates ProFIX (a short delay and a
+balance drift), which is what development and demo installs run against;
+httpx is then never imported.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any, Dict, Optional
+
+from app.config.settings import app_config
+from app.utils.exceptions import ExternalServiceException, LoanNotFoundException
+from app.utils.lazy_import import lazy_import
+from .resilience import ResiliencePolicy, TransientError, get_policy
+
+httpx = lazy_import("httpx")
+
+SERVICE_NAME = "profix"
+
+# Responses worth retrying: ProFIX overloaded, restarting or behind a failing proxy
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class ProFIXClient:
+    """Reads loan positions from ProFIX."""
+
+    def __init__(
+        self,
+        base_url: str = "",
+        api_key: str = "",
+        policy: Optional[ResiliencePolicy] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.simulated = not base_url
+        self.policy = policy or profix_policy()
+        self._http: Optional[httpx.AsyncClient] = None
+        if not self.simulated:
+            # The policy applies the per-attempt timeout
+            self._http = httpx.AsyncClient(
+                base_url=base_url,
+                headers={"Authorization": f"Bearer {api_key}"} if api_key else None,
+                timeout=None,
+                transport=transport,
+            )
+
+    async def get_loan(self, loan_number: str) -> Dict[str, Any]:
+        """
+        Fetch a loan's current position from ProFIX.
+
+        Args:
+            loan_number: Loan number shared by ProFIX and this system
+
+        Returns:
+            The ProFIX loan document (``outstanding_balance`` among its fields)
+
+        Raises:
+            LoanNotFoundException: If ProFIX does not know the loan
+            ExternalServiceUnavailableException: If ProFIX calls are being rejected
+            ExternalServiceException: If ProFIX kept failing
+        """
+        return await self.policy.call(lambda: self._get_loan(loan_number))
+
+    async def get_outstanding_balance(self, loan: Dict[str, Any]) -> float:
+        """ProFIX's outstanding balance for a loan account document."""
+        if self.simulated:
+            return await self.policy.call(lambda: self._simulated_balance(loan))
+        position = await self.get_loan(loan["loan_number"])
+        return float(position["outstanding_balance"])
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+
+    async def _get_loan(self, loan_number: str) -> Dict[str, Any]:
+        try:
+            response = await self._http.get(f"/loans/{loan_number}")
+        except httpx.TransportError as e:
+            raise TransientError(f"{type(e).__name__}: {e}") from e
+        if response.status_code in RETRYABLE_STATUSES or response.status_code >= 500:
+            raise TransientError(f"HTTP {response.status_code}")
+        if response.status_code == 404:
+            raise LoanNotFoundException(loan_number)
+        if response.status_code >= 400:
+            raise ExternalServiceException(SERVICE_NAME, f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    @staticmethod
+    async def _simulated_balance(loan: Dict[str, Any]) -> float:
+        await asyncio.sleep(1)  # Simulate API call delay
+        return loan["outstanding_balance"] * random.uniform(0.95, 1.02)
+
+
+def profix_policy() -> ResiliencePolicy:
+    """The process-wide resilience policy for ProFIX calls."""
+    return get_policy(
+        SERVICE_NAME,
+        timeout=app_config.PROFIX_TIMEOUT_SECONDS,
+        max_concurrent=app_config.PROFIX_MAX_CONCURRENCY,
+        max_wait=app_config.PROFIX_MAX_WAIT_SECONDS,
+        failure_threshold=app_config.PROFIX_BREAKER_FAILURES,
+        recovery_timeout=app_config.PROFIX_BREAKER_RESET_SECONDS,
+        retry_attempts=app_config.PROFIX_RETRY_ATTEMPTS,
+    )
+
+
+_client: Optional[ProFIXClient] = None
+
+
+def get_profix_client() -> ProFIXClient:
+    """Shared ProFIX client for this process (pooled HTTP connections)."""
+    global _client
+    if _client is None:
+        _client = ProFIXClient(app_config.PROFIX_API_URL, app_config.PROFIX_API_KEY)
+    return _client
+
+
+async def close_profix_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
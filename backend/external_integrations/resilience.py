@@ -0,0 +1,289 @@
+"""
+Resilience policies for calls to external systems.
+
+Every external dependency (ProFIX, SMS gateways, partner portals) gets its
+own ``ResiliencePolicy``, so a slow or failing dependency can only tie up
+its own share of the worker:
+
+- a bulkhead bounds how many calls to the dependency are in flight; a call
+  that cannot get a slot within ``max_wait`` is rejected instead of queuing
+- each attempt has a timeout
+- a circuit breaker opens after ``failure_threshold`` consecutive failures
+  and rejects calls without trying them for ``recovery_timeout`` seconds;
+  it then lets a trial call through (half-open) and closes again if it
+  succeeds
+- transient failures (timeouts and ``TransientError``) are retried with
+  jittered exponential backoff while the circuit stays closed
+
+A rejected call raises ``ExternalServiceUnavailableException`` (503); a call
+that still fails after its retries raises ``ExternalServiceException`` (502).
+Other exceptions raised by the call (a 404 from the dependency, say) pass
+through untouched and do not count against the circuit.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential, wait_random
+
+from app.utils.exceptions import ExternalServiceException, ExternalServiceUnavailableException
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class TransientError(Exception):
+    """A failure worth retrying: the dependency was unreachable, overloaded or errored."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open trial state."""
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_calls = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self.trial_calls = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a trial call through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; a half-open circuit admits a limited number of trials."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self.trial_calls < self.half_open_max_calls:
+            self.trial_calls += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self._state = CLOSED
+        self.consecutive_failures = 0
+        self.trial_calls = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    f"Circuit for {self.name} opened after {self.consecutive_failures} consecutive failures"
+                )
+            self._state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot whose call ended without an outcome (cancelled)."""
+        if self._state == HALF_OPEN and self.trial_calls:
+            self.trial_calls -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after_seconds": round(self.retry_after(), 1),
+        }
+
+
+class Bulkhead:
+    """Bounded number of concurrent calls to one dependency."""
+
+    def __init__(self, name: str, max_concurrent: int, max_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._semaphore = asyncio.BoundedSemaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting up to ``max_wait``; False if none freed up."""
+        if self._semaphore.locked() and self.max_wait <= 0:
+            self.rejected += 1
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.max_wait or None)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+class ResiliencePolicy:
+    """Bulkhead, timeout, circuit breaker and retries around calls to one dependency."""
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 5.0,
+        max_concurrent: int = 10,
+        max_wait: float = 0.0,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        retry_attempts: int = 3,
+        backoff: float = 0.2,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.retry_attempts = max(1, retry_attempts)
+        self.backoff = backoff
+        self.bulkhead = Bulkhead(name, max_concurrent, max_wait)
+        self.breaker = CircuitBreaker(name, failure_threshold, recovery_timeout)
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` under the policy.
+
+        Args:
+            fn: Zero-argument coroutine function making one attempt
+
+        Returns:
+            Whatever ``fn`` returns
+
+        Raises:
+            ExternalServiceUnavailableException: If the circuit is open or the bulkhead is full
+            ExternalServiceException: If every attempt failed transiently
+        """
+        self.calls += 1
+        if not self.breaker.allow():
+            raise ExternalServiceUnavailableException(self.name, "circuit open", self.breaker.retry_after())
+        # A trial call (half-open) is the only attempt: its outcome decides the circuit
+        attempts = self.retry_attempts if self.breaker.state == CLOSED else 1
+        if not await self.bulkhead.acquire():
+            self.breaker.release_trial()
+            raise ExternalServiceUnavailableException(self.name, "too many concurrent calls", 1)
+        try:
+            return await self._call_with_retries(fn, attempts)
+        finally:
+            self.bulkhead.release()
+
+    async def _call_with_retries(self, fn: Callable[[], Awaitable[Any]], attempts: int) -> Any:
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(attempts),
+            wait=wait_exponential(multiplier=self.backoff, max=self.backoff * 8) + wait_random(0, self.backoff),
+            retry=retry_if_exception(self._should_retry),
+            before_sleep=self._count_retry,
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    if attempt.retry_state.attempt_number > 1 and not self.breaker.allow():
+                        raise ExternalServiceUnavailableException(
+                            self.name, "circuit open", self.breaker.retry_after()
+                        )
+                    return await self._attempt(fn)
+        except (TransientError, asyncio.TimeoutError) as e:
+            self.failures += 1
+            reason = f"timed out after {self.timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            raise ExternalServiceException(self.name, reason) from e
+
+    async def _attempt(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await asyncio.wait_for(fn(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            raise
+        except TransientError:
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release_trial()
+            raise
+        except Exception:
+            # The dependency answered, just not with what was asked for
+            self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        self.successes += 1
+        return result
+
+    def _should_retry(self, error: BaseException) -> bool:
+        return isinstance(error, (TransientError, asyncio.TimeoutError)) and self.breaker.state == CLOSED
+
+    def _count_retry(self, retry_state) -> None:
+        self.retries += 1
+        logger.info(
+            f"Retrying {self.name} call (attempt {retry_state.attempt_number} failed: "
+            f"{retry_state.outcome.exception()!r})"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.stats(),
+            "bulkhead": self.bulkhead.stats(),
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "timeout_seconds": self.timeout,
+        }
+
+
+# One policy per dependency, shared by every caller in this process
+_policies: Dict[str, ResiliencePolicy] = {}
+
+
+def get_policy(name: str, **options: Any) -> ResiliencePolicy:
+    """The policy for a dependency, created with ``options`` on first use."""
+    policy = _policies.get(name)
+    if policy is None:
+        policy = _policies[name] = ResiliencePolicy(name, **options)
+    return policy
+
+
+def resilience_stats() -> Dict[str, Any]:
+    """Circuit, bulkhead and call counters for every dependency used in this process."""
+    return {name: policy.stats() for name, policy in _policies.items()}
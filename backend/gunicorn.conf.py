@@ -0,0 +1,75 @@
+"""
+Gunicorn configuration for the production server profile.
+
+One uvicorn worker per available core (``WEB_CONCURRENCY`` overrides), the
+application imported once in the master and forked into the workers, and a
+fresh MongoDB client and log listener created in each worker after the fork.
+
+Usage (from the ``backend`` directory):
+
+    gunicorn -c gunicorn.conf.py main:app
+"""
+
+import os
+
+
+def _available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8001")
+
+# Async workers keep a core busy on their own, so one per core (not 2n+1)
+workers = int(os.environ.get("WEB_CONCURRENCY") or _available_cores())
+worker_class = "app.utils.uvicorn_worker.UvicornWorker"
+
+# Import the app once in the master; workers share its pages copy-on-write
+preload_app = True
+
+# Longer than nginx's upstream keepalive_timeout, so nginx always closes an
+# idle upstream connection first and never reuses one the worker just closed
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "75"))
+
+# SIGTERM: stop accepting, give in-flight requests this long, then exit
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# A worker whose event loop does not heartbeat for this long is restarted
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+
+backlog = int(os.environ.get("GUNICORN_BACKLOG", "2048"))
+
+# Trust X-Forwarded-For from the bundled nginx only, so the client address
+# seen by the per-address rate limit is the caller's, not the proxy's
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+accesslog = None  # request logging is done by the application
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+
+def post_fork(server, worker):
+    """Replace process-bound state inherited from the master."""
+    import sys
+
+    from app.config import app_config, reset_database_connection
+    from app.utils.logging_config import setup_logging
+
+    # The master's log listener thread does not exist in the child
+    setup_logging(
+        app_config.LOG_LEVEL,
+        log_file=app_config.LOG_FILE,
+        log_format=app_config.LOG_FORMAT,
+        queue_size=app_config.LOG_QUEUE_SIZE,
+        info_sample_rate=app_config.LOG_INFO_SAMPLE_RATE,
+    )
+
+    # MongoDB clients are not fork-safe: each worker opens its own pool
+    reset_database_connection()
+    legacy_server = sys.modules.get("server")
+    if legacy_server is not None:
+        legacy_server.reset_database_client()
+
+    server.log.info(f"Worker {worker.pid} ready")
@@ -5,6 +5,11 @@ This is the refactored version with improved structure, separation of concerns,
 and better maintainability.
 """
 
+import time
+
+# Start of the import phase reported in /system/metrics (startup)
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -12,19 +17,42 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 import logging
 from pathlib import Path
 
-from app.config import app_config, close_database_connection
-from app.routes import api_router
-from app.services.data_generator import DataGeneratorService
-from app.utils import setup_logging, get_logger, StimaException
+from app.config import app_config, get_database, close_database_connection
+from app.config.settings import INSECURE_SECRET_KEYS
+from app.routes import api_router, health_router
+from app.services import (
+    start_background_seeding,
+    stop_background_seeding,
+    start_follow_up_scheduler,
+    stop_follow_up_scheduler,
+)
+from app.utils import (
+    setup_logging,
+    shutdown_logging,
+    get_logger,
+    StimaException,
+    QueryProfilerMiddleware,
+    RequestIdMiddleware,
+    AdmissionControlMiddleware,
+    secret_key_is_insecure,
+    startup_timer,
+)
 from app.utils.exception_handlers import (
     stima_exception_handler,
     http_exception_handler,
     validation_exception_handler,
     general_exception_handler,
 )
+from external_integrations.profix_client import close_profix_client
 
 # Configure logging
-setup_logging(app_config.LOG_LEVEL)
+setup_logging(
+    app_config.LOG_LEVEL,
+    log_file=app_config.LOG_FILE,
+    log_format=app_config.LOG_FORMAT,
+    queue_size=app_config.LOG_QUEUE_SIZE,
+    info_sample_rate=app_config.LOG_INFO_SAMPLE_RATE,
+)
 logger = get_logger(__name__)
 
 # Create FastAPI application
@@ -34,6 +62,9 @@ app = FastAPI(
     description="A comprehensive debt management system for Stima Sacco with improved architecture and maintainability"
 )
 
+# Shed and rate-limit requests by priority class before they reach the routes
+app.add_middleware(AdmissionControlMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -43,6 +74,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profile MongoDB commands per request (slow-query log and debug trace header)
+app.add_middleware(
+    QueryProfilerMiddleware,
+    client_provider=lambda: get_database().client,
+    debug_header_enabled=app_config.QUERY_TRACE_HEADER_ENABLED,
+)
+
+# Correlate log records with a per-request id
+app.add_middleware(RequestIdMiddleware)
+
 # Add exception handlers
 app.add_exception_handler(StimaException, stima_exception_handler)
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
@@ -52,20 +93,36 @@ app.add_exception_handler(Exception, general_exception_handler)
 # Include API routes
 app.include_router(api_router, prefix=app_config.API_PREFIX)
 
+# Liveness/readiness probes at the application root
+app.include_router(health_router)
+
+startup_timer.mark_imported(_import_started)
+
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize application on startup."""
+    startup_timer.mark_startup_started()
     logger.info("Starting Stima Sacco Debt Management System...")
     logger.info(f"Environment: {app_config.LOG_LEVEL}")
     logger.info(f"Database: {app_config.DATABASE_NAME}")
+    if secret_key_is_insecure():
+        message = "SECRET_KEY is a published value; set a private key (or ALLOW_INSECURE_SECRET_KEY=true in development)"
+        logger.error(message)
+        raise RuntimeError(message)
+    if app_config.SECRET_KEY in INSECURE_SECRET_KEYS:
+        logger.warning("ALLOW_INSECURE_SECRET_KEY is set; access tokens are signed with a published key")
     
     try:
-        # Generate dummy data if needed
-        data_generator = DataGeneratorService()
-        await data_generator.generate_dummy_data_if_needed()
+        # Create indexes and seed dummy data in the background so startup
+        # time does not depend on data volume (progress: /health/ready)
+        start_background_seeding()
+        
+        # Fire follow-up reminders, recovering any missed while stopped
+        start_follow_up_scheduler()
         
-        logger.info("Application startup completed successfully")
+        startup_timer.mark_ready()
+        logger.info(f"Application startup completed successfully ({startup_timer.stats()})")
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
         raise
@@ -77,10 +134,15 @@ async def shutdown_event():
     logger.info("Shutting down Stima Sacco Debt Management System...")
     
     try:
+        await stop_background_seeding()
+        await stop_follow_up_scheduler()
+        await close_profix_client()
         await close_database_connection()
         logger.info("Application shutdown completed successfully")
     except Exception as e:
         logger.error(f"Error during shutdown: {str(e)}")
+    finally:
+        shutdown_logging()
 
 
 @app.get("/")
@@ -1,4 +1,13 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query, Depends
+"""
+Legacy single-module API.
+
+Every endpoint here is served by the modular application (``main:app``), which
+is what the container runs. This module is kept as the reference for
+``tests/test_api_parity.py`` and as a fallback (``APP_MODULE=server:app``);
+new endpoints belong in ``app/``.
+"""
+
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Depends, Header, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -13,15 +22,43 @@ from datetime import datetime, timedelta
 from enum import Enum
 import random
 import asyncio
+import math
+
+from app.config import app_config
+from app.models import MemberCreate as AppMemberCreate, StatusTransitionRequest, TransitionResult
+from app.routes import health_router
+from app.services.dashboard_service import DashboardService
+from app.services.event_stream_service import EventStreamService
+from app.services.idempotency_service import IdempotencyService
+from app.services.member_service import MemberService
+from app.services.seeding_service import start_background_seeding, stop_background_seeding
+from app.services.status_transition_service import StatusTransitionService
+from app.services.worklist_service import WorklistService
+from app.services.note_search_service import NoteSearchService
+from app.services.follow_up_service import FollowUpService, start_follow_up_scheduler, stop_follow_up_scheduler
+from app.utils.admission_control import AdmissionControlMiddleware
+from app.utils.exceptions import StimaException
+from app.utils.query_profiler import query_profiler, QueryProfilerMiddleware
+from app.utils.request_id import RequestIdMiddleware
+from app.utils.single_flight import single_flight, call_key
+from app.utils.logging_config import setup_logging, shutdown_logging
+from external_integrations.profix_client import get_profix_client, close_profix_client
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[query_profiler])
 db = client[os.environ['DB_NAME']]
 
+
+def reset_database_client():
+    """Give this process its own MongoDB client (each server worker, after fork)"""
+    global client, db
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[query_profiler])
+    db = client[os.environ['DB_NAME']]
+
 # Create the main app without a prefix
 app = FastAPI(title="Stima Sacco Debt Management System", version="1.0.0")
 
@@ -184,6 +221,7 @@ class ExternalPartner(BaseModel):
     email: str
     phone_number: str
     commission_rate: float
+    max_active_assignments: int = 5000
     is_active: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -194,6 +232,7 @@ class ExternalPartnerCreate(BaseModel):
     email: str
     phone_number: str
     commission_rate: float
+    max_active_assignments: int = 5000
 
 class PartnerAssignment(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -238,189 +277,21 @@ class DashboardStats(BaseModel):
 # Authentication dependency (simplified for demo)
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     # In a real system, you would validate the JWT token here
-    return {"user_id": "demo_user", "name": "Demo Agent", "role": "agent"}
-
-# Helper function to generate dummy data
-async def generate_dummy_data():
-    """Generate realistic dummy data for the system"""
-    
-    # Check if data already exists
-    member_count = await db.members.count_documents({})
-    if member_count > 0:
-        return
-    
-    print("Generating dummy data...")
-    
-    # Generate Members (sample of 1000 members for demo)
-    members = []
-    kenyan_names = [
-        ("John", "Kamau"), ("Mary", "Wanjiku"), ("Peter", "Mwangi"), ("Grace", "Akinyi"),
-        ("David", "Kiprotich"), ("Agnes", "Nyong'o"), ("Samuel", "Ochieng"), ("Faith", "Wambui"),
-        ("Michael", "Ruto"), ("Joyce", "Chebet"), ("Joseph", "Mutua"), ("Esther", "Wairimu"),
-        ("Daniel", "Kinyua"), ("Rose", "Atieno"), ("Francis", "Mburu"), ("Lucy", "Jepkoech")
-    ]
-    
-    branch_codes = ["001", "002", "003", "004", "005", "006", "007", "008", "009", "010"]
-    
-    for i in range(1000):
-        first_name, last_name = random.choice(kenyan_names)
-        member = Member(
-            member_number=f"STM{10000 + i}",
-            first_name=first_name,
-            last_name=last_name,
-            email=f"{first_name.lower()}.{last_name.lower()}@email.com",
-            phone_number=f"+254{random.randint(700000000, 799999999)}",
-            id_number=f"{random.randint(10000000, 39999999)}",
-            address=f"P.O. Box {random.randint(1, 9999)}, Nairobi",
-            branch_code=random.choice(branch_codes),
-            registration_date=datetime.utcnow() - timedelta(days=random.randint(30, 1825))
-        )
-        members.append(member.dict())
-    
-    await db.members.insert_many(members)
-    
-    # Generate Loan Accounts
-    members_list = await db.members.find().to_list(1000)
-    loans = []
-    
-    for i, member in enumerate(members_list):
-        # Each member can have 1-3 loans
-        num_loans = random.randint(1, 3)
-        
-        for j in range(num_loans):
-            loan_type = random.choice(["branch", "mobile"])
-            principal = random.randint(50000, 2000000)  # 50K to 2M KES
-            interest_rate = random.uniform(12.0, 24.0)
-            term_months = random.choice([6, 12, 18, 24, 36])
-            
-            disbursement_date = datetime.utcnow() - timedelta(days=random.randint(30, 730))
-            maturity_date = disbursement_date + timedelta(days=term_months * 30)
-            
-            # Calculate if loan should be NPL (35,000 out of 107,000 total)
-            is_npl = random.random() < 0.33  # About 33% NPL rate
-            
-            if is_npl:
-                days_in_arrears = random.randint(90, 730)  # 3 months to 2 years
-                outstanding_balance = principal * random.uniform(0.6, 1.2)
-                arrears_amount = outstanding_balance * random.uniform(0.3, 0.8)
-                status = LoanStatus.NON_PERFORMING
-                last_payment_date = datetime.utcnow() - timedelta(days=days_in_arrears)
-            else:
-                days_in_arrears = random.randint(0, 30)
-                outstanding_balance = principal * random.uniform(0.2, 0.8)
-                arrears_amount = 0.0
-                status = LoanStatus.PERFORMING
-                last_payment_date = datetime.utcnow() - timedelta(days=random.randint(1, 30))
-            
-            monthly_payment = (principal / term_months) * (1 + interest_rate/100/12)
-            
-            loan = LoanAccount(
-                loan_number=f"LN{member['member_number']}{j+1:02d}",
-                member_id=member['id'],
-                member_number=member['member_number'],
-                loan_type=loan_type,
-                principal_amount=principal,
-                outstanding_balance=outstanding_balance,
-                monthly_payment=monthly_payment,
-                interest_rate=interest_rate,
-                loan_term_months=term_months,
-                disbursement_date=disbursement_date,
-                maturity_date=maturity_date,
-                last_payment_date=last_payment_date,
-                days_in_arrears=days_in_arrears,
-                arrears_amount=arrears_amount,
-                status=status,
-                branch_code=member['branch_code']
-            )
-            loans.append(loan.dict())
-    
-    await db.loan_accounts.insert_many(loans)
-    
-    # Generate External Partners
-    partners = [
-        ExternalPartner(
-            partner_name="Elite Recovery Services",
-            partner_type=PartnerType.DEBT_COLLECTOR,
-            contact_person="Jane Doe",
-            email="jane@eliterecovery.co.ke",
-            phone_number="+254701234567",
-            commission_rate=15.0
-        ),
-        ExternalPartner(
-            partner_name="Quick Auction House",
-            partner_type=PartnerType.AUCTIONEER,
-            contact_person="Robert Smith",
-            email="robert@quickauction.co.ke",
-            phone_number="+254702345678",
-            commission_rate=10.0
-        ),
-        ExternalPartner(
-            partner_name="Legal Associates LLP",
-            partner_type=PartnerType.LEGAL_FIRM,
-            contact_person="Mary Johnson",
-            email="mary@legalassociates.co.ke",
-            phone_number="+254703456789",
-            commission_rate=20.0
-        )
-    ]
-    
-    await db.external_partners.insert_many([p.dict() for p in partners])
-    
-    print("Dummy data generated successfully!")
+    return {"user_id": "demo_user", "name": "Demo Agent", "role": "agent", "branch_code": "001"}
 
-# Initialize dummy data on startup
+# Initialize indexes and dummy data on startup, in the background so the
+# API accepts traffic immediately (progress is reported on /health/ready)
 @app.on_event("startup")
 async def startup_event():
-    await generate_dummy_data()
+    start_background_seeding()
+    start_follow_up_scheduler()
 
 # Dashboard API
 @api_router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats():
-    """Get dashboard statistics"""
-    total_members = await db.members.count_documents({})
-    total_loans = await db.loan_accounts.count_documents({})
-    total_npl_loans = await db.loan_accounts.count_documents({"status": "non_performing"})
-    
-    # Calculate totals
-    pipeline = [
-        {"$group": {
-            "_id": None,
-            "total_outstanding": {"$sum": "$outstanding_balance"},
-            "total_arrears": {"$sum": "$arrears_amount"}
-        }}
-    ]
-    result = await db.loan_accounts.aggregate(pipeline).to_list(1)
-    total_outstanding = result[0]["total_outstanding"] if result else 0
-    total_arrears = result[0]["total_arrears"] if result else 0
-    
-    # Calculate recovery rate (dummy calculation)
-    recovery_rate = 65.5
-    
-    # Get today's stats
-    today = datetime.utcnow().date()
-    calls_today = await db.call_logs.count_documents({
-        "call_start_time": {"$gte": datetime.combine(today, datetime.min.time())}
-    })
-    
-    promises_due_today = await db.promises_to_pay.count_documents({
-        "promised_date": {"$gte": datetime.combine(today, datetime.min.time()),
-                         "$lt": datetime.combine(today + timedelta(days=1), datetime.min.time())},
-        "status": "pending"
-    })
-    
-    escalations_pending = await db.partner_assignments.count_documents({"status": "assigned"})
-    
-    return DashboardStats(
-        total_members=total_members,
-        total_loans=total_loans,
-        total_npl_loans=total_npl_loans,
-        total_outstanding_amount=total_outstanding,
-        total_arrears_amount=total_arrears,
-        recovery_rate_percent=recovery_rate,
-        calls_today=calls_today,
-        promises_due_today=promises_due_today,
-        escalations_pending=escalations_pending
-    )
+    """Get dashboard statistics (identical concurrent requests share one set of queries)"""
+    stats = await DashboardService().get_dashboard_statistics()
+    return DashboardStats(**stats.dict())
 
 # Member APIs
 @api_router.get("/members", response_model=List[Member])
@@ -449,11 +320,13 @@ async def get_member(member_id: str):
     return Member(**member)
 
 @api_router.post("/members", response_model=Member)
-async def create_member(member_data: MemberCreate):
-    """Create new member"""
-    member = Member(**member_data.dict(), registration_date=datetime.utcnow())
-    await db.members.insert_one(member.dict())
-    return member
+async def create_member(member_data: MemberCreate, force: bool = Query(False)):
+    """Create new member, rejecting exact and (unless forced) probable duplicates"""
+    try:
+        member = await MemberService().create_member(AppMemberCreate(**member_data.dict()), force=force)
+    except StimaException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return Member(**member.dict())
 
 # Loan Account APIs
 @api_router.get("/loans", response_model=List[LoanAccount])
@@ -513,10 +386,24 @@ async def get_calls(skip: int = 0, limit: int = 50, loan_id: str = Query(None)):
     return [CallLog(**call) for call in calls]
 
 @api_router.post("/calls", response_model=CallLog)
-async def create_call_log(call_data: CallLogCreate, current_user: dict = Depends(get_current_user)):
-    """Create new call log"""
+async def create_call_log(
+    call_data: CallLogCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """Create new call log (once per Idempotency-Key)"""
+    try:
+        return await IdempotencyService().run(
+            "calls", idempotency_key, current_user["user_id"], call_data,
+            lambda: _create_call_log(call_data, current_user), response,
+        )
+    except StimaException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+async def _create_call_log(call_data: CallLogCreate, current_user: dict) -> CallLog:
     call_log = CallLog(
-        **call_data.dict(),
+        **call_data.dict(exclude={"agent_id", "agent_name"}),
         call_start_time=datetime.utcnow(),
         agent_id=current_user["user_id"],
         agent_name=current_user["name"]
@@ -529,12 +416,30 @@ async def create_call_log(call_data: CallLogCreate, current_user: dict = Depends
         call_log.recording_url = f"https://recordings.stimasacco.co.ke/{call_log.id}.mp3"
     
     await db.call_logs.insert_one(call_log.dict())
+    await WorklistService().on_call_logged(call_log)
+    await FollowUpService().schedule_from_call(call_log)
+    await NoteSearchService().index_note("call", call_log.dict())
+    await EventStreamService().publish("call_log", "created", call_log.dict())
     return call_log
 
 @api_router.get("/calls/auto-dial")
-async def auto_dial_next():
+async def auto_dial_next(current_user: dict = Depends(get_current_user)):
     """Auto dial next NPL customer"""
-    # Find next NPL loan without recent call
+    # Take the next ready loan from the agent's precomputed worklist
+    item = await WorklistService().next_for_agent(current_user["user_id"], current_user.get("branch_code"))
+    if item is not None:
+        loan = await db.loan_accounts.find_one({"id": item.loan_id})
+        member = await db.members.find_one({"id": item.member_id})
+        if loan and member:
+            return {
+                "loan": LoanAccount(**loan),
+                "member": Member(**member),
+                "phone_number": member["phone_number"],
+                "worklist_item": item,
+                "message": "Ready to dial. Click 'Start Call' to begin."
+            }
+    
+    # No worklist yet: find next NPL loan without recent call
     yesterday = datetime.utcnow() - timedelta(days=1)
     
     # Get NPL loans that haven't been called in the last 24 hours
@@ -581,33 +486,63 @@ async def get_promises(skip: int = 0, limit: int = 50, status: str = Query(None)
     return [PromiseToPay(**promise) for promise in promises]
 
 @api_router.post("/promises", response_model=PromiseToPay)
-async def create_promise(promise_data: PromiseToPayCreate, current_user: dict = Depends(get_current_user)):
-    """Create new promise to pay"""
+async def create_promise(
+    promise_data: PromiseToPayCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """Create new promise to pay (once per Idempotency-Key)"""
+    try:
+        return await IdempotencyService().run(
+            "promises", idempotency_key, current_user["user_id"], promise_data,
+            lambda: _create_promise(promise_data, current_user), response,
+        )
+    except StimaException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+async def _create_promise(promise_data: PromiseToPayCreate, current_user: dict) -> PromiseToPay:
     promise = PromiseToPay(
-        **promise_data.dict(),
+        **promise_data.dict(exclude={"agent_id", "agent_name"}),
         status=PromiseStatus.PENDING,
         agent_id=current_user["user_id"],
         agent_name=current_user["name"]
     )
     await db.promises_to_pay.insert_one(promise.dict())
+    await WorklistService().on_promise_created(promise)
+    await NoteSearchService().index_note("promise", promise.dict())
+    await EventStreamService().publish("promise", "created", promise.dict())
     return promise
 
 @api_router.put("/promises/{promise_id}/status")
-async def update_promise_status(promise_id: str, status: PromiseStatus):
-    """Update promise status"""
-    result = await db.promises_to_pay.update_one(
-        {"id": promise_id},
-        {"$set": {"status": status, "updated_at": datetime.utcnow()}}
-    )
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Promise not found")
+async def update_promise_status(promise_id: str, status: PromiseStatus, current_user: dict = Depends(get_current_user)):
+    """Update promise status through the validated transition engine"""
+    try:
+        await StatusTransitionService().transition_one(
+            "promise", promise_id, status.value, reason="status update", actor=current_user["user_id"]
+        )
+    except StimaException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     return {"message": "Promise status updated"}
 
+@api_router.post("/promises/status-transitions", response_model=TransitionResult)
+async def transition_promise_statuses(request: StatusTransitionRequest, current_user: dict = Depends(get_current_user)):
+    """Move many promises to a new status in one validated bulk operation"""
+    try:
+        return await StatusTransitionService().transition(
+            "promise", request.ids, request.status, request.reason, actor=current_user["user_id"]
+        )
+    except StimaException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
 # External Partner APIs
 @api_router.get("/partners", response_model=List[ExternalPartner])
 async def get_partners():
     """Get external partners"""
-    partners = await db.external_partners.find({"is_active": True}).to_list(100)
+    partners = await single_flight.do(
+        call_key("partners", {"is_active": True}),
+        lambda: db.external_partners.find({"is_active": True}).to_list(100),
+    )
     return [ExternalPartner(**partner) for partner in partners]
 
 @api_router.post("/partners", response_model=ExternalPartner)
@@ -631,6 +566,7 @@ async def create_partner_assignment(assignment_data: PartnerAssignmentCreate):
         assigned_date=datetime.utcnow()
     )
     await db.partner_assignments.insert_one(assignment.dict())
+    await EventStreamService().publish("partner_assignment", "created", assignment.dict())
     return assignment
 
 # Notification APIs
@@ -659,20 +595,7 @@ async def mark_notification_read(notification_id: str):
 @api_router.get("/reports/npl-summary")
 async def get_npl_summary():
     """Get NPL summary report"""
-    pipeline = [
-        {"$match": {"status": "non_performing"}},
-        {"$group": {
-            "_id": "$branch_code",
-            "total_loans": {"$sum": 1},
-            "total_outstanding": {"$sum": "$outstanding_balance"},
-            "total_arrears": {"$sum": "$arrears_amount"},
-            "avg_days_arrears": {"$avg": "$days_in_arrears"}
-        }},
-        {"$sort": {"total_outstanding": -1}}
-    ]
-    
-    results = await db.loan_accounts.aggregate(pipeline).to_list(100)
-    return results
+    return await DashboardService().get_npl_summary()
 
 @api_router.get("/reports/collection-performance")
 async def get_collection_performance():
@@ -693,21 +616,26 @@ async def get_collection_performance():
     results = await db.promises_to_pay.aggregate(pipeline).to_list(100)
     return results
 
-# ProFIX Integration Simulation
+# ProFIX Integration
 @api_router.get("/profix/sync/{loan_id}")
 async def sync_with_profix(loan_id: str):
-    """Simulate ProFIX data synchronization"""
+    """Synchronize a loan's outstanding balance with ProFIX (simulated without PROFIX_API_URL)"""
     loan = await db.loan_accounts.find_one({"id": loan_id})
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
     
-    # Simulate fetching updated data from ProFIX
-    await asyncio.sleep(1)  # Simulate API call delay
+    try:
+        updated_balance = await get_profix_client().get_outstanding_balance(loan)
+    except StimaException as e:
+        retry_after = getattr(e, "retry_after", 0)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after else None,
+        )
     
-    # Update with simulated new data
-    updated_balance = loan["outstanding_balance"] * random.uniform(0.95, 1.02)
     result = await db.loan_accounts.update_one(
-        {"id": loan_id},
+        {"branch_code": loan.get("branch_code"), "id": loan_id},
         {"$set": {"outstanding_balance": updated_balance, "updated_at": datetime.utcnow()}}
     )
     
@@ -721,6 +649,10 @@ async def sync_with_profix(loan_id: str):
 
 # Include the router in the main app
 app.include_router(api_router)
+app.include_router(health_router)
+
+# Shed and rate-limit requests by priority class before they reach the routes
+app.add_middleware(AdmissionControlMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -730,13 +662,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+app.add_middleware(
+    QueryProfilerMiddleware,
+    client_provider=lambda: client,
+    debug_header_enabled=app_config.QUERY_TRACE_HEADER_ENABLED,
+)
+
+app.add_middleware(RequestIdMiddleware)
+
+# Configure logging (queue-based, off the event loop)
+setup_logging(
+    app_config.LOG_LEVEL,
+    log_file=app_config.LOG_FILE,
+    log_format=app_config.LOG_FORMAT,
+    queue_size=app_config.LOG_QUEUE_SIZE,
+    info_sample_rate=app_config.LOG_INFO_SAMPLE_RATE,
 )
 logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await stop_background_seeding()
+    await stop_follow_up_scheduler()
+    await close_profix_client()
     client.close()
+    shutdown_logging()
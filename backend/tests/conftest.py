@@ -0,0 +1,11 @@
+"""
+Test configuration shared by every module.
+
+Tokens are refused while SECRET_KEY is a published value, so the suite signs
+them with a key of its own unless one is configured.
+"""
+
+import os
+import secrets
+
+os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
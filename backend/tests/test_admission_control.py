@@ -0,0 +1,180 @@
+"""
+Admission control: slot handoff and queue shedding in the class limiter,
+reports refused while critical requests queue, and token bucket refill with
+the ``Retry-After`` it reports.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.utils import admission_control
+from app.utils.admission_control import (
+    CRITICAL,
+    AdmissionControlMiddleware,
+    AdmissionController,
+    ClassLimiter,
+    TokenBuckets,
+)
+
+
+class Clock:
+    """Stand-in for ``time.monotonic`` that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_released_slot_is_handed_to_the_next_waiter():
+    limiter = ClassLimiter("critical", concurrency=1, max_queue_seconds=1.0)
+
+    async def scenario():
+        assert await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.has_waiters() and not waiter.done()
+
+        limiter.release(0.01)
+
+        assert await waiter
+        # The slot passed straight to the waiter; it was never free for a newcomer
+        assert limiter.active == 1
+        limiter.release(0.01)
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
+    assert limiter.admitted == 2 and limiter.queued == 1 and limiter.shed == 0
+
+
+def test_waiter_is_shed_when_its_queue_budget_runs_out():
+    limiter = ClassLimiter("interactive", concurrency=1, max_queue_seconds=0.02)
+
+    async def scenario():
+        assert await limiter.acquire()
+        started = time.monotonic()
+        assert not await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.02
+    assert limiter.shed == 1 and limiter.active == 1
+    assert not limiter.has_waiters()
+
+
+def test_arrival_is_shed_at_once_behind_a_queue_over_budget():
+    limiter = ClassLimiter("interactive", concurrency=1, max_queue_seconds=0.5)
+
+    async def scenario():
+        assert await limiter.acquire()
+        stale = asyncio.get_running_loop().create_future()
+        limiter.waiters.append((stale, time.monotonic() - 1.0))
+        started = time.monotonic()
+        assert not await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 0.1
+    assert limiter.shed == 1
+
+
+def test_reports_are_refused_while_critical_requests_queue():
+    controller = AdmissionController()
+    controller.enabled = True
+    controller.limiters[CRITICAL] = ClassLimiter(CRITICAL, concurrency=1, max_queue_seconds=5.0)
+    controller.buckets = TokenBuckets(rate=1000, burst=1000)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            if scope["path"] == "/api/calls":
+                await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        middleware = AdmissionControlMiddleware(app, controller)
+        first, second, report = [], [], []
+        calls = [
+            asyncio.ensure_future(middleware(request("POST", "/api/calls"), receive, sender(sent)))
+            for sent in (first, second)
+        ]
+        await asyncio.sleep(0.01)
+        assert controller.limiters[CRITICAL].has_waiters()
+
+        await middleware(request("GET", "/api/reports/npl-summary"), receive, sender(report))
+
+        release.set()
+        await asyncio.gather(*calls)
+        return first, second, report
+
+    first, second, report = asyncio.run(scenario())
+    assert report[0]["status"] == 503
+    assert int(headers(report)[b"retry-after"]) >= 1
+    assert first[0]["status"] == second[0]["status"] == 200
+
+
+def test_bucket_refills_at_its_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission_control.time, "monotonic", clock)
+    buckets = TokenBuckets(rate=10.0, burst=2.0)
+
+    assert buckets.take("user:agent_001", 1.0) == 0.0
+    assert buckets.take("user:agent_001", 1.0) == 0.0
+    assert buckets.take("user:agent_001", 1.0) == pytest.approx(0.1)
+    # Other clients have their own bucket
+    assert buckets.take("user:agent_002", 2.0) == 0.0
+
+    clock.now += 0.1
+    assert buckets.take("user:agent_001", 1.0) == 0.0
+    clock.now += 10.0
+    # Refill stops at the burst size
+    assert buckets.take("user:agent_001", 3.0) == pytest.approx(0.1)
+    assert buckets.limited == 2
+
+
+def test_empty_bucket_gets_429_with_retry_after(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission_control.time, "monotonic", clock)
+    controller = AdmissionController()
+    controller.enabled = True
+    controller.buckets = TokenBuckets(rate=0.4, burst=1.0)
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = AdmissionControlMiddleware(app, controller)
+
+    def get():
+        sent = []
+        asyncio.run(middleware(request("GET", "/api/members"), receive, sender(sent)))
+        return sent
+
+    assert get()[0]["status"] == 200
+    limited = get()
+    assert limited[0]["status"] == 429
+    # 1 token at 0.4 tokens/s is 2.5s away, rounded up
+    assert headers(limited)[b"retry-after"] == b"3"
+
+    clock.now += 2.5
+    assert get()[0]["status"] == 200
+
+
+def request(method, path):
+    return {"type": "http", "method": method, "path": path, "headers": [], "client": ("10.0.0.7", 50000)}
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def sender(sent):
+    async def send(message):
+        sent.append(message)
+    return send
+
+
+def headers(sent):
+    return dict(sent[0]["headers"])
@@ -0,0 +1,181 @@
+"""
+Access token validation, the verified-token cache and revocation.
+
+Runs against a mongomock database; the auth routes are exercised through
+the modular app in-process.
+"""
+
+import asyncio
+import time
+
+import httpx
+import jwt
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import main  # noqa: E402
+from app.config import app_config  # noqa: E402
+from app.config.database import db_config  # noqa: E402
+from app.config.settings import DEFAULT_SECRET_KEY  # noqa: E402
+from app.services import AuthService  # noqa: E402
+from app.utils import (  # noqa: E402
+    InsecureSecretKeyException,
+    InvalidCredentialsException,
+    authenticate_token,
+    create_access_token,
+    hash_password,
+    require_role,
+    token_cache,
+    user_from_token,
+)
+from app.utils.token_cache import VerifiedTokenCache  # noqa: E402
+
+AGENT = {"user_id": "agent_042", "username": "wanjiru", "name": "Wanjiru Kamau", "role": "agent", "branch_code": "004"}
+
+
+@pytest.fixture
+def database():
+    client = AsyncMongoMockClient()
+    database = client["stima_auth"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    token_cache.clear()
+    asyncio.run(database.users.insert_one({**AGENT, "password_hash": hash_password("s3cret"), "is_active": True}))
+    yield database
+    token_cache.clear()
+    db_config._client, db_config._database = previous
+
+
+def test_login_issues_a_token_for_the_user(database):
+    access = asyncio.run(AuthService().login("wanjiru", "s3cret"))
+
+    user = asyncio.run(authenticate_token(access.access_token))
+    assert user == AGENT
+    assert access.user.user_id == "agent_042" and access.expires_in > 0
+
+    with pytest.raises(InvalidCredentialsException):
+        asyncio.run(AuthService().login("wanjiru", "wrong"))
+    with pytest.raises(InvalidCredentialsException):
+        asyncio.run(AuthService().login("nobody", "s3cret"))
+
+
+def test_published_secret_key_disables_tokens(database, monkeypatch):
+    valid, _ = create_access_token(AGENT)
+    forged = jwt.encode({"sub": "admin", "role": "admin", "iat": time.time(), "exp": int(time.time()) + 60,
+                         "jti": "forged"}, DEFAULT_SECRET_KEY, algorithm="HS256")
+    monkeypatch.setattr(app_config, "SECRET_KEY", DEFAULT_SECRET_KEY)
+
+    with pytest.raises(InsecureSecretKeyException):
+        create_access_token(AGENT)
+    assert user_from_token(forged) is None
+    with pytest.raises(RuntimeError):
+        asyncio.run(main.startup_event())
+
+    # Explicitly allowed for development
+    monkeypatch.setattr(app_config, "ALLOW_INSECURE_SECRET_KEY", True)
+    assert user_from_token(forged) == {"user_id": "admin", "role": "admin"}
+    assert user_from_token(valid) is None  # signed with the configured key
+
+
+def test_invalid_and_expired_tokens_are_rejected(database):
+    expired, _ = create_access_token(AGENT, expires_minutes=-1)
+    valid, _ = create_access_token(AGENT)
+    forged = valid[:-4] + ("AAAA" if not valid.endswith("AAAA") else "BBBB")
+
+    for token in ("not-a-jwt", expired, forged):
+        assert asyncio.run(authenticate_token(token)) is None
+        assert user_from_token(token) is None
+
+
+def test_cached_token_skips_signature_check_and_lookup(database):
+    token, _ = create_access_token(AGENT)
+    assert asyncio.run(authenticate_token(token)) == AGENT
+
+    # The user record is gone, but the verified token is still cached
+    asyncio.run(database.users.delete_many({}))
+    hits = token_cache.hits
+    assert asyncio.run(authenticate_token(token)) == AGENT
+    assert user_from_token(token) == AGENT
+    assert token_cache.hits == hits + 2
+
+    # Once the cache entry lapses the lookup runs again and fails
+    token_cache.clear()
+    assert asyncio.run(authenticate_token(token)) is None
+
+
+def test_inactive_user_is_rejected(database):
+    asyncio.run(database.users.update_one({"user_id": "agent_042"}, {"$set": {"is_active": False}}))
+    token, _ = create_access_token(AGENT)
+    assert asyncio.run(authenticate_token(token)) is None
+
+
+def test_revoked_token_is_rejected(database):
+    token, _ = create_access_token(AGENT)
+    other, _ = create_access_token(AGENT)
+    assert asyncio.run(authenticate_token(token)) == AGENT
+    assert asyncio.run(authenticate_token(other)) == AGENT
+
+    asyncio.run(AuthService().revoke_token(token))
+    assert asyncio.run(authenticate_token(token)) is None
+    assert asyncio.run(authenticate_token(other)) == AGENT
+
+
+def test_sign_out_everywhere_rejects_earlier_tokens_only(database):
+    earlier, _ = create_access_token(AGENT)
+    assert asyncio.run(authenticate_token(earlier)) == AGENT
+
+    asyncio.run(AuthService().revoke_user_tokens("agent_042"))
+    time.sleep(0.01)
+    later, _ = create_access_token(AGENT)
+
+    assert asyncio.run(authenticate_token(earlier)) is None
+    assert asyncio.run(authenticate_token(later)) == AGENT
+
+
+def test_cache_is_bounded_and_expires_with_the_token():
+    cache = VerifiedTokenCache(max_size=2, ttl_seconds=60)
+    now = time.time()
+    for digest in (b"a", b"b", b"c"):
+        cache.put(digest, {"user_id": digest.decode()}, now + 600)
+
+    assert cache.get(b"a") is None
+    assert cache.get(b"c") == {"user_id": "c"}
+    assert cache.stats()["evictions"] == 1
+
+    cache.put(b"expired", {"user_id": "x"}, now - 1)
+    assert cache.get(b"expired") is None
+
+    assert cache.evict_user("c") == 1 and cache.get(b"c") is None
+
+
+def test_require_role():
+    checker = require_role("manager")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(checker(current_user=AGENT))
+    assert error.value.status_code == 403
+
+    admin = {**AGENT, "role": "admin"}
+    assert asyncio.run(checker(current_user=admin)) is admin
+
+
+def test_auth_routes(database):
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://auth") as client:
+            failed = await client.post("/api/auth/token", json={"username": "wanjiru", "password": "nope"})
+            login = await client.post("/api/auth/token", json={"username": "wanjiru", "password": "s3cret"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            profile = await client.get("/api/auth/me", headers=headers)
+            logout = await client.post("/api/auth/logout", headers=headers)
+            after_logout = await client.get("/api/auth/me", headers=headers)
+            return failed, login, profile, logout, after_logout
+
+    failed, login, profile, logout, after_logout = asyncio.run(scenario())
+    assert failed.status_code == 401
+    assert login.status_code == 200 and login.json()["token_type"] == "bearer"
+    assert profile.status_code == 200 and profile.json() == AGENT
+    assert logout.status_code == 200
+    assert after_logout.status_code == 401
@@ -0,0 +1,188 @@
+"""
+Daily balance snapshots: column encoding, keyframe and delta replay,
+point-in-time and period-over-period reports, and branch scoping.
+
+Snapshots are taken of a small mongomock portfolio whose balances and
+statuses are changed between business dates.
+"""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.config import app_config  # noqa: E402
+from app.config.database import db_config  # noqa: E402
+from app.services import BalanceSnapshotService  # noqa: E402
+from app.services.balance_snapshot_service import decode_column, encode_column  # noqa: E402
+from app.utils import BranchAccessDeniedException, SnapshotNotFoundException  # noqa: E402
+
+AGENT = {"user_id": "agent_007", "name": "Otieno Ouma", "role": "agent", "branch_code": "003"}
+
+
+def loan(index, branch, balance, status="performing", arrears=0.0, days=0):
+    return {
+        "id": f"loan_{branch}_{index}",
+        "branch_code": branch,
+        "outstanding_balance": balance,
+        "arrears_amount": arrears,
+        "days_in_arrears": days,
+        "status": status,
+    }
+
+
+@pytest.fixture
+def database(monkeypatch):
+    client = AsyncMongoMockClient()
+    database = client["stima_snapshots"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    # Small chunks and keyframes, so the tests cross chunk and keyframe boundaries
+    monkeypatch.setattr(app_config, "SNAPSHOT_CHUNK_SIZE", 4)
+    monkeypatch.setattr(app_config, "SNAPSHOT_KEYFRAME_DAYS", 3)
+
+    loans = [loan(index, "003", 1000.0 + index) for index in range(10)]
+    loans += [loan(index, "005", 500.0, status="non_performing", arrears=200.0, days=120) for index in range(3)]
+    asyncio.run(database.loan_accounts.insert_many(loans))
+    yield database
+
+    db_config._client, db_config._database = previous
+
+
+def snapshot(business_date, user=None):
+    return asyncio.run(BalanceSnapshotService(user).take_snapshot(business_date))
+
+
+def change(database, loan_id, **fields):
+    asyncio.run(database.loan_accounts.update_one({"id": loan_id}, {"$set": fields}))
+
+
+def test_columns_round_trip_and_deltas_compress():
+    rng = np.random.default_rng(7)
+    previous = rng.integers(0, 10_000_000, 5000).astype("<i8")
+    current = previous.copy()
+    current[::100] -= 150_00
+
+    full = encode_column(current)
+    delta = encode_column(current, previous)
+    assert np.array_equal(decode_column(full, "<i8"), current)
+    assert np.array_equal(decode_column(delta, "<i8", previous), current)
+    assert len(delta) < len(full) / 10
+
+    # A longer column than the previous one: new positions start from zero
+    grown = np.append(current, [42, 43]).astype("<i8")
+    assert np.array_equal(decode_column(encode_column(grown, previous), "<i8", previous), grown)
+
+
+def test_point_in_time_totals_survive_overwrites(database):
+    first = snapshot("2026-10-01")
+    assert first["branches"]["003"] == {**first["branches"]["003"], "loans": 10, "chunks": 3, "keyframe": True}
+
+    change(database, "loan_003_0", outstanding_balance=0.0, status="closed")
+    change(database, "loan_003_1", outstanding_balance=900.0, arrears_amount=300.0, days_in_arrears=95,
+           status="non_performing")
+    second = snapshot("2026-10-02")
+    assert second["branches"]["003"]["keyframe"] is False
+
+    service = BalanceSnapshotService()
+    october_1 = asyncio.run(service.get_portfolio_as_of("2026-10-01"))
+    assert october_1.total.loans == 13
+    assert october_1.total.outstanding == sum(1000.0 + index for index in range(10)) + 1500.0
+    assert october_1.npl.loans == 3 and october_1.npl.arrears == 600.0
+
+    # A date between snapshots reads the latest one before it
+    october_5 = asyncio.run(service.get_portfolio_as_of("2026-10-05"))
+    assert {branch.business_date for branch in october_5.branches} == {"2026-10-02"}
+    assert october_5.npl.loans == 4 and october_5.npl.outstanding == 2400.0
+    assert october_5.by_status["closed"].loans == 1
+
+    with pytest.raises(SnapshotNotFoundException):
+        asyncio.run(service.get_portfolio_as_of("2026-09-30"))
+
+
+def test_deltas_replay_from_keyframes_across_new_and_deleted_loans(database):
+    expected = {}
+    for day in range(1, 8):
+        business_date = f"2026-10-{day:02d}"
+        change(database, "loan_003_2", outstanding_balance=1002.0 - day * 10)
+        if day == 3:
+            asyncio.run(database.loan_accounts.insert_one(loan(10, "003", 777.0)))
+        if day == 5:
+            asyncio.run(database.loan_accounts.delete_one({"id": "loan_003_4"}))
+        result = snapshot(business_date)
+        assert result["branches"]["003"]["keyframe"] is (day in (1, 4, 7))
+        expected[business_date] = asyncio.run(
+            database.loan_accounts.aggregate([
+                {"$match": {"branch_code": "003"}},
+                {"$group": {"_id": None, "loans": {"$sum": 1}, "outstanding": {"$sum": "$outstanding_balance"}}},
+            ]).to_list(1)
+        )[0]
+
+    service = BalanceSnapshotService()
+    for business_date, totals in expected.items():
+        state = asyncio.run(service._decode("003", business_date, ("balance_cents", "status")))
+        assert int((state["status"] != 0).sum()) == totals["loans"]
+        assert state["balance_cents"].sum() == round(totals["outstanding"] * 100)
+
+
+def test_comparison_reports_status_migrations(database):
+    snapshot("2026-10-01")
+    change(database, "loan_003_1", outstanding_balance=950.0, status="non_performing")
+    change(database, "loan_005_0", outstanding_balance=0.0, status="closed")
+    asyncio.run(database.loan_accounts.insert_one(loan(3, "005", 250.0)))
+    snapshot("2026-10-08")
+
+    comparison = asyncio.run(BalanceSnapshotService().compare("2026-10-01", "2026-10-08"))
+    migrations = {(row.from_status, row.to_status): row for row in comparison.migrations}
+
+    assert migrations[("performing", "non_performing")].loans == 1
+    assert migrations[("performing", "non_performing")].outstanding_from == 1001.0
+    assert migrations[("performing", "non_performing")].outstanding_to == 950.0
+    assert migrations[("non_performing", "closed")].loans == 1
+    assert migrations[(None, "performing")].loans == 1
+    assert migrations[("performing", "performing")].loans == 9
+    assert comparison.change.loans == 1
+    assert comparison.npl_change.loans == 0
+    assert comparison.npl_change.outstanding == 950.0 - 500.0
+
+
+def test_retaking_the_latest_date_replaces_it_and_earlier_dates_are_skipped(database):
+    snapshot("2026-10-02")
+    change(database, "loan_003_0", outstanding_balance=1.0)
+    retaken = snapshot("2026-10-02")
+    earlier = snapshot("2026-10-01")
+
+    assert retaken["branches"]["003"]["keyframe"] is True
+    assert "skipped" in earlier["branches"]["003"]
+    assert asyncio.run(database.balance_snapshots.count_documents({"business_date": "2026-10-02"})) == 4
+    totals = asyncio.run(BalanceSnapshotService().get_portfolio_as_of("2026-10-02"))
+    assert totals.by_status["performing"].outstanding == sum(1000.0 + index for index in range(1, 10)) + 1.0
+
+
+def test_branch_users_see_only_their_branch(database):
+    snapshot("2026-10-01")
+
+    totals = asyncio.run(BalanceSnapshotService(AGENT).get_portfolio_as_of("2026-10-01"))
+    storage = asyncio.run(BalanceSnapshotService(AGENT).get_storage_stats())
+
+    assert [branch.branch_code for branch in totals.branches] == ["003"]
+    assert totals.total.loans == 10 and totals.npl.loans == 0
+    assert storage[0].branches == 1 and storage[0].loans == 10
+    with pytest.raises(BranchAccessDeniedException):
+        BalanceSnapshotService(AGENT, "005")
+
+
+def test_storage_is_measured_per_snapshot(database):
+    snapshot("2026-10-01")
+    change(database, "loan_003_0", outstanding_balance=10.0)
+    snapshot("2026-10-02")
+
+    storage = asyncio.run(BalanceSnapshotService().get_storage_stats())
+
+    assert [row.business_date for row in storage] == ["2026-10-02", "2026-10-01"]
+    assert [row.keyframe for row in storage] == [False, True]
+    assert all(row.loans == 13 and row.chunks == 4 and row.stored_bytes > 0 for row in storage)
+    assert storage[0].bytes_per_loan == round(storage[0].stored_bytes / 13, 3)
@@ -0,0 +1,38 @@
+"""
+Benchmark runner helpers: nearest-rank percentiles and the baseline gate.
+"""
+
+from benchmarks.run import compare_with_baseline, percentile
+
+BASELINE = {"dashboard_stats": {"requests": 100, "errors": 0, "statuses": {"200": 100}, "rps": 400.0, "p95_ms": 20.0}}
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 7) == 7.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile([5.0], 99) == 5.0
+    assert percentile([], 50) == 0.0
+
+
+def test_gate_passes_a_clean_run():
+    assert compare_with_baseline(BASELINE, BASELINE, tolerance=0.2) == []
+
+
+def test_gate_fails_a_fast_run_of_rejected_requests():
+    # 429s come back quickly, so latency and throughput alone would look like an improvement
+    rejected = {"dashboard_stats": {"requests": 100, "errors": 100, "statuses": {429: 100}, "rps": 5000.0, "p95_ms": 1.0}}
+
+    regressions = compare_with_baseline(rejected, BASELINE, tolerance=0.2)
+
+    assert regressions == ["dashboard_stats: 100/100 requests failed or were not 2xx"]
+
+
+def test_gate_fails_errors_in_scenarios_missing_from_the_baseline():
+    results = {"reports_npl_summary": {"requests": 10, "errors": 0, "statuses": {200: 9, 302: 1}, "rps": 50.0, "p95_ms": 5.0}}
+
+    assert compare_with_baseline(results, BASELINE, tolerance=0.2) == [
+        "reports_npl_summary: 1/10 requests failed or were not 2xx"
+    ]
@@ -0,0 +1,232 @@
+"""
+Branch scoping of member, loan, dashboard and report queries.
+
+Runs the modular app in-process against a generated mongomock database
+spread over several branches, as a branch agent and as an admin.
+"""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import main  # noqa: E402
+from app.config.database import db_config  # noqa: E402
+from app.config.indexes import COLLECTION_INDEXES, SHARD_KEYS, shard_compatible  # noqa: E402
+from app.services import BranchPartitionService, DataGeneratorService, LoanService  # noqa: E402
+from app.utils import (  # noqa: E402
+    BranchAccessDeniedException,
+    admission_controller,
+    create_access_token,
+    resolve_branch_scope,
+    token_cache,
+)
+
+AGENT = {"user_id": "agent_007", "username": "otieno", "name": "Otieno Ouma", "role": "agent", "branch_code": "003"}
+ADMIN = {"user_id": "admin_01", "username": "root", "name": "Head Office", "role": "admin", "branch_code": None}
+
+
+@pytest.fixture(scope="module")
+def database():
+    client = AsyncMongoMockClient()
+    database = client["stima_branches"]
+    previous = (db_config._client, db_config._database, admission_controller.enabled)
+    db_config._client, db_config._database = client, database
+    admission_controller.enabled = False
+    token_cache.clear()
+
+    asyncio.run(DataGeneratorService(member_count=200).generate_dummy_data_if_needed())
+    for user in (AGENT, ADMIN):
+        asyncio.run(database.users.insert_one({**user, "password_hash": "", "is_active": True}))
+    yield database
+
+    token_cache.clear()
+    db_config._client, db_config._database, admission_controller.enabled = previous
+
+
+def send(method, user, path, **kwargs):
+    async def request():
+        token, _ = create_access_token(user)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://branches") as client:
+            return await client.request(method, path, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+
+    return asyncio.run(request())
+
+
+def get(user, path):
+    return send("GET", user, path)
+
+
+def count(database, collection, query=None):
+    return asyncio.run(database[collection].count_documents(query or {}))
+
+
+def test_resolve_branch_scope():
+    assert resolve_branch_scope(None) is None
+    assert resolve_branch_scope(None, "002") == "002"
+    assert resolve_branch_scope(AGENT) == "003"
+    assert resolve_branch_scope(AGENT, "003") == "003"
+    assert resolve_branch_scope(ADMIN) is None
+    assert resolve_branch_scope(ADMIN, "002") == "002"
+    assert resolve_branch_scope({**AGENT, "branch_code": None}) is None
+    with pytest.raises(BranchAccessDeniedException):
+        resolve_branch_scope(AGENT, "002")
+
+
+def test_branch_user_lists_only_their_branch(database):
+    members = get(AGENT, "/api/members?limit=1000").json()
+    loans = get(AGENT, "/api/loans?limit=1000").json()
+
+    assert members and {member["branch_code"] for member in members} == {"003"}
+    assert len(members) == count(database, "members", {"branch_code": "003"})
+    assert loans and {loan["branch_code"] for loan in loans} == {"003"}
+    assert len(loans) == count(database, "loan_accounts", {"branch_code": "003"})
+
+
+def test_other_branch_records_are_not_found(database):
+    member = asyncio.run(database.members.find_one({"branch_code": "005"}))
+    loan = asyncio.run(database.loan_accounts.find_one({"branch_code": "005"}))
+
+    assert get(AGENT, f"/api/members/{member['id']}").status_code == 404
+    assert get(AGENT, f"/api/loans/{loan['id']}").status_code == 404
+    assert get(AGENT, f"/api/loans/member/{member['id']}").json() == []
+    assert get(ADMIN, f"/api/members/{member['id']}").status_code == 200
+
+
+def test_branch_user_cannot_ask_for_another_branch(database):
+    assert get(AGENT, "/api/members?branch_code=005").status_code == 403
+    assert get(AGENT, "/api/dashboard/stats?branch_code=005").status_code == 403
+    assert get(AGENT, "/api/members?branch_code=003").status_code == 200
+
+
+def test_admin_sees_every_branch_or_one(database):
+    stats = get(ADMIN, "/api/dashboard/stats").json()
+    branch = get(ADMIN, "/api/dashboard/stats?branch_code=005").json()
+
+    assert stats["total_loans"] == count(database, "loan_accounts")
+    assert branch["total_loans"] == count(database, "loan_accounts", {"branch_code": "005"})
+    assert len(get(ADMIN, "/api/reports/npl-summary").json()) > 1
+
+
+def test_dashboard_and_reports_are_scoped(database):
+    stats = get(AGENT, "/api/dashboard/stats").json()
+    summary = get(AGENT, "/api/reports/npl-summary").json()
+    performance = get(AGENT, "/api/reports/collection-performance").json()
+
+    assert stats["total_members"] == count(database, "members", {"branch_code": "003"})
+    assert stats["total_npl_loans"] == count(database, "loan_accounts", {"branch_code": "003", "status": "non_performing"})
+    assert [row["_id"] for row in summary] == ["003"]
+    promises = sum(row["count"] for row in performance)
+    assert promises <= count(database, "promises_to_pay", {"branch_code": "003"})
+
+
+def test_branch_user_cannot_transition_other_branch_records(database):
+    loan = asyncio.run(database.loan_accounts.find_one({"branch_code": "005", "status": "performing"}))
+    promise = {"id": "promise_005_pending", "loan_id": loan["id"], "branch_code": "005", "status": "pending"}
+    asyncio.run(database.promises_to_pay.insert_one(dict(promise)))
+
+    result = send("POST", AGENT, "/api/loans/status-transitions",
+                  json={"ids": [loan["id"]], "status": "non_performing", "reason": "test"}).json()
+    assert result["outcomes"] == {loan["id"]: "not_found"}
+    assert asyncio.run(database.loan_accounts.find_one({"id": loan["id"]}))["status"] == "performing"
+
+    response = send("PUT", AGENT, f"/api/promises/{promise['id']}/status?status=kept")
+    assert response.status_code == 404
+    assert asyncio.run(database.promises_to_pay.find_one({"id": promise["id"]}))["status"] == "pending"
+
+
+def test_loan_details_notes_and_worklists_are_scoped(database):
+    loan = asyncio.run(database.loan_accounts.find_one({"branch_code": "005"}))
+    for path in ("schedule", "arrears-position", "status-history"):
+        assert get(AGENT, f"/api/loans/{loan['id']}/{path}").status_code == 404
+        assert get(ADMIN, f"/api/loans/{loan['id']}/{path}").status_code == 200
+
+    note = asyncio.run(database.note_index.find_one({"branch_code": "005"}))
+    prefix = note["terms"][0][:3]
+    assert {row["loan_id"] for row in get(ADMIN, f"/api/notes/search?q={prefix}*&limit=100").json()}
+    results = get(AGENT, f"/api/notes/search?q={prefix}*&limit=100").json()
+    branch_loans = {loan["id"] for loan in asyncio.run(database.loan_accounts.find({"branch_code": "003"}).to_list(None))}
+    assert {row["loan_id"] for row in results} <= branch_loans
+
+    item = {"loan_id": loan["id"], "member_id": loan["member_id"], "loan_number": loan["loan_number"],
+            "member_number": "M005", "agent_id": "agent_005", "branch_code": "005", "priority": 1.0,
+            "ready_at": datetime.utcnow()}
+    asyncio.run(database.worklist_items.insert_one(item))
+    assert get(AGENT, "/api/worklists/agents/agent_005").json() == []
+    assert len(get(ADMIN, "/api/worklists/agents/agent_005").json()) == 1
+
+
+def test_loan_activity_carries_the_loan_branch(database):
+    for collection in ("call_logs", "promises_to_pay", "partner_assignments"):
+        assert count(database, collection, {"branch_code": None}) == 0
+
+    # Records written before branch codes were copied are backfilled from their loans
+    asyncio.run(database.call_logs.update_many({}, {"$unset": {"branch_code": ""}}))
+    counts = asyncio.run(BranchPartitionService().backfill_branch_codes(batch_size=50))
+    assert counts["call_logs"] == count(database, "call_logs") > 0
+    call = asyncio.run(database.call_logs.find_one({}))
+    loan = asyncio.run(database.loan_accounts.find_one({"id": call["loan_id"]}))
+    assert call["branch_code"] == loan["branch_code"]
+
+
+def test_branch_service_rejects_other_branch_writes(database):
+    from app.models import LoanAccountCreate
+
+    loan = asyncio.run(database.loan_accounts.find_one({"branch_code": "005"}, {"_id": 0}))
+    fields = {field: loan[field] for field in LoanAccountCreate.model_fields if field in loan}
+    with pytest.raises(BranchAccessDeniedException):
+        asyncio.run(LoanService(AGENT).create_loan(LoanAccountCreate(**fields)))
+
+
+def test_calls_and_promises_are_scoped(database):
+    call = asyncio.run(database.call_logs.find_one({"branch_code": "005"}, {"_id": 0}))
+    assert get(AGENT, f"/api/calls?loan_id={call['loan_id']}").json() == []
+    assert get(ADMIN, f"/api/calls?loan_id={call['loan_id']}").json()
+    calls = get(AGENT, "/api/calls?limit=1000").json()
+    promises = get(AGENT, "/api/promises?limit=1000").json()
+    assert calls and {c["branch_code"] for c in calls} == {"003"}
+    assert {p["branch_code"] for p in promises} <= {"003"}
+
+    fields = {"loan_id": call["loan_id"], "member_id": call["member_id"], "agent_id": "x", "agent_name": "x"}
+    logged = send("POST", AGENT, "/api/calls", json={
+        **fields, "call_type": call["call_type"], "phone_number": call["phone_number"], "call_status": "no_answer",
+    })
+    promised = send("POST", AGENT, "/api/promises", json={
+        **fields, "call_id": call["id"], "promised_amount": 500.0, "promised_date": datetime.utcnow().isoformat(),
+    })
+    assert logged.status_code == promised.status_code == 403
+    assert count(database, "call_logs", {"loan_id": call["loan_id"], "agent_id": AGENT["user_id"]}) == 0
+
+
+def test_shard_keys_lead_with_branch():
+    for collection, shard_key in SHARD_KEYS.items():
+        assert list(shard_key) == ["branch_code", "id"]
+        names = {index.document["name"] for index in COLLECTION_INDEXES[collection]}
+        kept = {index.document["name"] for index in COLLECTION_INDEXES[collection] if shard_compatible(collection, index)}
+        assert "branch_id_unique" in kept
+        assert names - kept == {"id_unique"}
+
+
+def test_only_admins_run_escalations(database):
+    assert send("POST", AGENT, "/api/escalations/run?dry_run=true").status_code == 403
+    assert send("POST", ADMIN, "/api/escalations/run?dry_run=true").status_code == 200
+
+
+def test_agents_cannot_post_recoveries_or_settle_commission(database):
+    period = datetime.utcnow().strftime("%Y-%m")
+    recovery = [{"assignment_id": "missing", "amount": 100.0}]
+    assert send("POST", AGENT, "/api/partners/recoveries", json=recovery).status_code == 403
+    assert send("POST", AGENT, f"/api/partners/partner_x/settle?period={period}").status_code == 403
+    assert send("POST", ADMIN, "/api/partners/recoveries", json=recovery).status_code == 404
+    assert send("POST", ADMIN, f"/api/partners/partner_x/settle?period={period}").status_code == 404
+
+
+def test_only_admins_read_events_or_commit_offsets(database):
+    assert get(AGENT, "/api/events/consumers/partner-portal").status_code == 403
+    assert send("POST", AGENT, "/api/events/consumers/partner-portal/offset?offset=1000000").status_code == 403
+    assert get(ADMIN, "/api/events/consumers/partner-portal").status_code == 200
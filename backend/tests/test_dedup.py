@@ -0,0 +1,159 @@
+"""
+Member deduplication: blocking keys and MinHash bands, pair scoring, the
+clustered scan with oversized blocks skipped, and the duplicate checks on
+member create and update.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.config.database import db_config  # noqa: E402
+from app.models import MemberCreate  # noqa: E402
+from app.services import MemberDedupService, MemberService  # noqa: E402
+from app.services.dedup_service import (  # noqa: E402
+    _within_one_edit,
+    blocking_keys,
+    minhash_bands,
+    score_pair,
+)
+from app.utils import DuplicateMemberException, ProbableDuplicateMemberException  # noqa: E402
+
+
+def member(number, first_name, last_name, phone_number, id_number, branch_code="003"):
+    return {
+        "id": f"member_{number}",
+        "member_number": f"M{number}",
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": f"m{number}@example.com",
+        "phone_number": phone_number,
+        "id_number": id_number,
+        "address": "Nairobi",
+        "branch_code": branch_code,
+    }
+
+
+WANJIKU = member("001", "Grace", "Wanjiku", "0712345678", "23456789")
+# The same person registered with swapped names and the phone in international form
+SWAPPED = member("002", "Wanjiku", "Grace", "+254 712 345 678", "31234567")
+# The same person with a misspelt name, a new phone and a one-digit ID typo
+MISSPELT = member("003", "Grace", "Wanjku", "0733000111", "23456788")
+STRANGER = member("004", "Peter", "Otieno", "0712345678", "11223344")
+
+
+@pytest.fixture
+def database():
+    client = AsyncMongoMockClient()
+    database = client["stima_dedup"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    # The insert and update paths rely on the unique member indexes
+    asyncio.run(database.members.create_index("member_number", unique=True, name="member_number_unique"))
+    asyncio.run(database.members.create_index("id_number", unique=True, name="id_number_unique"))
+    yield database
+
+    db_config._client, db_config._database = previous
+
+
+def store(database, *members):
+    asyncio.run(database.members.insert_many([{**m, "dedup_keys": blocking_keys(m)} for m in members]))
+
+
+def test_blocking_keys_collide_for_the_same_person():
+    keys, swapped, misspelt = (set(blocking_keys(m)) for m in (WANJIKU, SWAPPED, MISSPELT))
+
+    assert "id:23456789" in keys
+    assert "phone:+254712345678" in keys & swapped
+    assert "name:grace wanjiku" in keys & swapped
+    # Misspelt names share no exact key but at least one MinHash band
+    assert not {key for key in keys & misspelt if not key.startswith("lsh:")}
+    assert keys & misspelt
+    assert blocking_keys({**WANJIKU, "id_number": "0023-456-789"})[0] == "id:23456789"
+
+
+def test_minhash_bands_are_stable():
+    bands = minhash_bands("grace wanjiku")
+
+    assert len(bands) == 4 and all(band.startswith(f"lsh:{i}:") for i, band in enumerate(bands))
+    assert minhash_bands("grace wanjiku") == bands
+    assert not set(minhash_bands("peter otieno")) & set(bands)
+
+
+def test_within_one_edit():
+    assert _within_one_edit("23456789", "23456788")
+    assert _within_one_edit("23456789", "23457689")
+    assert not _within_one_edit("23456789", "23456700")
+    assert not _within_one_edit("23456789", "32456798")
+
+
+def test_score_pair():
+    same_id, reasons = score_pair(WANJIKU, {**STRANGER, "id_number": "023456789"})
+    assert same_id == 1.0 and reasons[0] == "same_id_number"
+
+    score, reasons = score_pair(WANJIKU, SWAPPED)
+    assert score >= 0.5 and set(reasons) == {"same_name", "same_phone"}
+
+    score, reasons = score_pair(WANJIKU, MISSPELT)
+    assert score >= 0.5 and set(reasons) == {"similar_name", "similar_id_number"}
+
+    # A shared family phone is not enough without a similar name, nor a similar name alone
+    assert score_pair(WANJIKU, STRANGER)[0] < 0.5
+    assert score_pair(SWAPPED, MISSPELT)[0] < 0.5
+
+
+def test_scan_clusters_probable_duplicates(database):
+    store(database, WANJIKU, SWAPPED, MISSPELT, STRANGER)
+
+    report = asyncio.run(MemberDedupService().scan())
+
+    assert {tuple(pair.member_ids) for pair in report.pairs} == {
+        ("member_001", "member_002"),
+        ("member_001", "member_003"),
+    }
+    # Both pairs go through Wanjiku, so they form one cluster
+    assert report.duplicate_pairs == 2 and report.clusters == 1
+    assert report.oversized_blocks == 0
+
+
+def test_scan_skips_oversized_blocks(database):
+    kamaus = [member(f"1{index:02d}", "John", "Kamau", f"07220000{index:02d}", f"4000{index:04d}") for index in range(3)]
+    store(database, *kamaus)
+
+    report = asyncio.run(MemberDedupService().scan(max_block_size=2))
+
+    # The name key and every MinHash band hold all three members
+    assert report.oversized_blocks == 5
+    assert report.blocks_compared == report.comparisons == 0
+
+    assert asyncio.run(MemberDedupService().scan(max_block_size=3)).comparisons == 3
+
+
+def test_create_member_rejects_duplicates_unless_forced(database):
+    store(database, WANJIKU)
+    service = MemberService()
+
+    same_id = {**SWAPPED, "id_number": "23-456-789"}
+    with pytest.raises(DuplicateMemberException):
+        asyncio.run(service.create_member(MemberCreate(**same_id)))
+    with pytest.raises(DuplicateMemberException):
+        asyncio.run(service.create_member(MemberCreate(**same_id), force=True))
+
+    with pytest.raises(ProbableDuplicateMemberException) as error:
+        asyncio.run(service.create_member(MemberCreate(**MISSPELT)))
+    assert "M001" in error.value.message
+
+    created = asyncio.run(service.create_member(MemberCreate(**MISSPELT), force=True))
+    stored = asyncio.run(database.members.find_one({"id": created.id}))
+    assert stored["dedup_keys"] == blocking_keys(stored)
+
+
+def test_update_to_a_taken_id_number_is_a_conflict(database):
+    store(database, WANJIKU, STRANGER)
+
+    with pytest.raises(DuplicateMemberException):
+        asyncio.run(MemberService().update_member("member_004", {"id_number": WANJIKU["id_number"]}))
+    assert asyncio.run(database.members.find_one({"id": "member_004"}))["id_number"] == "11223344"
@@ -0,0 +1,69 @@
+"""
+Escalation assignment ids: a re-run does not assign a loan twice, and a loan
+whose earlier external assignment ended can be escalated again.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.config.database import db_config  # noqa: E402
+from app.models import EscalationLevel, EscalationRule  # noqa: E402
+from app.services import EscalationService  # noqa: E402
+
+RULES = [EscalationRule(
+    level=EscalationLevel.EXTERNAL_PARTNER, min_days_in_arrears=90, min_broken_promises=0, min_failed_calls=0,
+)]
+
+
+@pytest.fixture
+def database():
+    client = AsyncMongoMockClient()
+    database = client["stima_escalation"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    # A re-run's duplicate assignments are rejected by the unique id index
+    asyncio.run(database.partner_assignments.create_index("id", unique=True))
+
+    asyncio.run(database.loan_accounts.insert_one({
+        "id": "loan_1", "branch_code": "003", "status": "defaulted",
+        "days_in_arrears": 200, "outstanding_balance": 50000.0,
+    }))
+    asyncio.run(database.external_partners.insert_one(
+        {"id": "partner_1", "commission_rate": 10.0, "is_active": True, "max_active_assignments": 10}
+    ))
+    yield database
+
+    db_config._client, db_config._database = previous
+
+
+def escalate():
+    return asyncio.run(EscalationService().run_escalations(rules=RULES))
+
+
+def assignments(database):
+    return asyncio.run(database.partner_assignments.find({}, {"_id": 0}).sort("created_at", 1).to_list(None))
+
+
+def test_rerun_does_not_reassign_an_active_loan(database):
+    assert escalate()["assigned"] == 1
+    summary = escalate()
+
+    assert summary["assigned"] == 0 and summary["already_assigned"] == 1
+    assert len(assignments(database)) == 1
+
+
+def test_loan_is_escalated_again_after_its_assignment_ends(database):
+    escalate()
+    asyncio.run(database.partner_assignments.update_one({"loan_id": "loan_1"}, {"$set": {"status": "completed"}}))
+
+    assert escalate()["assigned"] == 1
+
+    first, second = assignments(database)
+    assert first["id"] != second["id"]
+    assert second["escalation_key"] == "loan_1:external_partner:1"
+    assert second["status"] == "assigned"
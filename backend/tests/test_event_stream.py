@@ -0,0 +1,90 @@
+"""
+Domain event stream: readers stop at a gap until it is filled or abandoned,
+committed offsets only move forward, and bulk status changes are published
+in outbox mode.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.config.database import db_config  # noqa: E402
+from app.services import EventStreamService, StatusTransitionService  # noqa: E402
+from app.services import event_stream_service  # noqa: E402
+from app.services.event_stream_service import COUNTER_ID  # noqa: E402
+
+
+@pytest.fixture
+def database(monkeypatch):
+    client = AsyncMongoMockClient()
+    database = client["stima_events"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    monkeypatch.setattr(event_stream_service, "_event_source", "outbox")
+    yield database
+
+    db_config._client, db_config._database = previous
+
+
+def event(entity_id):
+    return {"event_type": "loan.updated", "entity": "loan", "entity_id": entity_id, "occurred_at": datetime.utcnow()}
+
+
+def read(consumer="rollups"):
+    return asyncio.run(EventStreamService().read(consumer))
+
+
+def test_reader_waits_at_a_gap_until_it_is_filled(database):
+    service = EventStreamService()
+    asyncio.run(service.append([event("loan_1")]))
+    # A writer allocated position 2 but has not inserted its event yet
+    asyncio.run(database.event_counters.update_one({"id": COUNTER_ID}, {"$inc": {"seq": 1}}))
+    asyncio.run(service.append([event("loan_3")]))
+
+    batch = read()
+    assert [e.seq for e in batch.events] == [1] and batch.next_offset == 1
+
+    asyncio.run(database.domain_events.insert_one({
+        **event("loan_2"), "id": "late", "seq": 2, "recorded_at": datetime.utcnow(), "payload": {},
+    }))
+    assert [e.seq for e in read().events] == [1, 2, 3]
+
+
+def test_reader_skips_an_abandoned_gap(database):
+    service = EventStreamService()
+    asyncio.run(service.append([event("loan_1")]))
+    asyncio.run(database.event_counters.update_one({"id": COUNTER_ID}, {"$inc": {"seq": 1}}))
+    asyncio.run(service.append([event("loan_3")]))
+    asyncio.run(database.domain_events.update_one(
+        {"seq": 3}, {"$set": {"recorded_at": datetime.utcnow() - timedelta(hours=1)}}
+    ))
+
+    batch = read()
+    assert [e.seq for e in batch.events] == [1, 3] and batch.next_offset == 3
+
+
+def test_committed_offset_never_moves_back(database):
+    service = EventStreamService()
+    asyncio.run(service.append([event(f"loan_{index}") for index in range(5)]))
+
+    assert asyncio.run(service.commit("rollups", 4)) == 4
+    assert asyncio.run(service.commit("rollups", 2)) == 4
+    batch = read()
+    assert batch.offset == 4 and [e.seq for e in batch.events] == [5]
+
+
+def test_bulk_status_changes_are_published(database):
+    asyncio.run(database.loan_accounts.insert_many([
+        {"id": f"loan_{index}", "branch_code": "003", "status": "performing"} for index in range(3)
+    ]))
+
+    asyncio.run(StatusTransitionService().transition("loan", ["loan_0", "loan_1"], "non_performing"))
+
+    events = read().events
+    assert sorted(e.entity_id for e in events) == ["loan_0", "loan_1"]
+    assert {e.event_type for e in events} == {"loan.updated"}
+    assert {e.payload["status"] for e in events} == {"non_performing"}
@@ -0,0 +1,116 @@
+"""
+Idempotency keys: a retried write is replayed, a key reused with another
+body is rejected (sequentially and while the first write is in flight),
+concurrent duplicates share one write, and a cancelled request does not
+abort the write its duplicates are waiting on.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+from fastapi import Response  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.config.database import db_config  # noqa: E402
+from app.services import IdempotencyService  # noqa: E402
+from app.services.idempotency_service import REPLAYED_HEADER  # noqa: E402
+from app.utils import IdempotencyKeyMismatchException  # noqa: E402
+
+BODY = {"loan_id": "loan_1", "notes": "Promised to pay on Friday"}
+
+
+@pytest.fixture
+def database():
+    client = AsyncMongoMockClient()
+    database = client["stima_idempotency"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    # Claims rely on the unique id index
+    asyncio.run(database.idempotency_keys.create_index("id", unique=True))
+    yield database
+
+    db_config._client, db_config._database = previous
+
+
+class Writer:
+    """Write callable that counts executions and can be held open."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.executions = 0
+
+    async def __call__(self):
+        self.executions += 1
+        await asyncio.sleep(self.delay)
+        return {"id": f"call_{self.executions}"}
+
+
+def run(write, body=BODY, key="key-1", response=None):
+    return IdempotencyService().run("calls", key, "agent_001", body, write, response)
+
+
+def test_retry_is_replayed(database):
+    write = Writer()
+    first = asyncio.run(run(write))
+    response = Response()
+    second = asyncio.run(run(write, response=response))
+
+    assert first == second == {"id": "call_1"}
+    assert write.executions == 1
+    assert response.headers[REPLAYED_HEADER] == "true"
+
+
+def test_key_reused_with_another_body_is_rejected(database):
+    write = Writer()
+    asyncio.run(run(write))
+
+    with pytest.raises(IdempotencyKeyMismatchException):
+        asyncio.run(run(write, body={**BODY, "notes": "Something else"}))
+    assert write.executions == 1
+
+
+def test_concurrent_duplicates_share_one_write(database):
+    write = Writer(delay=0.02)
+    responses = [Response() for _ in range(3)]
+
+    async def scenario():
+        return await asyncio.gather(*(run(write, response=response) for response in responses))
+
+    assert asyncio.run(scenario()) == [{"id": "call_1"}] * 3
+    assert write.executions == 1
+    assert [REPLAYED_HEADER in response.headers for response in responses] == [False, True, True]
+
+
+def test_concurrent_duplicate_with_another_body_is_rejected(database):
+    write = Writer(delay=0.02)
+
+    async def scenario():
+        first = asyncio.ensure_future(run(write))
+        await asyncio.sleep(0)
+        with pytest.raises(IdempotencyKeyMismatchException):
+            await run(write, body={**BODY, "notes": "Something else"})
+        return await first
+
+    assert asyncio.run(scenario()) == {"id": "call_1"}
+    assert write.executions == 1
+
+
+def test_cancelled_request_does_not_abort_the_shared_write(database):
+    write = Writer(delay=0.02)
+
+    async def scenario():
+        first = asyncio.ensure_future(run(write))
+        await asyncio.sleep(0)
+        duplicate = asyncio.ensure_future(run(write))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await duplicate
+
+    assert asyncio.run(scenario()) == {"id": "call_1"}
+    assert write.executions == 1
+    record = asyncio.run(database.idempotency_keys.find_one({"id": "calls:agent_001:key-1"}))
+    assert record["status"] == "completed"
@@ -0,0 +1,88 @@
+"""
+Note search: query parsing, the index filter a parsed query becomes, and
+indexing the notes of a database seeded before notes were indexed.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.config import app_config  # noqa: E402
+from app.config.database import db_config  # noqa: E402
+from app.models import NoteSource  # noqa: E402
+from app.services import NoteSearchService, seeding_service  # noqa: E402
+from app.services.note_search_service import parse_query  # noqa: E402
+from app.services.seeding_service import MANIFEST_ID, SeedingService, seed_progress  # noqa: E402
+
+AGENT = {"user_id": "agent_007", "role": "agent", "branch_code": "003"}
+
+
+@pytest.fixture
+def database():
+    client = AsyncMongoMockClient()
+    database = client["stima_notes"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    yield database
+
+    db_config._client, db_config._database = previous
+
+
+def test_parse_query():
+    assert parse_query("paid Salary") == (["paid", "salary"], [], [])
+    assert parse_query('"will pay on Friday" mpesa') == (["mpesa"], ["will pay on friday"], [])
+    assert parse_query("sal* follow-u*") == (["follow"], [], ["sal"])
+    # Prefixes shorter than two characters and empty phrases are dropped
+    assert parse_query('s* "" ,') == ([], [], [])
+    assert parse_query('"M-Pesa, tomorrow"') == ([], ["m pesa tomorrow"], [])
+
+
+def test_build_filter(database):
+    date_from = datetime(2024, 6, 1)
+    words, phrases, prefixes = parse_query('salary "next week" emp*')
+
+    match = NoteSearchService().build_filter(
+        words, phrases, prefixes, agent_id="agent_001", source=NoteSource.PROMISE, date_from=date_from
+    )
+
+    assert match == {
+        "agent_id": "agent_001",
+        "source": "promise",
+        "noted_at": {"$gte": date_from},
+        "$text": {"$search": 'salary "next week"'},
+        "$and": [{"terms": {"$regex": "^emp"}}],
+    }
+    # A branch user's filter is limited to their branch; prefix-only queries need no text index
+    assert NoteSearchService(AGENT).build_filter([], [], ["emp"]) == {
+        "branch_code": "003",
+        "$and": [{"terms": {"$regex": "^emp"}}],
+    }
+
+
+def test_completed_seed_without_indexed_notes_is_indexed(database, monkeypatch):
+    async def nothing(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(app_config, "SEED_DUMMY_DATA", True)
+    monkeypatch.setattr(seeding_service, "ensure_indexes", nothing)
+    monkeypatch.setattr(seeding_service, "seed_progress", dict(seed_progress))
+    asyncio.run(database.seed_manifest.insert_one({
+        "_id": MANIFEST_ID, "status": "completed", "chunk_count": 1, "completed_chunks": [0], "rows_written": 2,
+    }))
+    asyncio.run(database.call_logs.insert_many([
+        {"id": "call_1", "loan_id": "loan_1", "member_id": "member_1", "branch_code": "003",
+         "call_start_time": datetime.utcnow(), "notes": "Member will pay after salary"},
+        {"id": "call_2", "loan_id": "loan_1", "member_id": "member_1", "branch_code": "003",
+         "call_start_time": datetime.utcnow(), "notes": ""},
+    ]))
+
+    asyncio.run(SeedingService().run())
+
+    entries = asyncio.run(database.note_index.find({}, {"_id": 0}).to_list(None))
+    assert [entry["id"] for entry in entries] == ["call_1"]
+    assert entries[0]["branch_code"] == "003" and "salary" in entries[0]["terms"]
+    assert seeding_service.seed_progress["status"] == "completed"
@@ -0,0 +1,182 @@
+"""
+ProFIX client resilience against a fault-injecting ProFIX stand-in.
+
+The stand-in is a small ASGI app served in-process through httpx's ASGI
+transport; each test scripts the faults it returns (errors, hangs).
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.utils.exceptions import (
+    ExternalServiceException,
+    ExternalServiceUnavailableException,
+    LoanNotFoundException,
+)
+from external_integrations.profix_client import ProFIXClient
+from external_integrations.resilience import CLOSED, HALF_OPEN, OPEN, ResiliencePolicy
+
+
+class FaultyProFIX:
+    """ProFIX stand-in answering ``GET /loans/{number}``; queued faults are served first."""
+
+    def __init__(self, faults=(), delay: float = 0.0):
+        self.faults = list(faults)
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            fault = self.faults.pop(0) if self.faults else "ok"
+            if fault == "hang":
+                await asyncio.sleep(60)
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            loan_number = scope["path"].rsplit("/", 1)[-1]
+            if fault == "ok":
+                status, body = 200, {"loan_number": loan_number, "outstanding_balance": 1234.5}
+            elif fault == "missing":
+                status, body = 404, {"detail": "Loan not found"}
+            else:
+                status, body = int(fault), {"detail": "fault injected"}
+            payload = json.dumps(body).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            })
+            await send({"type": "http.response.body", "body": payload})
+        finally:
+            self.in_flight -= 1
+
+
+def make_client(stand_in: FaultyProFIX, **options) -> ProFIXClient:
+    settings = dict(
+        timeout=0.2, max_concurrent=10, max_wait=0.0, failure_threshold=3,
+        recovery_timeout=0.3, retry_attempts=3, backoff=0.01,
+    )
+    settings.update(options)
+    policy = ResiliencePolicy("profix-test", **settings)
+    return ProFIXClient("http://profix.test", policy=policy, transport=httpx.ASGITransport(app=stand_in))
+
+
+def test_transient_errors_are_retried():
+    stand_in = FaultyProFIX(faults=["503", "502"])
+    client = make_client(stand_in)
+
+    loan = asyncio.run(client.get_loan("LN001"))
+
+    assert loan["outstanding_balance"] == 1234.5
+    assert stand_in.requests == 3
+    assert client.policy.retries == 2
+    assert client.policy.breaker.state == CLOSED
+
+
+def test_client_errors_pass_through_without_tripping_the_circuit():
+    stand_in = FaultyProFIX(faults=["missing"] * 5)
+    client = make_client(stand_in)
+
+    async def scenario():
+        for _ in range(5):
+            with pytest.raises(LoanNotFoundException):
+                await client.get_loan("LN404")
+
+    asyncio.run(scenario())
+    assert stand_in.requests == 5
+    assert client.policy.breaker.state == CLOSED
+
+
+def test_timeouts_open_the_circuit_and_calls_fail_fast():
+    stand_in = FaultyProFIX(faults=["hang"] * 10)
+    client = make_client(stand_in, retry_attempts=2)
+
+    async def scenario():
+        with pytest.raises(ExternalServiceException):
+            await client.get_loan("LN001")  # two timeouts
+        with pytest.raises(ExternalServiceException):
+            await client.get_loan("LN001")  # third timeout opens the circuit, no retry
+        assert client.policy.breaker.state == OPEN
+
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(ExternalServiceUnavailableException) as rejected:
+            await client.get_loan("LN001")
+        assert asyncio.get_running_loop().time() - started < 0.05
+        assert rejected.value.status_code == 503
+        assert rejected.value.retry_after > 0
+
+    asyncio.run(scenario())
+    assert stand_in.requests == 3
+    assert client.policy.timeouts == 3
+    assert client.policy.breaker.rejected == 1
+
+
+def test_half_open_trial_closes_or_reopens_the_circuit():
+    stand_in = FaultyProFIX(faults=["500"] * 3)
+    client = make_client(stand_in, retry_attempts=1)
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(ExternalServiceException):
+                await client.get_loan("LN001")
+        assert client.policy.breaker.state == OPEN
+
+        # A failed trial reopens the circuit
+        await asyncio.sleep(0.35)
+        assert client.policy.breaker.state == HALF_OPEN
+        stand_in.faults = ["503", "503"]
+        with pytest.raises(ExternalServiceException):
+            await client.get_loan("LN001")
+        assert client.policy.breaker.state == OPEN
+        assert stand_in.requests == 4  # the trial is not retried
+
+        # A successful trial closes it
+        await asyncio.sleep(0.35)
+        stand_in.faults = []
+        loan = await client.get_loan("LN001")
+        assert loan["loan_number"] == "LN001"
+        assert client.policy.breaker.state == CLOSED
+
+    asyncio.run(scenario())
+    assert client.policy.breaker.times_opened == 2
+
+
+def test_bulkhead_bounds_concurrent_calls():
+    stand_in = FaultyProFIX(delay=0.1)
+    client = make_client(stand_in, max_concurrent=3, max_wait=0.0)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(client.get_loan(f"LN{n:03d}") for n in range(10)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    rejected = [r for r in results if isinstance(r, ExternalServiceUnavailableException)]
+    succeeded = [r for r in results if isinstance(r, dict)]
+    assert len(succeeded) == 3
+    assert len(rejected) == 7
+    assert stand_in.max_in_flight == 3
+    assert client.policy.bulkhead.rejected == 7
+    # Rejections are load shedding, not dependency failures
+    assert client.policy.breaker.state == CLOSED
+
+
+def test_stats_expose_policy_state():
+    stand_in = FaultyProFIX(faults=["503"])
+    client = make_client(stand_in)
+
+    asyncio.run(client.get_loan("LN001"))
+    stats = client.policy.stats()
+
+    assert stats["circuit"]["state"] == CLOSED
+    assert stats["bulkhead"]["active"] == 0
+    assert stats["calls"] == 1
+    assert stats["successes"] == 1
+    assert stats["retries"] == 1
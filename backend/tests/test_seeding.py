@@ -0,0 +1,88 @@
+"""
+Seeding lease: a worker that finds another process seeding waits on the
+manifest instead of staying not-ready, and takes over an abandoned lease.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.config import app_config  # noqa: E402
+from app.config.database import db_config  # noqa: E402
+from app.services import seeding_service  # noqa: E402
+from app.services.seeding_service import MANIFEST_ID, SeedingService, seed_progress  # noqa: E402
+
+
+@pytest.fixture
+def database(monkeypatch):
+    client = AsyncMongoMockClient()
+    database = client["stima_seeding"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    monkeypatch.setattr(app_config, "SEED_DUMMY_DATA", True)
+    monkeypatch.setattr(seeding_service, "WAIT_POLL_SECONDS", 0.01)
+
+    async def nothing(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(seeding_service, "ensure_indexes", nothing)
+    monkeypatch.setattr(seeding_service.AuthService, "ensure_demo_users", nothing)
+    monkeypatch.setattr(seeding_service, "seed_progress", dict(seed_progress))
+
+    asyncio.run(database.seed_manifest.insert_one({
+        "_id": MANIFEST_ID,
+        "seed": 1,
+        "member_count": 10,
+        "batch_size": 10,
+        "chunk_count": 1,
+        "now": datetime.utcnow(),
+        "status": "in_progress",
+        "completed_chunks": [],
+        "rows_written": 0,
+        "lease_owner": "other-worker",
+        "lease_expires_at": datetime.utcnow() + timedelta(seconds=60),
+    }))
+    yield database
+
+    db_config._client, db_config._database = previous
+
+
+def test_waiting_worker_reports_completed_when_the_holder_finishes(database):
+    async def scenario():
+        task = asyncio.ensure_future(SeedingService().run())
+        await asyncio.sleep(0.05)
+        assert seeding_service.seed_progress["status"] == "waiting"
+        await database.seed_manifest.update_one(
+            {"_id": MANIFEST_ID}, {"$set": {"status": "completed", "completed_chunks": [0], "rows_written": 42}}
+        )
+        await asyncio.wait_for(task, timeout=1)
+
+    asyncio.run(scenario())
+
+    assert seeding_service.seed_progress["status"] == "completed"
+    assert seeding_service.seed_progress["rows_written"] == 42
+
+
+def test_waiting_worker_takes_over_an_expired_lease(database, monkeypatch):
+    seeded = []
+
+    async def seed(self, manifest):
+        seeded.append(manifest["lease_owner"] == self.owner)
+
+    monkeypatch.setattr(SeedingService, "_seed", seed)
+
+    async def scenario():
+        task = asyncio.ensure_future(SeedingService().run())
+        await asyncio.sleep(0.05)
+        await database.seed_manifest.update_one(
+            {"_id": MANIFEST_ID}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        await asyncio.wait_for(task, timeout=1)
+
+    asyncio.run(scenario())
+
+    assert seeded == [True]
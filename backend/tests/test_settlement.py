@@ -0,0 +1,154 @@
+"""
+Partner ledger crash safety: recoveries and settlements interrupted between
+the ledger entry and the running totals are finished exactly once by a
+retried write or by the reconcile pass.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.config.database import db_config  # noqa: E402
+from app.models import RecoveryCreate  # noqa: E402
+from app.services import SettlementService  # noqa: E402
+from app.services.settlement_service import bucket_id, ledger_period  # noqa: E402
+
+PERIOD = ledger_period(datetime.utcnow())
+
+
+class Crash(Exception):
+    """Stands in for the process dying part way through a write."""
+
+
+@pytest.fixture
+def database():
+    client = AsyncMongoMockClient()
+    database = client["stima_settlement"]
+    previous = (db_config._client, db_config._database)
+    db_config._client, db_config._database = client, database
+    # Duplicate recoveries are detected by the unique id index
+    asyncio.run(database.partner_ledger.create_index("id", unique=True))
+
+    asyncio.run(database.external_partners.insert_one(
+        {"id": "partner_1", "partner_name": "Haki Recoveries", "commission_rate": 10.0}
+    ))
+    asyncio.run(database.partner_assignments.insert_one({
+        "id": "assignment_1", "partner_id": "partner_1", "loan_id": "loan_1",
+        "branch_code": "003", "status": "assigned",
+    }))
+    yield database
+
+    db_config._client, db_config._database = previous
+
+
+def recover(amount=1000.0, reference="MPESA-1"):
+    return asyncio.run(SettlementService().record_recoveries(
+        [RecoveryCreate(assignment_id="assignment_1", amount=amount, reference=reference)]
+    ))
+
+
+def bucket(database):
+    return asyncio.run(database.partner_ledger_buckets.find_one({"_id": bucket_id("partner_1", PERIOD)})) or {}
+
+
+def assignment(database):
+    return asyncio.run(database.partner_assignments.find_one({"id": "assignment_1"}))
+
+
+def unapplied(database):
+    return asyncio.run(database.partner_ledger.count_documents({"applied": False}))
+
+
+def reconcile(database):
+    """Reconcile once the unapplied entries are past the grace period."""
+    asyncio.run(database.partner_ledger.update_many(
+        {"applied": False}, {"$set": {"recorded_at": datetime.utcnow() - timedelta(hours=1)}}
+    ))
+    return asyncio.run(SettlementService().reconcile())
+
+
+def crash_once(monkeypatch, name):
+    original = getattr(SettlementService, name)
+    calls = []
+
+    async def crashing(self, *args, **kwargs):
+        if not calls:
+            calls.append(name)
+            raise Crash()
+        return await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(SettlementService, name, crashing)
+
+
+def test_resent_recovery_applies_totals_lost_to_a_crash(database, monkeypatch):
+    crash_once(monkeypatch, "_apply_totals")
+    with pytest.raises(Crash):
+        recover()
+    assert unapplied(database) == 1
+    assert bucket(database) == {}
+
+    result = recover()
+
+    assert result["recorded"] == 0 and result["duplicates"] == 1
+    assert bucket(database)["recovered_amount"] == 1000.0
+    assert assignment(database)["actual_recovery_amount"] == 1000.0
+    assert assignment(database)["status"] == "in_progress"
+    assert unapplied(database) == 0
+
+
+def test_reconcile_does_not_apply_a_batch_twice(database, monkeypatch):
+    # Totals applied, then the crash before the entries were marked
+    original = SettlementService._apply_totals
+
+    async def apply_then_crash(self, *args, **kwargs):
+        await original(self, *args, **kwargs)
+        raise Crash()
+
+    monkeypatch.setattr(SettlementService, "_apply_totals", apply_then_crash)
+    with pytest.raises(Crash):
+        recover(amount=500.0)
+    monkeypatch.setattr(SettlementService, "_apply_totals", original)
+
+    counts = reconcile(database)
+
+    assert counts["recoveries"] == 1
+    assert bucket(database)["recovered_amount"] == 500.0
+    assert bucket(database)["commission_amount"] == 50.0
+    assert assignment(database)["commission_amount"] == 50.0
+    assert unapplied(database) == 0
+
+
+def test_reconcile_applies_an_interrupted_settlement(database, monkeypatch):
+    recover(amount=2000.0)
+    crash_once(monkeypatch, "_apply_settlement")
+    with pytest.raises(Crash):
+        asyncio.run(SettlementService().settle("partner_1", PERIOD))
+    assert bucket(database).get("settled_amount") is None
+
+    counts = reconcile(database)
+
+    assert counts["settlements"] == 1
+    assert bucket(database)["settled_amount"] == 200.0
+    statement = asyncio.run(SettlementService().settle("partner_1", PERIOD))
+    assert statement.outstanding_commission == 0.0
+    assert asyncio.run(database.partner_ledger.count_documents({"entry_type": "settlement"})) == 1
+
+
+def test_reconcile_discards_an_overtaken_settlement(database, monkeypatch):
+    recover(amount=2000.0)
+    crash_once(monkeypatch, "_apply_settlement")
+    with pytest.raises(Crash):
+        asyncio.run(SettlementService().settle("partner_1", PERIOD))
+    # Another settlement paid the same commission before reconciliation
+    asyncio.run(SettlementService().settle("partner_1", PERIOD))
+
+    counts = reconcile(database)
+
+    assert counts == {"recoveries": 0, "settlements": 0, "discarded_settlements": 1}
+    assert bucket(database)["settled_amount"] == 200.0
+    rebuilt = asyncio.run(SettlementService().rebuild_bucket("partner_1", PERIOD))
+    assert rebuilt.settled_amount == 200.0
@@ -0,0 +1,65 @@
+"""
+Single-flight coalescing: concurrent callers share one execution, errors
+reach every waiter, and cancelling any waiter (the one that started the
+call included) leaves the others with the shared result.
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    async def query():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return {"total": 3}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("dashboard:{}", query) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [{"total": 3}] * 5
+    assert len(executions) == 1
+    stats = flight.stats()
+    assert stats["executions"] == 1 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database unavailable")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("dashboard:{}", query) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["errors"] == 1
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    flight = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.02)
+        return "shared"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("dashboard:{}", query))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("dashboard:{}", query))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "shared"
+    assert flight.stats()["errors"] == 0
@@ -0,0 +1,47 @@
+"""
+Startup budget for the API.
+
+The application is imported in fresh interpreters (``benchmarks/startup.py``)
+so modules already loaded by other tests do not hide an eager import. The
+budget defaults to ``DEFAULT_BUDGET_MS`` and can be set for slower CI
+machines with ``STARTUP_BUDGET_MS``.
+"""
+
+import json
+import sys
+
+import pytest
+
+from app.utils.lazy_import import LazyModule, lazy_import
+from benchmarks.startup import DEFAULT_BUDGET_MS, import_in_child, measure, parse_importtime
+
+
+def test_deferred_modules_are_not_imported_at_startup():
+    assert import_in_child("main")["deferred_loaded"] == []
+
+
+def test_import_within_budget():
+    report = measure("main", runs=3)
+    assert report["import_ms"] <= DEFAULT_BUDGET_MS, json.dumps(report["packages"], indent=2)
+
+
+def test_lazy_import_loads_on_first_attribute_access():
+    assert lazy_import("json") is sys.modules["json"]
+
+    module = lazy_import("stima_no_such_module")
+    assert isinstance(module, LazyModule) and not module.is_loaded
+    with pytest.raises(ModuleNotFoundError):
+        module.anything
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   bson.codec\n"
+        "import time:       300 |        420 | bson\n"
+        "some other stderr line\n"
+    )
+    assert parse_importtime(stderr) == [
+        {"module": "bson.codec", "self_us": 120, "cumulative_us": 120},
+        {"module": "bson", "self_us": 300, "cumulative_us": 420},
+    ]
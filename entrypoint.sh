@@ -4,25 +4,52 @@ set -e
 # Start the FastAPI backend
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
-echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
-BACKEND_PID=$!
-
-echo "Waiting for backend to start..."
-sleep 30
+APP_MODULE=${APP_MODULE:-main:app}
 
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
-    exit 1
+# production: gunicorn with one uvicorn worker per core (gunicorn.conf.py);
+# single: one uvicorn process, for small or development deployments
+if [ "${SERVER_PROFILE:-production}" = "production" ]; then
+    echo "Starting FastAPI backend (gunicorn, ${WEB_CONCURRENCY:-one worker per core})"
+    gunicorn -c gunicorn.conf.py "$APP_MODULE" &
+else
+    echo "Starting FastAPI backend (single uvicorn process)"
+    uvicorn "$APP_MODULE" --host 0.0.0.0 --port 8001 &
 fi
+BACKEND_PID=$!
+
+# Wait for the liveness probe instead of a fixed sleep; dummy-data seeding
+# runs in the background and does not delay liveness
+echo "Waiting for backend to become live..."
+STARTUP_TIMEOUT=${BACKEND_STARTUP_TIMEOUT:-60}
+ELAPSED=0
+until wget -q -O /dev/null http://127.0.0.1:8001/health/live 2>/dev/null; do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if [ "$ELAPSED" -ge "$STARTUP_TIMEOUT" ]; then
+        echo "Backend did not become live within ${STARTUP_TIMEOUT}s, exiting"
+        kill $BACKEND_PID
+        exit 1
+    fi
+    sleep 1
+    ELAPSED=$((ELAPSED + 1))
+done
+echo "Backend is live"
 
 # Start Nginx
 nginx -g 'daemon off;' &
 NGINX_PID=$!
 
-# Handle termination signals
-trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
+# Handle termination signals: nginx finishes its open requests and gunicorn
+# drains its workers (GUNICORN_GRACEFUL_TIMEOUT) before the container exits
+shutdown() {
+    kill -QUIT $NGINX_PID 2>/dev/null
+    kill -TERM $BACKEND_PID 2>/dev/null
+    wait $BACKEND_PID $NGINX_PID || true
+    exit 0
+}
+trap shutdown SIGTERM SIGINT
 
 # Check if processes are still running
 while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
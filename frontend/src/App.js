@@ -11,6 +11,7 @@ import { Login, ProtectedRoute } from "./components/auth";
 import { Dashboard } from "./components/dashboard";
 import Reports from "./components/Reports";
 import Notifications from "./components/Notifications";
+import { apiService } from "./services/apiService";
 
 // Authentication Context
 const AuthContext = React.createContext();
@@ -39,6 +40,8 @@ const App = () => {
   };
 
   const handleLogout = () => {
+    // Revoke the token server-side; sign out locally even if that fails
+    apiService.logout().catch(() => {});
     localStorage.removeItem("auth");
     setAuth(null);
   };
@@ -5,6 +5,7 @@
 import React, { useState } from "react";
 import { AuthLogo } from "./AuthLogo";
 import { DemoCredentials } from "./DemoCredentials";
+import { apiService } from "../../services/apiService";
 
 const Login = ({ onLogin }) => {
   const [credentials, setCredentials] = useState({ username: "", password: "" });
@@ -13,43 +14,37 @@ const Login = ({ onLogin }) => {
 
   const handleSubmit = async (e) => {
     e.preventDefault();
+    if (!credentials.username || !credentials.password) {
+      setError("Please enter both username and password");
+      return;
+    }
     setLoading(true);
     setError("");
 
-    // Simulate authentication (in real system, this would call an API)
-    setTimeout(() => {
-      if (credentials.username && credentials.password) {
-        // Demo credentials - in real system, validate against backend
-        const validCredentials = [
-          { username: "admin", password: "admin123", role: "admin", name: "System Administrator" },
-          { username: "agent", password: "agent123", role: "agent", name: "Collection Agent" },
-          { username: "manager", password: "manager123", role: "manager", name: "Branch Manager" }
-        ];
-
-        const user = validCredentials.find(
-          u => u.username === credentials.username && u.password === credentials.password
-        );
-
-        if (user) {
-          const authData = {
-            user: { 
-              id: user.username + "_id",
-              username: user.username,
-              name: user.name,
-              role: user.role
-            },
-            token: "mock_jwt_token_" + Date.now()
-          };
-          localStorage.setItem("auth", JSON.stringify(authData));
-          onLogin(authData);
-        } else {
-          setError("Invalid username or password");
-        }
+    try {
+      const response = await apiService.login(credentials);
+      const { access_token: token, user } = response.data;
+      const authData = {
+        user: {
+          id: user.user_id,
+          username: user.username,
+          name: user.name,
+          role: user.role,
+          branchCode: user.branch_code
+        },
+        token
+      };
+      localStorage.setItem("auth", JSON.stringify(authData));
+      onLogin(authData);
+    } catch (err) {
+      if (err.response?.status === 401) {
+        setError("Invalid username or password");
       } else {
-        setError("Please enter both username and password");
+        setError("Unable to sign in. Please try again.");
       }
+    } finally {
       setLoading(false);
-    }, 1000);
+    }
   };
 
   const handleInputChange = (field, value) => {
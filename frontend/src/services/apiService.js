@@ -33,7 +33,8 @@ class ApiService {
     this.client.interceptors.response.use(
       (response) => response,
       (error) => {
-        if (error.response?.status === 401) {
+        // A failed login is reported by the login form, not by redirecting
+        if (error.response?.status === 401 && error.config?.url !== "/auth/token") {
           // Handle unauthorized access
           localStorage.removeItem("auth");
           window.location.href = "/login";
@@ -43,6 +44,15 @@ class ApiService {
     );
   }
 
+  // Authentication endpoints
+  login(credentials) {
+    return this.client.post("/auth/token", credentials);
+  }
+
+  logout() {
+    return this.client.post("/auth/logout");
+  }
+
   // Dashboard endpoints
   getDashboardStats() {
     return this.client.get("/dashboard/stats");